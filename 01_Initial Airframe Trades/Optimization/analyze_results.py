@@ -3,11 +3,12 @@ Analyze optimization results from opt_history.csv
 Generates summary statistics and identifies best designs
 """
 
-import csv
 import os
 import sys
 import numpy as np
 
+import history_store
+
 def analyze_results(history_file="opt_history.csv"):
     """
     Analyze optimization history and generate summary report.
@@ -20,42 +21,23 @@ def analyze_results(history_file="opt_history.csv"):
     print("OPTIMIZATION RESULTS ANALYSIS")
     print("="*80)
     
-    # Read data
-    iterations = []
-    with open(history_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            iterations.append(row)
+    # Read data (typed columns - from the columnar store next to the CSV when there is one)
+    iterations = history_store.read_rows(history_file)
     
     if len(iterations) == 0:
         print("ERROR: No iterations found!")
         return
     
-    # Extract numeric data
-    data = {
-        'iter': [], 'generation': [], 'final_obj': [], 'band_LD': [],
-        'static_margin': [], 'span_mm': [], 'sweep_deg': [], 'xloc_mm': [],
-        'taper': [], 'tip_mm': [], 'cg_x': [], 'xnp': [], 'mac': [],
-        'total_penalty': [], 'vspaero_time_s': [], 'is_new_best': []
-    }
-    
-    for it in iterations:
-        try:
-            for key in data.keys():
-                val = it.get(key, 'N/A')
-                if val != 'N/A' and val != '':
-                    try:
-                        data[key].append(float(val))
-                    except (ValueError, TypeError):
-                        data[key].append(None)
-                else:
-                    data[key].append(None)
-        except Exception as e:
-            continue
-    
-    # Convert to numpy arrays (filtering None values)
-    def to_array(lst):
-        return np.array([x for x in lst if x is not None])
+    # Extract numeric data (nan for N/A)
+    keys = ['iter', 'generation', 'final_obj', 'band_LD', 'static_margin', 'span_mm', 'sweep_deg', 'xloc_mm',
+            'taper', 'tip_mm', 'cg_x', 'xnp', 'mac', 'total_penalty', 'vspaero_time_s']
+    data = {key: np.asarray(iterations.column(key), dtype=float) for key in keys}
+    data['iter'][data['iter'] == history_store.INT_MISSING] = np.nan
+    data['generation'][data['generation'] == history_store.INT_MISSING] = np.nan
+    
+    # Convert to numpy arrays (filtering missing values)
+    def to_array(values):
+        return values[~np.isnan(values)]
     
     objs = to_array(data['final_obj'])
     if len(objs) == 0:
@@ -68,10 +50,9 @@ def analyze_results(history_file="opt_history.csv"):
     
     print(f"\n[OVERVIEW]")
     print(f"  Total Iterations: {len(iterations)}")
-    if data['generation']:
-        gens = [g for g in data['generation'] if g is not None]
-        if gens:
-            print(f"  Total Generations: {int(max(gens))}")
+    gens = to_array(data['generation'])
+    if len(gens):
+        print(f"  Total Generations: {int(max(gens))}")
     print(f"  Best Iteration: {best_iter}")
     print(f"  Best Objective: {objs[best_idx]:.4f}")
     
@@ -107,12 +88,10 @@ def analyze_results(history_file="opt_history.csv"):
         print(f"  Static Margin Mean:  {np.mean(sm_vals):.2f}% ± {np.std(sm_vals):.2f}%")
         
         # Count by category
-        categories = {}
-        for it in iterations:
-            cat = it.get('sm_category', 'unknown')
-            categories[cat] = categories.get(cat, 0) + 1
+        names, counts = np.unique(iterations.columns.get('sm_category', np.full(len(iterations), 'unknown')),
+                                  return_counts=True)
         print(f"  Distribution:")
-        for cat, count in sorted(categories.items()):
+        for cat, count in zip(names, counts):
             pct = (count / len(iterations)) * 100
             print(f"    {cat:15s}: {count:3d} ({pct:5.1f}%)")
     
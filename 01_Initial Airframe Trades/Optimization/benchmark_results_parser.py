@@ -0,0 +1,142 @@
+"""
+Microbenchmark: indexed ResultsTable vs scanning Results.csv once per quantity.
+
+Writes synthetic VSPAero-style Results.csv files with many result blocks (a
+history block and a span load block per alpha, then the polar and the flow
+condition rows) and times reading what one evaluation needs - L_D, CLtot,
+CMytot, FC_Cref_ and FC_Xcg_ - three ways:
+
+    per-quantity scans:  open and split the whole file for each quantity, as
+                         extract_band_ld / extract_cg_from_results /
+                         extract_stability_margin / extract_stability_fallback
+                         did before the results were loaded once
+    eager table:         one pass that splits every line (ResultsTable before
+                         the index)
+    indexed table:       ResultsTable.from_csv - one pass, lines split and
+                         converted only for the labels that are read
+
+Usage:
+    python benchmark_results_parser.py [--alphas 7 13 25] [--span-stations 200] [--repeats 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+
+HISTORY_LABELS = ["Iteration", "Mach", "Alpha", "Beta", "CL", "CDo", "CDi", "CDtot", "CS", "L/D", "E",
+                  "CFx", "CFy", "CFz", "CMx", "CMy", "CMz", "ToQS"]
+LOAD_LABELS = ["WingId", "S", "Xavg", "Yavg", "Zavg", "Chord", "V/Vref", "Cl", "Cd", "Cs", "Cx", "Cy",
+               "Cz", "Cmx", "Cmy", "Cmz"]
+POLAR_LABELS = ["Alpha", "Beta", "CDi", "CDo", "CDtot", "CFxtot", "CFytot", "CFztot", "CLtot", "CMxtot",
+                "CMytot", "CMztot", "CStot", "E", "L_D", "Mach", "ToQS"]
+
+def write_results_csv(path, n_alphas=7, span_stations=200, wake_iterations=10, seed=0):
+    """Synthetic Results.csv; returns the polar rows it wrote (label -> values)."""
+    rng = np.random.default_rng(seed)
+    alphas = np.linspace(2.0, 14.0, n_alphas)
+    fmt = lambda values: ",".join(f"{v:.10f}" for v in values)
+    polar = {label: rng.normal(size=n_alphas) for label in POLAR_LABELS}
+    polar["Alpha"] = alphas
+    polar["L_D"] = -np.abs(polar["L_D"]) * 10.0
+    polar["CLtot"] = 0.08 * alphas
+    with open(path, "w") as f:
+        for alpha in alphas:
+            f.write("Results_Name,VSPAERO_History\n")
+            f.write("Results_Timestamp,1700000000\nResults_Date,1,1,2024\n")
+            for label in HISTORY_LABELS:
+                f.write(f"{label},{fmt(rng.normal(size=wake_iterations))}\n")
+            f.write("Results_Name,VSPAERO_Load\n")
+            f.write(f"FC_AoA_,{alpha:.10f}\n")
+            for label in LOAD_LABELS:
+                f.write(f"{label},{fmt(rng.normal(size=span_stations))}\n")
+        f.write("Results_Name,VSPAERO_Polar\n")
+        for label in POLAR_LABELS:
+            f.write(f"{label},{fmt(polar[label])}\n")
+        f.write("Results_Name,VSPAERO_Flow_Conditions\n")
+        f.write("FC_Cref_,137.8800000000\nFC_Sref_,43560.0000000000\nFC_Xcg_,314.2500000000\n")
+    return polar
+
+def scan_row(path, label):
+    """One full pass over the file for the first row with this label (the old extract_* loop)."""
+    with open(path, "r") as f:
+        for line in f:
+            row = line.strip().split(",")
+            if row[0].strip() == label:
+                return row
+    return None
+
+def read_per_quantity(path):
+    ld = np.array([float(v) for v in scan_row(path, "L_D")[1:]])
+    xcg = float(scan_row(path, "FC_Xcg_")[1])
+    cref = float(scan_row(path, "FC_Cref_")[1])
+    cl = np.array([float(v) for v in scan_row(path, "CLtot")[1:]])
+    cm = np.array([float(v) for v in scan_row(path, "CMytot")[1:]])
+    return ld, cl, cm, cref, xcg
+
+def read_eager(path):
+    rows = {}
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                row = line.strip().split(",")
+                rows.setdefault(row[0].strip(), row)
+    to_array = lambda label: np.array([float(v) for v in rows[label][1:]])
+    return to_array("L_D"), to_array("CLtot"), to_array("CMytot"), float(rows["FC_Cref_"][1]), float(rows["FC_Xcg_"][1])
+
+def read_indexed(path):
+    table = optimizer2.ResultsTable.from_csv(path)
+    return table.L_D, table.CLtot, table.CMytot, table.FC_Cref_, table.FC_Xcg_
+
+READERS = [
+    ("per-quantity scans", read_per_quantity),
+    ("eager table", read_eager),
+    ("indexed table", read_indexed),
+]
+
+def time_readers(path, repeats=20):
+    """Best-of-repeats time (s) of each reader; checks they all read the same values."""
+    reference = read_per_quantity(path)
+    times = {}
+    for label, reader in READERS:
+        values = reader(path)
+        for got, expected in zip(values, reference):
+            np.testing.assert_array_equal(got, expected)
+        best = np.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            reader(path)
+            best = min(best, time.perf_counter() - start)
+        times[label] = best
+    return times
+
+def print_report(results):
+    print("\n" + "=" * 72)
+    print("RESULTS.CSV PARSING (one evaluation's reads, best of repeats)")
+    print("=" * 72)
+    print(f"{'Alphas':>7}{'Size (kB)':>11}" + "".join(f"{label:>19}" for label, _ in READERS) + f"{'Speedup':>10}")
+    for n_alphas, size, times in results:
+        speedup = times["per-quantity scans"] / times["indexed table"]
+        print(f"{n_alphas:>7}{size / 1024:>11.0f}" + "".join(f"{times[label] * 1000:>16.2f} ms" for label, _ in READERS)
+              + f"{speedup:>9.1f}x")
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time indexed vs per-quantity parsing of Results.csv")
+    parser.add_argument("--alphas", type=int, nargs="+", default=[7, 13, 25], help="Alphas per synthetic sweep")
+    parser.add_argument("--span-stations", type=int, default=200, help="Values per span load row")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed repeats per reader (best is reported)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_alphas in args.alphas:
+            path = os.path.join(tmp, f"Results_{n_alphas}.csv")
+            write_results_csv(path, n_alphas, args.span_stations)
+            results.append((n_alphas, os.path.getsize(path), time_readers(path, args.repeats)))
+    print_report(results)
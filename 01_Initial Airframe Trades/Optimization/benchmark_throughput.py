@@ -0,0 +1,343 @@
+"""
+Throughput benchmark for the optimization loop.
+
+Runs optimizer2's driver sequence (baseline, then differential evolution) for a
+fixed budget of generations against the stand-in solver backend, whose stages
+take a configurable time instead of running VSPAero. Everything the optimizer
+writes goes to a temporary directory. Reports:
+- evaluations per hour (wall clock, baseline included)
+- time to the first completed evaluation
+- Python-side overhead per evaluation: DES writes, results parsing, history
+  logging, status / control file handling, checkpoints, the Tier 2 sandbox
+  hand-off, and the rest of evaluate_design (memo, pre-filter, scoring,
+  waiting for locks)
+- peak RSS of the process
+
+Overhead parts are the exclusive wall time of the optimizer2 functions listed
+in OVERHEAD_PARTS, summed over worker threads: a function's time excludes the
+wrapped functions it calls, so parsing inside the cruise stage counts as
+parsing, not solver time. Solver time includes waiting for cores when the
+core scheduler is on (--cores). The result is written as JSON; --compare
+prints the change against an earlier result (exit code 1 if anything got more
+than REGRESSION_TOLERANCE worse), so orchestration changes that cost
+throughput show up.
+
+Usage:
+    python benchmark_throughput.py [--latency cruise=2,pitch=1] [--workers 4] [--tier2-workers 1]
+                                   [--popsize 2] [--generations 5] [--output benchmark_results.json]
+                                   [--compare old_results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+
+# Part -> optimizer2 functions (ResultsTable.from_csv is the class method)
+OVERHEAD_PARTS = {
+    "des_write": ["write_des_from_x"],
+    "parsing": [
+        "ResultsTable.from_csv", "load_results_table", "extract_band_ld", "extract_cg_from_results",
+        "extract_stability_margin", "extract_stability_fallback", "estimate_neutral_point",
+        "read_aerocenter_x", "read_des_file",
+    ],
+    "logging": [
+        "record_evaluation", "record_failure", "record_prefiltered", "record_surrogate_rejection",
+        "convergence_callback",
+    ],
+    "status": ["write_status_file", "check_control_files"],
+    "checkpoint": ["save_checkpoint"],
+    "tier2_handoff": ["SandboxPool.move_to_tier2"],  # Includes waiting for a free Tier 2 sandbox
+    "other": ["evaluate_design"],  # The rest of evaluate_design (memo, pre-filter, scoring, lock waits)
+}
+SOLVER_STAGES = ["update_geometry", "run_cruise", "run_pitch"]
+DEFAULT_LATENCY = {"update_geom": 0.05, "cruise": 0.5, "pitch": 0.25}  # seconds
+DEFAULT_OUTPUT = "benchmark_results.json"
+REGRESSION_TOLERANCE = 0.10  # --compare flags changes worse than this fraction
+
+# Optimizer settings the benchmark overrides (restored afterwards)
+CONFIG_NAMES = [
+    "LOG_CSV", "STATUS_FILE", "CONTROL_FILE", "CHECKPOINT_FILE", "PREFILTER_LOG", "FIDELITY_LOG",
+    "XNP_CALIBRATION_LOG", "DE_POPSIZE", "DE_MAXITER", "DE_SEED", "DE_TOL", "ADAPTIVE_ALPHA",
+    "eval_cache", "core_scheduler", "watchdog",
+]
+
+class OverheadProfiler:
+    """
+    Exclusive wall time per OVERHEAD_PARTS part, from wrappers installed
+    around the optimizer2 functions (and the solver backend's stages).
+
+    Each thread keeps a stack of the wrapped calls it is in; a call's time goes
+    to its own part and is taken off its caller's, so nested parts are never
+    counted twice.
+    """
+    def __init__(self):
+        self.totals = {part: 0.0 for part in list(OVERHEAD_PARTS) + ["solver"]}
+        self.calls = {part: 0 for part in self.totals}
+        self.first_evaluation = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.installed = []
+
+    def timed(self, function, part, on_return=None):
+        def wrapper(*args, **kwargs):
+            stack = self.local.__dict__.setdefault("stack", [])
+            stack.append(0.0)  # Time of the wrapped calls nested in this one
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with self.lock:
+                    self.totals[part] += elapsed - nested
+                    self.calls[part] += 1
+                if on_return is not None:
+                    on_return()
+        return wrapper
+
+    def install(self, backend):
+        for part, names in OVERHEAD_PARTS.items():
+            for name in names:
+                owner, attr = optimizer2, name
+                if "." in name:
+                    owner, attr = getattr(optimizer2, name.split(".")[0]), name.split(".")[1]
+                original = owner.__dict__[attr]
+                on_return = self.evaluation_done if name == "evaluate_design" else None
+                if isinstance(original, classmethod):
+                    patched = classmethod(self.timed(original.__func__, part))
+                else:
+                    patched = self.timed(original, part, on_return)
+                setattr(owner, attr, patched)
+                self.installed.append((owner, attr, original))
+        for stage in SOLVER_STAGES:
+            setattr(backend, stage, self.timed(getattr(backend, stage), "solver"))
+            self.installed.append((backend, stage, None))
+
+    def uninstall(self):
+        for owner, attr, original in reversed(self.installed):
+            if original is None:
+                delattr(owner, attr)  # Instance attribute over the class method
+            else:
+                setattr(owner, attr, original)
+        self.installed = []
+
+    def evaluation_done(self):
+        with self.lock:
+            if self.first_evaluation is None:
+                self.first_evaluation = time.perf_counter()
+
+def peak_rss_mb():
+    """Peak resident set size of this process (MB), or None where resource is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024.0 ** 2 if sys.platform == "darwin" else peak / 1024.0  # bytes on macOS, KB on Linux
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=optimizer2.SCRIPT_DIR,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def reset_optimizer(tmp):
+    """Fresh optimizer state with every output file in tmp."""
+    optimizer2.LOG_CSV = os.path.join(tmp, "opt_history.csv")
+    optimizer2.STATUS_FILE = os.path.join(tmp, "optimizer_status.json")
+    optimizer2.CONTROL_FILE = os.path.join(tmp, "optimizer_control.txt")
+    optimizer2.CHECKPOINT_FILE = os.path.join(tmp, "optimizer_checkpoint.json")
+    optimizer2.PREFILTER_LOG = os.path.join(tmp, "prefilter_log.csv")
+    optimizer2.FIDELITY_LOG = os.path.join(tmp, "fidelity_log.csv")
+    optimizer2.XNP_CALIBRATION_LOG = os.path.join(tmp, "xnp_calibration.csv")
+    optimizer2.eval_cache = None  # Cache hits would measure the cache, not the loop
+    optimizer2.watchdog = optimizer2.StageWatchdog()
+    optimizer2.eval_counter = 0
+    optimizer2.generation_counter = 0
+    optimizer2.stagnation_counter = 0
+    optimizer2.best_obj_so_far = -float("inf")
+    optimizer2.best_x_so_far = None
+    optimizer2.prev_iter_obj = None
+    optimizer2._should_stop = False
+    optimizer2._should_pause = False
+    optimizer2._cg_cache.clear()
+    optimizer2._massprop_samples.clear()
+    optimizer2.cg_model = None
+    optimizer2.cg_model_skips = 0
+    optimizer2.design_memo.clear()
+    optimizer2.prefilter_threshold = None
+    optimizer2.prefilter_skips = 0
+    optimizer2.init_history_log()
+    if optimizer2.PREFILTER_ENABLED:
+        optimizer2.init_prefilter_log()
+    optimizer2.t_start = time.time()
+
+def run_benchmark(latency=None, failures=None, workers=1, tier2_workers=0, popsize=2, generations=3,
+                  cores=None, adaptive_alpha=False, seed=0, verbose=False):
+    """
+    Run the baseline and `generations` DE generations on the stand-in backend.
+
+    Parameters:
+    - latency / failures: Stand-in STANDIN_LATENCY / STANDIN_FAILURES
+    - workers, tier2_workers: SandboxPool size (workers=1 and no Tier 2 workers = serial DE)
+    - popsize, generations: DE budget (DE_TOL = 0, so every generation runs)
+    - cores: Core budget for the core scheduler (None = off, 0 = all cores)
+    - adaptive_alpha: Use the adaptive alpha sweep
+    - verbose: Keep the optimizer's console output
+
+    Returns: result dict (see write_results)
+    """
+    latency = dict(DEFAULT_LATENCY if latency is None else latency)
+    failures = dict(failures or {})
+    saved = {name: getattr(optimizer2, name) for name in CONFIG_NAMES}
+    profiler = OverheadProfiler()
+    backend = optimizer2.StandInBackend(latency, failures)
+    pool = None
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        try:
+            with redirect_stdout(sys.stdout if verbose else devnull):
+                optimizer2.DE_POPSIZE = popsize
+                optimizer2.DE_MAXITER = generations
+                optimizer2.DE_SEED = seed
+                optimizer2.DE_TOL = 0.0
+                optimizer2.ADAPTIVE_ALPHA = adaptive_alpha
+                optimizer2.set_solver_backend(backend)
+                profiler.install(backend)
+                start = time.perf_counter()
+                reset_optimizer(tmp)
+                if cores is not None:
+                    optimizer2.core_scheduler = optimizer2.CoreScheduler(cores or None, max_jobs=workers)
+                # The baseline (and serial DE) runs on this thread
+                optimizer2.use_serial_sandbox(os.path.join(tmp, "sandboxes"))
+                if workers > 1 or tier2_workers > 0:
+                    pool = optimizer2.SandboxPool(workers, root=os.path.join(tmp, "sandboxes"),
+                                                  tier2_workers=tier2_workers)
+                optimizer2.evaluate_design(optimizer2.BASELINE_X)
+                optimizer2.retrain_cg_model()
+                result = optimizer2.run_differential_evolution(optimizer2.DESIGN_BOUNDS, workers=pool)
+                wall = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.close()
+            optimizer2._worker_state.workdir = None
+            profiler.uninstall()
+            optimizer2.set_solver_backend(None)
+            for name, value in saved.items():
+                setattr(optimizer2, name, value)
+
+    evaluations = optimizer2.eval_counter
+    overhead = {part: 1000.0 * total / evaluations for part, total in profiler.totals.items() if part != "solver"}
+    overhead["total"] = sum(overhead.values())
+    return {
+        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+        "git_commit": git_commit(),
+        "config": {
+            "latency_s": latency, "failures": failures, "workers": workers, "tier2_workers": tier2_workers,
+            "popsize": popsize, "generations": generations, "cores": cores, "adaptive_alpha": adaptive_alpha,
+            "seed": seed, "python": platform.python_version(), "platform": platform.platform(),
+        },
+        "evaluations": evaluations,
+        "wall_s": wall,
+        "evals_per_hour": evaluations * 3600.0 / wall,
+        "time_to_first_eval_s": profiler.first_evaluation - start,
+        "solver_s_per_eval": profiler.totals["solver"] / evaluations,
+        "overhead_ms_per_eval": overhead,
+        "overhead_calls": {part: calls for part, calls in profiler.calls.items() if part != "solver"},
+        "peak_rss_mb": peak_rss_mb(),
+        "best_objective": float(-result.fun),
+    }
+
+def write_results(results, path=DEFAULT_OUTPUT):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+def compare_results(new, old, tolerance=REGRESSION_TOLERANCE):
+    """
+    Changes from an earlier result: list of (metric, old, new, change, regressed).
+
+    Higher is better for evals/hour; lower is better for everything else.
+    """
+    metrics = [("evals_per_hour", True), ("time_to_first_eval_s", False), ("peak_rss_mb", False)]
+    metrics += [(f"overhead_ms_per_eval.{part}", False) for part in new["overhead_ms_per_eval"]]
+    rows = []
+    for metric, higher_is_better in metrics:
+        old_value, new_value = old, new
+        for key in metric.split("."):
+            old_value = old_value.get(key) if isinstance(old_value, dict) else None
+            new_value = new_value.get(key) if isinstance(new_value, dict) else None
+        if old_value is None or new_value is None:
+            continue
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        regressed = -change > tolerance if higher_is_better else change > tolerance
+        # Sub-millisecond parts are mostly timer noise
+        if metric.startswith("overhead") and abs(new_value - old_value) < 0.1:
+            regressed = False
+        rows.append((metric, old_value, new_value, change, regressed))
+    return rows
+
+def print_report(results, comparison=None):
+    config = results["config"]
+    print("\n" + "=" * 72)
+    print("OPTIMIZATION LOOP THROUGHPUT")
+    print("=" * 72)
+    print(f"  Stand-in latency: {', '.join(f'{k}={v:g}s' for k, v in config['latency_s'].items())}")
+    print(f"  Workers: {config['workers']} (+{config['tier2_workers']} Tier 2) | Population: {config['popsize']}"
+          f" | Generations: {config['generations']}")
+    print(f"  Evaluations:         {results['evaluations']} in {results['wall_s']:.1f}s")
+    print(f"  Evaluations/hour:    {results['evals_per_hour']:.0f}")
+    print(f"  First evaluation:    {results['time_to_first_eval_s']:.2f}s")
+    print(f"  Solver time/eval:    {results['solver_s_per_eval']:.3f}s")
+    rss = results["peak_rss_mb"]
+    print(f"  Peak RSS:            {f'{rss:.0f} MB' if rss is not None else 'n/a'}")
+    print(f"\n  {'Python overhead per evaluation':<32}{'ms':>10}")
+    for part, ms in results["overhead_ms_per_eval"].items():
+        print(f"  {part:<32}{ms:>10.2f}")
+    if comparison:
+        print(f"\n  {'Change vs. previous result':<36}{'old':>11}{'new':>11}{'change':>9}")
+        for metric, old_value, new_value, change, regressed in comparison:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {metric:<36}{old_value:>11.2f}{new_value:>11.2f}{change:>+8.0%}{flag}")
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput benchmark of the optimization loop (stand-in solver)")
+    parser.add_argument("--latency", type=optimizer2.parse_stage_values, default=None,
+                        help="Stand-in seconds per stage, e.g. update_geom=0.05,cruise=0.5,pitch=0.25 (the default)")
+    parser.add_argument("--failures", type=optimizer2.parse_stage_values, default=None,
+                        help="Stand-in failure rates per stage:kind, e.g. cruise:hang=0.02")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent evaluations (default: 1, serial DE)")
+    parser.add_argument("--tier2-workers", type=int, default=0, help="Pipelined Tier 2 sandboxes (default: 0)")
+    parser.add_argument("--cores", type=int, default=None, help="Core budget for the core scheduler (0 = all cores)")
+    parser.add_argument("--popsize", type=int, default=2, help="DE population multiplier (default: 2)")
+    parser.add_argument("--generations", type=int, default=3, help="DE generations (default: 3)")
+    parser.add_argument("--adaptive-alpha", action="store_true", help="Use the adaptive alpha sweep")
+    parser.add_argument("--seed", type=int, default=0, help="DE seed (default: 0)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"JSON result file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--compare", default=None, help="Earlier JSON result to compare with")
+    parser.add_argument("--verbose", action="store_true", help="Show the optimizer's console output")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.latency, args.failures, args.workers, args.tier2_workers, args.popsize,
+                            args.generations, args.cores, args.adaptive_alpha, args.seed, args.verbose)
+    comparison = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            comparison = compare_results(results, json.load(f))
+    write_results(results, args.output)
+    print_report(results, comparison)
+    print(f"\nResults written to {args.output}")
+    sys.exit(1 if comparison and any(row[-1] for row in comparison) else 0)
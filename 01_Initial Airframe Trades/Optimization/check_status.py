@@ -8,11 +8,12 @@ Safe to run while optimizer is running.
 """
 
 import json
-import csv
 import os
 import sys
 from datetime import datetime, timedelta
 
+import history_store
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -122,9 +123,8 @@ def check_status():
     if os.path.exists(HISTORY_FILE):
         try:
             # Read-only, non-blocking - safe even if optimizer is writing
-            with open(HISTORY_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
+            # (columnar store next to the CSV when there is one, plus the CSV rows since)
+            rows = history_store.read_rows(HISTORY_FILE)
                 
             if rows:
                 print(f"[RECENT EVALUATIONS] (last 5)")
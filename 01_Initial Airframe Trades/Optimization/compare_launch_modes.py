@@ -0,0 +1,94 @@
+"""
+Timing comparison: fused single-launch Tier 1 vs the original two-launch path.
+
+Two-launch path:  update_geom.vspscript (baseline.vsp3 + .des -> current.vsp3)
+                  then cruise.vspscript (re-reads current.vsp3)
+Fused path:       fused_cruise.vspscript (apply .des, MassProp, sweep in one process)
+Fused, no vsp3:   same, but skips the intermediate current.vsp3 write
+
+Each mode evaluates the same designs in its own sandbox, so it can run next to
+a live optimizer. Uses optimizer2.VSP_EXE (override with the VSP_EXE
+environment variable).
+
+Usage:
+    python compare_launch_modes.py [--designs 3] [--repeats 1]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+
+MODES = [
+    ("two-launch", False, True),
+    ("fused", True, True),
+    ("fused, no vsp3", True, False),
+]
+
+def sample_designs(n, seed=0):
+    """Baseline plus n-1 random designs inside the optimizer bounds."""
+    rng = np.random.default_rng(seed)
+    lower = np.array([b[0] for b in optimizer2.DESIGN_BOUNDS])
+    upper = np.array([b[1] for b in optimizer2.DESIGN_BOUNDS])
+    designs = [np.array(optimizer2.BASELINE_X)]
+    designs += [lower + rng.random(len(lower)) * (upper - lower) for _ in range(n - 1)]
+    return designs
+
+def time_tier1(x, workdir, fused, write_vsp3):
+    """Wall-clock time of one Tier 1 evaluation (geometry + MassProp + sweep)."""
+    start = time.time()
+    if fused:
+        optimizer2.write_des_from_x(x, os.path.join(workdir, "current.des"))
+        if not write_vsp3 and os.path.exists(os.path.join(workdir, "current.vsp3")):
+            os.remove(os.path.join(workdir, "current.vsp3"))
+        script = optimizer2.render_vspscript("fused_cruise.vspscript", workdir, WRITE_VSP3=write_vsp3)
+        optimizer2.run_vspaero(workdir, script)
+    else:
+        optimizer2.update_geometry_from_x(x, workdir)
+        optimizer2.run_vspaero(workdir)
+    return time.time() - start
+
+def compare(n_designs=3, repeats=1):
+    """
+    Time every mode on the same designs.
+
+    Returns: dict mode -> list of per-evaluation times (s)
+    """
+    designs = sample_designs(n_designs)
+    root = os.path.join(optimizer2.SCRIPT_DIR, optimizer2.SANDBOX_ROOT, "timing")
+    timings = {}
+    for mode_id, (label, fused, write_vsp3) in enumerate(MODES):
+        workdir = optimizer2.create_worker_sandbox(mode_id, root)
+        times = []
+        for _ in range(repeats):
+            for x in designs:
+                times.append(time_tier1(x, workdir, fused, write_vsp3))
+        timings[label] = times
+    return timings
+
+def print_report(timings):
+    baseline_mean = np.mean(timings["two-launch"])
+    print("\n" + "=" * 72)
+    print("TIER 1 LAUNCH MODE COMPARISON")
+    print("=" * 72)
+    print(f"{'Mode':<18}{'Launches':>10}{'Mean (s)':>12}{'Median (s)':>12}{'Saved (s)':>11}{'Speedup':>9}")
+    for label, fused, _ in MODES:
+        times = np.array(timings[label])
+        launches = 1 if fused else 2
+        print(f"{label:<18}{launches:>10}{times.mean():>12.2f}{np.median(times):>12.2f}"
+              f"{baseline_mean - times.mean():>11.2f}{baseline_mean / times.mean():>8.2f}x")
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare fused vs two-launch Tier 1 timing")
+    parser.add_argument("--designs", type=int, default=3, help="Number of designs (baseline + random)")
+    parser.add_argument("--repeats", type=int, default=1, help="Repeat each design this many times")
+    args = parser.parse_args()
+
+    print(f"VSP executable: {optimizer2.VSP_EXE}")
+    print(f"Designs: {args.designs}, repeats: {args.repeats}")
+    print_report(compare(args.designs, args.repeats))
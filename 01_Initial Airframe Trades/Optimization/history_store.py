@@ -0,0 +1,520 @@
+"""
+Columnar binary copy of the optimization history (opt_history.csv).
+
+opt_history.csv stays the row-by-row log the optimizer appends to (and what
+--resume, the surrogate and CG model rebuilds read), but every reader that
+parses it with csv.DictReader pays for splitting and converting every row on
+every refresh. The store keeps the same rows as typed columns next to it:
+
+    opt_history.store/
+        index.json        columns and their types, text categories, segments,
+                          and how far into opt_history.csv the segments reach
+        seg_000000.bin    SEGMENT_ROWS rows, one contiguous array per column
+        seg_000001.bin    ...
+
+Columns are float64 (N/A -> nan), int64 (iter, generation) or text stored as
+int32 codes into the category list in index.json (sm_category, failure_class,
+...). A segment is written once, when SEGMENT_ROWS rows have been appended, and
+never changed; index.json is replaced atomically after it. Readers
+memory-map the segments and parse only the rows of opt_history.csv past
+csv_offset (fewer than SEGMENT_ROWS), so loading a long history costs
+milliseconds instead of a full CSV parse. Without a store - or if the CSV was
+rewritten since - they fall back to parsing the CSV.
+
+Reading:
+    load_columns(csv_path)   name -> numpy array (floats, ints, text as str objects)
+    read_rows(csv_path)      sequence of rows with the csv.DictReader interface
+                             (string values, "N/A" for missing numbers)
+    last_row(csv_path)       the newest row only (status pages)
+
+Usage:
+    python history_store.py build [opt_history.csv]            (re)build the store from the CSV
+    python history_store.py export [opt_history.csv] [out.csv] write the stored rows as CSV
+    python history_store.py info [opt_history.csv]             rows, segments and load time
+"""
+
+import os
+import csv
+import json
+import time
+import zlib
+import numpy as np
+
+# ---------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------
+STORE_SUFFIX = ".store"     # opt_history.csv -> opt_history.store/
+INDEX_FILE = "index.json"
+SEGMENT_ROWS = 1024         # Rows per segment file (the CSV tail readers parse is shorter)
+STORE_VERSION = 1
+CHECK_BYTES = 256           # CSV bytes before csv_offset checksummed to detect a rewritten CSV
+
+# Column types; every other column is float64
+INT_COLUMNS = {"iter", "generation"}
+TEXT_COLUMNS = {"sm_category", "is_new_best", "failure_class", "fidelity", "xnp_source", "cg_source", "reused"}
+INT_MISSING = -1            # int column value for an empty / N/A field
+
+DTYPES = {"float": np.dtype("<f8"), "int": np.dtype("<i8"), "text": np.dtype("<i4")}
+
+def store_path(csv_path):
+    """Directory of the columnar store kept alongside a history CSV."""
+    return os.path.splitext(csv_path)[0] + STORE_SUFFIX
+
+def column_kind(name):
+    """'int', 'text' or 'float' for a history column."""
+    if name in INT_COLUMNS:
+        return "int"
+    if name in TEXT_COLUMNS:
+        return "text"
+    return "float"
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return INT_MISSING
+
+def _parse_column(values, kind):
+    """Typed array of one column's CSV fields (text columns: list of str unchanged)."""
+    if kind == "text":
+        return values
+    missing = "nan" if kind == "float" else str(INT_MISSING)
+    try:
+        return np.array([missing if v in ("N/A", "") else v for v in values], dtype=DTYPES[kind])
+    except ValueError:
+        convert = _to_float if kind == "float" else _to_int
+        return np.array([convert(v) for v in values], dtype=DTYPES[kind])
+
+def _array_kind(array):
+    """Kind of a loaded column from its dtype (a CSV-only column may be text under any name)."""
+    if array.dtype == object:
+        return "text"
+    return "int" if array.dtype.kind == "i" else "float"
+
+def _format_column(array, kind):
+    """CSV text of every value of a column."""
+    if kind == "text":
+        return [str(v) for v in array]
+    if kind == "int":
+        return ["N/A" if v == INT_MISSING else str(v) for v in array.tolist()]
+    return ["N/A" if v != v else repr(v) for v in array.tolist()]  # v != v: nan
+
+def _format(value, kind):
+    """CSV text of a stored value (the inverse of the conversions above)."""
+    if kind == "text":
+        return str(value)
+    if kind == "int":
+        return str(int(value)) if value != INT_MISSING else "N/A"
+    return repr(float(value)) if not np.isnan(value) else "N/A"
+
+def _segment_layout(columns, rows):
+    """Byte offset of each column in a segment of `rows` rows (8-byte aligned) and the file size."""
+    offsets, offset = [], 0
+    for _, kind in columns:
+        offsets.append(offset)
+        offset += -(-DTYPES[kind].itemsize * rows // 8) * 8
+    return offsets, offset
+
+def _csv_check(f, offset, start):
+    """Checksum of the CSV bytes just before `offset` (not before `start`, the end of the header)."""
+    begin = max(start, offset - CHECK_BYTES)
+    f.seek(begin)
+    return zlib.crc32(f.read(offset - begin))
+
+def _read_header(f):
+    """(column names, byte length of the header line) of an open CSV (binary mode)."""
+    f.seek(0)
+    line = f.readline()
+    if not line.endswith(b"\n"):
+        return None, 0  # empty, or the header is still being written
+    return line.decode("utf-8", "replace").strip().split(","), len(line)
+
+def _read_lines(f, offset):
+    """Complete data lines from `offset` on: list of (fields, CSV offset after the line)."""
+    f.seek(offset)
+    data = f.read()
+    rows, start = [], 0
+    end = data.find(b"\n")
+    while end >= 0:
+        line = data[start:end].decode("utf-8", "replace").strip()
+        start = end + 1
+        if line:
+            rows.append((line.split(","), offset + start))
+        end = data.find(b"\n", start)
+    return rows
+
+def _read_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == STORE_VERSION else None
+
+# ---------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------
+class HistoryStore:
+    """
+    Append side of the store, kept in step with the history CSV.
+
+    Opening syncs the store with the CSV: rows appended since the last segment
+    (an interrupted run) are taken over, and a store that does not match the
+    CSV - another header, a rewritten or truncated file - is rebuilt from it.
+    After that, append() every row the optimizer writes to the CSV.
+
+    Parameters:
+    - csv_path: History CSV the store shadows (opt_history.csv)
+    - segment_rows: Rows per segment file
+    """
+    def __init__(self, csv_path, segment_rows=SEGMENT_ROWS):
+        self.csv_path = csv_path
+        self.path = store_path(csv_path)
+        self.segment_rows = segment_rows
+        self.pending = []  # rows (lists of CSV fields) not yet in a segment
+        self.pending_offset = None  # CSV offset after the last pending row
+        self._codes = {}
+        self.index = None
+        self.sync()
+
+    def __len__(self):
+        return self.index["rows"] + len(self.pending)
+
+    def sync(self):
+        """Rebuild the store if it does not match the CSV, then take over the CSV rows it is missing."""
+        self.pending = []
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.csv_path, "rb") as f:
+            header, header_end = _read_header(f)
+            if header is None:
+                raise ValueError(f"{self.csv_path} has no header line")
+            index = _read_index(self.path)
+            size = os.fstat(f.fileno()).st_size
+            if (index is None or index["columns"] != [[name, column_kind(name)] for name in header]
+                    or not header_end <= index["csv_offset"] <= size
+                    or index["csv_check"] != _csv_check(f, index["csv_offset"], header_end)):
+                index = self._reset(header, header_end)
+            self.index = index
+            self._codes = {name: {value: code for code, value in enumerate(values)}
+                           for name, values in index["categories"].items()}
+            missing = _read_lines(f, index["csv_offset"])
+        for fields, offset in missing:
+            self.append(fields, offset)
+
+    def _reset(self, header, header_end):
+        """Empty store for these columns, reaching up to the end of the CSV header."""
+        for name in os.listdir(self.path):
+            if name.startswith("seg_") or name == INDEX_FILE:
+                os.remove(os.path.join(self.path, name))
+        index = {
+            "version": STORE_VERSION,
+            "columns": [[name, column_kind(name)] for name in header],
+            "categories": {name: [] for name in header if column_kind(name) == "text"},
+            "segments": [],
+            "rows": 0,
+            "csv_offset": header_end,
+            "csv_check": zlib.crc32(b""),
+        }
+        self._write_index(index)
+        return index
+
+    def _write_index(self, index):
+        tmp = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+    def append(self, fields, csv_offset):
+        """
+        Add one history row.
+
+        Parameters:
+        - fields: The row's CSV fields (strings or values, in header order)
+        - csv_offset: Size of the CSV after the row was written (f.tell())
+        """
+        n = len(self.index["columns"])
+        row = [str(value) for value in fields][:n]
+        self.pending.append(row + ["N/A"] * (n - len(row)))
+        self.pending_offset = csv_offset
+        if len(self.pending) >= self.segment_rows:
+            self.flush()
+
+    def flush(self):
+        """Write the pending rows as a segment and point the index past them in the CSV."""
+        if not self.pending:
+            return
+        rows, columns = len(self.pending), self.index["columns"]
+        offsets, size = _segment_layout(columns, rows)
+        buffer = bytearray(size)
+        for (name, kind), offset, column in zip(columns, offsets, zip(*self.pending)):
+            if kind != "text":
+                array = _parse_column(column, kind)
+            else:
+                codes, categories = self._codes[name], self.index["categories"][name]
+                for value in column:
+                    if value not in codes:
+                        codes[value] = len(categories)
+                        categories.append(value)
+                array = np.array([codes[v] for v in column], dtype=DTYPES[kind])
+            buffer[offset:offset + array.nbytes] = array.tobytes()
+
+        name = f"seg_{len(self.index['segments']):06d}.bin"
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(buffer)
+        with open(self.csv_path, "rb") as f:
+            _, header_end = _read_header(f)
+            check = _csv_check(f, self.pending_offset, header_end)
+        self.index["segments"].append({"file": name, "rows": rows})
+        self.index["rows"] += rows
+        self.index["csv_offset"] = self.pending_offset
+        self.index["csv_check"] = check
+        self._write_index(self.index)
+        self.pending = []
+        self.pending_offset = None
+
+    def close(self):
+        """Write the last, partial segment (a later append starts the next one)."""
+        self.flush()
+
+# ---------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------
+def _load_segments(directory, index, names=None):
+    """name -> array per column over all segments (text as int32 codes)."""
+    columns = index["columns"]
+    wanted = [i for i, (name, _) in enumerate(columns) if names is None or name in names]
+    pieces = {i: [] for i in wanted}
+    for segment in index["segments"]:
+        rows = segment["rows"]
+        offsets, _ = _segment_layout(columns, rows)
+        data = np.memmap(os.path.join(directory, segment["file"]), dtype=np.uint8, mode="r")
+        for i in wanted:
+            pieces[i].append(np.frombuffer(data, dtype=DTYPES[columns[i][1]], count=rows, offset=offsets[i]))
+    return {columns[i][0]: (np.concatenate(pieces[i]) if pieces[i] else np.empty(0, DTYPES[columns[i][1]]))
+            for i in wanted}
+
+def _convert(header, rows, names=None, keep_text=True):
+    """
+    name -> typed array for CSV rows (text as str objects). keep_text: a float
+    column with non-numeric fields becomes text (else they are nan, as in the store).
+    """
+    n = len(header)
+    rows = [row if len(row) == n else (row + ["N/A"] * n)[:n] for row in rows]
+    result = {}
+    for name, column in zip(header, zip(*rows) if rows else [()] * n):
+        if names is not None and name not in names:
+            continue
+        kind = column_kind(name)
+        if kind == "float" and keep_text:
+            try:  # keep a column of an older history that isn't numeric as text
+                result[name] = np.array([v if v not in ("N/A", "") else "nan" for v in column], dtype=float)
+                continue
+            except ValueError:
+                kind = "text"
+        result[name] = np.array(column, dtype=object) if kind == "text" else _parse_column(column, kind)
+    return result
+
+def load_columns(csv_path, names=None):
+    """
+    The whole history as typed columns.
+
+    Uses the store next to csv_path when it matches the CSV (plus the CSV rows
+    written since its last segment), else parses the CSV.
+
+    Parameters:
+    - csv_path: History CSV (opt_history.csv); the store is found next to it
+    - names: Columns to load (default: all); names not in the history are left out
+
+    Returns: dict name -> numpy array in CSV column order: float64 with nan for
+    N/A, int64 (INT_MISSING for N/A) for iter / generation, object arrays of
+    str for text columns. Empty dict if there is no history.
+    """
+    directory = store_path(csv_path)
+    index = _read_index(directory)
+    if not os.path.exists(csv_path):
+        if index is None:
+            return {}
+        return _decode(_load_segments(directory, index, names), index)
+
+    with open(csv_path, "rb") as f:
+        header, header_end = _read_header(f)
+        if header is None:
+            return {}
+        usable = (index is not None and index["columns"] == [[name, column_kind(name)] for name in header]
+                  and header_end <= index["csv_offset"] <= os.fstat(f.fileno()).st_size
+                  and index["csv_check"] == _csv_check(f, index["csv_offset"], header_end))
+        tail = [fields for fields, _ in _read_lines(f, index["csv_offset"] if usable else header_end)]
+    if not usable:
+        return _convert(header, tail, names)  # no store, or not of this CSV: parse the CSV
+    try:
+        stored = _decode(_load_segments(directory, index, names), index)
+    except (OSError, ValueError):
+        # Segments removed or cut short (store being rebuilt): parse the CSV
+        with open(csv_path, "rb") as f:
+            return _convert(header, [fields for fields, _ in _read_lines(f, header_end)], names)
+    if not tail:
+        return stored
+    fresh = _convert(header, tail, names, keep_text=False)
+    return {name: np.concatenate([stored[name], fresh[name]]) for name in stored}
+
+def _decode(columns, index):
+    """Replace text codes with their strings."""
+    for name, categories in index["categories"].items():
+        if name not in columns:
+            continue
+        lookup = np.array(categories, dtype=object)
+        columns[name] = lookup[columns[name]]
+    return columns
+
+class HistoryRow:
+    """
+    One history row with the csv.DictReader row interface (row['x'],
+    row.get('x', default), keys/items); values are formatted on access.
+    """
+    __slots__ = ("_rows", "_i")
+
+    def __init__(self, rows, i):
+        self._rows = rows
+        self._i = i
+
+    def __getitem__(self, name):
+        column = self._rows.columns[name]
+        return _format(column[self._i], self._rows.kinds[name])
+
+    def get(self, name, default=None):
+        if name not in self._rows.columns:
+            return default
+        return self[name]
+
+    def __contains__(self, name):
+        return name in self._rows.columns
+
+    def __iter__(self):
+        return iter(self._rows.columns)
+
+    def __len__(self):
+        return len(self._rows.columns)
+
+    def keys(self):
+        return list(self._rows.columns)
+
+    def values(self):
+        return [self[name] for name in self._rows.columns]
+
+    def items(self):
+        return [(name, self[name]) for name in self._rows.columns]
+
+    def __repr__(self):
+        return f"HistoryRow({dict(self.items())})"
+
+class HistoryRows:
+    """
+    The history as a sequence of HistoryRow (len, indexing, iteration; slices
+    are lists), backed by the typed columns of load_columns.
+    """
+    def __init__(self, columns):
+        self.columns = columns
+        self.kinds = {name: _array_kind(array) for name, array in columns.items()}
+        self._len = len(next(iter(columns.values()))) if columns else 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [HistoryRow(self, j) for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("history row index out of range")
+        return HistoryRow(self, i)
+
+    def __iter__(self):
+        return (HistoryRow(self, i) for i in range(self._len))
+
+    def column(self, name):
+        """Typed array of a column (float columns all-nan if the history has no such column)."""
+        if name in self.columns:
+            return self.columns[name]
+        return np.full(self._len, np.nan)
+
+def read_rows(csv_path):
+    """Drop-in for list(csv.DictReader(open(csv_path))) - see load_columns."""
+    return HistoryRows(load_columns(csv_path))
+
+def last_row(csv_path):
+    """
+    Newest history row as a dict of CSV strings, without reading the rest of
+    the history (last line of the CSV, or of the store if there is no CSV).
+
+    Returns: dict, or None if there are no rows
+    """
+    if not os.path.exists(csv_path):
+        rows = read_rows(csv_path)
+        return dict(rows[-1].items()) if len(rows) else None
+    with open(csv_path, "rb") as f:
+        header, header_end = _read_header(f)
+        if header is None:
+            return None
+        end = os.fstat(f.fileno()).st_size
+        block = 4096
+        while True:
+            start = max(header_end, end - block)
+            f.seek(start)
+            data = f.read(end - start)
+            complete = data.rfind(b"\n") + 1
+            lines = [line for line in data[:complete].split(b"\n") if line.strip()]
+            if len(lines) > 1 or start == header_end:
+                break
+            block *= 4
+    if not lines:
+        return None
+    fields = lines[-1].decode("utf-8", "replace").strip().split(",")
+    return dict(zip(header, fields))
+
+def export_csv(csv_path, output):
+    """Write the history (store plus newer CSV rows) to `output` as CSV; returns the row count."""
+    columns = load_columns(csv_path)
+    text = [_format_column(array, _array_kind(array)) for array in columns.values()]
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(list(columns))
+        writer.writerows(zip(*text))
+    return len(text[0]) if text else 0
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Columnar store of the optimization history")
+    parser.add_argument("command", choices=["build", "export", "info"])
+    parser.add_argument("history", nargs="?", default="opt_history.csv", help="History CSV (default: opt_history.csv)")
+    parser.add_argument("output", nargs="?", help="export: CSV file to write (default: <history>_export.csv)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        store = HistoryStore(args.history)
+        store.close()
+        print(f"[STORE] {len(store)} rows in {store.path} ({len(store.index['segments'])} segments)")
+    elif args.command == "export":
+        output = args.output or os.path.splitext(args.history)[0] + "_export.csv"
+        print(f"[STORE] {export_csv(args.history, output)} rows written to {output}")
+    else:
+        index = _read_index(store_path(args.history))
+        start = time.perf_counter()
+        columns = load_columns(args.history)
+        elapsed = time.perf_counter() - start
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if index is None:
+            print(f"[STORE] No store for {args.history} - parsed the CSV")
+        else:
+            print(f"[STORE] {index['rows']} rows in {len(index['segments'])} segments, "
+                  f"{rows - index['rows']} newer rows in the CSV")
+        print(f"[STORE] Loaded {rows} rows x {len(columns)} columns in {elapsed * 1000:.1f} ms")
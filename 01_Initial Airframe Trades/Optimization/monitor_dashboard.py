@@ -4,17 +4,41 @@ Comprehensive situational awareness dashboard
 """
 
 import json
-import csv
 import os
 from datetime import datetime
 import math
 
+import history_store
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 STATUS_FILE = os.path.join(SCRIPT_DIR, "optimizer_status.json")
 HISTORY_FILE = os.path.join(SCRIPT_DIR, "opt_history.csv")
 DASHBOARD_FILE = os.path.join(SCRIPT_DIR, "dashboard.html")
 OUTPUT_LOG = os.path.join(SCRIPT_DIR, "optimizer_output.log")
 
+# Per-stage wall-clock columns of opt_history.csv (optimizer2.STAGE_TIME_HEADER)
+STAGE_TIME_COLUMNS = [
+    ('geom_s', 'Geometry update', '#8957e5'),
+    ('cruise_s', 'Cruise solve', '#58a6ff'),
+    ('pitch_s', 'Pitch solve', '#3fb950'),
+    ('parse_s', 'Parsing', '#d29922'),
+    ('logging_s', 'Logging', '#db61a2'),
+    ('other_s', 'Other (in evaluation)', '#8b949e'),
+    ('overhead_s', 'Between evaluations', '#f85149'),
+]
+STAGE_TIME_WINDOW = 50  # Evaluations in the rolling p50/p95 table
+
+# DE run size when the status file doesn't say (written before population_members):
+# scipy's population is DE_POPSIZE (20) x 5 free design parameters
+DEFAULT_POPULATION = 100
+DEFAULT_MAX_GENERATIONS = 40
+
+def run_size(status):
+    """(population members, generations, planned evaluations incl. baseline) of the run in status."""
+    population = status.get('population_members') or DEFAULT_POPULATION
+    generations = status.get('max_generations') or DEFAULT_MAX_GENERATIONS
+    return population, generations, 1 + population * (generations + 1)
+
 def calculate_de_phase(generation, total_generations, diversity_metric=None):
     """Determine which phase of Differential Evolution we're in."""
     progress = generation / total_generations if total_generations > 0 else 0
@@ -164,6 +188,57 @@ def analyze_tier_performance(history_data):
         'tier2_failed': (tier2_failed, (tier2_failed/total*100) if total > 0 else 0)
     }
 
+def percentile(values, q):
+    """q-th percentile (0-100) of values, interpolating between order statistics."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def analyze_stage_times(history_data, window=STAGE_TIME_WINDOW, population=DEFAULT_POPULATION):
+    """
+    Where the evaluation time goes, from the per-stage columns of the history.
+    
+    Returns: None for histories written before the stage-time columns, else a
+    dict with the per-iteration series (stacked-area chart) and, over the last
+    `window` evaluations, p50/p95/mean seconds per stage, its share of the
+    time and worker-hours per generation of `population` evaluations
+    """
+    iterations = []
+    series = {column: [] for column, _, _ in STAGE_TIME_COLUMNS}
+    for row in history_data:
+        try:
+            values = [float(row[column]) for column, _, _ in STAGE_TIME_COLUMNS]
+            iteration = int(row.get('iter', 0))
+        except (KeyError, TypeError, ValueError):
+            continue  # older history row, or N/A
+        iterations.append(iteration)
+        for (column, _, _), value in zip(STAGE_TIME_COLUMNS, values):
+            series[column].append(value)
+    if not iterations:
+        return None
+
+    recent = {column: values[-window:] for column, values in series.items()}
+    n = len(iterations[-window:])
+    total = sum(sum(values) for values in recent.values())
+    stats = []
+    for column, label, color in STAGE_TIME_COLUMNS:
+        values = recent[column]
+        stats.append({
+            'column': column,
+            'label': label,
+            'color': color,
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'mean': sum(values) / n,
+            'share': sum(values) / total * 100 if total > 0 else 0.0,
+            'hours_per_generation': sum(values) / n * population / 3600.0,
+        })
+    return {'iterations': iterations, 'series': series, 'stats': stats, 'window': n}
+
 def generate_alerts(status, history_data, de_phase):
     """Generate actionable alerts."""
     alerts = []
@@ -200,7 +275,7 @@ def generate_alerts(status, history_data, de_phase):
     
     # Check VSPAero time (last 10 designs)
     if len(history_data) > 0:
-        recent_times = [float(r.get('vspaero_time_s', 0)) for r in history_data[-10:] if r.get('vspaero_time_s', '').strip()]
+        recent_times = [float(r.get('vspaero_time_s', 0)) for r in history_data[-10:] if r.get('vspaero_time_s', '').strip() and r.get('vspaero_time_s', '').strip() != 'N/A']
         if recent_times:
             avg_time = sum(recent_times) / len(recent_times)
             if avg_time > 250:
@@ -243,7 +318,7 @@ def generate_ai_analysis(history_data, status, de_phase, violations, stability_c
     }
     
     # Executive Summary
-    progress_pct = (status.get('iteration', 0) / (40 * 20)) * 100
+    progress_pct = (status.get('iteration', 0) / run_size(status)[2]) * 100
     improvement = ((best_obj - baseline_obj) / abs(baseline_obj) * 100) if baseline_obj and best_obj and baseline_obj != 0 else 0
     
     analysis['executive_summary'] = f"""
@@ -359,13 +434,11 @@ def generate_dashboard():
         except:
             pass
     
-    # Read history
+    # Read history (columnar store next to the CSV when there is one)
     history_data = []
     if os.path.exists(HISTORY_FILE):
         try:
-            with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                history_data = list(reader)
+            history_data = history_store.read_rows(HISTORY_FILE)
         except:
             pass
     
@@ -467,25 +540,27 @@ def generate_dashboard():
     elapsed_min = status.get('elapsed_minutes', 0)
     elapsed_hr = elapsed_min / 60.0
     
+    population, max_generations, planned_iters = run_size(status)
     if generation == 0 and iteration > 1:
-        generation = (iteration - 2) // 20
+        generation = (iteration - 2) // population
     
     if iteration > 0 and elapsed_min > 0:
         avg_time_per_iter = elapsed_min / iteration
-        remaining_iters = (40 * 20) - iteration
+        remaining_iters = planned_iters - iteration
         remaining_min = remaining_iters * avg_time_per_iter
         remaining_hr = remaining_min / 60.0
-        progress_pct = (iteration / (40 * 20)) * 100
+        progress_pct = (iteration / planned_iters) * 100
     else:
         remaining_hr = None
         progress_pct = 0
     
     # Calculate metrics
-    de_phase = calculate_de_phase(generation, 40)
+    de_phase = calculate_de_phase(generation, max_generations)
     diversity = calculate_diversity(history_data)
     violations = analyze_constraints(history_data)
     stability_cats = analyze_stability_categories(history_data)
     tier_perf = analyze_tier_performance(history_data)
+    stage_times = analyze_stage_times(history_data, population=population)
     alerts = generate_alerts(status, history_data, de_phase)
     
     # Baseline comparison
@@ -495,7 +570,7 @@ def generate_dashboard():
     improvement_pct = ((best_obj - baseline_obj) / abs(baseline_obj) * 100) if baseline_obj and best_obj and baseline_obj != 0 else None
     
     # Recent activity (last 10 iterations)
-    recent_activity = history_data[-10:] if len(history_data) >= 10 else history_data
+    recent_activity = list(history_data[-10:])
     recent_activity.reverse()  # Most recent first
     
     # Convergence metrics
@@ -700,7 +775,7 @@ def generate_dashboard():
         remaining_hr, progress_pct, de_phase, diversity, violations, stability_cats,
         tier_perf, alerts, baseline_obj, baseline_ld, baseline_sm, improvement_pct,
         recent_activity, convergence_rate, improvement_rate, avg_ld, avg_sm, avg_pen,
-        obj_std, param_ranges, recent_window, ai_analysis, most_recent_html
+        obj_std, param_ranges, recent_window, ai_analysis, most_recent_html, stage_times
     )
     
     try:
@@ -724,7 +799,7 @@ def generate_html_content(*args):
      remaining_hr, progress_pct, de_phase, diversity, violations, stability_cats,
      tier_perf, alerts, baseline_obj, baseline_ld, baseline_sm, improvement_pct,
      recent_activity, convergence_rate, improvement_rate, avg_ld, avg_sm, avg_pen,
-     obj_std, param_ranges, recent_window, ai_analysis, most_recent_html) = args
+     obj_std, param_ranges, recent_window, ai_analysis, most_recent_html, stage_times) = args
     
     # Format data for JavaScript
     recent_iterations = iterations[-100:] if len(iterations) > 100 else iterations
@@ -802,6 +877,82 @@ def generate_html_content(*args):
             <div class="range-value">{min_val:.1f} - {max_val:.1f} ({coverage:.1f}% of bounds)</div>
         </div>'''
     
+    # Format stage-time breakdown (stacked area of the last 100 evaluations + rolling p50/p95 table)
+    if stage_times:
+        stage_rows_html = ""
+        for stat in stage_times['stats']:
+            stage_rows_html += f'''
+            <tr>
+                <td><span style="color: {stat['color']};">&#9632;</span> {stat['label']}</td>
+                <td>{stat['p50']:.1f}</td>
+                <td>{stat['p95']:.1f}</td>
+                <td>{stat['mean']:.1f}</td>
+                <td>{stat['share']:.1f}%</td>
+                <td>{stat['hours_per_generation']:.2f}</td>
+            </tr>'''
+        stage_html = f'''
+        <div style="display: grid; grid-template-columns: 3fr 2fr; gap: 16px; margin-bottom: 20px;">
+            <div class="chart-container">
+                <div class="chart-title">Stage Time Breakdown (s per evaluation)</div>
+                <canvas id="stageChart"></canvas>
+            </div>
+            <div class="section">
+                <div class="section-title">Stage Times (Last {stage_times['window']})</div>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Stage</th>
+                            <th>p50 (s)</th>
+                            <th>p95 (s)</th>
+                            <th>Mean (s)</th>
+                            <th>Share</th>
+                            <th>Worker-h / Gen</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {stage_rows_html}
+                    </tbody>
+                </table>
+            </div>
+        </div>'''
+        stage_datasets = [
+            {
+                'label': label,
+                'data': stage_times['series'][column][-100:],
+                'borderColor': color,
+                'backgroundColor': color + '60',
+                'fill': 'origin' if i == 0 else '-1',
+                'pointRadius': 0,
+                'tension': 0.1,
+            }
+            for i, (column, label, color) in enumerate(STAGE_TIME_COLUMNS)
+        ]
+        stage_js = f'''
+        new Chart(document.getElementById('stageChart'), {{
+            type: 'line',
+            data: {{
+                labels: {json.dumps(stage_times['iterations'][-100:])},
+                datasets: {json.dumps(stage_datasets)}
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: true,
+                interaction: {{ mode: 'index', intersect: false }},
+                plugins: {{ legend: {{ position: 'bottom', labels: {{ color: darkTheme.textColor }} }} }},
+                scales: {{
+                    x: {{ grid: {{ color: darkTheme.gridColor }}, ticks: {{ color: darkTheme.textColor }} }},
+                    y: {{ stacked: true, grid: {{ color: darkTheme.gridColor }}, ticks: {{ color: darkTheme.textColor }} }}
+                }}
+            }}
+        }});'''
+    else:
+        stage_html = '''
+        <div class="section">
+            <div class="section-title">Stage Time Breakdown</div>
+            <div style="color: #8b949e; padding: 20px; text-align: center;">No per-stage timing in this history (written before the stage-time columns were added)</div>
+        </div>'''
+        stage_js = ""
+    
     return f"""<!DOCTYPE html>
 <html>
 <head>
@@ -1097,7 +1248,7 @@ def generate_html_content(*args):
             </div>
             <div class="card">
                 <div class="card-header"><div class="card-title">Generation</div></div>
-                <div class="card-value">{generation} / 40</div>
+                <div class="card-value">{generation} / {run_size(status)[1]}</div>
                 <div class="progress-bar"><div class="progress-fill" style="width: {progress_pct:.1f}%"></div></div>
                 <div class="card-label">{progress_pct:.1f}% complete</div>
             </div>
@@ -1269,6 +1420,8 @@ def generate_html_content(*args):
             </div>
         </div>
         
+        {stage_html}
+        
         <div class="footer">
             <p>Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
             <p>Auto-refreshes every 60 seconds | <a href="/control">Control Interface</a> | <a href="/viewer" target="_blank">3D Viewer</a> | <a href="/status" download="status.json">Download Status JSON</a> | <a href="{HISTORY_FILE}" download="history.csv">Download History CSV</a></p>
@@ -1440,6 +1593,7 @@ def generate_html_content(*args):
                 }}
             }}
         }});
+        {stage_js}
     </script>
 </body>
 </html>"""
@@ -2,40 +2,206 @@ import subprocess
 import time
 import os
 import sys
+import re
+import shutil
+import signal
+import queue
+import threading
+import argparse
+import csv
 import numpy as np
 import json
-from scipy.optimize import differential_evolution
+import sqlite3
+import hashlib
+import functools
+import atexit
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import contextmanager
+from scipy.linalg import cholesky, cho_solve, solve_triangular
+import scipy
+try:  # private module: checked again in check_de_solver before a run relies on it
+    from scipy.optimize._differentialevolution import DifferentialEvolutionSolver
+except ImportError:
+    DifferentialEvolutionSolver = None
+from scipy.spatial import cKDTree
+from scipy.stats import spearmanr
+
+import history_store
+import solver_backends
+from output_log import LOG_LEVELS, LogWriter, TeeOutput
+from tracing import NULL_SPAN, StageTimes, TraceSpan, Tracer
+from solver_backends import SolverBackend, SubprocessBackend, OpenVSPAPIBackend, StandInBackend
+
+solver_backends.optimizer = sys.modules[__name__]  # the backends read settings and helpers from here
 
 # ---------------------------------------------------------------------
 # Logging setup - capture all output to file
 # ---------------------------------------------------------------------
-class TeeOutput:
-    """Write to both stdout and log file."""
-    def __init__(self, file_path):
-        self.file = open(file_path, 'w', encoding='utf-8')
-        self.stdout = sys.stdout
-        
-    def write(self, text):
-        self.stdout.write(text)
-        self.file.write(text)
-        self.file.flush()
-        
-    def flush(self):
-        self.stdout.flush()
-        self.file.flush()
-        
-    def close(self):
-        self.file.close()
+# The console output is copied to OUTPUT_LOG / EVENT_LOG by a background
+# thread (output_log.LogWriter), so print(..., flush=True) never waits for the disk.
+log_writer = None  # LogWriter of the driver's TeeOutput (None: no event log)
+
+def log_event(name, level="info", **fields):
+    """Structured event for the JSON-lines EVENT_LOG (no-op without the driver's log)."""
+    if log_writer is not None:
+        log_writer.event(name, level, **fields)
 
 # ---------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------
-VSP_EXE = r"C:\Users\Jackson\Desktop\ZZ_Software Downloads\OpenVSP-3.46.0-win64\vsp.exe"
+VSP_EXE = os.environ.get(
+    "VSP_EXE", r"C:\Users\Jackson\Desktop\ZZ_Software Downloads\OpenVSP-3.46.0-win64\vsp.exe"
+)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 RESULTS_CSV = "Results.csv"
 LOG_CSV = "opt_history.csv"
 STATUS_FILE = "optimizer_status.json"
 CONTROL_FILE = "optimizer_control.txt"
 OUTPUT_LOG = "optimizer_output.log"
+EVENT_LOG = "optimizer_events.jsonl"  # JSON-lines events next to OUTPUT_LOG
+LOG_MAX_BYTES = 20 * 1024 * 1024  # Rotate OUTPUT_LOG / EVENT_LOG past this size (0: never)
+LOG_BACKUPS = 5  # Rotated logs kept, gzipped (optimizer_output.log.1.gz is the newest)
+LOG_FLUSH_INTERVAL = 1.0  # s - the background log writer flushes at most this often
+LOG_EVENT_LEVEL = "warning"  # Printed lines at or above this level also go to EVENT_LOG (--log-level)
+CHECKPOINT_FILE = "optimizer_checkpoint.json"
+TRACE_FILE = "optimizer_trace.json"  # --trace without a path (open in ui.perfetto.dev or chrome://tracing)
+
+# Design vector: span, sweep, xloc, taper, tip, ctrl
+BASELINE_X = [330.0, 25.0, 320.0, 0.833333, 120.0, 0.22]
+DESIGN_BOUNDS = [
+    (275.0, 480.0),  # span
+    (0.0, 40.0),     # sweep
+    (220.0, 340.0),  # xloc
+    (0.6, 0.9),      # taper
+    (95.0, 125.0),  # tip
+    (0.22, 0.22),    # control fraction
+]
+
+# Parallel evaluation - each worker runs VSP in its own scratch directory
+SANDBOX_ROOT = "sandboxes"
+SANDBOX_INPUT_FILES = (
+    "baseline.vsp3",
+    "update_geom.vspscript",
+    "cruise.vspscript",
+    "fused_cruise.vspscript",
+    "pitch_stability.vspscript",
+    "batch_cruise.vspscript",
+    "tessellation.vspscript",  # #included by the cruise, pitch and batch scripts
+)
+
+# Differential evolution settings (also recorded in the checkpoint)
+DE_POPSIZE = 20
+DE_MAXITER = 40
+DE_STRATEGY = 'best1bin'
+DE_TOL = 5e-3
+DE_SEED = None  # None = fresh random start; the checkpoint keeps the RNG state either way
+
+# Fused Tier 1 mode - apply .des, MassProp and cruise sweep in one VSP launch
+# (fused_cruise.vspscript) instead of update_geom.vspscript + cruise.vspscript
+USE_FUSED_SCRIPT = False
+FUSED_WRITE_VSP3 = True  # False skips the intermediate current.vsp3 write/read
+
+# Watchdog - hung VSP processes are killed after a per-stage timeout of
+# quantile(past stage times) x factor, then retried once with fewer wake iterations
+WATCHDOG_QUANTILE = 0.95
+WATCHDOG_FACTOR = 3.0
+WATCHDOG_MIN_SAMPLES = 5      # Use the defaults below until a stage has this many runs
+WATCHDOG_DEFAULT_TIMEOUTS = {"update_geom": 300.0, "cruise": 1800.0, "pitch": 1200.0}  # seconds
+WATCHDOG_MIN_TIMEOUT = 120.0  # Never cut a stage off sooner than this (seconds)
+WATCHDOG_RETRY_WAKE_ITER = 5  # WakeNumIter for the retry (normal runs use 10)
+FAILURE_ENERGY = 100.0        # Returned to DE for designs with no usable result (DE minimizes)
+REJECTED_ENERGY = 1e9         # Returned for surrogate-rejected designs: above FAILURE_ENERGY and any
+                              # penalized design, so an unsolved trial never wins selection
+
+# Stand-in solver (--backend standin) - writes the files VSP would from an analytic
+# model (vlm.py aerodynamics, component-mass CG), so the pipeline runs without OpenVSP.
+# Latency is per stage at VSPAERO_NCPU cores; failures are rates per "stage:kind" with
+# kind = error, hang (until the watchdog kills it) or diverged (cruise: NaN polar).
+# Both are deterministic per design (see StandInBackend)
+STANDIN_LATENCY = {"update_geom": 0.0, "cruise": 0.0, "pitch": 0.0}  # seconds
+STANDIN_FAILURES = {}          # e.g. {"cruise:hang": 0.02, "pitch:error": 0.05}
+STANDIN_JITTER = 0.1           # Latency spread between designs (+-10%)
+STANDIN_PARALLEL_FRACTION = 0.9  # Amdahl fraction of a solve that scales with cores
+STANDIN_SEED = 0               # Picks which designs fail and their latency jitter
+
+# Persistent evaluation cache - analyzed designs survive restarts (see EvaluationCache)
+EVAL_CACHE_DB = "eval_cache.sqlite"
+EVAL_CACHE_MAX_ENTRIES = 5000
+# Design vectors closer than these steps share a cache entry
+# Format: (span_mm, sweep_deg, xloc_mm, taper, tip_mm, ctrl)
+EVAL_CACHE_STEPS = (0.05, 0.01, 0.05, 0.0001, 0.05, 0.001)
+EVAL_CACHE_VERSION = 2  # Bump when analyze_design's scoring inputs change meaning
+
+# Surrogate pre-screen - skip the solver for designs a GP fitted to the history
+# is confident are far below the best (see SurrogateModel, enabled by --surrogate)
+SURROGATE_ENABLED = False
+SURROGATE_MIN_SAMPLES = 30   # Successful designs needed before the surrogate rejects anything
+SURROGATE_MAX_SAMPLES = 400  # Most recent designs used for training (GP cost grows as n^3)
+SURROGATE_MARGIN = 2.0       # Reject only if the predicted objective is this far below the best...
+SURROGATE_CONFIDENCE = 3.0   # ...even at mean + this many standard deviations
+
+# Near-duplicate memoization - late generations propose designs a fraction of a
+# millimetre apart; those reuse or interpolate earlier results instead of running
+# VSPAero (see DesignMemo, disabled by --no-memo)
+MEMO_ENABLED = True
+MEMO_RADIUS = 1e-3   # Normalized distance (fraction of each DESIGN_BOUNDS range)
+MEMO_NEIGHBORS = 4   # Evaluated designs within MEMO_RADIUS that are interpolated
+
+# Analytic pre-filter - designs whose best possible objective (from the penalties
+# that follow from the design vector alone) is below the worst member of the DE
+# population can't survive selection, so no solver runs for them (--no-prefilter)
+PREFILTER_ENABLED = True
+PREFILTER_LOG = "prefilter_log.csv"
+
+# Multi-fidelity ladder - each design starts at the cheapest level and moves up
+# only while its objective is within FIDELITY_MARGIN of the best (--fidelity).
+# The last level must be the production settings (vspscript defaults).
+FIDELITY_ENABLED = False
+FIDELITY_LEVELS = [
+    {"name": "coarse", "WAKE_ITER": 3, "TESS_SCALE": 0.5},
+    {"name": "medium", "WAKE_ITER": 5, "TESS_SCALE": 0.75},
+    {"name": "full", "WAKE_ITER": 10, "TESS_SCALE": 1.0},
+]
+FIDELITY_MARGIN = 3.0
+FIDELITY_LOG = "fidelity_log.csv"
+
+# Cruise sweep - band L/D is the best BAND_WINDOW consecutive alphas of the grid
+SWEEP_ALPHAS = (2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0)  # deg
+BAND_WINDOW = 3
+# Adaptive alpha sweep - solve ADAPTIVE_ALPHA_INITIAL first, then only the grid
+# alphas around the L/D peak (--adaptive-alpha)
+ADAPTIVE_ALPHA = False
+ADAPTIVE_ALPHA_INITIAL = (4.0, 8.0, 12.0)
+
+# Neutral point source for designs that pass the Tier 2 gate (--xnp):
+#   "pitch"      - always run pitch_stability.vspscript (.aerocenter.stab)
+#   "calibrate"  - run it until the dCMy/dCL estimate from the cruise sweep has
+#                  agreed on XNP_CALIBRATION_SAMPLES designs in a row, then use
+#                  the estimate (re-checking every XNP_RECHECK_EVERY-th design)
+#   "derivative" - never run Tier 2, always use the estimate
+XNP_SOURCE = "pitch"
+XNP_CALIBRATION_SAMPLES = 8
+XNP_TOLERANCE_PCT_MAC = 1.0   # Agreement: estimate within this % MAC (= static margin points)
+XNP_RECHECK_EVERY = 10
+XNP_CALIBRATION_LOG = "xnp_calibration.csv"
+XNP_REFERENCE_X = 314.25      # Moment reference (Xcg in the vspscripts) if Results.csv has no FC_Xcg_
+
+# Analytic CG model - component masses (fuselage, two wings, fin) fitted to the
+# MassProp results; MassProp is skipped for designs whose predicted CG error is
+# below CG_MODEL_MAX_ERROR_MM (see CGModel, disabled by --no-cg-model)
+CG_MODEL_ENABLED = True
+CG_MODEL_MIN_SAMPLES = 12     # MassProp results needed before the model replaces any run
+CG_MODEL_MAX_ERROR_MM = 0.5   # 0.5 mm = 0.36% MAC of static margin
+
+# CG cache - MassProp CGs interpolated from the CG_CACHE_NEIGHBORS nearest cached
+# designs, with distances in units of _cg_cache_tolerances (see CGCache)
+CG_CACHE_FILE = "cg_cache.json"
+CG_CACHE_NEIGHBORS = 4
+CG_CACHE_RADIUS = 1.0         # Only neighbours within one tolerance step are used
+CG_CACHE_MAX_ERROR_MM = 0.5   # Estimated interpolation error accepted as a hit
+CG_CACHE_SLOPE_MM = 0.5       # Smallest CG change per tolerance step assumed for the error estimate
 
 # ---------------------------------------------------------------------
 # Global state
@@ -56,9 +222,8 @@ _should_stop = False
 _should_pause = False
 
 # CG caching - avoid recomputing MassProp for similar geometries
-_cg_cache = {}
-_CG_CACHE_MAX_SIZE = 200  # Limit cache size to prevent unbounded growth
-# Parameter-specific tolerances for CG caching
+_CG_CACHE_MAX_SIZE = 2000  # Least recently used designs are evicted beyond this
+# Parameter-specific tolerances for CG caching (the CG cache's distance units)
 # CG is sensitive to geometry changes, so we use conservative tolerances
 # Format: (span_tol_mm, sweep_tol_deg, xloc_tol_mm, taper_tol, tip_tol_mm, ctrl_tol)
 _cg_cache_tolerances = (
@@ -72,18 +237,135 @@ _cg_cache_tolerances = (
 
 t_start = time.time()
 
+# Guards counters, best-so-far tracking and history appends when several
+# workers finish evaluations at the same time
+_state_lock = threading.RLock()
+
+# Per-thread evaluation context (sandbox directory of the current worker)
+_worker_state = threading.local()
+
 # ---------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------
-with open(LOG_CSV, "w") as f:
-    f.write(
-        "iter,generation,elapsed_s,elapsed_min,vspaero_time_s,"
-        "span_mm,sweep_deg,xloc_mm,taper,tip_mm,ctrl_frac,te_x_mm,"
-        "band_LD,ld_min,ld_max,ld_range,ld_at_2deg,ld_at_4deg,ld_at_6deg,ld_at_8deg,ld_at_10deg,ld_at_12deg,ld_at_14deg,"
-        "span_penalty,te_penalty,ld_penalty,crash_penalty,slug_penalty,total_penalty,"
-        "static_margin,sm_category,xnp,mac,cg_x,"
-        "final_obj,alpha_center,is_new_best,iter_improvement\n"
-    )
+HISTORY_HEADER = (
+    "iter,generation,elapsed_s,elapsed_min,vspaero_time_s,"
+    "span_mm,sweep_deg,xloc_mm,taper,tip_mm,ctrl_frac,te_x_mm,"
+    "band_LD,ld_min,ld_max,ld_range,ld_at_2deg,ld_at_4deg,ld_at_6deg,ld_at_8deg,ld_at_10deg,ld_at_12deg,ld_at_14deg,"
+    "span_penalty,te_penalty,ld_penalty,crash_penalty,slug_penalty,total_penalty,"
+    "static_margin,sm_category,xnp,mac,cg_x,"
+    "final_obj,alpha_center,is_new_best,iter_improvement,failure_class,fidelity,alpha_points,xnp_source,cg_source,reused,"
+    "geom_s,cruise_s,pitch_s,parse_s,logging_s,other_s,overhead_s\n"
+)
+
+# Span name or category (trace_span / traced) -> history column its wall time goes to.
+# other_s is the rest of the evaluation, overhead_s the time on the worker
+# thread since its previous history row (DE bookkeeping, callbacks, checkpoints,
+# waiting for the generation's other designs)
+STAGE_TIME_COLUMNS = {"update_geom": "geom_s", "cruise": "cruise_s", "pitch": "pitch_s",
+                      "parse": "parse_s", "logging": "logging_s"}
+STAGE_TIME_HEADER = ["geom_s", "cruise_s", "pitch_s", "parse_s", "logging_s", "other_s", "overhead_s"]
+
+def init_history_log(path=None):
+    """
+    Start a fresh optimization history file (header only).
+    
+    Called from the driver rather than at import time so that test scripts and
+    worker threads can import this module without truncating a running history.
+    """
+    with open(path or LOG_CSV, "w") as f:
+        f.write(HISTORY_HEADER)
+
+column_store = None  # history_store.HistoryStore next to LOG_CSV (opened by the driver unless --no-history-store)
+
+def open_column_store():
+    """Open the columnar copy of LOG_CSV, taking over rows it is missing (interrupted run)."""
+    global column_store
+    column_store = history_store.HistoryStore(LOG_CSV)
+    print(f"[HISTORY STORE] {len(column_store)} rows in {column_store.path}", flush=True)
+
+def append_history_line(line):
+    """
+    Append one row to the optimization history: LOG_CSV, and the columnar store
+    when one is open. Callers hold _state_lock.
+    """
+    with trace_span("history_append", "logging"), open(LOG_CSV, "a") as f:
+        f.write(line + "\n")
+        if column_store is not None:
+            column_store.append(line.split(","), f.tell())
+    if log_writer is not None:
+        row = dict(zip(HISTORY_HEADER.strip().split(","), line.split(",")))
+        failure_class = row.get("failure_class", "ok")
+        level = "warning" if "error" in failure_class or "timeout" in failure_class else "info"
+        log_event("evaluation", level, **{key: event_value(row.get(key)) for key in EVENT_HISTORY_FIELDS})
+
+# History columns copied into the "evaluation" events of EVENT_LOG
+EVENT_HISTORY_FIELDS = ["iter", "generation", "final_obj", "band_LD", "static_margin", "sm_category",
+                        "failure_class", "fidelity", "reused", "vspaero_time_s", "elapsed_s"]
+
+def event_value(text):
+    """JSON value of a history field: int, float, None for N/A (or a missing column), else the text."""
+    if text is None or text == "N/A":
+        return None
+    for convert in (int, float):
+        try:
+            value = convert(text)
+        except ValueError:
+            continue
+        return value if np.isfinite(value) else None
+    return text
+
+def begin_stage_times():
+    """Start timing an evaluation on this thread. Returns: its StageTimes."""
+    now = time.perf_counter()
+    last = getattr(_worker_state, "last_row_time", None)
+    _worker_state.stage_times = StageTimes(STAGE_TIME_HEADER[:-2], now - last if last is not None else 0.0)
+    return _worker_state.stage_times
+
+def stage_time_fields():
+    """Timing columns for the history row this thread is writing (N/A if it wasn't timed)."""
+    times = getattr(_worker_state, "stage_times", None)
+    now = time.perf_counter()
+    _worker_state.stage_times = None
+    _worker_state.last_row_time = now
+    if times is None:
+        return dict.fromkeys(STAGE_TIME_HEADER, "N/A")
+    return times.fields(now)
+
+# ---------------------------------------------------------------------
+# Tracing - per-stage spans as a Chrome / Perfetto timeline
+# ---------------------------------------------------------------------
+tracer = None  # Tracer while --trace is on
+
+def trace_span(name, cat="stage", **args):
+    """
+    Context manager timing one stage of an evaluation.
+    
+    Spans named in STAGE_TIME_COLUMNS (by name or category) are also timed
+    into the history columns of the evaluation running on this thread. Any
+    other span while tracing is off is a shared no-op, so the instrumentation
+    can stay in the evaluation path.
+    """
+    column = STAGE_TIME_COLUMNS.get(name) or STAGE_TIME_COLUMNS.get(cat)
+    times = getattr(_worker_state, "stage_times", None) if column is not None else None
+    if tracer is None and times is None:
+        return NULL_SPAN
+    return TraceSpan(tracer, name, cat, args, times, column)
+
+def traced(cat, name=None):
+    """Decorator: trace every call of the function (named after it by default)."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+        column = STAGE_TIME_COLUMNS.get(span_name) or STAGE_TIME_COLUMNS.get(cat)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            times = getattr(_worker_state, "stage_times", None) if column is not None else None
+            if tracer is None and times is None:
+                return func(*args, **kwargs)
+            with TraceSpan(tracer, span_name, cat, {}, times, column):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
 
 # ---------------------------------------------------------------------
 # DES template
@@ -108,6 +390,12 @@ ARLMRMBRQTY:TailGeom:XSec_1:Root_Chord: {fin_chord}
 OJGNBNXLMTG:TailGeom:XSec_1:Sweep: {fin_sweep}
 """
 
+# (parm ID, template field) for every DES line - lets the API backend set parms directly
+DES_PARMS = [
+    (line.split(":")[0], line[line.index("{") + 1:line.index("}")])
+    for line in DES_TEMPLATE.splitlines()
+]
+
 # ---------------------------------------------------------------------
 # Remote control functions
 # ---------------------------------------------------------------------
@@ -137,6 +425,7 @@ def check_control_files():
     
     return _should_stop, _should_pause
 
+@traced("logging")
 def write_status_file():
     """Write current optimizer status to JSON file for remote monitoring."""
     global eval_counter, generation_counter, best_obj_so_far, best_x_so_far, t_start, vspaero_time
@@ -150,6 +439,8 @@ def write_status_file():
         "paused": _should_pause,
         "iteration": eval_counter,
         "generation": generation_counter,
+        "population_members": population_size(),
+        "max_generations": DE_MAXITER,
         "elapsed_seconds": elapsed_s,
         "elapsed_minutes": elapsed_min,
         "best_objective": float(best_obj_so_far) if best_obj_so_far != -np.inf else None,
@@ -165,30 +456,554 @@ def write_status_file():
     except Exception as e:
         print(f"Warning: Could not write status file: {e}", flush=True)
 
+# ---------------------------------------------------------------------
+# Worker sandboxes (parallel evaluation)
+# ---------------------------------------------------------------------
+def create_worker_sandbox(worker_id, root=None, prefix="worker"):
+    """
+    Create an isolated scratch directory for one evaluation worker.
+    
+    The VSP scripts read and write fixed file names (current.des, current.vsp3,
+    Results.csv, MassProp_Results.csv, current.aerocenter.stab), so concurrent
+    runs are only safe when each one executes in its own directory with its own
+    copy of baseline.vsp3 and the vspscripts.
+    
+    Returns: absolute path of the sandbox directory
+    """
+    root = root or os.path.join(SCRIPT_DIR, SANDBOX_ROOT)
+    path = os.path.abspath(os.path.join(root, f"{prefix}_{worker_id:02d}"))
+    os.makedirs(path, exist_ok=True)
+    for name in SANDBOX_INPUT_FILES:
+        shutil.copy2(os.path.join(SCRIPT_DIR, name), os.path.join(path, name))
+    return path
+
+def current_workdir():
+    """Directory the calling thread should run VSP in (its sandbox, or the script directory)."""
+    return getattr(_worker_state, "workdir", None) or SCRIPT_DIR
+
+def use_serial_sandbox(root=None):
+    """
+    Run the calling thread's evaluations in sandboxes/serial_00 instead of the
+    script directory. Serial stand-in runs use it: their current.des,
+    Results.csv, current.vsp3 etc. are not VSP's and must not overwrite the
+    files next to the tracked inputs.
+    
+    Returns: the sandbox path
+    """
+    _worker_state.workdir = create_worker_sandbox(0, root, prefix="serial")
+    return _worker_state.workdir
+
+class SandboxPool:
+    """
+    Map-like callable for differential_evolution(workers=...).
+    
+    Each candidate runs on a thread that checks out a free sandbox for the
+    duration of the evaluation. Threads are sufficient because the expensive
+    work happens in the VSP subprocess, and they keep the counters, best design
+    and history file in a single process.
+    
+    With tier2_workers > 0 the pool pipelines the two tiers: a design that
+    passes the Tier 2 gate hands its Tier 1 sandbox back (see move_to_tier2)
+    and finishes its pitch stability run in one of the separate tier2_NN
+    sandboxes, so the next candidate's Tier 1 sweep starts immediately.
+    """
+    def __init__(self, n_workers, root=None, tier2_workers=0):
+        self.n_workers = n_workers
+        self.sandboxes = queue.Queue()
+        for worker_id in range(n_workers):
+            self.sandboxes.put(create_worker_sandbox(worker_id, root))
+        self.tier2_sandboxes = queue.Queue()
+        for worker_id in range(tier2_workers):
+            self.tier2_sandboxes.put(create_worker_sandbox(worker_id, root, prefix="tier2"))
+        self.pipelined = tier2_workers > 0
+        # One thread per sandbox: threads finishing Tier 2 don't hold up Tier 1
+        self.executor = ThreadPoolExecutor(max_workers=n_workers + tier2_workers, thread_name_prefix="vsp-worker")
+
+    def _run_in_sandbox(self, func, x):
+        workdir = self.sandboxes.get()
+        _worker_state.workdir = workdir
+        _worker_state.pool = self
+        _worker_state.held = (self.sandboxes, workdir)
+        try:
+            return func(x)
+        finally:
+            home, held = _worker_state.held
+            _worker_state.workdir = None
+            _worker_state.pool = None
+            home.put(held)
+
+    def move_to_tier2(self, workdir):
+        """
+        Hand the calling thread's Tier 1 sandbox back and continue in a Tier 2 sandbox.
+        
+        The design's geometry (current.des / current.vsp3) is carried over, so
+        the pitch stability script sees the same model. The Tier 1 results must
+        already be parsed into memory - the next candidate overwrites them.
+        
+        Returns: Tier 2 sandbox directory
+        """
+        geometry = {}
+        for name in ("current.des", "current.vsp3"):
+            path = os.path.join(workdir, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    geometry[name] = f.read()
+        self.sandboxes.put(workdir)  # next candidate's Tier 1 can start now
+
+        tier2_dir = self.tier2_sandboxes.get()
+        _worker_state.held = (self.tier2_sandboxes, tier2_dir)
+        _worker_state.workdir = tier2_dir
+        for name in ("current.des", "current.vsp3"):
+            path = os.path.join(tier2_dir, name)
+            if name in geometry:
+                with open(path, "wb") as f:
+                    f.write(geometry[name])
+            elif os.path.exists(path):
+                os.remove(path)  # never let Tier 2 read a previous design's model
+        return tier2_dir
+
+    def __call__(self, func, iterable):
+        futures = [self.executor.submit(self._run_in_sandbox, func, x) for x in iterable]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # Stop request or crash - don't start any candidates still queued
+            for future in futures:
+                future.cancel()
+            raise
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+# ---------------------------------------------------------------------
+# CPU core budget (concurrent VSPAero runs)
+# ---------------------------------------------------------------------
+class CoreAllocation:
+    """Cores granted to one solver job: NCPU for VSPAero, plus CPU ids when pinning."""
+    def __init__(self, ncpu, cpus=None):
+        self.ncpu = ncpu
+        self.cpus = cpus
+
+class CoreScheduler:
+    """
+    Owns the machine's core budget and hands each solver job a share of it.
+
+    Every VSPAero run asks for cores with `allocate(stage)`; a job only starts
+    when its cores are free, so `workers x NCPU` never oversubscribes the
+    machine. The cores per job c fixes the concurrency k = min(workers, total // c),
+    and the scheduler learns which c gives the most evaluations per hour:
+
+        evals/hour(c) = k * 3600 / median(measured time of a job on c cores)
+
+    Each candidate split (total // k for k = 1..workers) is tried min_samples
+    times, after which the best measured split is used.
+
+    Parameters:
+    - total_cores: Core budget (default: every core this process may run on)
+    - max_jobs: Number of workers that can ask for cores at once
+    - pin: Restrict each VSP process to its own CPU ids (affinity)
+    - min_samples: Measurements per candidate before it is trusted
+    """
+    def __init__(self, total_cores=None, max_jobs=1, pin=False, min_samples=2):
+        if hasattr(os, "sched_getaffinity"):
+            cpu_ids = sorted(os.sched_getaffinity(0))
+        else:
+            cpu_ids = list(range(os.cpu_count() or 1))
+        self.total = max(1, total_cores or len(cpu_ids))
+        if pin:
+            self.total = min(self.total, len(cpu_ids))  # every pinned core needs a real CPU id
+        self.free_cpus = cpu_ids[:self.total]
+        self.max_jobs = max(1, max_jobs)
+        self.pin = pin
+        self.min_samples = min_samples
+        self.candidates = sorted({max(1, self.total // k) for k in range(1, self.max_jobs + 1)}, reverse=True)
+        self.samples = {}   # (stage, cores) -> list of job times (s)
+        self.in_use = 0
+        self.cond = threading.Condition()
+
+    def concurrency(self, cores):
+        return min(self.max_jobs, self.total // cores)
+
+    def evals_per_hour(self, cores, stage="cruise"):
+        """Expected throughput when every job gets `cores`, or None before any measurement."""
+        times = self.samples.get((stage, cores))
+        if not times:
+            return None
+        return self.concurrency(cores) * 3600.0 / max(float(np.median(times)), 1e-6)
+
+    def choose_cores(self, stage="cruise"):
+        """Core count for the next `stage` job (explore untried splits, then exploit)."""
+        for cores in self.candidates:
+            if len(self.samples.get((stage, cores), [])) < self.min_samples:
+                return cores
+        return max(self.candidates, key=lambda c: self.evals_per_hour(c, stage))
+
+    def record(self, stage, cores, elapsed):
+        self.samples.setdefault((stage, cores), []).append(elapsed)
+
+    @contextmanager
+    def allocate(self, stage="cruise"):
+        """Block until cores are free, yield a CoreAllocation, and time the job."""
+        with self.cond:
+            cores = self.choose_cores(stage)
+            while self.in_use + cores > self.total:
+                self.cond.wait()
+            self.in_use += cores
+            cpus = None
+            if self.pin:
+                cpus, self.free_cpus = self.free_cpus[:cores], self.free_cpus[cores:]
+        start = time.time()
+        succeeded = False
+        try:
+            yield CoreAllocation(cores, cpus)
+            succeeded = True
+        finally:
+            elapsed = time.time() - start
+            with self.cond:
+                self.in_use -= cores
+                if cpus:
+                    self.free_cpus = sorted(self.free_cpus + cpus)
+                if succeeded:
+                    # Failed runs say nothing about how fast a split is
+                    self.record(stage, cores, elapsed)
+                self.cond.notify_all()
+
+    def summary(self):
+        """One line per measured split: cores/job, concurrency, median job time, evals/hour."""
+        lines = []
+        with self.cond:
+            best = self.choose_cores("cruise")
+            for cores in self.candidates:
+                times = self.samples.get(("cruise", cores), [])
+                if not times:
+                    continue
+                marker = "  <- using" if cores == best else ""
+                lines.append(
+                    f"  {cores:3d} cores x {self.concurrency(cores)} jobs | n={len(times):3d} | "
+                    f"median {np.median(times):7.1f}s | {self.evals_per_hour(cores):7.1f} evals/h{marker}"
+                )
+        return "\n".join(lines)
+
+VSPAERO_NCPU = 16  # NCPU the vspscripts use when no scheduler is installed
+VSPAERO_WAKE_ITER = 10  # WakeNumIter of a normal (non-degraded) run
+core_scheduler = None  # CoreScheduler instance (set by --cores / --pin-cpus)
+
+@contextmanager
+def solver_cores(stage):
+    """Cores for one solver job: from core_scheduler if installed, else the script default."""
+    if core_scheduler is None:
+        yield CoreAllocation(VSPAERO_NCPU)
+    else:
+        with core_scheduler.allocate(stage) as allocation:
+            yield allocation
+
+_affinity_warned = False
+
+def current_fidelity():
+    """Fidelity level (FIDELITY_LEVELS entry) of the calling thread's evaluation, or None."""
+    return getattr(_worker_state, "fidelity", None)
+
+def fidelity_stage(stage):
+    """Watchdog/scheduler stage name: cheaper levels learn their own run times."""
+    level = current_fidelity()
+    if level is None or level is FIDELITY_LEVELS[-1]:
+        return stage
+    return f"{stage}_{level['name']}"
+
+def fidelity_settings(degraded=False):
+    """
+    WAKE_ITER / TESS_SCALE script settings for the current fidelity level.
+    
+    degraded=True is the watchdog retry: never more than WATCHDOG_RETRY_WAKE_ITER
+    wake iterations. Settings equal to the script defaults are left out.
+    """
+    level = current_fidelity() or {}
+    wake_iter = level.get("WAKE_ITER", VSPAERO_WAKE_ITER)
+    if degraded:
+        wake_iter = min(wake_iter, WATCHDOG_RETRY_WAKE_ITER)
+    settings = {}
+    if wake_iter != VSPAERO_WAKE_ITER:
+        settings["WAKE_ITER"] = wake_iter
+    if level.get("TESS_SCALE", 1.0) != 1.0:
+        settings["TESS_SCALE"] = level["TESS_SCALE"]
+    return settings
+
+def set_process_affinity(pid, cpus):
+    """Pin a process to CPU ids (Linux sched_setaffinity, else psutil if installed)."""
+    global _affinity_warned
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cpus)
+        else:
+            import psutil
+            psutil.Process(pid).cpu_affinity(list(cpus))
+    except (ImportError, OSError, AttributeError) as e:
+        # Affinity is an optimization - run unpinned rather than fail the design
+        if not _affinity_warned:
+            _affinity_warned = True
+            print(f"[CORES] Could not set CPU affinity ({e}) - running unpinned", flush=True)
+
+def pinned_command(command, cpus):
+    """
+    Pin a VSP launch to cpus without running Python in the forked child.
+
+    On Linux with taskset on the PATH the command is prefixed with
+    `taskset -c <cpus>`, so VSP and every thread or vspaero process it starts
+    run on those CPUs from the first instruction. Otherwise the caller pins the
+    process with set_process_affinity right after launch, which can miss
+    threads or processes VSP started in the meantime.
+
+    Returns: (command, CPUs to pin after launch or None)
+    """
+    global _affinity_warned
+    if not cpus:
+        return command, None
+    if not hasattr(os, "sched_getaffinity"):
+        return command, cpus
+    allowed = sorted(set(cpus) & os.sched_getaffinity(0))
+    if not allowed:
+        # Checked here: taskset would fail the launch, not just the pinning
+        if not _affinity_warned:
+            _affinity_warned = True
+            print(f"[CORES] CPUs {sorted(cpus)} not available to this process - running unpinned", flush=True)
+        return command, None
+    taskset = shutil.which("taskset")
+    if taskset is None:
+        return command, allowed
+    return [taskset, "-c", ",".join(str(cpu) for cpu in allowed)] + command, None
+
+# ---------------------------------------------------------------------
+# Solver process watchdog
+# ---------------------------------------------------------------------
+class SolverTimeout(RuntimeError):
+    """A VSP process ran past its watchdog timeout and was killed."""
+
+class EvaluationFailed(RuntimeError):
+    """Tier 1 produced no usable result; failure_class goes to opt_history.csv."""
+    def __init__(self, failure_class, message):
+        super().__init__(message)
+        self.failure_class = failure_class
+
+class StageWatchdog:
+    """
+    Per-stage timeouts learned from how long the stage normally takes.
+
+    Until a stage has min_samples successful runs its timeout is the fixed
+    default; after that it is quantile(past times) x factor, never below
+    min_timeout. Only clean (non-retried) runs are recorded, so hung and
+    degraded runs don't stretch the limit.
+    """
+    def __init__(self, quantile=WATCHDOG_QUANTILE, factor=WATCHDOG_FACTOR, min_samples=WATCHDOG_MIN_SAMPLES,
+                 defaults=None, min_timeout=WATCHDOG_MIN_TIMEOUT, history=200):
+        self.quantile = quantile
+        self.factor = factor
+        self.min_samples = min_samples
+        self.defaults = dict(defaults or WATCHDOG_DEFAULT_TIMEOUTS)
+        self.min_timeout = min_timeout
+        self.history = history
+        self.times = {}
+        self.lock = threading.Lock()
+
+    def timeout(self, stage):
+        with self.lock:
+            times = list(self.times.get(stage, []))
+        if len(times) < self.min_samples:
+            return self.defaults.get(stage, max(self.defaults.values()))
+        return max(self.min_timeout, float(np.quantile(times, self.quantile)) * self.factor)
+
+    def record(self, stage, elapsed):
+        with self.lock:
+            times = self.times.setdefault(stage, [])
+            times.append(elapsed)
+            del times[:-self.history]
+
+watchdog = StageWatchdog()
+
+def kill_process_tree(process):
+    """Kill a VSP process and everything it started (vspaero solver children)."""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)  # launched with start_new_session=True
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+
+def run_vsp_script(script, workdir, cpus=None, timeout=None):
+    """
+    subprocess.run([VSP_EXE, "-script", script]) in workdir, with a watchdog.
+
+    The process starts in its own process group so a timeout can kill the whole
+    tree (vsp.exe and the vspaero it launched). cpus are applied through
+    pinned_command (taskset, or set_process_affinity right after launch).
+
+    Raises: SolverTimeout if the script runs longer than timeout seconds
+    """
+    if os.name == "nt":
+        group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {"start_new_session": True}
+    command, pin_after_launch = pinned_command([VSP_EXE, "-script", script], cpus)
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=workdir,
+        **group
+    )
+    if pin_after_launch:
+        set_process_affinity(process.pid, pin_after_launch)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(process)
+        process.communicate()
+        raise SolverTimeout(f"{script} exceeded the {timeout:.0f}s watchdog timeout - process tree killed")
+    except BaseException:
+        kill_process_tree(process)
+        process.wait()
+        raise
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+def note_stage_outcome(outcome):
+    """Remember a watchdog event for the evaluation running on this thread."""
+    outcomes = getattr(_worker_state, "stage_outcomes", None)
+    if outcomes is not None:
+        outcomes.append(outcome)
+
+def run_watched_stage(stage, attempt):
+    """
+    Run a solver stage under the watchdog, retrying once after a timeout.
+
+    Parameters:
+    - stage: "update_geom", "cruise" or "pitch" (keys of the learned timeouts)
+    - attempt: attempt(degraded, timeout) runs the stage once; degraded=True
+      asks for cheaper settings (WATCHDOG_RETRY_WAKE_ITER wake iterations)
+
+    Returns: attempt's result. Raises SolverTimeout if the retry times out too.
+    """
+    timeout = watchdog.timeout(stage)
+    start = time.time()
+    try:
+        with trace_span(stage + " attempt", "solver", timeout_s=timeout):
+            result = attempt(False, timeout)
+    except SolverTimeout as e:
+        print(f"[WATCHDOG] {stage}: {e}", flush=True)
+        print(f"[WATCHDOG] {stage}: retrying once with degraded settings", flush=True)
+        try:
+            with trace_span(stage + " attempt", "solver", timeout_s=timeout, degraded=True):
+                result = attempt(True, timeout)
+        except SolverTimeout as retry_error:
+            print(f"[WATCHDOG] {stage}: retry timed out too - giving up on this design", flush=True)
+            note_stage_outcome(f"{stage}_timeout")
+            raise retry_error
+        note_stage_outcome(f"{stage}_retried")
+        return result
+    watchdog.record(stage, time.time() - start)
+    return result
+
+# ---------------------------------------------------------------------
+# Script templating
+# ---------------------------------------------------------------------
+_generated_script_dir = None  # Temporary directory for serial runs' generated scripts
+
+def generated_script_dir(workdir):
+    """
+    Where render_vspscript writes: the sandbox itself, or a temporary directory
+    (removed at exit) when VSP runs in the script directory, so generated
+    scripts never land next to the originals.
+    """
+    global _generated_script_dir
+    if os.path.abspath(workdir) != os.path.abspath(SCRIPT_DIR):
+        return workdir
+    with _state_lock:
+        if _generated_script_dir is None:
+            _generated_script_dir = tempfile.mkdtemp(prefix="vspscripts_")
+            atexit.register(shutil.rmtree, _generated_script_dir, True)
+    return _generated_script_dir
+
+SCRIPT_INCLUDE = re.compile(r'^#include\s+"([^"]+)"[ \t]*$', re.MULTILINE)
+
+def render_vspscript(name, workdir=None, **params):
+    """
+    Prepare a vspscript with some of its settings overridden.
+    
+    Settings are the `const <type> NAME = value;` declarations at the top of the
+    script; the unmodified script runs with their default values. Shared
+    functions (`#include "tessellation.vspscript"`) are inlined, so they are
+    defined in one file only. Scripts with overrides or includes are written as
+    <name>_gen.vspscript to the sandbox, or to a temporary directory for runs
+    in the script directory (generated_script_dir), so the original is never
+    touched.
+    
+    Returns: script path (relative to workdir, or absolute) to pass to VSP
+    """
+    workdir = workdir or current_workdir()
+    with open(os.path.join(SCRIPT_DIR, name), "r") as f:
+        text = f.read()
+
+    def include(match):
+        with open(os.path.join(SCRIPT_DIR, match.group(1)), "r") as f:
+            return f.read()
+    text, includes = SCRIPT_INCLUDE.subn(include, text)
+    if not params and not includes:
+        return name
+
+    for key, value in params.items():
+        if isinstance(value, bool):
+            literal = "true" if value else "false"
+        elif isinstance(value, str):
+            literal = '"' + value + '"'
+        else:
+            literal = repr(value)
+        pattern = re.compile(r"^(const\s+\w+\s+" + re.escape(key) + r"\s*=\s*)[^;]*;", re.MULTILINE)
+        text, count = pattern.subn(lambda m: m.group(1) + literal + ";", text)
+        if count == 0:
+            raise ValueError(f"{name} has no setting named {key}")
+
+    generated = os.path.splitext(name)[0] + "_gen.vspscript"
+    directory = generated_script_dir(workdir)
+    with open(os.path.join(directory, generated), "w") as f:
+        f.write(text)
+    return generated if directory == workdir else os.path.join(directory, generated)
+
 # ---------------------------------------------------------------------
 # Geometry update
 # ---------------------------------------------------------------------
-def write_des_from_x(x, path="current.des"):
+def des_values(x):
+    """Values for the DES_TEMPLATE fields of design vector x."""
     span, sweep, xloc, taper, tip, ctrl = x
     fin_chord = tip        # fin chord always equals tip chord
     fin_sweep = 45.0       # fixed
+    return dict(
+        span=span, sweep=sweep, xloc=xloc,
+        taper=taper, tip=tip, ctrl=ctrl,
+        fin_chord=fin_chord, fin_sweep=fin_sweep
+    )
 
+@traced("io")
+def write_des_from_x(x, path="current.des"):
     with open(path, "w") as f:
         f.write("14\n")  # updated from 12 to 14 to account for tail lines
-        f.write(DES_TEMPLATE.format(
-            span=span, sweep=sweep, xloc=xloc,
-            taper=taper, tip=tip, ctrl=ctrl,
-            fin_chord=fin_chord, fin_sweep=fin_sweep
-        ))
-
-def update_geometry_from_x(x):
-    write_des_from_x(x)
-    result = subprocess.run(
-        [VSP_EXE, "-script", "update_geom.vspscript"],
-        capture_output=True,
-        text=True,
-        cwd=os.path.dirname(os.path.abspath(__file__)) if "__file__" in globals() else None
-    )
+        f.write(DES_TEMPLATE.format(**des_values(x)))
+
+def read_des_file(path):
+    """Design vector of a .des file written by write_des_from_x."""
+    fields = dict(DES_PARMS)
+    values = {}
+    with open(path, "r") as f:
+        for line in f.readlines()[1:]:
+            parm_id = line.split(":")[0]
+            if parm_id in fields:
+                values[fields[parm_id]] = float(line.rsplit(":", 1)[1])
+    return [values[key] for key in ("span", "sweep", "xloc", "taper", "tip", "ctrl")]
+
+def update_geometry_from_x(x, workdir=None, timeout=None):
+    workdir = workdir or current_workdir()
+    write_des_from_x(x, os.path.join(workdir, "current.des"))
+    result = run_vsp_script("update_geom.vspscript", workdir, timeout=timeout)
     if result.returncode != 0:
         print(f"ERROR: update_geom.vspscript failed with exit code {result.returncode}", flush=True)
         if result.stderr:
@@ -196,7 +1011,7 @@ def update_geometry_from_x(x):
         raise RuntimeError("Failed to update geometry")
     
     # Verify current.vsp3 was created
-    if not os.path.exists("current.vsp3"):
+    if not os.path.exists(os.path.join(workdir, "current.vsp3")):
         print("ERROR: current.vsp3 was not created by update_geom.vspscript", flush=True)
         if result.stdout:
             print(f"STDOUT: {result.stdout[-500:]}", flush=True)
@@ -205,10 +1020,25 @@ def update_geometry_from_x(x):
 # ---------------------------------------------------------------------
 # VSPAERO run (includes MassProp for CG calculation)
 # ---------------------------------------------------------------------
-def run_vspaero():
+def run_vspaero(workdir=None, script="cruise.vspscript", cpus=None, timeout=None):
+    """
+    Run the Tier 1 cruise sweep in workdir.
+    
+    Parameters:
+    - workdir: Directory VSP runs in (defaults to the current worker's sandbox)
+    - script: cruise.vspscript (reads current.vsp3), or a rendered
+      fused_cruise.vspscript that applies current.des itself
+    - cpus: CPU ids to pin the VSP process to (None = no affinity)
+    - timeout: Watchdog limit in seconds (None = wait forever)
+    
+    Returns: VSPAero wall-clock time in seconds. Raises SolverTimeout if the
+    watchdog killed the run.
+    """
     global vspaero_time
-    if os.path.exists(RESULTS_CSV):
-        os.remove(RESULTS_CSV)
+    workdir = workdir or current_workdir()
+    results_csv = os.path.join(workdir, RESULTS_CSV)
+    if os.path.exists(results_csv):
+        os.remove(results_csv)
 
     start = time.time()
     
@@ -236,12 +1066,7 @@ def run_vspaero():
     progress_thread.start()
     
     try:
-        result = subprocess.run(
-            [VSP_EXE, "-script", "cruise.vspscript"],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)) if "__file__" in globals() else None
-        )
+        result = run_vsp_script(script, workdir, cpus, timeout)
     finally:
         progress_stop.set()  # Stop progress indicator
     
@@ -256,11 +1081,11 @@ def run_vspaero():
             print(f"STDERR: {result.stderr[-500:]}", flush=True)
     
     # Check if Results.csv was created and has content
-    if not os.path.exists(RESULTS_CSV):
+    if not os.path.exists(results_csv):
         raise RuntimeError("No Results.csv produced")
     
     # Check file size - if it's too small, the analysis probably didn't complete
-    file_size = os.path.getsize(RESULTS_CSV)
+    file_size = os.path.getsize(results_csv)
     if file_size < 1000:  # Less than 1KB is suspicious
         print(f"WARNING: Results.csv is very small ({file_size} bytes) - analysis may have failed", flush=True)
     
@@ -279,15 +1104,36 @@ def run_vspaero():
     elif elapsed_min > 15:
         print(f"WARNING: VSPAero took unusually long ({elapsed_min:.1f} min) - may indicate issues", flush=True)
         print(f"Expected time: 5-10 minutes. Check if geometry is valid and system resources are available.", flush=True)
+    
+    return elapsed
 
 # ---------------------------------------------------------------------
 # Pitch stability run (Tier 2 - expensive, single alpha)
 # ---------------------------------------------------------------------
-def run_pitch_stability():
-    """Run pitch stability analysis at single alpha (8 deg). Much faster than 7-alpha sweep."""
+def run_pitch_stability(workdir=None, apply_des=False, ncpu=VSPAERO_NCPU, cpus=None,
+                        wake_iter=VSPAERO_WAKE_ITER, timeout=None, tess_scale=1.0):
+    """
+    Run pitch stability analysis at single alpha (8 deg). Much faster than 7-alpha sweep.
+    
+    apply_des=True rebuilds the geometry from baseline.vsp3 + current.des
+    (fused mode that skipped writing current.vsp3). ncpu/cpus come from the
+    core scheduler's allocation for this job; wake_iter/timeout from the watchdog;
+    wake_iter/tess_scale from the fidelity level.
+    """
     global vspaero_time
+    workdir = workdir or current_workdir()
+    settings = {}
+    if apply_des:
+        settings["APPLY_DES"] = True
+    if ncpu != VSPAERO_NCPU:
+        settings["NCPU"] = ncpu
+    if wake_iter != VSPAERO_WAKE_ITER:
+        settings["WAKE_ITER"] = wake_iter
+    if tess_scale != 1.0:
+        settings["TESS_SCALE"] = tess_scale
+    script = render_vspscript("pitch_stability.vspscript", workdir, **settings)
     
-    stab_file = "current.aerocenter.stab"
+    stab_file = os.path.join(workdir, "current.aerocenter.stab")
     if os.path.exists(stab_file):
         os.remove(stab_file)
     
@@ -295,12 +1141,9 @@ def run_pitch_stability():
     print(f"[TIER 2] Running pitch stability analysis (single alpha = 8 deg)...", flush=True)
     
     try:
-        result = subprocess.run(
-            [VSP_EXE, "-script", "pitch_stability.vspscript"],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)) if "__file__" in globals() else None
-        )
+        result = run_vsp_script(script, workdir, cpus, timeout)
+    except SolverTimeout:
+        raise
     except Exception as e:
         print(f"ERROR: Pitch stability analysis failed: {e}", flush=True)
         raise RuntimeError(f"Pitch stability analysis failed: {e}")
@@ -315,44 +1158,289 @@ def run_pitch_stability():
     
     # Check if .stab file was created
     if not os.path.exists(stab_file):
-        print(f"WARNING: {stab_file} not created - stability analysis may have failed", flush=True)
+        print(f"WARNING: {os.path.basename(stab_file)} not created - stability analysis may have failed", flush=True)
         return False
     
     return True
 
+# ---------------------------------------------------------------------
+# Results tables (CSV files or OpenVSP results manager)
+# ---------------------------------------------------------------------
+def float_values(values):
+    """Row values as a float array; values that aren't numbers become nan."""
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        def number(value):
+            try:
+                return float(value)
+            except ValueError:
+                return np.nan
+        return np.array([number(v) for v in values], dtype=float)
+
+class ResultsTable:
+    """
+    Row label -> row of a VSP results set (label first, then values).
+    
+    `rows` keeps the first row for each label, which is the row the CSV scans
+    always picked. Built from a file written by WriteResultsCSVFile, or
+    directly from the OpenVSP results manager by OpenVSPAPIBackend.
+    `directory` locates the files VSPAERO writes itself
+    (current.aerocenter.stab); `massprop` holds the MassProp results when they
+    didn't come from MassProp_Results.csv.
+    
+    from_csv reads the file once and indexes every line by label and result
+    block (each "Results_Name" line starts a block), so a label that appears in
+    several blocks (one per alpha, per sweep, ...) can be read from any of
+    them. Lines are split and converted only when asked for: values() returns
+    a row as a float array, and the rows the optimizer uses have typed
+    accessors (L_D, CLtot, CMytot, CDtot arrays; FC_Cref_, FC_Xcg_ scalars).
+    """
+    def __init__(self, rows, name="", directory="", massprop=None, index=None, blocks=None):
+        self.rows = rows
+        self.name = name
+        self.directory = directory
+        self.massprop = massprop
+        self.index = index    # label -> [(block number, line)] in file order (from_csv only)
+        self.blocks = blocks or []  # Results_Name of each block
+        self._arrays = {}
+
+    @classmethod
+    @traced("parse")
+    def from_csv(cls, path):
+        rows = {}
+        index = {}
+        blocks = []
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                label = line.split(",", 1)[0].strip()
+                if label == "Results_Name":
+                    blocks.append(line.split(",")[1].strip() if "," in line else "")
+                occurrences = index.setdefault(label, [])
+                occurrences.append((len(blocks) - 1, line))
+                if len(occurrences) == 1:
+                    rows[label] = line.split(",")
+        directory, name = os.path.split(path)
+        return cls(rows, name, directory, index=index, blocks=blocks)
+
+    def row(self, label, block=None):
+        """
+        Row with this label (label first, then the values as text), or None.
+        
+        block: Result block name (e.g. "VSPAERO_Polar") or number; default the
+        first row with this label in the file.
+        """
+        if block is None or self.index is None:
+            return self.rows.get(label) if block in (None, 0) else None
+        for number, line in self.index.get(label, ()):
+            if number == block or (number >= 0 and self.blocks[number] == block):
+                return line.split(",")
+        return None
+
+    def all_rows(self, label):
+        """Every row with this label, one per block it appears in, in file order."""
+        if self.index is None:
+            return [self.rows[label]] if label in self.rows else []
+        return [line.split(",") for _, line in self.index.get(label, ())]
+
+    def values(self, label, block=None):
+        """Values of row(label, block) as a float array (nan if not a number), or None."""
+        key = (label, block)
+        if key not in self._arrays:
+            row = self.row(label, block)
+            self._arrays[key] = None if row is None else float_values(row[1:])
+        return self._arrays[key]
+
+    def scalar(self, label, default=None):
+        """First value of a row as a float (default if missing or not a number)."""
+        values = self.values(label)
+        if values is None or len(values) == 0 or not np.isfinite(values[0]):
+            return default
+        return float(values[0])
+
+    def labels(self):
+        return list(self.rows)
+
+    @property
+    def L_D(self):
+        return self.values("L_D")
+
+    @property
+    def CLtot(self):
+        return self.values("CLtot")
+
+    @property
+    def CMytot(self):
+        return self.values("CMytot")
+
+    @property
+    def CDtot(self):
+        return self.values("CDtot")
+
+    @property
+    def FC_Cref_(self):
+        return self.scalar("FC_Cref_")
+
+    @property
+    def FC_Xcg_(self):
+        return self.scalar("FC_Xcg_")
+
+def load_results_table(results):
+    """Accept either a Results.csv path or an already built ResultsTable."""
+    return results if isinstance(results, ResultsTable) else ResultsTable.from_csv(results)
+
+def results_location(results):
+    """(directory, file name) of a Results.csv path or ResultsTable."""
+    if isinstance(results, ResultsTable):
+        return results.directory, results.name
+    return os.path.split(results)
+
+# ---------------------------------------------------------------------
+# Adaptive alpha sweep
+# ---------------------------------------------------------------------
+def arithmetic_runs(values):
+    """Split values into sorted runs of constant spacing (one VSPAEROSweep call each)."""
+    runs = []
+    for value in sorted(values):
+        run = runs[-1] if runs else None
+        if run and (len(run) == 1 or np.isclose(value - run[-1], run[1] - run[0])):
+            run.append(value)
+        else:
+            runs.append([value])
+    return runs
+
+def merge_alpha_sweeps(sweeps, alphas=SWEEP_ALPHAS):
+    """
+    Combine partial sweeps into one table on the full alpha grid.
+    
+    Parameters:
+    - sweeps: list of (alphas solved, ResultsTable) in the order they ran
+    - alphas: Grid the merged per-alpha rows are laid out on
+    
+    Per-alpha rows are the rows of the first sweep with one value per solved
+    alpha; unsolved alphas are "nan", which extract_band_ld skips (a window
+    containing one never wins). Other rows (FC_Cref_, ...) come from the first
+    sweep.
+    
+    Returns: ResultsTable named like the first sweep
+    """
+    first_alphas, first = sweeps[0]
+    per_alpha = [label for label in first.labels() if len(first.row(label)) - 1 == len(first_alphas)]
+    rows = dict(first.rows)
+    for label in per_alpha:
+        values = {}
+        for solved, table in sweeps:
+            row = table.row(label)
+            if row is not None and len(row) - 1 == len(solved):
+                values.update(zip(solved, row[1:]))
+        rows[label] = [label] + [values.get(a, "nan") for a in alphas]
+    return ResultsTable(rows, first.name, first.directory, first.massprop)
+
+def adaptive_alpha_sweep(run_sweep):
+    """
+    Solve only the alphas that decide the band L/D.
+    
+    Starts with ADAPTIVE_ALPHA_INITIAL, then repeatedly adds the unsolved grid
+    alphas within BAND_WINDOW - 1 points of the highest L/D solved so far,
+    until every window containing the peak is complete. For the single-peaked
+    polars VSPAero produces here the best window is one of those, so the band
+    L/D matches the full sweep with fewer solver points.
+    
+    Parameters:
+    - run_sweep: run_sweep(alpha_start, alpha_end, npts) -> ResultsTable of one
+      VSPAEROSweep call
+    
+    Returns: (ResultsTable merged onto SWEEP_ALPHAS, number of alphas solved)
+    """
+    grid = list(SWEEP_ALPHAS)
+    ld = {}
+    sweeps = []
+
+    def solve(alphas):
+        for run in arithmetic_runs(alphas):
+            table = run_sweep(run[0], run[-1], len(run))
+            values = table.L_D
+            if values is None or len(values) < len(run):
+                raise RuntimeError(f"Sweep {run[0]:g}-{run[-1]:g} deg returned no L_D for every alpha")
+            sweeps.append((run, table))
+            for alpha, value in zip(run, values):
+                ld[alpha] = -float(value)  # VSPAero outputs negative L/D
+
+    solve(ADAPTIVE_ALPHA_INITIAL)
+    while True:
+        peak = grid.index(max(ld, key=ld.get))
+        reach = BAND_WINDOW - 1
+        needed = [a for a in grid[max(0, peak - reach):peak + reach + 1] if a not in ld]
+        if not needed:
+            break
+        print(f"  [ALPHA] L/D peak near {grid[peak]:g} deg - refining at {', '.join(f'{a:g}' for a in needed)} deg", flush=True)
+        solve(needed)
+    print(f"  [ALPHA] {len(ld)}/{len(grid)} alphas solved in {len(sweeps)} sweeps", flush=True)
+    return merge_alpha_sweeps(sweeps), len(ld)
+
+# ---------------------------------------------------------------------
+# Solver backends
+# ---------------------------------------------------------------------
+SOLVER_BACKEND = "subprocess"  # "subprocess", "api" (opt-in: one model, no watchdog or Tier 2 pipeline) or "standin"
+
+def parse_stage_values(text):
+    """"cruise=2,pitch=1" (or "cruise:hang=0.02") -> {"cruise": 2.0, "pitch": 1.0}."""
+    values = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, value = item.split("=")
+        values[key.strip()] = float(value)
+    return values
+
+_solver_backend = None
+
+def get_solver_backend():
+    """Backend selected by SOLVER_BACKEND (created on first use, then shared)."""
+    global _solver_backend
+    with _state_lock:
+        if _solver_backend is None:
+            if SOLVER_BACKEND == "api":
+                _solver_backend = OpenVSPAPIBackend()
+            elif SOLVER_BACKEND == "standin":
+                _solver_backend = StandInBackend()
+            else:
+                _solver_backend = SubprocessBackend()
+        return _solver_backend
+
+def set_solver_backend(backend):
+    """Install a backend instance (or None to re-select from SOLVER_BACKEND on next use)."""
+    global _solver_backend
+    with _state_lock:
+        _solver_backend = backend
+
 # ---------------------------------------------------------------------
 # L/D extraction (α = 2–14°, step 2°)
 # ---------------------------------------------------------------------
+@traced("parse")
 def extract_band_ld(results_path):
-    alphas = np.arange(2, 15, 2)  # 2, 4, 6, 8, 10, 12, 14 (7 pts)
+    alphas = np.array(SWEEP_ALPHAS)  # 2, 4, 6, 8, 10, 12, 14 (7 pts)
 
-    with open(results_path, "r") as f:
-        rows = [line.strip().split(",") for line in f if line.strip()]
+    table = load_results_table(results_path)
 
-    ld_row = next((r for r in rows if r[0].strip() == "L_D"), None)
-    if ld_row is None:
-        print(f"WARNING: L_D row not found in {results_path}. Available rows:", flush=True)
+    ld_values = table.L_D
+    if ld_values is None:
+        print(f"WARNING: L_D row not found in {table.name}. Available rows:", flush=True)
         # Print first 20 row headers for debugging
-        for i, row in enumerate(rows[:20]):
-            if row:
-                print(f"  Row {i}: '{row[0].strip()}'", flush=True)
+        for i, label in enumerate(table.labels()[:20]):
+            print(f"  Row {i}: '{label}'", flush=True)
         return 0.001, None, None
 
-    WINDOW = 3  # Reduced from 4 since we have fewer points now
+    WINDOW = BAND_WINDOW  # Reduced from 4 since we have fewer points now
     
-    try:
-        ld = np.array([float(v) for v in ld_row[1:1 + len(alphas)]])
-        ld = -ld  # VSPAero outputs negative L/D
-        # Removed hard ceiling - allow higher L/D but penalize sailplane-like designs (>20)
-        ld = np.clip(ld, 0.0, 50.0)  # Upper bound to prevent numerical issues
-        
-        if len(ld) < WINDOW:
-            print(f"WARNING: Only {len(ld)} L/D values found, need at least {WINDOW} for band calculation", flush=True)
-            return 0.001, None, ld if len(ld) > 0 else None
-    except (ValueError, IndexError) as e:
-        print(f"WARNING: Error parsing L/D values from {results_path}: {e}", flush=True)
-        print(f"  L_D row: {ld_row[:min(10, len(ld_row))]}", flush=True)
-        return 0.001, None, None
+    ld = -ld_values[:len(alphas)]  # VSPAero outputs negative L/D
+    # Removed hard ceiling - allow higher L/D but penalize sailplane-like designs (>20)
+    ld = np.clip(ld, 0.0, 50.0)  # Upper bound to prevent numerical issues
+    
+    if len(ld) < WINDOW:
+        print(f"WARNING: Only {len(ld)} L/D values found, need at least {WINDOW} for band calculation", flush=True)
+        return 0.001, None, ld if len(ld) > 0 else None
     best_score = -np.inf
     best_idx = None
 
@@ -367,109 +1455,787 @@ def extract_band_ld(results_path):
         print(f"WARNING: Invalid band L/D score: {best_score}, using fallback", flush=True)
         return 0.001, None, ld
 
-    alpha_center = alphas[best_idx + WINDOW // 2] if best_idx is not None else None
+    alpha_center = int(alphas[best_idx + WINDOW // 2]) if best_idx is not None else None
     return best_score, alpha_center, ld
 
 # ---------------------------------------------------------------------
 # CG caching
 # ---------------------------------------------------------------------
+class CGCache:
+    """
+    MassProp CGs of earlier designs, looked up by nearest neighbours.
+    
+    Designs are points in parameter space scaled by _cg_cache_tolerances, so a
+    distance of 1 is one tolerance step. A lookup interpolates (inverse distance
+    squared) between the CG_CACHE_NEIGHBORS nearest designs within
+    CG_CACHE_RADIUS and estimates the error as the CG slope (the steepest between
+    those neighbours, but at least CG_CACHE_SLOPE_MM per step) times their
+    weighted distance. It is a hit if that estimate is within
+    CG_CACHE_MAX_ERROR_MM. Every new MassProp result is also checked against
+    what the cache would have interpolated, so the error estimate can be
+    compared with the real error. Least recently used designs are evicted once
+    max_size is exceeded, and the cache can be saved to / loaded from JSON.
+    
+    Parameters:
+    - max_size: Most designs kept
+    - scales: Distance unit per parameter
+    """
+    def __init__(self, max_size=_CG_CACHE_MAX_SIZE, scales=_cg_cache_tolerances):
+        self.max_size = max_size
+        self.scales = np.asarray(scales, dtype=float)
+        self.entries = OrderedDict()   # design tuple -> CG x, least recently used first
+        self.lock = threading.Lock()
+        self._tree = None              # cKDTree over self._keys, rebuilt after changes
+        self._keys = []
+        self.clear_stats()
+
+    def clear_stats(self):
+        self.hits = 0           # Exact design found
+        self.interpolated = 0   # Interpolated within CG_CACHE_MAX_ERROR_MM
+        self.misses = 0
+        self.errors = []        # (real error, estimated error) of each checked interpolation
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self._tree = None
+        self.clear_stats()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _neighbours(self, x):
+        """(keys, scaled distances) of the nearest designs within CG_CACHE_RADIUS."""
+        if not self.entries:
+            return [], np.array([])
+        if self._tree is None:
+            self._keys = list(self.entries)
+            self._tree = cKDTree(np.array(self._keys) / self.scales)
+        k = min(CG_CACHE_NEIGHBORS, len(self._keys))
+        dist, idx = self._tree.query(np.asarray(x, dtype=float) / self.scales, k=k)
+        dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        inside = dist <= CG_CACHE_RADIUS
+        return [self._keys[i] for i in idx[inside]], dist[inside]
+
+    def _interpolate(self, keys, dist):
+        """(CG x, estimated error) from neighbour keys at scaled distances dist."""
+        cgs = np.array([self.entries[key] for key in keys])
+        if dist[0] == 0.0:
+            return float(cgs[0]), 0.0
+        weights = 1.0 / dist ** 2
+        cg = float(weights @ cgs / weights.sum())
+        slope = CG_CACHE_SLOPE_MM
+        if len(keys) > 1:
+            points = np.array(keys) / self.scales
+            gaps = np.linalg.norm(points[:, None] - points[None, :], axis=2)
+            steps = np.abs(cgs[:, None] - cgs[None, :])
+            if (gaps > 0).any():
+                slope = max(slope, float(np.max(steps[gaps > 0] / gaps[gaps > 0])))
+        return cg, slope * float(weights @ dist / weights.sum())
+
+    def get(self, x):
+        """CG x for design x, or None if it can't be interpolated accurately enough."""
+        with self.lock:
+            keys, dist = self._neighbours(x)
+            if not keys:
+                self.misses += 1
+                return None
+            cg, error = self._interpolate(keys, dist)
+            if error > CG_CACHE_MAX_ERROR_MM:
+                self.misses += 1
+                return None
+            for key in keys:
+                self.entries.move_to_end(key)
+            if error == 0.0:
+                self.hits += 1
+            else:
+                self.interpolated += 1
+            return cg
+
+    def put(self, x, cg_x):
+        key = tuple(float(v) for v in x)
+        with self.lock:
+            if key not in self.entries:
+                keys, dist = self._neighbours(key)
+                if keys:
+                    cg, error = self._interpolate(keys, dist)
+                    self.errors.append((abs(cg - cg_x), error))
+            self.entries[key] = float(cg_x)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self._tree = None
+
+    def summary(self):
+        """One-line hit/miss and interpolation error report."""
+        text = (f"{len(self.entries)} designs | {self.hits} exact hits, {self.interpolated} interpolated, "
+                f"{self.misses} misses")
+        if self.errors:
+            real, estimated = np.array(self.errors).T
+            text += (f" | interpolation error {real.mean():.3f} mm mean, {real.max():.3f} mm max"
+                     f" over {len(real)} MassProp checks, within the estimate {np.mean(real <= estimated):.0%}")
+        return text
+
+    def save(self, path, input_hash):
+        """Write the designs (least recently used first) atomically (tmp file + rename)."""
+        with self.lock:
+            data = {"input_hash": input_hash, "entries": [list(key) + [cg] for key, cg in self.entries.items()]}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path, input_hash):
+        """
+        Read designs saved by save(). A file written for other inputs
+        (baseline.vsp3 or vspscripts changed) is ignored.
+        
+        Returns: number of designs loaded
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("input_hash") != input_hash:
+            return 0
+        for entry in data["entries"]:
+            self.put(entry[:-1], entry[-1])
+        self.errors.clear()
+        return len(data["entries"])
+
+_cg_cache = CGCache()
+
 def get_cached_cg(x):
+    """CG of a cached design near x (see CGCache), or None to trigger MassProp."""
+    return _cg_cache.get(x)
+
+def cache_cg(x, cg_x):
+    """Cache the MassProp CG of this geometry (production mesh only, like record_massprop_cg)."""
+    level = current_fidelity()
+    if level is not None and level is not FIDELITY_LEVELS[-1]:
+        return  # Coarse fidelity-ladder tessellation: the full level must rerun MassProp
+    _cg_cache.put(x, cg_x)
+
+def save_cg_cache():
+    """Persist the CG cache next to the evaluation cache (skipped with --no-cache)."""
+    if eval_cache is not None:
+        _cg_cache.save(os.path.join(SCRIPT_DIR, CG_CACHE_FILE), eval_cache.input_hash)
+
+# ---------------------------------------------------------------------
+# Analytic CG model
+# ---------------------------------------------------------------------
+class CGModel:
     """
-    Get CG from cache if geometry is similar, otherwise return None to trigger recomputation.
+    Component-mass model of the CG x position, fitted to MassProp results.
     
-    Uses parameter-specific tolerances:
-    - Sweep: 0.2 deg (conservative - 1 deg sweep change can move CG by 0.5-1mm)
-    - Span: 1.0 mm (moderate - affects CG position)
-    - X Location: 0.5 mm (moderate - directly affects CG)
-    - Others: Small tolerances (minor CG impact)
+    CG = sum(m x) / sum(m) over a fixed fuselage, the two wings and the fin.
+    A wing's mass is a density times the integral of c(y)^k over the span
+    (k = 2: solid sections of fixed thickness ratio, k = 1: skins); its
+    moment uses the section centroid xloc + y tan(sweep) + h c. The fin chord is
+    the tip chord at a fixed position and sweep. Dividing by the fuselage mass
+    leaves an equation that is linear in six unknowns:
+    
+        CG = a0 + a1 (Q_w - CG V_w) + a2 V_w2 + a3 V_f - a4 CG V_f + a5 V_f2
+    
+    which is solved by least squares for k = 1 and k = 2, keeping the better
+    fit. The predicted error of a design is the leave-one-out RMSE inflated by
+    its leverage, so it grows away from the sampled designs.
+    """
+    QUADRATURE = np.polynomial.legendre.leggauss(4)  # exact for the cubic integrands
+
+    def __init__(self):
+        self.n_samples = 0
+
+    def _integrals(self, X, k):
+        """(V_w, Q_w, V_w2, V_f, V_f2) for design vectors X (n, 6)."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        span, sweep, xloc, taper, tip = (X[:, i:i + 1] for i in range(5))
+        nodes, weights = self.QUADRATURE
+        t = 0.5 * (nodes + 1.0)                          # stations along the span, 0..1
+        w = 0.5 * weights
+        root = tip / taper
+        chord = root + (tip - root) * t
+        x_le = xloc + span * t * np.tan(np.radians(sweep))
+        v_w = span[:, 0] * (w * chord ** k).sum(axis=1)
+        q_w = span[:, 0] * (w * chord ** k * x_le).sum(axis=1)
+        v_w2 = span[:, 0] * (w * chord ** (k + 1)).sum(axis=1)
+        return v_w, q_w, v_w2, tip[:, 0] ** k, tip[:, 0] ** (k + 1)
+
+    def _design_matrix(self, integrals, cg):
+        v_w, q_w, v_w2, v_f, v_f2 = integrals
+        return np.column_stack([np.ones_like(cg), q_w - cg * v_w, v_w2, v_f, -cg * v_f, v_f2])
+
+    def fit(self, X, cg):
+        """
+        Train on design vectors X (n, 6) and their MassProp CG x (n,).
+        
+        Returns: self
+        """
+        cg = np.asarray(cg, dtype=float)
+        best = None
+        for k in (1, 2):
+            integrals = self._integrals(X, k)
+            A = self._design_matrix(integrals, cg)
+            scale = np.linalg.norm(A, axis=0)
+            scale[scale == 0] = 1.0
+            Q, R = np.linalg.qr(A / scale)
+            theta = np.linalg.solve(R, Q.T @ cg)
+            residual = cg - (A / scale) @ theta
+            leverage = (Q ** 2).sum(axis=1)
+            loo = residual / np.maximum(1.0 - leverage, 1e-9)
+            loo_rmse = float(np.sqrt(np.mean(loo ** 2)))
+            if best is None or loo_rmse < best[0]:
+                best = (loo_rmse, k, theta / scale, R, scale)
+        self.loo_rmse, self.k, self.theta, self.R, self.scale = best
+        self.n_samples = len(cg)
+        return self
+
+    def predict(self, X):
+        """
+        Returns: (cg, error) arrays for design vectors X - the predicted CG x (mm)
+        and its expected error (mm)
+        """
+        v_w, q_w, v_w2, v_f, v_f2 = integrals = self._integrals(X, self.k)
+        a0, a1, a2, a3, a4, a5 = self.theta
+        cg = (a0 + a1 * q_w + a2 * v_w2 + a3 * v_f + a5 * v_f2) / (1.0 + a1 * v_w + a4 * v_f)
+        # Leverage of each design: |R^-T a|^2 with a its scaled design-matrix row
+        A = self._design_matrix(integrals, cg) / self.scale
+        leverage = (solve_triangular(self.R, A.T, trans="T") ** 2).sum(axis=0)
+        return cg, self.loo_rmse * np.sqrt(1.0 + leverage)
+
+cg_model = None            # CGModel fitted to _massprop_samples (None until enough samples)
+_massprop_samples = {}     # design tuple -> MassProp CG x (mm)
+cg_model_skips = 0         # Cruise runs that skipped MassProp (CG cache or model)
+
+def record_massprop_cg(x, cg_x):
+    """Keep a production-mesh MassProp result for the next retrain_cg_model."""
+    level = current_fidelity()
+    if level is not None and level is not FIDELITY_LEVELS[-1]:
+        return  # Coarse fidelity-ladder tessellation
+    with _state_lock:
+        _massprop_samples[tuple(float(v) for v in x)] = cg_x
+
+def load_massprop_samples(path=None):
     """
-    global _cg_cache, _cg_cache_tolerances
+    Collect the MassProp CGs of a previous run from opt_history.csv (rows with
+    cg_source = massprop), so a resumed run starts with a fitted CG model.
     
-    # Create cache key by rounding each parameter to its specific tolerance
-    key = tuple(
-        round(v / tol) * tol 
-        for v, tol in zip(x, _cg_cache_tolerances)
-    )
+    Returns: number of samples loaded
+    """
+    path = path or LOG_CSV
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("cg_source") == "massprop"]
+    loaded = 0
+    for row in rows:
+        if row.get("fidelity") not in (None, "", FIDELITY_LEVELS[-1]["name"]):
+            continue
+        try:
+            x = tuple(float(row[c]) for c in HISTORY_DESIGN_COLUMNS)
+            cg_x = float(row["cg_x"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        with _state_lock:
+            _massprop_samples[x] = cg_x
+        loaded += 1
+    return loaded
+
+def retrain_cg_model():
+    """
+    Refit the CG model on every MassProp result so far. Called between
+    generations, so all designs of a generation see the same model.
     
-    if key in _cg_cache:
-        return _cg_cache[key]
-    return None
+    Returns: the current CGModel, or None
+    """
+    global cg_model
+    if not CG_MODEL_ENABLED:
+        return None
+    with _state_lock:
+        samples = list(_massprop_samples.items())
+    if len(samples) < CG_MODEL_MIN_SAMPLES:
+        return cg_model
+    model = CGModel().fit([x for x, _ in samples], [cg for _, cg in samples])
+    cg_model = model
+    print(f"[CG MODEL] Fitted to {model.n_samples} MassProp results: k={model.k}, "
+          f"LOO RMSE {model.loo_rmse:.3f} mm | {cg_model_skips} MassProp runs skipped so far", flush=True)
+    return model
 
-def cache_cg(x, cg_x):
-    """Cache CG for this geometry using parameter-specific tolerances."""
-    global _cg_cache, _cg_cache_tolerances, _CG_CACHE_MAX_SIZE
+def known_cgs(designs):
+    """
+    CG of every design that doesn't need MassProp, vectorized over the population:
+    CG cache hits, then designs the CG model predicts within CG_MODEL_MAX_ERROR_MM.
     
-    # Create cache key by rounding each parameter to its specific tolerance
-    key = tuple(
-        round(v / tol) * tol 
-        for v, tol in zip(x, _cg_cache_tolerances)
-    )
+    Returns: (cg_x array with nan where MassProp has to run, list of sources:
+    "cache", "model" or None)
+    """
+    cg = np.full(len(designs), np.nan)
+    sources = [None] * len(designs)
+    for i, x in enumerate(designs):
+        cached = get_cached_cg(x)
+        if cached is not None:
+            cg[i], sources[i] = cached, "cache"
+    global cg_model_skips
+    model = cg_model
+    todo = [i for i, source in enumerate(sources) if source is None]
+    if model is not None and CG_MODEL_ENABLED and todo:
+        predicted, error = model.predict([designs[i] for i in todo])
+        for i, value, err in zip(todo, predicted, error):
+            if err <= CG_MODEL_MAX_ERROR_MM:
+                cg[i], sources[i] = value, "model"
+    with _state_lock:
+        cg_model_skips += sum(source is not None for source in sources)
+    return cg, sources
+
+# ---------------------------------------------------------------------
+# Persistent evaluation cache
+# ---------------------------------------------------------------------
+class EvaluationCache:
+    """
+    On-disk cache of analyze_design results, shared across optimizer runs.
+    
+    Keys are content addressed: the design vector quantized to EVAL_CACHE_STEPS
+    plus a hash of baseline.vsp3 and the vspscripts, so editing the model or a
+    script starts from an empty cache instead of returning stale results. Only
+    clean analyses are stored (no watchdog retries or failures). Entries are
+    evicted least-recently-used first once max_entries is exceeded.
+    
+    Parameters:
+    - path: SQLite database file (one file, safe to copy between machines)
+    - max_entries: Size cap for LRU eviction
+    - source_dir: Directory holding the input files that are hashed
+    """
+    def __init__(self, path=None, max_entries=EVAL_CACHE_MAX_ENTRIES, source_dir=None):
+        self.path = path or os.path.join(SCRIPT_DIR, EVAL_CACHE_DB)
+        self.max_entries = max_entries
+        self.input_hash = self.hash_inputs(source_dir or SCRIPT_DIR)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                "key TEXT PRIMARY KEY, input_hash TEXT, design TEXT, analysis TEXT, "
+                "created REAL, last_used REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used)")
+
+    @staticmethod
+    def hash_inputs(source_dir):
+        """sha256 over baseline.vsp3, the vspscripts and EVAL_CACHE_VERSION."""
+        digest = hashlib.sha256(f"v{EVAL_CACHE_VERSION}".encode())
+        for name in SANDBOX_INPUT_FILES:
+            digest.update(name.encode())
+            with open(os.path.join(source_dir, name), "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def key(self, x):
+        steps = "/".join(str(int(round(v / step))) for v, step in zip(x, EVAL_CACHE_STEPS))
+        return f"{self.input_hash}/{steps}"
+
+    def get(self, x):
+        """Stored analysis dict for x, or None."""
+        key = self.key(x)
+        with self.lock:
+            row = self.db.execute("SELECT analysis FROM evaluations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self.db:
+                self.db.execute("UPDATE evaluations SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, x, analysis):
+        now = time.time()
+        design = json.dumps([float(v) for v in x])
+        payload = json.dumps(analysis, default=lambda v: v.tolist() if hasattr(v, "tolist") else str(v))
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key(x), self.input_hash, design, payload, now, now)
+            )
+            self.db.execute(
+                "DELETE FROM evaluations WHERE key IN ("
+                "SELECT key FROM evaluations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+eval_cache = None  # EvaluationCache instance (created by the driver unless --no-cache)
+
+# ---------------------------------------------------------------------
+# Near-duplicate memoization
+# ---------------------------------------------------------------------
+class DesignMemo:
+    """
+    In-memory results of this run's evaluated designs, for near-duplicates.
+    
+    Distances are normalized by the DESIGN_BOUNDS ranges. A design within
+    MEMO_RADIUS of exactly one evaluated design reuses its analysis ("nearest");
+    with several, every numeric field of the analysis (band L/D, penalties,
+    static margin, L/D curve, ...) is interpolated by inverse distance squared
+    over up to MEMO_NEIGHBORS of them ("interpolated"), so the objective is
+    interpolated too. Designs being evaluated right now are tracked as well:
+    a near-duplicate of a running design waits for it instead of starting a
+    second solver run.
+    """
+    def __init__(self, bounds=DESIGN_BOUNDS):
+        lower, upper = np.array(bounds, dtype=float).T
+        self.lower = lower
+        self.scales = np.where(upper > lower, upper - lower, 1.0)
+        self.lock = threading.Lock()
+        self.points = []        # normalized design vectors
+        self.analyses = []
+        self._tree = None
+        self.running = []       # (normalized design, threading.Event) of designs being evaluated
+        self.reused = {"nearest": 0, "interpolated": 0}
+
+    def clear(self):
+        with self.lock:
+            self.points, self.analyses, self._tree, self.running = [], [], None, []
+            self.reused = {"nearest": 0, "interpolated": 0}
+
+    def __len__(self):
+        return len(self.points)
+
+    def normalize(self, x):
+        return (np.asarray(x, dtype=float) - self.lower) / self.scales
+
+    def add(self, x, analysis):
+        """Remember a clean production-fidelity analysis (reused ones are not added)."""
+        if (analysis.get("failure_class", "ok") != "ok" or analysis.get("reused") in self.reused
+                or analysis.get("fidelity", FIDELITY_LEVELS[-1]["name"]) != FIDELITY_LEVELS[-1]["name"]):
+            return
+        with self.lock:
+            self.points.append(self.normalize(x))
+            self.analyses.append(dict(analysis))
+            self._tree = None
+
+    def lookup(self, x):
+        """
+        Analysis for a near-duplicate of an evaluated design, or None.
+        
+        Returns: a new analysis dict with "reused" set to "nearest" or "interpolated"
+        """
+        if not MEMO_ENABLED:
+            return None
+        with self.lock:
+            if not self.points:
+                return None
+            if self._tree is None:
+                self._tree = cKDTree(np.array(self.points))
+            k = min(MEMO_NEIGHBORS, len(self.points))
+            dist, idx = self._tree.query(self.normalize(x), k=k)
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+            inside = dist <= MEMO_RADIUS
+            dist, neighbours = dist[inside], [self.analyses[i] for i in idx[inside]]
+            if not neighbours:
+                return None
+            analysis = dict(neighbours[0])
+            if len(neighbours) == 1 or dist[0] == 0.0:
+                analysis["reused"] = "nearest"
+            else:
+                analysis.update(self._interpolate(neighbours, 1.0 / dist ** 2))
+                analysis["reused"] = "interpolated"
+            self.reused[analysis["reused"]] += 1
+        return analysis
+
+    @staticmethod
+    def _interpolate(neighbours, weights):
+        """Weighted mean of every float / array field all neighbours have (NaN-free arrays)."""
+        weights = weights / weights.sum()
+        fields = {}
+        for key, value in neighbours[0].items():
+            if isinstance(value, bool) or key == "vspaero_time":
+                continue
+            values = [n.get(key) for n in neighbours]
+            if isinstance(value, float) and all(isinstance(v, (int, float)) for v in values):
+                fields[key] = float(weights @ np.array(values, dtype=float))
+            elif isinstance(value, (list, np.ndarray)) and all(isinstance(v, (list, np.ndarray)) for v in values):
+                stacked = np.array(values, dtype=float)
+                if stacked.ndim == 2 and np.isfinite(stacked).all():
+                    fields[key] = weights @ stacked
+        return fields
+
+    def claim(self, x):
+        """
+        Mark x as being evaluated, unless a near-duplicate already is.
+        
+        Returns: None if the caller should evaluate x (and call release(x) when
+        done), or the Event of the running near-duplicate to wait for
+        """
+        point = self.normalize(x)
+        with self.lock:
+            for other, done in self.running:
+                if np.linalg.norm(point - other) <= MEMO_RADIUS:
+                    return done
+            self.running.append((point, threading.Event()))
+        return None
+
+    def release(self, x):
+        point = self.normalize(x)
+        with self.lock:
+            for i, (other, done) in enumerate(self.running):
+                if np.array_equal(other, point):
+                    del self.running[i]
+                    done.set()
+                    break
+
+    def summary(self):
+        return (f"{self.reused['nearest']} reused, {self.reused['interpolated']} interpolated "
+                f"from {len(self.points)} evaluated designs (radius {MEMO_RADIUS:g})")
+
+design_memo = DesignMemo()
+
+def find_stored_analysis(x, iteration):
+    """
+    Analysis of x without a solver run: from the evaluation cache, or from the
+    memo for a near-duplicate of a design evaluated this run.
+    
+    Returns: analysis dict ("reused" says where from, vspaero_time is 0), or None
+    """
+    analysis = eval_cache.get(x) if eval_cache is not None else None
+    if analysis is not None:
+        print(f"\n[CACHE] Iteration {iteration}: design already analyzed - reusing stored result", flush=True)
+        analysis["reused"] = "cache"
+    else:
+        analysis = design_memo.lookup(x)
+        if analysis is None:
+            return None
+        print(f"\n[MEMO] Iteration {iteration}: near-duplicate of an evaluated design - "
+              f"{analysis['reused']} result", flush=True)
+    analysis["vspaero_time"] = 0.0
+    return analysis
+
+# ---------------------------------------------------------------------
+# Surrogate pre-screen
+# ---------------------------------------------------------------------
+HISTORY_DESIGN_COLUMNS = ["span_mm", "sweep_deg", "xloc_mm", "taper", "tip_mm", "ctrl_frac"]
+
+class SurrogateModel:
+    """
+    Gaussian process regression of final_obj over the design vector.
+    
+    Inputs are scaled to [0, 1] by DESIGN_BOUNDS (fixed parameters dropped) and
+    the objective is standardized. The squared-exponential length scale and the
+    noise level are picked from a small grid by log marginal likelihood. The
+    predictive std is inflated by the leave-one-out z-score spread, so a
+    "confident" rejection stays confident when the GP assumptions don't hold
+    (the objective has hard penalty steps).
+    """
+    LENGTH_SCALES = (0.05, 0.1, 0.2, 0.35, 0.5, 0.8)
+    NOISE_LEVELS = (1e-4, 1e-2, 1e-1)
+
+    def __init__(self, bounds=None):
+        bounds = np.array(bounds if bounds is not None else DESIGN_BOUNDS, dtype=float)
+        self.free = bounds[:, 1] > bounds[:, 0]
+        self.lower = bounds[self.free, 0]
+        self.width = bounds[self.free, 1] - bounds[self.free, 0]
+        self.n_samples = 0
+
+    def _scale(self, X):
+        return (np.atleast_2d(np.asarray(X, dtype=float))[:, self.free] - self.lower) / self.width
+
+    def _kernel(self, A, B, length_scale):
+        d2 = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    def fit(self, X, y):
+        """
+        Train on design vectors X (n, 6) and their objectives y (n,).
+        
+        Returns: self
+        """
+        Z = self._scale(X)
+        y = np.asarray(y, dtype=float)
+        self.y_mean = y.mean()
+        self.y_std = y.std() if y.std() > 0 else 1.0
+        t = (y - self.y_mean) / self.y_std
+
+        best = None
+        for length_scale in self.LENGTH_SCALES:
+            K0 = self._kernel(Z, Z, length_scale)
+            for noise in self.NOISE_LEVELS:
+                try:
+                    L = cholesky(K0 + noise * np.eye(len(Z)), lower=True)
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = cho_solve((L, True), t)
+                log_likelihood = -0.5 * t @ alpha - np.log(np.diag(L)).sum()
+                if best is None or log_likelihood > best[0]:
+                    best = (log_likelihood, length_scale, noise, L, alpha)
+        _, self.length_scale, self.noise, self.L, self.alpha = best
+        self.Z = Z
+        self.n_samples = len(Z)
+
+        # Leave-one-out residuals in closed form: r_i = alpha_i / Kinv_ii
+        K_inv_diag = np.diag(cho_solve((self.L, True), np.eye(len(Z))))
+        loo_residual = self.alpha / K_inv_diag
+        loo_z = loo_residual * np.sqrt(K_inv_diag)
+        self.loo_rmse = float(np.sqrt(np.mean(loo_residual ** 2)) * self.y_std)
+        self.std_scale = max(1.0, float(np.sqrt(np.mean(loo_z ** 2))))
+        return self
+
+    def predict(self, X):
+        """
+        Returns: (mean, std) arrays of the predicted final_obj for design vectors X
+        """
+        Zs = self._scale(X)
+        Ks = self._kernel(self.Z, Zs, self.length_scale)
+        mean = self.y_mean + self.y_std * (Ks.T @ self.alpha)
+        v = solve_triangular(self.L, Ks, lower=True)
+        var = np.maximum(1.0 + self.noise - (v ** 2).sum(axis=0), 0.0)
+        std = self.y_std * self.std_scale * np.sqrt(var)
+        return mean, std
+
+surrogate = None  # SurrogateModel trained on the history (None until enough samples)
+surrogate_rejections = 0
+
+def retrain_surrogate(path=None):
+    """
+    Refit the surrogate on the successful designs in opt_history.csv.
     
-    # Limit cache size - if too large, clear oldest entries (simple FIFO)
-    if len(_cg_cache) >= _CG_CACHE_MAX_SIZE:
-        # Remove oldest 20% of entries (simple approach: clear all and let it rebuild)
-        # In practice, cache should stay well below limit with conservative tolerances
-        if len(_cg_cache) >= _CG_CACHE_MAX_SIZE * 1.5:
-            print(f"[CACHE] Cache size ({len(_cg_cache)}) exceeded limit, clearing...", flush=True)
-            _cg_cache.clear()
+    Failed, degraded, surrogate-rejected and lower-fidelity rows are left out
+    (their final_obj is not a production solver result); repeated designs keep
+    their latest objective.
+    Leaves the previous model in place if the history is too short.
     
-    _cg_cache[key] = cg_x
+    Returns: the current SurrogateModel, or None
+    """
+    global surrogate
+    path = path or LOG_CSV
+    if not os.path.exists(path):
+        return surrogate
+    with open(path, "r") as f:
+        rows = list(csv.DictReader(f))
+    designs = {}
+    for row in rows:
+        if row.get("failure_class", "ok") not in ("ok", "", None):
+            continue
+        if row.get("fidelity") not in (None, "", FIDELITY_LEVELS[-1]["name"]):
+            continue  # Cheap fidelity-ladder estimate
+        try:
+            x = tuple(float(row[c]) for c in HISTORY_DESIGN_COLUMNS)
+            designs[x] = float(row["final_obj"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    if len(designs) < SURROGATE_MIN_SAMPLES:
+        print(f"[SURROGATE] {len(designs)}/{SURROGATE_MIN_SAMPLES} designs - not screening yet", flush=True)
+        return surrogate
+
+    samples = list(designs.items())[-SURROGATE_MAX_SAMPLES:]
+    model = SurrogateModel().fit([x for x, _ in samples], [obj for _, obj in samples])
+    surrogate = model
+    print(f"[SURROGATE] Trained on {model.n_samples} designs: length scale {model.length_scale:g}, "
+          f"LOO RMSE {model.loo_rmse:.3f}, std x{model.std_scale:.2f} | "
+          f"{surrogate_rejections} solver runs skipped so far", flush=True)
+    return model
+
+def surrogate_prescreen(x):
+    """
+    Ask the surrogate whether x is worth a solver run.
+    
+    Returns: (predicted_obj, std) if x is rejected - its optimistic bound
+    mean + SURROGATE_CONFIDENCE * std is still more than SURROGATE_MARGIN below
+    the best objective so far - otherwise None
+    """
+    model = surrogate
+    if model is None or not np.isfinite(best_obj_so_far):
+        return None
+    mean, std = model.predict([x])
+    if mean[0] + SURROGATE_CONFIDENCE * std[0] < best_obj_so_far - SURROGATE_MARGIN:
+        return float(mean[0]), float(std[0])
+    return None
 
 # ---------------------------------------------------------------------
 # Dynamic CG calculation
 # ---------------------------------------------------------------------
+@traced("parse")
 def extract_cg_from_results(results_path, stab_file=None):
     """
     Extract Center of Gravity from MassProp_Results.csv file (written by massprop.vspscript).
     
     Parameters:
-    - results_path: Path to Results.csv (used to determine test vs main run)
+    - results_path: Path to Results.csv (used to determine test vs main run), or a
+      ResultsTable carrying its MassProp results
     - stab_file: Path to .aerocenter.stab file (optional, not used for CG)
     
     Returns:
     - cg_x: X-location of CG in mm, or None if not found
     """
-    # Determine which MassProp CSV file to use
-    if "test_" in results_path:
-        massprop_file = "test_MassProp_Results.csv"
+    # Determine which MassProp CSV file to use (lives next to Results.csv)
+    results_dir, results_name = results_location(results_path)
+    if "test_" in results_name:
+        massprop_file = os.path.join(results_dir, "test_MassProp_Results.csv")
     else:
-        massprop_file = "MassProp_Results.csv"
+        massprop_file = os.path.join(results_dir, "MassProp_Results.csv")
     
-    if os.path.exists(massprop_file):
+    massprop = results_path.massprop if isinstance(results_path, ResultsTable) else None
+    if massprop is not None or os.path.exists(massprop_file):
         try:
-            with open(massprop_file, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    # Total_CG is stored as: Total_CG,X,Y,Z
-                    if line.startswith("Total_CG,"):
-                        # Split by comma: first is label, rest are X,Y,Z
-                        parts = line.split(",")
-                        if len(parts) >= 2:  # At least "Total_CG" and X value
-                            try:
-                                cg_x = float(parts[1].strip())
-                                if cg_x != 0.0:
-                                    return cg_x
-                            except (ValueError, IndexError):
-                                pass
+            if massprop is None:
+                massprop = ResultsTable.from_csv(massprop_file)
+            # Total_CG is stored as: Total_CG,X,Y,Z
+            cg_x = massprop.scalar("Total_CG")
+            if cg_x is not None and cg_x != 0.0:
+                return cg_x
         except Exception as e:
-            print(f"Warning: Could not extract CG from {massprop_file}: {e}", flush=True)
+            print(f"Warning: Could not extract CG from {os.path.basename(massprop_file)}: {e}", flush=True)
     
     # Final fallback: Try Results.csv
     try:
-        with open(results_path, "r") as f:
-            for line in f:
-                if line.startswith("FC_Xcg_,"):
-                    cg_x = float(line.split(",")[1])
-                    if cg_x != 0.0:
-                        return cg_x
+        cg_x = load_results_table(results_path).FC_Xcg_
+        if cg_x is not None and cg_x != 0.0:
+            return cg_x
     except Exception as e:
-        print(f"Warning: Could not extract CG from {results_path}: {e}", flush=True)
+        print(f"Warning: Could not extract CG from {results_name}: {e}", flush=True)
     
     return None
 
 # ---------------------------------------------------------------------
 # Stability extraction (Static Margin from VSPAEROStability)
 # ---------------------------------------------------------------------
+def stab_file_for(results_path):
+    """current.aerocenter.stab next to Results.csv (test_current... for test runs)."""
+    results_dir, results_name = results_location(results_path)
+    if "test_" in results_name:
+        return os.path.join(results_dir, "test_current.aerocenter.stab")
+    return os.path.join(results_dir, "current.aerocenter.stab")
+
+@traced("parse")
+def read_aerocenter_x(stab_file):
+    """X of every "Aerodynamic Center is at: ( X, Y, Z)" line of a .stab file."""
+    with open(stab_file, "r") as f:
+        content = f.read()
+    pattern = r"Aerodynamic Center is at:\s*\(\s*([\d\.\-]+),\s*([\d\.\-]+),\s*([\d\.\-]+)\)"
+    return [float(m[0]) for m in re.findall(pattern, content)]
+
+def static_margin_penalties(static_margin_pct):
+    """
+    (crash_penalty, slug_penalty) for a static margin in % MAC.
+    Sweet spot 5-15%: no penalty.
+    """
+    crash_penalty = 0.0
+    slug_penalty = 0.0
+    if static_margin_pct < 5.0:
+        # Crash Penalty (100% weight) - unstable aircraft
+        crash_penalty = 10.0 * (5.0 - static_margin_pct)
+    elif static_margin_pct > 15.0:
+        # Slug Penalty (35% weight) - overly stable
+        slug_penalty = 0.35 * (static_margin_pct - 15.0)
+    return crash_penalty, slug_penalty
+
+@traced("parse")
 def extract_stability_margin(stability_results_path, results_path, cg_x=None, design_x=None):
     """
     Extract Static Margin from VSPAero Pitch stability analysis.
@@ -478,7 +2244,7 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
     
     Parameters:
     - stability_results_path: Path to stability results (not used, we use .stab file)
-    - results_path: Path to Results.csv
+    - results_path: Path to Results.csv (or a ResultsTable)
     - cg_x: CG X-location (mm). If None, calculates dynamically from design_x
     - design_x: Design vector [span, sweep, xloc, taper, tip, ctrl] for dynamic CG calculation
     
@@ -492,11 +2258,7 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
     """
     # Extract CG from VSPAero results (set by MassProp analysis)
     # Try to find .aerocenter.stab file for CG extraction
-    stab_file = None
-    if "test_" in results_path:
-        stab_file = "test_current.aerocenter.stab"
-    else:
-        stab_file = "current.aerocenter.stab"
+    stab_file = stab_file_for(results_path)
     
     # If cg_x not provided, extract from results
     if cg_x is None:
@@ -512,11 +2274,7 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
             else:
                 cg_x = 310.0  # Final fallback to default
     # Try to find .aerocenter.stab file (created by Pitch mode)
-    stab_file = None
-    if "test_" in results_path:
-        stab_file = "test_current.aerocenter.stab"
-    else:
-        stab_file = "current.aerocenter.stab"
+    stab_file = stab_file_for(results_path)
     
     if not os.path.exists(stab_file):
         # Fallback to Cm slope method if .stab file not found
@@ -525,22 +2283,15 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
     
     try:
         # Parse .stab file to extract aerodynamic center locations
-        with open(stab_file, "r") as f:
-            content = f.read()
-        
-        # Extract all "Aerodynamic Center is at: ( X, Y, Z)" lines
-        import re
-        pattern = r"Aerodynamic Center is at:\s*\(\s*([\d\.\-]+),\s*([\d\.\-]+),\s*([\d\.\-]+)\)"
-        matches = re.findall(pattern, content)
+        xnp_values = read_aerocenter_x(stab_file)
         
-        if not matches:
+        if not xnp_values:
             print(f"WARNING: No aerodynamic center found in {stab_file}, using fallback", flush=True)
             return extract_stability_fallback(results_path, cg_x)
         
         # Get X-coordinates (neutral point)
         # With single-alpha pitch stability, there should be only ONE AC location
         # If multiple found, use the first one (shouldn't happen with single alpha)
-        xnp_values = [float(m[0]) for m in matches]
         if len(xnp_values) == 1:
             xnp = xnp_values[0]  # Single alpha = single AC location
         else:
@@ -549,12 +2300,7 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
             xnp = xnp_values[0]
         
         # Get MAC from Results.csv (Cref is approximately MAC)
-        mac = None
-        with open(results_path, "r") as f:
-            for line in f:
-                if line.startswith("FC_Cref_,"):
-                    mac = float(line.split(",")[1])
-                    break
+        mac = load_results_table(results_path).FC_Cref_
         
         if mac is None or mac <= 0:
             # Fallback: estimate MAC from Cref if not found
@@ -590,18 +2336,7 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
         
         # Calculate Static Margin
         static_margin_pct = ((xnp - cg_x) / mac) * 100.0
-        
-        # Penalty system with sweet spot (8-12% no penalty)
-        crash_penalty = 0.0
-        slug_penalty = 0.0
-        
-        if static_margin_pct < 5.0:
-            # Crash Penalty (100% weight) - unstable aircraft
-            crash_penalty = 10.0 * (5.0 - static_margin_pct)
-        elif static_margin_pct > 15.0:
-            # Slug Penalty (35% weight) - overly stable
-            slug_penalty = 0.35 * (static_margin_pct - 15.0)
-        # Sweet spot 8-12%: no penalty
+        crash_penalty, slug_penalty = static_margin_penalties(static_margin_pct)
         
         return static_margin_pct, crash_penalty, slug_penalty, xnp, mac, cg_x
         
@@ -612,148 +2347,327 @@ def extract_stability_margin(stability_results_path, results_path, cg_x=None, de
         # Return large penalty instead of fallback
         return None, 5.0, 0.0, None, None, cg_x  # 5.0 penalty for extraction failure
 
+@traced("parse")
+def estimate_neutral_point(results_path):
+    """
+    Neutral point from the cruise sweep's pitching-moment derivative.
+    
+    VSPAero reports CMytot about the moment reference FC_Xcg_, so for the
+    linear part of the polar dCMy/dCL = (Xref - Xnp) / Cref, i.e.
+    Xnp = Xref - Cref * dCMy/dCL. dCMy/dCL is the least-squares slope of
+    CMytot against CLtot over the solved alphas.
+    
+    Parameters:
+    - results_path: Path to Results.csv (or a ResultsTable) of the cruise sweep
+    
+    Returns: (xnp, mac) in mm, or None if CLtot/CMytot are missing or fewer
+    than 3 alphas were solved
+    """
+    table = load_results_table(results_path)
+    cl, cm = table.CLtot, table.CMytot
+    if cl is None or cm is None:
+        return None
+    n = min(len(cl), len(cm))
+    cl, cm = cl[:n], cm[:n]
+    solved = np.isfinite(cl) & np.isfinite(cm)  # adaptive sweeps leave unsolved alphas as nan
+    if solved.sum() < 3 or np.ptp(cl[solved]) <= 0.0:
+        return None
+
+    dcm_dcl = np.polyfit(cl[solved], cm[solved], 1)[0]
+    mac = table.FC_Cref_
+    if mac is None or mac <= 0:
+        mac = 137.88  # Approximate MAC from baseline
+    xref = table.scalar("FC_Xcg_", XNP_REFERENCE_X)
+    return xref - mac * dcm_dcl, mac
+
+@traced("parse")
 def extract_stability_fallback(results_path, cg_x=310.0):
     """
-    Fallback: Extract stability from Cm slope if stability file not available.
-    Uses CMytot (total pitch moment) from Results.csv.
-    Cm slope (dCm/dAlpha) is proportional to static margin.
+    Fallback: Extract stability from the cruise sweep if stability file not available.
+    Neutral point from dCMy/dCL (estimate_neutral_point), same penalties as
+    extract_stability_margin.
     
     Returns: (static_margin_pct, crash_penalty, slug_penalty, xnp, mac, cg_x)
     All 6 values are always returned for consistency.
     """
-    alphas = np.arange(2, 15, 2)  # 2, 4, 6, 8, 10, 12, 14 (7 pts)
+    try:
+        estimate = estimate_neutral_point(results_path)
+    except (ValueError, IndexError):
+        estimate = None
+    if estimate is None:
+        name = results_location(results_path)[1]
+        print(f"WARNING: No usable CLtot/CMytot in {name}, using default stability", flush=True)
+        return None, 0.0, 0.0, None, None, cg_x
 
-    with open(results_path, "r") as f:
-        rows = [line.strip().split(",") for line in f if line.strip()]
+    xnp, mac = estimate
+    static_margin_pct = ((xnp - cg_x) / mac) * 100.0
+    crash_penalty, slug_penalty = static_margin_penalties(static_margin_pct)
+    return static_margin_pct, crash_penalty, slug_penalty, xnp, mac, cg_x
 
-    # Find CMytot (total pitch moment coefficient about Y-axis)
-    cm_row = None
-    for row in rows:
-        row_header = row[0].strip()
-        if row_header == "CMytot":
-            cm_row = row
-            break
+# ---------------------------------------------------------------------
+# Neutral point calibration (--xnp calibrate)
+# ---------------------------------------------------------------------
+XNP_CALIBRATION_HEADER = "timestamp,span_mm,sweep_deg,xloc_mm,taper,tip_mm,ctrl_frac,xnp_pitch,xnp_derivative,error_pct_mac,agree,streak\n"
+
+def init_xnp_calibration_log(path=None):
+    """Start a new calibration log (XNP_CALIBRATION_LOG)."""
+    with open(path or XNP_CALIBRATION_LOG, "w") as f:
+        f.write(XNP_CALIBRATION_HEADER)
+
+class XnpCalibration:
+    """
+    Tracks how well estimate_neutral_point agrees with Tier 2 (.aerocenter.stab).
     
-    if cm_row is None:
-        print(f"WARNING: CMytot not found in {results_path}, using default stability", flush=True)
-        return None, 0.0, 0.0, None, None, cg_x
+    Every design that runs Tier 2 in "calibrate" mode is compared and logged to
+    XNP_CALIBRATION_LOG. After XNP_CALIBRATION_SAMPLES agreeing designs in a
+    row the estimate is trusted and Tier 2 is skipped, except on every
+    XNP_RECHECK_EVERY-th design, which still runs it; one disagreement starts
+    the count over.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.streak = 0
+        self.since_check = 0
+        self.skipped = 0
+        self.errors = []  # estimate - Tier 2, % MAC
 
-    try:
-        cm_values = np.array([float(v) for v in cm_row[1:1 + len(alphas)]])
-        
-        if len(cm_values) < 3:
-            return None, 0.0, 0.0, None, None, cg_x  # Returns 6 values
-        
-        # Calculate Cm slope (dCm/dAlpha)
-        # Negative slope = stable (Cm becomes more negative as alpha increases)
-        cm_slope = np.polyfit(alphas, cm_values, 1)[0]
-        
-        # Convert Cm slope to approximate static margin
-        # For a typical aircraft: SM ≈ -dCm/dCL ≈ -dCm/dAlpha * (dAlpha/dCL)
-        # Rough approximation: assume dCL/dAlpha ≈ 0.1 per degree
-        # So SM ≈ -dCm/dAlpha / 0.1 * 100 (as percentage)
-        # This is approximate but gives reasonable values
-        if cm_slope >= 0:
-            # Unstable (positive slope)
-            static_margin_pct = -10.0  # Very unstable
-            crash_penalty = 10.0 * 15.0  # Large penalty
-            slug_penalty = 0.0
-        else:
-            # Stable (negative slope)
-            # Rough conversion: SM ≈ -dCm/dAlpha * 10 (as percentage)
-            static_margin_pct = abs(cm_slope) * 10.0
-            
-            crash_penalty = 0.0
-            slug_penalty = 0.0
-            
-            if static_margin_pct < 5.0:
-                crash_penalty = 10.0 * (5.0 - static_margin_pct)
-            elif static_margin_pct > 15.0:
-                slug_penalty = 0.35 * (static_margin_pct - 15.0)
-        
-        return static_margin_pct, crash_penalty, slug_penalty, None, None, cg_x
-        
-    except (ValueError, IndexError):
-        return None, 0.0, 0.0, None, None, cg_x
+    def trusted(self):
+        return self.streak >= XNP_CALIBRATION_SAMPLES
+
+    def skip_tier2(self):
+        """True if this design should use the estimate instead of running Tier 2."""
+        with self.lock:
+            if XNP_SOURCE == "derivative":
+                self.skipped += 1
+                return True
+            if XNP_SOURCE != "calibrate" or not self.trusted():
+                return False
+            self.since_check += 1
+            if self.since_check >= XNP_RECHECK_EVERY:
+                self.since_check = 0
+                return False
+            self.skipped += 1
+            return True
+
+    def record(self, x, xnp_pitch, xnp_derivative, mac, path=None):
+        """Compare one design's estimate with its Tier 2 neutral point. Returns True if they agree."""
+        error = (xnp_derivative - xnp_pitch) / mac * 100.0
+        agree = abs(error) <= XNP_TOLERANCE_PCT_MAC
+        path = path or XNP_CALIBRATION_LOG
+        with self.lock:
+            was_trusted = self.trusted()
+            self.errors.append(error)
+            self.streak = self.streak + 1 if agree else 0
+            new_file = not os.path.exists(path)
+            with open(path, "a") as f:
+                if new_file:
+                    f.write(XNP_CALIBRATION_HEADER)
+                design = ",".join(f"{v:.4f}" for v in x)
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')},{design},{xnp_pitch:.3f},{xnp_derivative:.3f},"
+                        f"{error:.3f},{agree},{self.streak}\n")
+            if self.trusted() and not was_trusted:
+                print(f"[XNP] dCMy/dCL estimate agreed with pitch stability on {self.streak} designs in a row"
+                      f" - skipping Tier 2 (re-check every {XNP_RECHECK_EVERY})", flush=True)
+            elif was_trusted and not agree:
+                print(f"[XNP] Re-check disagreed by {error:+.2f}% MAC - running Tier 2 again until recalibrated", flush=True)
+        return agree
+
+    def summary(self):
+        """One line: comparisons, error statistics and Tier 2 runs skipped."""
+        with self.lock:
+            if not self.errors:
+                return f"no comparisons yet, {self.skipped} Tier 2 runs skipped"
+            errors = np.array(self.errors)
+            state = "trusted" if self.trusted() else f"calibrating ({self.streak}/{XNP_CALIBRATION_SAMPLES})"
+            return (f"{len(errors)} comparisons, error mean {errors.mean():+.2f}% MAC, max |error|"
+                    f" {np.abs(errors).max():.2f}% MAC - {state}, {self.skipped} Tier 2 runs skipped")
+
+xnp_calibration = XnpCalibration()
+
+# ---------------------------------------------------------------------
+# Analytic feasibility pre-filter
+# ---------------------------------------------------------------------
+# Largest 0.6 * band L/D - L/D penalty over all band L/D (at 20.6, just past
+# the sailplane penalty's onset at 20)
+BEST_LD_TERM = 0.6 * 20.6 - 0.5 * 0.6 ** 2
+GATE_FAILURE_PENALTY = 1.0
+
+PREFILTER_LOG_HEADER = "iter,span_mm,te_x_mm,span_penalty,te_penalty,gate_failure,best_obj,worst_survivor_obj,reason\n"
+
+prefilter_threshold = None  # Objective of the worst DE population member (None until the initial population is scored)
+prefilter_skips = 0
+
+def analytic_penalties(X):
+    """
+    Penalties that follow from the design vectors alone, vectorized over a
+    population, and the best objective each design could still reach.
+    
+    Parameters:
+    - X: Design vectors (n, 6)
+    
+    Returns: dict of arrays - te_x, te_penalty, span_penalty, gate_failure
+    (span alone fails the Tier 2 gate) and best_obj (upper bound on the
+    objective: the best band L/D term, no stability penalties)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    span, sweep, xloc, tip = X[:, 0], X[:, 1], X[:, 2], X[:, 4]
+    # Trailing edge soft penalty
+    te_x = xloc + np.sin(np.radians(sweep)) * span + tip
+    te_penalty = np.where(te_x > 630.0, 0.002 * (te_x - 630.0) ** 2, 0.0)
+    span_penalty = np.where(span > 360.0, 0.001 * (span - 350.0) ** 2,
+                            np.where(span < 320.0, 0.0005 * (330.0 - span) ** 2, 0.0))
+    gate_failure = span_penalty >= 1.0
+    best_obj = BEST_LD_TERM - 0.2 * span_penalty - te_penalty - GATE_FAILURE_PENALTY * gate_failure
+    return {"te_x": te_x, "te_penalty": te_penalty, "span_penalty": span_penalty,
+            "gate_failure": gate_failure, "best_obj": best_obj}
+
+def update_prefilter_threshold(population_energies):
+    """Worst surviving objective of the DE population (energies are negated objectives)."""
+    global prefilter_threshold
+    energies = np.asarray(population_energies, dtype=float)
+    energies = energies[np.isfinite(energies)]
+    prefilter_threshold = -float(energies.max()) if energies.size else None
 
-# ---------------------------------------------------------------------
-# Objective function
-# ---------------------------------------------------------------------
-def evaluate_design(x):
-    global eval_counter, best_obj_so_far, best_x_so_far, prev_iter_obj, vspaero_time, _should_stop, _should_pause
+def prefilter_reason(penalties, i):
+    """Which analytic penalties of design i cap its objective."""
+    parts = []
+    if penalties["span_penalty"][i] > 0:
+        parts.append(f"span penalty {penalties['span_penalty'][i]:.3f}"
+                     + (" (fails the Tier 2 gate)" if penalties["gate_failure"][i] else ""))
+    if penalties["te_penalty"][i] > 0:
+        parts.append(f"trailing edge at {penalties['te_x'][i]:.1f} mm: penalty {penalties['te_penalty'][i]:.3f}")
+    return "; ".join(parts) or "band L/D alone"
 
-    # Check for remote control commands
-    check_control_files()
+def prefilter(designs):
+    """
+    Designs that can't beat the worst member of the DE population whatever
+    the solver returns.
     
-    # Handle pause
-    if _should_pause:
-        print("\n[PAUSED] Waiting for resume command...", flush=True)
-        while _should_pause and not _should_stop:
-            time.sleep(5)
-            check_control_files()
-            write_status_file()
-        if _should_stop:
-            raise KeyboardInterrupt("Stop requested via remote control")
+    Returns: {index: (reason, that design's analytic_penalties values)} for
+    the designs to skip
+    """
+    if not PREFILTER_ENABLED or prefilter_threshold is None or not len(designs):
+        return {}
+    penalties = analytic_penalties(designs)
+    rejected = np.flatnonzero(penalties["best_obj"] < prefilter_threshold)
+    return {
+        int(i): (prefilter_reason(penalties, i), {name: values[i].item() for name, values in penalties.items()})
+        for i in rejected
+    }
+
+def init_prefilter_log(path=None):
+    """Start a new pre-filter log (PREFILTER_LOG)."""
+    with open(path or PREFILTER_LOG, "w") as f:
+        f.write(PREFILTER_LOG_HEADER)
+
+def record_prefiltered(x, rejection, iteration, generation, elapsed_s):
+    """
+    Log a design the pre-filter skipped: history row (failure_class
+    prefiltered, best possible objective as final_obj) and PREFILTER_LOG.
+    Callers hold _state_lock.
     
-    # Handle stop
-    if _should_stop:
-        raise KeyboardInterrupt("Stop requested via remote control")
+    Returns: energy for DE (the negated bound - worse than every population
+    member, so selection rejects the design just as it would after a solve)
+    """
+    global prefilter_skips
+    reason, penalties = rejection
+    best_obj = penalties["best_obj"]
+    prefilter_skips += 1
+    print(f"\n[PREFILTER] Iteration {iteration}: skipped - {reason}: best possible objective "
+          f"{best_obj:.3f} < worst survivor {prefilter_threshold:.3f}", flush=True)
+    write_unsolved_row(x, "prefiltered", iteration, generation, elapsed_s, best_obj)
+    new_file = not os.path.exists(PREFILTER_LOG)
+    with open(PREFILTER_LOG, "a") as f:
+        if new_file:
+            f.write(PREFILTER_LOG_HEADER)
+        f.write(
+            f"{iteration},{x[0]:.2f},{penalties['te_x']:.2f},{penalties['span_penalty']:.5f},"
+            f"{penalties['te_penalty']:.5f},{penalties['gate_failure']},{best_obj:.5f},"
+            f"{prefilter_threshold:.5f},\"{reason}\"\n"
+        )
+    return -best_obj
 
-    eval_counter += 1
+# ---------------------------------------------------------------------
+# Objective function
+# ---------------------------------------------------------------------
+def analyze_design(x, workdir=None, tier1=None, known_cg=None):
+    """
+    Run the solver stages for one design in workdir: Tier 1 cruise sweep, CG,
+    and (for designs passing the gate) Tier 2 pitch stability.
     
-    # Calculate generation from iteration count
-    # Generation 0 = initial population (iterations 1-20, but iteration 1 is baseline)
-    # So: iteration 1 = baseline, iterations 2-21 = generation 0, 22-41 = generation 1, etc.
-    # After baseline: (eval_counter - 1) / popsize = generation number
-    global generation_counter  # Need to declare as global to update it
-    POPULATION_SIZE = 20  # Must match popsize in differential_evolution call
-    if eval_counter > 1:  # After baseline
-        generation_counter = (eval_counter - 2) // POPULATION_SIZE
-    else:
-        generation_counter = 0
+    Does not touch the optimizer's counters or history, so several designs can
+    be analyzed concurrently in separate sandboxes.
     
-    # Update status file (generation_counter is now calculated)
-    write_status_file()
+    tier1: (results, vspaero_time_s) when a batch run (run_batch_cruise) has
+    already done this design's Tier 1 - skips the geometry update and cruise run.
+    known_cg: (cg_x, source) from known_cgs when the caller already decided
+    whether MassProp runs (batch runs); by default decided here. MassProp is
+    skipped when the CG cache or the CG model knows the CG.
+    
+    Returns: dict of analysis results. Raises EvaluationFailed if the geometry
+    update or the Tier 1 VSPAERO run failed (or timed out on the retry too).
+    """
+    workdir = workdir or current_workdir()
+    _worker_state.stage_outcomes = []  # Watchdog events for this design
     span, sweep, xloc, taper, tip, ctrl = x
 
-    elapsed_s = time.time() - t_start
-    elapsed_min = elapsed_s / 60.0
-
-    # Initialize vspaero_time in case run_vspaero() fails before setting it
-    vspaero_time = 0.0
+    # Trailing edge and span penalties (from the design vector alone)
+    penalties = analytic_penalties([x])
+    te_x = float(penalties["te_x"][0])
+    te_penalty = float(penalties["te_penalty"][0])
+    span_penalty = float(penalties["span_penalty"][0])
 
-    # Trailing edge soft penalty
-    sweep_rad = np.radians(sweep)
-    te_x = xloc + np.sin(sweep_rad) * span + tip
-    te_penalty = 0.0
-    if te_x > 630.0:
-        te_penalty = 0.002 * (te_x - 630.0) ** 2
+    # CG cache / CG model: no MassProp needed for this design
+    if known_cg is None:
+        cg, sources = known_cgs([x])
+        known_cg = (float(cg[0]), sources[0])
 
     # =====================================================================
     # TIER 1: Cheap cruise analysis (L/D + geometry checks)
     # =====================================================================
-    update_geometry_from_x(x)
-    print(f"\n[TIER 1] Running cruise analysis (L/D sweep, no stability)...", flush=True)
-    print(f"  Starting at {time.strftime('%H:%M:%S', time.localtime())}", flush=True)
-    
-    try:
-        run_vspaero()  # Tier 1: Cruise only (no pitch stability)
-    except RuntimeError as e:
-        print(f"VSPAERO failed: {e}", flush=True)
-        vspaero_time = 0.0
-        # Penalize hard for failures - don't return clipped value
-        return -100.0  # Strong negative penalty
+    backend = get_solver_backend()
+    if tier1 is not None:
+        # Batch results: Tier 2 (if it runs) re-applies current.des to the baseline
+        write_des_from_x(x, os.path.join(workdir, "current.des"))
+        if os.path.exists(os.path.join(workdir, "current.vsp3")):
+            os.remove(os.path.join(workdir, "current.vsp3"))
+        results, vspaero_time_s = tier1
+        print(f"\n[TIER 1] Cruise analysis from batch run ({results.name})", flush=True)
+    else:
+        try:
+            with trace_span("update_geom", "solver"):
+                backend.update_geometry(x, workdir)
+        except RuntimeError as e:
+            print(f"Geometry update failed: {e}", flush=True)
+            raise EvaluationFailed("update_geom_timeout" if isinstance(e, SolverTimeout) else "update_geom_error", str(e))
+        print(f"\n[TIER 1] Running cruise analysis (L/D sweep, no stability)...", flush=True)
+        print(f"  Starting at {time.strftime('%H:%M:%S', time.localtime())}", flush=True)
+        
+        _worker_state.run_massprop = known_cg[1] is None
+        try:
+            # The subprocess backend runs MassProp inside the cruise script (massprop=True)
+            with trace_span("cruise", "solver", massprop=_worker_state.run_massprop):
+                results, vspaero_time_s = backend.run_cruise(workdir)  # Tier 1: Cruise only (no pitch stability)
+        except RuntimeError as e:
+            print(f"VSPAERO failed: {e}", flush=True)
+            raise EvaluationFailed("cruise_timeout" if isinstance(e, SolverTimeout) else "cruise_error", str(e))
+        finally:
+            _worker_state.run_massprop = True
+
+    # Parse Results.csv once - every extract_* below reads the same table
+    if not isinstance(results, ResultsTable) and os.path.exists(results):
+        results = load_results_table(results)
 
     # Extract L/D data
     try:
-        band_ld, alpha_center, ld_curve = extract_band_ld(RESULTS_CSV)
+        band_ld, alpha_center, ld_curve = extract_band_ld(results)
         if not np.isfinite(band_ld) or band_ld <= 0:
             print(f"[TIER 1] L/D extraction failed or invalid: {band_ld}", flush=True)
             band_ld = 0.0  # Don't use 0.001 - let penalties dominate
-        # Calculate L/D statistics
-        if ld_curve is not None and len(ld_curve) > 0:
-            ld_min = float(np.min(ld_curve))
-            ld_max = float(np.max(ld_curve))
+        # Calculate L/D statistics (over the solved alphas - adaptive sweeps leave gaps)
+        if ld_curve is not None and np.isfinite(ld_curve).any():
+            ld_min = float(np.nanmin(ld_curve))
+            ld_max = float(np.nanmax(ld_curve))
             ld_range = ld_max - ld_min
         else:
             ld_min = None
@@ -768,26 +2682,22 @@ def evaluate_design(x):
         ld_max = None
         ld_range = None
 
-    # Get CG (use cache if available, otherwise extract from MassProp)
-    cg_x_used = get_cached_cg(x)
-    if cg_x_used is None:
-        cg_x_used = extract_cg_from_results(RESULTS_CSV)
+    # Get CG (cache or CG model if MassProp was skipped, otherwise extract from MassProp)
+    cg_x_used, cg_source = known_cg
+    if cg_source is None:
+        cg_x_used = extract_cg_from_results(results)
         if cg_x_used is None:
             # Fallback: estimate from geometry
             cg_x_used = xloc - 10.0
+            cg_source = "estimate"
             print(f"[TIER 1] CG not found, using estimate: {cg_x_used:.1f} mm", flush=True)
         else:
+            cg_source = "massprop"
             cache_cg(x, cg_x_used)  # Cache for future use
+            record_massprop_cg(x, cg_x_used)  # Training data for the CG model
             print(f"[TIER 1] CG extracted: {cg_x_used:.1f} mm (cached)", flush=True)
     else:
-        print(f"[TIER 1] CG from cache: {cg_x_used:.1f} mm", flush=True)
-
-    # Calculate geometry penalties (before deciding on Tier 2)
-    span_penalty = 0.0
-    if span > 360.0:
-        span_penalty = 0.001 * (span - 350.0) ** 2
-    elif span < 320.0:
-        span_penalty = 0.0005 * (330.0 - span) ** 2
+        print(f"[TIER 1] CG from {cg_source}: {cg_x_used:.1f} mm (MassProp skipped)", flush=True)
 
     ld_penalty = 0.0
     if band_ld > 20.0:
@@ -806,19 +2716,44 @@ def evaluate_design(x):
     gate_failure_penalty = 0.0  # Penalty for designs that don't pass Tier 2 gate
     xnp = None
     mac = None
+    xnp_source = "N/A"
     
-    if run_tier2:
+    # Calibrated (or --xnp derivative): neutral point from the cruise sweep instead of Tier 2
+    estimate = estimate_neutral_point(results) if run_tier2 and XNP_SOURCE != "pitch" else None
+    if estimate is not None and xnp_calibration.skip_tier2():
+        print(f"\n[TIER 2] Design passed gate (L/D={band_ld:.2f} > 8.0, span_penalty={span_penalty:.3f} < 1.0)", flush=True)
+        static_margin, crash_penalty, slug_penalty, xnp, mac, cg_x_used = extract_stability_fallback(
+            results, cg_x_used
+        )
+        xnp_source = "derivative"
+        print(f"[TIER 2] Skipped - Xnp from dCMy/dCL: SM={static_margin:.2f}%, Xnp={xnp:.1f} mm", flush=True)
+    elif run_tier2:
         print(f"\n[TIER 2] Design passed gate (L/D={band_ld:.2f} > 8.0, span_penalty={span_penalty:.3f} < 1.0)", flush=True)
         print(f"  Running pitch stability analysis (single alpha = 8 deg)...", flush=True)
         
+        pool = getattr(_worker_state, "pool", None)
+        if pool is not None and pool.pipelined and backend.files_in_workdir:
+            # Pipelined: Tier 1 results are already parsed, so free the Tier 1
+            # sandbox for the next candidate and run Tier 2 in a Tier 2 sandbox
+            with trace_span("tier2_handoff", "wait"):
+                workdir = pool.move_to_tier2(workdir)
+            results.directory = workdir
+        
         try:
-            if run_pitch_stability():
+            with trace_span("pitch", "solver"):
+                pitch_ok = backend.run_pitch(workdir)
+            if pitch_ok:
                 # Extract stability from single-alpha pitch analysis
                 try:
                     static_margin, crash_penalty, slug_penalty, xnp, mac, cg_x_used = extract_stability_margin(
-                        "Stability_Results.csv", RESULTS_CSV, cg_x=cg_x_used, design_x=x
+                        "Stability_Results.csv", results, cg_x=cg_x_used, design_x=x
                     )
+                    xnp_source = "pitch"
                     print(f"[TIER 2] Stability extracted: SM={static_margin:.2f}%, Xnp={xnp:.1f} mm", flush=True)
+                    if estimate is not None and XNP_SOURCE == "calibrate":
+                        stab_xnp = read_aerocenter_x(stab_file_for(results))
+                        if stab_xnp:
+                            xnp_calibration.record(x, stab_xnp[0], estimate[0], estimate[1])
                 except Exception as e:
                     print(f"[TIER 2] Error extracting stability: {e}", flush=True)
                     # Penalize hard for stability extraction failure
@@ -835,24 +2770,26 @@ def evaluate_design(x):
         print(f"  Skipping expensive pitch stability analysis", flush=True)
         # Apply gate failure penalty to ensure these designs are clearly worse
         # This prevents optimizer from accidentally favoring designs that don't pass the gate
-        gate_failure_penalty = 1.0  # Moderate penalty for not being promising enough
+        gate_failure_penalty = GATE_FAILURE_PENALTY  # Moderate penalty for not being promising enough
         print(f"[TIER 2] Applying gate failure penalty: {gate_failure_penalty:.2f}", flush=True)
         
-        # Use Cm slope method from cruise results to estimate stability
+        # Use the dCMy/dCL neutral point from the cruise results to estimate stability
         # This is cheaper than full pitch stability but still gives reasonable estimate
         try:
             static_margin, crash_penalty, slug_penalty, xnp, mac, cg_x_used = extract_stability_fallback(
-                RESULTS_CSV, cg_x_used
+                results, cg_x_used
             )
-            print(f"[TIER 2] Stability estimated from Cm slope: SM={static_margin:.2f}% (if available)", flush=True)
             if static_margin is None:
-                # If Cm slope extraction failed, apply moderate penalty
+                # If the dCMy/dCL estimate failed, assume a neutral margin
                 static_margin = 10.0
                 crash_penalty = 0.0
                 slug_penalty = 0.0
-                print(f"[TIER 2] Cm slope extraction failed, using neutral assumption", flush=True)
+                print(f"[TIER 2] dCMy/dCL estimate failed, using neutral assumption", flush=True)
+            else:
+                xnp_source = "derivative"
+                print(f"[TIER 2] Stability estimated from dCMy/dCL: SM={static_margin:.2f}%, Xnp={xnp:.1f} mm", flush=True)
         except Exception as e:
-            print(f"[TIER 2] Error estimating stability from Cm slope: {e}", flush=True)
+            print(f"[TIER 2] Error estimating stability from dCMy/dCL: {e}", flush=True)
             # Fallback to neutral assumption if extraction fails
             static_margin = 10.0
             crash_penalty = 0.0
@@ -860,21 +2797,91 @@ def evaluate_design(x):
             xnp = None
             mac = None
 
+    return {
+        "vspaero_time": vspaero_time_s,
+        "alpha_points": int(np.isfinite(ld_curve).sum()) if ld_curve is not None else 0,
+        "te_x": te_x,
+        "te_penalty": te_penalty,
+        "band_ld": band_ld,
+        "alpha_center": alpha_center,
+        "ld_curve": ld_curve,
+        "ld_min": ld_min,
+        "ld_max": ld_max,
+        "ld_range": ld_range,
+        "cg_x": cg_x_used,
+        "span_penalty": span_penalty,
+        "ld_penalty": ld_penalty,
+        "gate_failure_penalty": gate_failure_penalty,
+        "static_margin": static_margin,
+        "crash_penalty": crash_penalty,
+        "slug_penalty": slug_penalty,
+        "xnp": xnp,
+        "mac": mac,
+        "xnp_source": xnp_source,
+        "cg_source": cg_source,
+        # "ok", or the watchdog events, e.g. "cruise_retried" (degraded settings) or "pitch_timeout"
+        "failure_class": "+".join(_worker_state.stage_outcomes) or "ok",
+    }
+
+
+def compute_objective(analysis):
+    """Objective (maximized) of an analyze_design result."""
     # Final objective with stability consideration
     # Weights: 60% efficiency, 20% agility, 20% stability
     # Crash penalty (100% weight) applied directly, slug penalty (35% weight) already scaled
     # REMOVED OBJECTIVE CLIPPING - let penalties dominate naturally to preserve gradient info
     obj = (
-        0.6 * band_ld
-        - 0.2 * span_penalty
-        - crash_penalty  # Full weight (unstable = crash)
-        - slug_penalty   # Already scaled to 35% weight
-        - ld_penalty     # Penalize sailplane designs
-        - te_penalty
-        - gate_failure_penalty  # Penalty for designs that don't pass Tier 2 gate
+        0.6 * analysis["band_ld"]
+        - 0.2 * analysis["span_penalty"]
+        - analysis["crash_penalty"]  # Full weight (unstable = crash)
+        - analysis["slug_penalty"]   # Already scaled to 35% weight
+        - analysis["ld_penalty"]     # Penalize sailplane designs
+        - analysis["te_penalty"]
+        - analysis["gate_failure_penalty"]  # Penalty for designs that don't pass Tier 2 gate
     )
     # NO CLIPPING - if design is bad, let it go negative
     # This preserves gradient information for DE optimizer
+    return obj
+
+@traced("logging")
+def record_evaluation(x, analysis, iteration, generation, elapsed_s):
+    """
+    Score an analyzed design, print the iteration report and append it to the
+    optimization history. Callers hold _state_lock so reports from concurrent
+    workers don't interleave.
+    
+    Returns: -objective (differential_evolution minimizes)
+    """
+    global best_obj_so_far, best_x_so_far, prev_iter_obj
+
+    span, sweep, xloc, taper, tip, ctrl = x
+    elapsed_min = elapsed_s / 60.0
+    vspaero_time_s = analysis["vspaero_time"]
+    te_x = analysis["te_x"]
+    te_penalty = analysis["te_penalty"]
+    band_ld = analysis["band_ld"]
+    alpha_center = analysis["alpha_center"]
+    ld_curve = analysis["ld_curve"]
+    ld_min = analysis["ld_min"]
+    ld_max = analysis["ld_max"]
+    ld_range = analysis["ld_range"]
+    cg_x_used = analysis["cg_x"]
+    span_penalty = analysis["span_penalty"]
+    ld_penalty = analysis["ld_penalty"]
+    gate_failure_penalty = analysis["gate_failure_penalty"]
+    static_margin = analysis["static_margin"]
+    crash_penalty = analysis["crash_penalty"]
+    slug_penalty = analysis["slug_penalty"]
+    xnp = analysis["xnp"]
+    mac = analysis["mac"]
+    failure_class = analysis.get("failure_class", "ok")
+    fidelity = analysis.get("fidelity", FIDELITY_LEVELS[-1]["name"])
+    alpha_points = analysis.get("alpha_points", len(SWEEP_ALPHAS))
+    xnp_source = analysis.get("xnp_source", "N/A")
+    cg_source = analysis.get("cg_source", "N/A")
+    reused = analysis.get("reused", "no")
+
+    obj = compute_objective(analysis)
 
     # Improvement tracking
     iter_improvement = 0.0 if prev_iter_obj is None else obj - prev_iter_obj
@@ -887,7 +2894,7 @@ def evaluate_design(x):
     # Enhanced logging with better formatting
     print("\n" + "="*80, flush=True)
     current_time = time.strftime('%H:%M:%S', time.localtime())
-    print(f"ITERATION {eval_counter} | Elapsed: {elapsed_min:.1f} min | Time: {current_time}", flush=True)
+    print(f"ITERATION {iteration} | Elapsed: {elapsed_min:.1f} min | Time: {current_time}", flush=True)
     print("="*80, flush=True)
     
     # Design parameters
@@ -928,7 +2935,7 @@ def evaluate_design(x):
         cg_str = f"{cg_x_used:.1f}" if cg_x_used is not None else "N/A"
         
         print(f"  Static Margin: {static_margin:5.2f}% {sm_indicator} ({sm_status})")
-        print(f"  Neutral Point:  {xnp_str:>6} mm  |  MAC: {mac_str:>6} mm  |  CG: {cg_str:>6} mm")
+        print(f"  Neutral Point:  {xnp_str:>6} mm  |  MAC: {mac_str:>6} mm  |  CG: {cg_str:>6} mm  ({xnp_source})")
         
         if crash_penalty > 0 or slug_penalty > 0:
             print(f"  Penalties:     Crash={crash_penalty:.3f}, Slug={slug_penalty:.3f}")
@@ -957,6 +2964,11 @@ def evaluate_design(x):
     else:
         print(f"\n[PENALTIES] None")
     
+    if failure_class != "ok":
+        print(f"\n[WATCHDOG] {failure_class}", flush=True)
+    if fidelity != FIDELITY_LEVELS[-1]["name"]:
+        print(f"\n[FIDELITY] Scored at the {fidelity} level (not promising enough to escalate)", flush=True)
+    
     # Determine if this is a new best
     is_new_best = (obj > best_obj_so_far)
     
@@ -989,7 +3001,7 @@ def evaluate_design(x):
         print(f"  (gap: {best_obj_so_far - obj:.4f})", flush=True)
     
     # Convergence indicator
-    if eval_counter > 1:
+    if iteration > 1:
         improvement_pct = ((obj - prev_iter_obj) / abs(prev_iter_obj) * 100) if prev_iter_obj != 0 else 0
         if improvement_pct > 1.0:
             print(f"  Trend: Improving (+{improvement_pct:.1f}%)", flush=True)
@@ -1017,24 +3029,469 @@ def evaluate_design(x):
     ld_values = {}
     if ld_curve is not None and len(ld_curve) >= len(alphas):
         for i, alpha in enumerate(alphas):
-            ld_values[alpha] = f"{ld_curve[i]:.5f}"
+            ld_values[alpha] = f"{ld_curve[i]:.5f}" if np.isfinite(ld_curve[i]) else "N/A"  # not solved (adaptive sweep)
     else:
         for alpha in alphas:
             ld_values[alpha] = "N/A"
     
-    with open(LOG_CSV, "a") as f:
-        f.write(
-            f"{eval_counter},{generation_counter},{elapsed_s:.1f},{elapsed_min:.2f},{vspaero_time:.1f},"
-            f"{span:.2f},{sweep:.2f},{xloc:.2f},{taper:.4f},{tip:.2f},{ctrl:.3f},{te_x:.2f},"
-            f"{band_ld:.5f},{ld_min_str},{ld_max_str},{ld_range_str},"
-            f"{ld_values[2]},{ld_values[4]},{ld_values[6]},{ld_values[8]},{ld_values[10]},{ld_values[12]},{ld_values[14]},"
-            f"{span_penalty:.5f},{te_penalty:.5f},{ld_penalty:.5f},{crash_penalty:.5f},{slug_penalty:.5f},{total_penalty:.5f},"
-            f"{static_margin_str},{sm_category},{xnp_str},{mac_str},{cg_x_str},"
-            f"{obj:.5f},{alpha_center_str},{is_new_best},{iter_improvement:.5f}\n"
-        )
+    # Timing columns up to here - the append itself counts as the next row's overhead_s
+    stage_times = ",".join(stage_time_fields().values())
+    append_history_line(
+        f"{iteration},{generation},{elapsed_s:.1f},{elapsed_min:.2f},{vspaero_time_s:.1f},"
+        f"{span:.2f},{sweep:.2f},{xloc:.2f},{taper:.4f},{tip:.2f},{ctrl:.3f},{te_x:.2f},"
+        f"{band_ld:.5f},{ld_min_str},{ld_max_str},{ld_range_str},"
+        f"{ld_values[2]},{ld_values[4]},{ld_values[6]},{ld_values[8]},{ld_values[10]},{ld_values[12]},{ld_values[14]},"
+        f"{span_penalty:.5f},{te_penalty:.5f},{ld_penalty:.5f},{crash_penalty:.5f},{slug_penalty:.5f},{total_penalty:.5f},"
+        f"{static_margin_str},{sm_category},{xnp_str},{mac_str},{cg_x_str},"
+        f"{obj:.5f},{alpha_center_str},{is_new_best},{iter_improvement:.5f},{failure_class},{fidelity},{alpha_points},{xnp_source},{cg_source},{reused},"
+        f"{stage_times}"
+    )
 
     return -obj
 
+@traced("logging")
+def write_unsolved_row(x, failure_class, iteration, generation, elapsed_s, final_obj):
+    """History row for a design without solver results (everything else N/A)."""
+    span, sweep, xloc, taper, tip, ctrl = x
+    te_x = xloc + np.sin(np.radians(sweep)) * span + tip
+    row = dict.fromkeys(HISTORY_HEADER.strip().split(","), "N/A")
+    row.update({
+        "iter": iteration, "generation": generation,
+        "elapsed_s": f"{elapsed_s:.1f}", "elapsed_min": f"{elapsed_s / 60.0:.2f}",
+        "span_mm": f"{span:.2f}", "sweep_deg": f"{sweep:.2f}", "xloc_mm": f"{xloc:.2f}",
+        "taper": f"{taper:.4f}", "tip_mm": f"{tip:.2f}", "ctrl_frac": f"{ctrl:.3f}", "te_x_mm": f"{te_x:.2f}",
+        "sm_category": "unknown", "final_obj": f"{final_obj:.5f}",
+        "is_new_best": False, "iter_improvement": f"{0.0:.5f}", "failure_class": failure_class,
+    })
+    row.update(stage_time_fields())
+    append_history_line(",".join(str(v) for v in row.values()))
+
+def record_failure(x, failure_class, iteration, generation, elapsed_s):
+    """
+    Log a design that produced no usable Tier 1 result (solver error, or a
+    watchdog timeout that also hit the retry). Callers hold _state_lock.
+    
+    Returns: FAILURE_ENERGY (worse than any real design for the minimizer)
+    """
+    span, sweep, xloc, taper, tip, ctrl = x
+    print("\n" + "="*80, flush=True)
+    print(f"ITERATION {iteration} | FAILED ({failure_class}) | Elapsed: {elapsed_s / 60.0:.1f} min", flush=True)
+    print(f"  Span: {span:.1f} mm | Sweep: {sweep:.1f} deg | X Location: {xloc:.1f} mm | Taper: {taper:.3f}", flush=True)
+    print("="*80, flush=True)
+    write_unsolved_row(x, failure_class, iteration, generation, elapsed_s, -FAILURE_ENERGY)
+    return FAILURE_ENERGY
+
+def record_surrogate_rejection(x, prediction, iteration, generation, elapsed_s):
+    """
+    Log a design the surrogate rejected without running the solver, with the
+    predicted objective as final_obj. Callers hold _state_lock.
+    
+    Returns: REJECTED_ENERGY - the prediction is only logged, so a design that
+    never ran cannot replace a population member (whose energy then feeds the
+    pre-filter threshold, the checkpoint and later mutations)
+    """
+    global surrogate_rejections
+    predicted_obj, std = prediction
+    surrogate_rejections += 1
+    span, sweep, xloc, taper, tip, ctrl = x
+    print(f"\n[SURROGATE] Iteration {iteration}: skipped - predicted objective {predicted_obj:.3f} "
+          f"+/- {std:.3f} vs best {best_obj_so_far:.3f} | span={span:.1f}, sweep={sweep:.1f}, "
+          f"xloc={xloc:.1f}, taper={taper:.3f}", flush=True)
+    write_unsolved_row(x, "surrogate_rejected", iteration, generation, elapsed_s, predicted_obj)
+    return REJECTED_ENERGY
+
+def handle_control_commands():
+    """Apply pending pause/stop commands before starting an evaluation."""
+    # Check for remote control commands
+    check_control_files()
+    
+    # Handle pause
+    if _should_pause:
+        print("\n[PAUSED] Waiting for resume command...", flush=True)
+        while _should_pause and not _should_stop:
+            time.sleep(5)
+            check_control_files()
+            write_status_file()
+        if _should_stop:
+            raise KeyboardInterrupt("Stop requested via remote control")
+    
+    # Handle stop
+    if _should_stop:
+        raise KeyboardInterrupt("Stop requested via remote control")
+
+de_population_members = None  # Set from the DE solver's num_population_members
+
+def population_size():
+    """
+    Members of the DE population. scipy's popsize is a multiplier: the solver
+    has popsize x number of free parameters members (at least 5) - 100 by
+    default, the control fraction being fixed.
+    """
+    if de_population_members is not None:
+        return de_population_members
+    return max(5, DE_POPSIZE * sum(1 for low, high in DESIGN_BOUNDS if high > low))
+
+def generation_of(iteration):
+    """DE generation an evaluation belongs to, from its iteration number."""
+    # Generation 0 = initial population, after the baseline (iteration 1)
+    # So: iteration 1 = baseline, iterations 2..N+1 = generation 0, N+2..2N+1 = generation 1, etc.
+    if iteration > 1:  # After baseline
+        return (iteration - 2) // population_size()
+    return 0
+
+def evaluate_design(x):
+    global eval_counter, generation_counter
+
+    handle_control_commands()
+    begin_stage_times()
+
+    with trace_span("evaluate_design", "evaluation") as span:
+        with _state_lock:
+            eval_counter += 1
+            iteration = eval_counter
+            generation_counter = generation_of(iteration)
+            generation = generation_counter
+            span.set(iter=iteration, generation=generation)
+        
+            # Update status file (generation_counter is now calculated)
+            write_status_file()
+
+        elapsed_s = time.time() - t_start
+
+        # A near-duplicate of a design another worker is running waits for its result
+        while True:
+            analysis = find_stored_analysis(x, iteration)
+            running = design_memo.claim(x) if analysis is None and MEMO_ENABLED else None
+            if running is None:
+                break
+            running.wait()
+        if analysis is not None:
+            design_memo.add(x, analysis)
+        else:
+            try:
+                rejection = prefilter([x]).get(0)
+                if rejection is not None:
+                    with _state_lock:
+                        return record_prefiltered(x, rejection, iteration, generation, elapsed_s)
+                prediction = surrogate_prescreen(x)
+                if prediction is not None:
+                    with _state_lock:
+                        return record_surrogate_rejection(x, prediction, iteration, generation, elapsed_s)
+                try:
+                    analysis = analyze_with_ladder(x, iteration) if FIDELITY_ENABLED else analyze_design(x)
+                except EvaluationFailed as e:
+                    # Penalize hard for failures - DE minimizes, so the energy must be large
+                    with _state_lock:
+                        return record_failure(x, e.failure_class, iteration, generation, elapsed_s)
+                # Only production-fidelity results are reused
+                if (eval_cache is not None and analysis["failure_class"] == "ok"
+                        and analysis.get("fidelity", FIDELITY_LEVELS[-1]["name"]) == FIDELITY_LEVELS[-1]["name"]):
+                    eval_cache.put(x, analysis)
+                design_memo.add(x, analysis)
+            finally:
+                design_memo.release(x)
+
+        with _state_lock:
+            return record_evaluation(x, analysis, iteration, generation, elapsed_s)
+
+# ---------------------------------------------------------------------
+# Multi-fidelity ladder
+# ---------------------------------------------------------------------
+FIDELITY_LOG_HEADER = "iter,level,fidelity,wake_iter,tess_scale,band_LD,static_margin,final_obj,vspaero_time_s,escalated,failure_class\n"
+
+def init_fidelity_log(path=None):
+    """Start a new per-level log (FIDELITY_LOG)."""
+    with open(path or FIDELITY_LOG, "w") as f:
+        f.write(FIDELITY_LOG_HEADER)
+
+def log_fidelity_level(iteration, level_index, analysis, obj, escalated, path=None):
+    """Append one level's result for one design to FIDELITY_LOG."""
+    path = path or FIDELITY_LOG
+    level = FIDELITY_LEVELS[level_index]
+    static_margin = analysis["static_margin"]
+    static_margin_str = f"{static_margin:.3f}" if static_margin is not None else "N/A"
+    with _state_lock:
+        new_file = not os.path.exists(path)
+        with open(path, "a") as f:
+            if new_file:
+                f.write(FIDELITY_LOG_HEADER)
+            f.write(
+                f"{iteration},{level_index},{level['name']},{level.get('WAKE_ITER', VSPAERO_WAKE_ITER)},"
+                f"{level.get('TESS_SCALE', 1.0)},{analysis['band_ld']:.5f},{static_margin_str},"
+                f"{obj:.5f},{analysis['vspaero_time']:.1f},{escalated},{analysis['failure_class']}\n"
+            )
+
+def analyze_with_ladder(x, iteration):
+    """
+    analyze_design up the fidelity ladder.
+    
+    Each level runs the full Tier 1 / Tier 2 analysis with that level's
+    WAKE_ITER and TESS_SCALE. The design moves to the next level only while its
+    objective is within FIDELITY_MARGIN of the best so far; every level's result
+    is logged to FIDELITY_LOG.
+    
+    Returns: analysis of the last level run ("fidelity" names the level;
+    "vspaero_time" is the total over all levels)
+    """
+    total_time = 0.0
+    try:
+        for index, level in enumerate(FIDELITY_LEVELS):
+            _worker_state.fidelity = level
+            if index > 0:
+                print(f"\n[FIDELITY] Iteration {iteration}: escalating to the {level['name']} level", flush=True)
+            analysis = analyze_design(x)
+            total_time += analysis["vspaero_time"]
+            obj = compute_objective(analysis)
+            escalate = index < len(FIDELITY_LEVELS) - 1 and obj >= best_obj_so_far - FIDELITY_MARGIN
+            log_fidelity_level(iteration, index, analysis, obj, escalate)
+            if not escalate:
+                break
+    finally:
+        _worker_state.fidelity = None
+    analysis["fidelity"] = level["name"]
+    analysis["vspaero_time"] = total_time
+    return analysis
+
+def fidelity_report(path=None):
+    """
+    Savings and ranking agreement of the fidelity ladder, from FIDELITY_LOG.
+    
+    Returns: list of text lines - designs and solver time per level, the time
+    saved versus running every design at the last level (estimated from its
+    mean time), and the Spearman rank correlation between each pair of adjacent
+    levels over the designs that ran at both
+    """
+    path = path or FIDELITY_LOG
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        rows = [row for row in csv.DictReader(f) if row["failure_class"] == "ok"]
+    by_level = {}
+    for row in rows:
+        by_level.setdefault(int(row["level"]), {})[row["iter"]] = row
+    lines = []
+    for index, level in enumerate(FIDELITY_LEVELS):
+        results = by_level.get(index, {})
+        seconds = sum(float(r["vspaero_time_s"]) for r in results.values())
+        lines.append(f"  {level['name']:>8}: {len(results):4d} designs, {seconds / 60.0:7.1f} min solver time")
+
+    designs = len(by_level.get(0, {}))
+    final = by_level.get(len(FIDELITY_LEVELS) - 1, {})
+    if designs and final:
+        spent = sum(float(r["vspaero_time_s"]) for r in rows)
+        full_cost = designs * np.mean([float(r["vspaero_time_s"]) for r in final.values()])
+        lines.append(f"  saved: {(full_cost - spent) / 60.0:.1f} min vs. all {designs} designs at {FIDELITY_LEVELS[-1]['name']}")
+
+    for index in range(len(FIDELITY_LEVELS) - 1):
+        lower, upper = by_level.get(index, {}), by_level.get(index + 1, {})
+        both = sorted(set(lower) & set(upper))
+        if len(both) >= 3:
+            rho = spearmanr([float(lower[i]["final_obj"]) for i in both],
+                            [float(upper[i]["final_obj"]) for i in both])[0]
+            lines.append(f"  ranking {FIDELITY_LEVELS[index]['name']} vs {FIDELITY_LEVELS[index + 1]['name']}: "
+                         f"Spearman {rho:.3f} over {len(both)} designs")
+    return lines
+
+# ---------------------------------------------------------------------
+# Batch evaluation (one VSP launch per DE generation)
+# ---------------------------------------------------------------------
+BATCH_MANIFEST = "batch_manifest.json"
+_BATCH_FILE = re.compile(r"^batch_\d+[._]")
+
+def run_batch_cruise(designs, workdir=None, massprop=None):
+    """
+    Tier 1 for several designs in one VSP launch (batch_cruise.vspscript).
+    
+    Writes batch_<i>.des for each design plus BATCH_MANIFEST (design vector and
+    file names of every entry), runs the script with NDESIGNS set, and loads the
+    per-design result files listed in the manifest. The whole batch gets the
+    watchdog's cruise timeout once per design; designs that crashed or didn't
+    finish before a timeout are simply missing from the result.
+    
+    Parameters:
+    - designs: Design vectors
+    - workdir: Directory VSP runs in (defaults to the current worker's sandbox)
+    - massprop: One bool per design - run MassProp for it (default: all designs)
+    
+    Returns: {index in designs: (ResultsTable, vspaero_time_s)}; the time is the
+    batch wall-clock time split evenly over the designs
+    """
+    workdir = workdir or current_workdir()
+    for name in os.listdir(workdir):
+        if _BATCH_FILE.match(name):
+            os.remove(os.path.join(workdir, name))  # never load a previous batch's results
+
+    manifest = {"baseline": "baseline.vsp3", "designs": []}
+    for i, x in enumerate(designs):
+        entry = {
+            "index": i,
+            "x": [float(v) for v in x],
+            "des": f"batch_{i}.des",
+            "results": f"batch_{i}_Results.csv",
+            "massprop": f"batch_{i}_MassProp_Results.csv",
+        }
+        write_des_from_x(x, os.path.join(workdir, entry["des"]))
+        manifest["designs"].append(entry)
+    with open(os.path.join(workdir, BATCH_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    n = len(designs)
+    print(f"\n[BATCH] Tier 1 for {n} designs in one VSP launch...", flush=True)
+    print(f"  Starting at {time.strftime('%H:%M:%S', time.localtime())}", flush=True)
+    completed = False
+    with solver_cores("cruise") as cores:
+        settings = {"NDESIGNS": n}
+        if massprop is not None and not all(massprop):
+            settings["MASSPROP_DESIGNS"] = "".join("1" if run else "0" for run in massprop)
+        if cores.ncpu != VSPAERO_NCPU:
+            settings["NCPU"] = cores.ncpu
+        script = render_vspscript("batch_cruise.vspscript", workdir, **settings)
+        start = time.time()
+        try:
+            result = run_vsp_script(script, workdir, cores.cpus, watchdog.timeout("cruise") * n)
+            completed = True
+            if result.returncode != 0:
+                print(f"WARNING: batch run returned non-zero exit code: {result.returncode}", flush=True)
+                if result.stderr:
+                    print(f"STDERR: {result.stderr[-500:]}", flush=True)
+        except SolverTimeout as e:
+            print(f"[WATCHDOG] batch: {e}", flush=True)
+        elapsed = time.time() - start
+
+    tier1 = {}
+    for entry in manifest["designs"]:
+        results_csv = os.path.join(workdir, entry["results"])
+        if not os.path.exists(results_csv):
+            continue
+        table = ResultsTable.from_csv(results_csv)
+        massprop_csv = os.path.join(workdir, entry["massprop"])
+        # Empty table if MassProp is missing, so the CG never comes from another run's file
+        table.massprop = ResultsTable.from_csv(massprop_csv) if os.path.exists(massprop_csv) else ResultsTable({})
+        tier1[entry["index"]] = (table, elapsed / n)
+
+    if completed and len(tier1) == n:
+        watchdog.record("cruise", elapsed / n)
+    print(f"[BATCH] {len(tier1)}/{n} designs produced results in {elapsed:.1f}s "
+          f"({elapsed / n:.1f}s per design)", flush=True)
+    return tier1
+
+def evaluate_population(designs, workdir=None):
+    """
+    Score a whole population with one batch Tier 1 launch.
+    
+    Designs found in the evaluation cache are not re-run, and designs the
+    pre-filter or the surrogate rejects are logged without a solver run. The rest go through
+    run_batch_cruise, then analyze_design scores each one from its batch results
+    (running Tier 2 for designs that pass the gate). Designs the batch produced
+    no results for are re-run on their own, with the usual watchdog retry.
+    With the openvsp API backend there is no launch to save, so every design
+    takes the single-design path.
+    
+    Parameters:
+    - designs: Design vectors
+    - workdir: Directory VSP runs in (defaults to the current worker's sandbox)
+    
+    Returns: list of energies (negated objectives), in the order of designs
+    """
+    global eval_counter, generation_counter
+    workdir = workdir or current_workdir()
+
+    handle_control_commands()
+
+    with _state_lock:
+        first = eval_counter + 1
+        eval_counter += len(designs)
+        generation_counter = generation_of(eval_counter)
+        write_status_file()
+
+    analyses = [find_stored_analysis(x, first + i) for i, x in enumerate(designs)]
+    # One vectorized pre-filter pass over the designs without a stored result
+    unsolved = [i for i, analysis in enumerate(analyses) if analysis is None]
+    rejections = {unsolved[j]: rejection for j, rejection in prefilter([designs[i] for i in unsolved]).items()}
+    predictions = [surrogate_prescreen(x) if analysis is None and i not in rejections else None
+                   for i, (x, analysis) in enumerate(zip(designs, analyses))]
+    pending = [i for i, analysis in enumerate(analyses)
+               if analysis is None and i not in rejections and predictions[i] is None]
+    # Near-duplicates within the population wait for the first of them (memo lookup below)
+    duplicates = set()
+    if MEMO_ENABLED:
+        points = {i: design_memo.normalize(designs[i]) for i in pending}
+        kept = []
+        for i in pending:
+            if any(np.linalg.norm(points[i] - points[j]) <= MEMO_RADIUS for j in kept):
+                duplicates.add(i)
+            else:
+                kept.append(i)
+        pending = kept
+    tier1 = {}
+    known = {}
+    batch_s = 0.0
+    if pending and get_solver_backend().name == "subprocess":
+        # One CG model evaluation for the whole batch decides where MassProp runs
+        cg, sources = known_cgs([designs[i] for i in pending])
+        known = {i: (float(cg[j]), sources[j]) for j, i in enumerate(pending)}
+        start = time.perf_counter()
+        with trace_span("batch_cruise", "solver", designs=len(pending)):
+            batch = run_batch_cruise([designs[i] for i in pending], workdir,
+                                     massprop=[sources[j] is None for j in range(len(pending))])
+        batch_s = time.perf_counter() - start
+        tier1 = {pending[j]: batch[j] for j in batch}
+
+    energies = []
+    for i, x in enumerate(designs):
+        # The shared launch's time is split evenly over the designs it solved
+        times = begin_stage_times()
+        if i in tier1:
+            times.seconds["cruise_s"] += batch_s / len(tier1)
+        if i == 0 and tier1:
+            times.overhead_s = max(times.overhead_s - batch_s, 0.0)
+        iteration = first + i
+        generation = generation_of(iteration)
+        elapsed_s = time.time() - t_start
+        analysis = analyses[i]
+        if i in rejections:
+            with _state_lock:
+                energies.append(record_prefiltered(x, rejections[i], iteration, generation, elapsed_s))
+            continue
+        if predictions[i] is not None:
+            with _state_lock:
+                energies.append(record_surrogate_rejection(x, predictions[i], iteration, generation, elapsed_s))
+            continue
+        if analysis is None and i in duplicates:
+            analysis = find_stored_analysis(x, iteration)  # None if the design it duplicates failed
+        if analysis is not None:
+            design_memo.add(x, analysis)
+        else:
+            if i not in tier1 and get_solver_backend().name == "subprocess":
+                print(f"\n[BATCH] Iteration {iteration}: no batch results - re-running the design on its own", flush=True)
+            try:
+                analysis = analyze_design(x, workdir, tier1=tier1.get(i), known_cg=known.get(i) if i in tier1 else None)
+            except EvaluationFailed as e:
+                with _state_lock:
+                    energies.append(record_failure(x, e.failure_class, iteration, generation, elapsed_s))
+                continue
+            if eval_cache is not None and analysis["failure_class"] == "ok":
+                eval_cache.put(x, analysis)
+            design_memo.add(x, analysis)
+        with _state_lock:
+            energies.append(record_evaluation(x, analysis, iteration, generation, elapsed_s))
+    return energies
+
+class BatchEvaluator:
+    """
+    Vectorized objective for DifferentialEvolutionSolver(vectorized=True).
+    
+    DE hands over a whole generation at once as an array of shape
+    (n_parameters, n_designs); it is scored by evaluate_population in a
+    dedicated batch_00 sandbox.
+    """
+    def __init__(self, root=None):
+        self.workdir = create_worker_sandbox(0, root, prefix="batch")
+
+    def __call__(self, population):
+        designs = np.atleast_2d(np.asarray(population, dtype=float)).T
+        return np.array(evaluate_population(list(designs), self.workdir))
+
 # ---------------------------------------------------------------------
 # Convergence callback
 # ---------------------------------------------------------------------
@@ -1069,36 +3526,492 @@ def convergence_callback(xk, convergence):
     if best_x_so_far is not None:
         span, sweep, xloc, taper, tip, ctrl = best_x_so_far
         print(f"Best Design: span={span:.1f}, sweep={sweep:.1f}, xloc={xloc:.1f}, taper={taper:.3f}", flush=True)
+    if core_scheduler is not None:
+        print(f"[CORES] Cruise throughput by core split:\n{core_scheduler.summary()}", flush=True)
+    if SURROGATE_ENABLED:
+        retrain_surrogate()  # Next generation is screened with this generation's results
+    retrain_cg_model()  # Next generation skips MassProp where the model is sure of the CG
+    print(f"[CG CACHE] {_cg_cache.summary()}", flush=True)
+    if MEMO_ENABLED:
+        print(f"[MEMO] {design_memo.summary()}", flush=True)
+    if PREFILTER_ENABLED and prefilter_threshold is not None:
+        print(f"[PREFILTER] {prefilter_skips} designs skipped so far | worst survivor {prefilter_threshold:.3f}", flush=True)
+    save_cg_cache()
+    if FIDELITY_ENABLED:
+        print("[FIDELITY] Ladder so far:\n" + "\n".join(fidelity_report()), flush=True)
+    if XNP_SOURCE != "pitch":
+        print(f"[XNP] {xnp_calibration.summary()}", flush=True)
     print("-"*80 + "\n", flush=True)
 
+# ---------------------------------------------------------------------
+# Checkpoint / resume
+# ---------------------------------------------------------------------
+def save_checkpoint(solver, generations_done, path=None):
+    """
+    Write the full DE state after a generation, atomically (tmp file + rename).
+    
+    Stores the population (in the solver's [0, 1] scaling), its energies, the
+    RNG state (and the sampler permutation that scipy shuffles in place), the
+    evaluation count and the optimizer's own counters/best
+    design, so --resume continues exactly where the run stopped.
+    """
+    path = path or CHECKPOINT_FILE
+    with _state_lock:
+        checkpoint = {
+            "version": 1,
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+            "settings": {
+                "popsize": DE_POPSIZE, "maxiter": DE_MAXITER, "strategy": DE_STRATEGY,
+                "tol": DE_TOL, "bounds": [list(b) for b in DESIGN_BOUNDS],
+            },
+            "generations_done": generations_done,
+            "nfev": int(solver._nfev),
+            "population": solver.population.tolist(),
+            "population_energies": solver.population_energies.tolist(),
+            "rng_state": solver.random_number_generator.bit_generator.state,
+            # Sample-selection permutation, shuffled in place every mutation (SciPy >= 1.11, else None)
+            "sample_index": (solver._random_population_index.tolist()
+                             if hasattr(solver, "_random_population_index") else None),
+            "scipy_version": scipy.__version__,
+            "eval_counter": eval_counter,
+            "generation_counter": generation_counter,
+            "best_obj_so_far": float(best_obj_so_far) if best_obj_so_far != -np.inf else None,
+            "best_x_so_far": [float(v) for v in best_x_so_far] if best_x_so_far is not None else None,
+            "prev_iter_obj": prev_iter_obj,
+            "stagnation_counter": stagnation_counter,
+            "elapsed_s": time.time() - t_start,
+        }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path=None):
+    """Checkpoint dict, or None if there is no usable checkpoint file."""
+    path = path or CHECKPOINT_FILE
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[RESUME] Checkpoint {path} is unreadable ({e})", flush=True)
+        return None
+    if checkpoint.get("settings", {}).get("bounds") != [list(b) for b in DESIGN_BOUNDS]:
+        print(f"[RESUME] Checkpoint {path} was written for different design bounds - ignoring it", flush=True)
+        return None
+    return checkpoint
+
+def restore_optimizer_state(state):
+    """Set the module counters/best design from a checkpoint (or rebuilt history) dict."""
+    global eval_counter, generation_counter, best_obj_so_far, best_x_so_far
+    global prev_iter_obj, stagnation_counter, t_start
+    eval_counter = state["eval_counter"]
+    generation_counter = state["generation_counter"]
+    best_obj_so_far = state["best_obj_so_far"] if state["best_obj_so_far"] is not None else -np.inf
+    best_x_so_far = np.array(state["best_x_so_far"]) if state["best_x_so_far"] is not None else None
+    prev_iter_obj = state["prev_iter_obj"]
+    stagnation_counter = state.get("stagnation_counter", 0)
+    t_start = time.time() - state.get("elapsed_s", 0.0)
+
+def rebuild_state_from_history(n_members, path=None):
+    """
+    Reconstruct a DE population from opt_history.csv when there is no checkpoint.
+    
+    The history doesn't record which population slot each design occupied, so
+    the population becomes the n_members best distinct successful designs
+    (repeated if fewer were logged), ordered best first as DE expects.
+    
+    Returns: (state dict for restore_optimizer_state with "population" in design
+    units and "population_energies"), or None if the history is unusable
+    """
+    path = path or LOG_CSV
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        rows = list(csv.DictReader(f))
+    designs = {}
+    for row in rows:
+        try:
+            x = tuple(float(row[c]) for c in HISTORY_DESIGN_COLUMNS)
+            obj = float(row["final_obj"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if row.get("failure_class", "ok") not in ("ok", "", None):
+            continue
+        if x not in designs or obj > designs[x]:
+            designs[x] = obj
+    if len(designs) < 5:
+        return None
+
+    ranked = sorted(designs.items(), key=lambda item: -item[1])
+    members = [ranked[i % len(ranked)] for i in range(n_members)]
+    iterations = [int(row["iter"]) for row in rows if str(row.get("iter", "")).isdigit()]
+    n_evals = max(iterations) if iterations else len(rows)
+    return {
+        "population": [list(x) for x, _ in members],
+        "population_energies": [-obj for _, obj in members],
+        # 1 baseline evaluation + n_members for the initial population, then n_members per generation
+        "generations_done": max(0, (n_evals - 1 - n_members) // n_members),
+        "nfev": max(0, n_evals - 1),
+        "eval_counter": n_evals,
+        "generation_counter": max(int(float(row["generation"])) for row in rows if row.get("generation")),
+        "best_obj_so_far": ranked[0][1],
+        "best_x_so_far": list(ranked[0][0]),
+        "prev_iter_obj": float(rows[-1]["final_obj"]) if rows[-1].get("final_obj") not in (None, "", "N/A") else None,
+        "elapsed_s": max(float(row["elapsed_s"]) for row in rows if row.get("elapsed_s") not in (None, "", "N/A")),
+    }
+
+# Private members of scipy's DifferentialEvolutionSolver that checkpoint/resume
+# reads and writes (tested with SciPy 1.17). SciPy can change them in any
+# release, so they are checked before the run instead of failing mid-run or
+# resuming inexactly.
+DE_SOLVER_INTERNALS = ("population", "population_energies", "num_population_members",
+                       "random_number_generator", "_nfev", "_unscale_parameters", "_result",
+                       "_calculate_population_feasibilities", "_calculate_population_energies",
+                       "_promote_lowest_energy")
+
+def check_de_solver(solver):
+    """Raise a RuntimeError naming what is missing if this SciPy lacks the DE internals used here."""
+    missing = [name for name in DE_SOLVER_INTERNALS if not hasattr(solver, name)]
+    if not missing and not hasattr(solver.random_number_generator, "bit_generator"):
+        missing.append("random_number_generator.bit_generator")
+    if missing:
+        raise RuntimeError(
+            f"SciPy {scipy.__version__}: DifferentialEvolutionSolver has no {', '.join(missing)}. "
+            f"The checkpointed DE run needs the solver internals of the SciPy versions it was tested "
+            f"with (1.17) - install one of those"
+        )
+
+def restore_sample_index(solver, checkpoint):
+    """
+    Put back the sampler permutation SciPy >= 1.11 keeps between mutations.
+    Raises RuntimeError if the checkpoint and this SciPy disagree on having
+    one, since the resumed run would then not reproduce the original.
+    """
+    saved = checkpoint.get("sample_index") or None  # [] from older checkpoints means none
+    if (saved is not None) != hasattr(solver, "_random_population_index"):
+        raise RuntimeError(
+            f"{CHECKPOINT_FILE} was written with SciPy {checkpoint.get('scipy_version', 'unknown')}, "
+            f"whose DE sampler state does not match SciPy {scipy.__version__}; resume with the SciPy "
+            f"version that wrote it, or delete the checkpoint to rebuild the population from {LOG_CSV}"
+        )
+    if saved is not None:
+        solver._random_population_index = np.array(saved)
+
+def score_initial_population(solver):
+    """
+    Evaluate the initial population the way solver.solve() would on its first
+    call, so the pre-filter threshold is set before generation 1's trials.
+    solve() then sees finite energies and goes straight to evolving.
+    """
+    solver.feasible, solver.constraint_violation = solver._calculate_population_feasibilities(solver.population)
+    solver.population_energies[solver.feasible] = solver._calculate_population_energies(
+        solver.population[solver.feasible]
+    )
+    solver._promote_lowest_energy()
+    update_prefilter_threshold(solver.population_energies)
+
+def run_differential_evolution(bounds, workers=None, resume=False, batch=None):
+    """
+    Run DE with a checkpoint after every generation.
+    
+    Drives scipy's DifferentialEvolutionSolver directly (same settings as the
+    differential_evolution() call it replaces) so its population, energies and
+    RNG can be saved and restored. With resume=True the run continues from
+    CHECKPOINT_FILE, or from a population rebuilt out of opt_history.csv if
+    there is no checkpoint; the remaining generations of DE_MAXITER are run.
+    
+    Parameters:
+    - bounds: Design bounds
+    - workers: SandboxPool for parallel evaluation (None = serial, immediate updating)
+    - resume: Continue a previous run instead of starting from a random population
+    - batch: BatchEvaluator scoring each generation in one VSP launch
+      (vectorized=True, deferred updating; workers is ignored)
+    
+    Returns: scipy OptimizeResult of this (possibly resumed) run
+    """
+    checkpoint = load_checkpoint() if resume else None
+    generations_done = 0
+    solver = None
+
+    def checkpointing_callback(xk, convergence):
+        nonlocal generations_done
+        generations_done += 1
+        update_prefilter_threshold(solver.population_energies)  # Next generation's trials compete with these
+        try:
+            return convergence_callback(xk, convergence)
+        finally:
+            save_checkpoint(solver, generations_done)
+            if tracer is not None:
+                tracer.instant(f"generation {generations_done}", evaluations=eval_counter)
+                tracer.flush()  # a generation at a time, so an interrupted run keeps its trace
+            log_event("generation", generation=generations_done, evaluations=eval_counter,
+                      best_objective=float(best_obj_so_far) if best_obj_so_far != -np.inf else None)
+
+    def make_solver(maxiter):
+        settings = dict(
+            strategy=DE_STRATEGY, maxiter=maxiter, popsize=DE_POPSIZE, tol=DE_TOL, polish=False,
+            callback=checkpointing_callback,
+            workers=workers if workers is not None and batch is None else 1,
+            updating='deferred' if workers is not None or batch is not None else 'immediate',
+            vectorized=batch is not None,
+        )
+        func = batch if batch is not None else evaluate_design
+        rng = np.random.default_rng(DE_SEED)
+        if DifferentialEvolutionSolver is None:
+            raise RuntimeError(f"SciPy {scipy.__version__} has no scipy.optimize._differentialevolution."
+                               f"DifferentialEvolutionSolver, which the checkpointed DE run drives directly")
+        try:
+            new_solver = DifferentialEvolutionSolver(func, bounds, rng=rng, **settings)
+        except TypeError:  # SciPy < 1.15 calls it seed
+            new_solver = DifferentialEvolutionSolver(func, bounds, seed=rng, **settings)
+        check_de_solver(new_solver)
+        global de_population_members
+        de_population_members = int(new_solver.num_population_members)
+        return new_solver
+
+    if resume and checkpoint is None:
+        print(f"[RESUME] No checkpoint - rebuilding the population from {LOG_CSV}", flush=True)
+        solver = make_solver(DE_MAXITER)
+        state = rebuild_state_from_history(solver.num_population_members)
+        if state is None:
+            print(f"[RESUME] {LOG_CSV} has too few usable designs - starting a new population", flush=True)
+            resume = False
+        else:
+            generations_done = state["generations_done"]
+            population = solver._unscale_parameters(np.array(state["population"]))
+            state["population"] = np.clip(np.nan_to_num(population, nan=0.5), 0.0, 1.0).tolist()
+            state["rng_state"] = None
+            checkpoint = state
+
+    if checkpoint is not None:
+        generations_done = checkpoint["generations_done"]
+        remaining = max(DE_MAXITER - generations_done, 0)
+        solver = make_solver(remaining)
+        solver.population = np.array(checkpoint["population"])
+        solver.population_energies = np.array(checkpoint["population_energies"], dtype=float)
+        solver._nfev = checkpoint["nfev"]
+        if checkpoint["rng_state"] is not None:  # None: rebuilt from history, no sampler state to restore
+            solver.random_number_generator.bit_generator.state = checkpoint["rng_state"]
+            restore_sample_index(solver, checkpoint)
+        restore_optimizer_state(checkpoint)
+        update_prefilter_threshold(solver.population_energies)
+        print(f"[RESUME] Continuing after generation {generations_done} ({eval_counter} evaluations, "
+              f"best objective {best_obj_so_far:.4f}) - {remaining} generations left", flush=True)
+        if remaining == 0:
+            return solver._result(nit=0, message="checkpoint already reached maxiter")
+    elif solver is None:
+        solver = make_solver(DE_MAXITER)
+
+    with solver:
+        if checkpoint is None:
+            update_prefilter_threshold([])  # No threshold from an earlier run while generation 0 is scored
+            score_initial_population(solver)
+        return solver.solve()
+
 # ---------------------------------------------------------------------
 # Driver
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
-    # Set up output logging to file
-    tee = TeeOutput(OUTPUT_LOG)
+    parser = argparse.ArgumentParser(description="Fixed-wing drone planform optimizer")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of designs evaluated concurrently, each in its own sandbox directory (default: 1)"
+    )
+    parser.add_argument(
+        "--tier2-workers", type=int, default=0,
+        help="Pipeline the tiers: run Tier 2 pitch stability in this many extra sandboxes while"
+             " the next candidates' Tier 1 sweeps run (default: 0, Tier 2 runs in the Tier 1 sandbox)"
+    )
+    parser.add_argument(
+        "--fused", action="store_true",
+        help="Apply the design and run MassProp + cruise sweep in one VSP launch (fused_cruise.vspscript)"
+    )
+    parser.add_argument(
+        "--skip-vsp3", action="store_true",
+        help="With --fused, don't write current.vsp3 (Tier 2 re-applies current.des instead)"
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Run each generation's Tier 1 in one VSP launch (batch_cruise.vspscript, DE vectorized=True;"
+             " --workers is ignored)"
+    )
+    parser.add_argument(
+        "--backend", choices=["subprocess", "api", "standin"], default=SOLVER_BACKEND,
+        help="Solver backend: vsp.exe subprocess (default), openvsp Python API in-process (one shared"
+             " model: serializes --workers, no watchdog or Tier 2 pipeline), or the analytic stand-in"
+             " that needs no OpenVSP"
+    )
+    parser.add_argument(
+        "--standin-latency", type=parse_stage_values, default=None,
+        help="Stand-in seconds per stage at full fidelity and the default cores, e.g. cruise=120,pitch=60"
+    )
+    parser.add_argument(
+        "--standin-failures", type=parse_stage_values, default=None,
+        help="Stand-in failure rates per stage:kind (error, hang, diverged), e.g. cruise:hang=0.02,pitch:error=0.05"
+    )
+    parser.add_argument(
+        "--cores", type=int, default=None,
+        help="Core budget shared by concurrent VSPAero runs (0 = all cores). Enables the core scheduler,"
+             " which learns the cores-per-job split with the most evaluations per hour"
+    )
+    parser.add_argument(
+        "--pin-cpus", action="store_true",
+        help="Pin each VSP process to its own CPUs from the core budget (implies --cores 0 if not given)"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help=f"Continue from {CHECKPOINT_FILE} (or rebuild the population from {LOG_CSV}) instead of starting over"
+    )
+    parser.add_argument(
+        "--adaptive-alpha", action="store_true",
+        help="Solve a sparse set of alphas first, then only the alphas around the L/D peak"
+             " (same band L/D, fewer solver points; count logged in alpha_points)"
+    )
+    parser.add_argument(
+        "--xnp", choices=["pitch", "calibrate", "derivative"], default="pitch",
+        help="Neutral point for designs past the Tier 2 gate: pitch stability run (default), the cruise"
+             " sweep's dCMy/dCL once it has agreed with the pitch run (calibrate, logged to"
+             f" {XNP_CALIBRATION_LOG}), or always dCMy/dCL (derivative)"
+    )
+    parser.add_argument(
+        "--fidelity", action="store_true",
+        help="Multi-fidelity ladder: evaluate at coarse wake/mesh settings first and escalate only designs"
+             f" within {FIDELITY_MARGIN:g} of the best (levels in FIDELITY_LEVELS, per-level log in {FIDELITY_LOG})"
+    )
+    parser.add_argument(
+        "--surrogate", action="store_true",
+        help="Skip the solver for designs a Gaussian process fitted to the history predicts, with high"
+             f" confidence, to be far below the best (needs {SURROGATE_MIN_SAMPLES} successful designs)"
+    )
+    parser.add_argument(
+        "--no-cg-model", action="store_true",
+        help="Run MassProp for every design instead of skipping it where the analytic CG model"
+             f" (fitted to the MassProp results) predicts the CG within {CG_MODEL_MAX_ERROR_MM:g} mm"
+    )
+    parser.add_argument(
+        "--no-prefilter", action="store_true",
+        help="Run the solver even for designs whose span/trailing-edge penalties alone keep them"
+             " below the worst member of the DE population"
+    )
+    parser.add_argument(
+        "--no-memo", action="store_true",
+        help=f"Run VSPAero for near-duplicate designs (within {MEMO_RADIUS:g} of an evaluated design,"
+             " normalized by the bounds) instead of reusing or interpolating their results"
+    )
+    parser.add_argument(
+        "--trace", nargs="?", const=TRACE_FILE, default=None, metavar="FILE",
+        help="Write per-stage timing spans (DES write, geometry update, cruise, MassProp, pitch, parsing,"
+             f" history/status writes) as a Chrome/Perfetto trace (default file: {TRACE_FILE})"
+    )
+    parser.add_argument(
+        "--log-level", choices=list(LOG_LEVELS), default=LOG_EVENT_LEVEL,
+        help=f"Lowest level of printed lines that also go to the JSON-lines event log ({EVENT_LOG});"
+             " evaluations, generations and the run start/end are always logged"
+    )
+    parser.add_argument(
+        "--no-history-store", action="store_true",
+        help=f"Write only {LOG_CSV}, not its columnar copy ({history_store.store_path(LOG_CSV)}/) that the"
+             " dashboard and analysis scripts load"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"Don't read or write the persistent evaluation cache ({EVAL_CACHE_DB}) or CG cache ({CG_CACHE_FILE})"
+    )
+    args = parser.parse_args()
+    SOLVER_BACKEND = args.backend
+    if args.standin_latency is not None:
+        STANDIN_LATENCY.update(args.standin_latency)
+    if args.standin_failures is not None:
+        STANDIN_FAILURES = args.standin_failures
+    if args.cores is not None or args.pin_cpus:
+        core_scheduler = CoreScheduler(args.cores or None, max_jobs=args.workers, pin=args.pin_cpus)
+    SURROGATE_ENABLED = args.surrogate
+    FIDELITY_ENABLED = args.fidelity
+    ADAPTIVE_ALPHA = args.adaptive_alpha
+    XNP_SOURCE = args.xnp
+    CG_MODEL_ENABLED = not args.no_cg_model
+    MEMO_ENABLED = not args.no_memo
+    PREFILTER_ENABLED = not args.no_prefilter
+    USE_FUSED_SCRIPT = args.fused
+    FUSED_WRITE_VSP3 = not args.skip_vsp3
+    if args.trace:
+        tracer = Tracer(args.trace)
+    LOG_EVENT_LEVEL = args.log_level
+
+    # Set up output logging to file (written by a background thread, see LogWriter)
+    tee = TeeOutput(OUTPUT_LOG, EVENT_LOG, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS,
+                    flush_interval=LOG_FLUSH_INTERVAL, event_level=LOG_EVENT_LEVEL, append=args.resume)
+    log_writer = tee.writer
     sys.stdout = tee
-    sys.stderr = tee  # Also capture errors
+    sys.stderr = tee.errors()  # Also capture errors
+    log_event("run_start", backend=SOLVER_BACKEND, workers=args.workers, resume=args.resume, pid=os.getpid())
     
-    baseline = [330.0, 25.0, 320.0, 0.833333, 120.0, 0.22]
-
-    bounds = [
-        (275.0, 480.0),  # span
-        (0.0, 40.0),     # sweep
-        (220.0, 340.0),  # xloc
-        (0.6, 0.9),      # taper
-        (95.0, 125.0),  # tip
-        (0.22, 0.22),    # control fraction
-    ]
+    baseline = list(BASELINE_X)
+    bounds = list(DESIGN_BOUNDS)
 
     print("="*80)
     print("FIXED-WING DRONE PLANFORM OPTIMIZER")
     print("="*80)
     print(f"\nConfiguration:")
-    print(f"  Population Size: 20")
-    print(f"  Max Generations: 40")
-    print(f"  Strategy: best1bin")
-    print(f"  Convergence Tolerance: 5e-3")
+    print(f"  Population Size: {DE_POPSIZE} x free parameters = {population_size()} members")
+    print(f"  Parallel Workers: {args.workers}")
+    print(f"  Solver Backend: {get_solver_backend().name}")
+    if SOLVER_BACKEND == "standin":
+        print(f"  Stand-in Latency: {', '.join(f'{k}={v:g}s' for k, v in STANDIN_LATENCY.items())}"
+              f" | Failures: {', '.join(f'{k}={v:g}' for k, v in STANDIN_FAILURES.items()) or 'none'}")
+    if core_scheduler is not None:
+        print(f"  Core Budget: {core_scheduler.total} cores, trying {core_scheduler.candidates} cores/job"
+              f"{' (pinned)' if core_scheduler.pin else ''}")
+    else:
+        print(f"  Core Budget: off ({VSPAERO_NCPU} cores per VSPAero run)")
+    if args.tier2_workers > 0:
+        print(f"  Tier 2 Pipeline: {args.tier2_workers} pitch stability sandbox(es)")
+    if (args.workers > 1 or args.tier2_workers > 0) and get_solver_backend().name == "api":
+        print("  WARNING: the openvsp API backend holds one model per process - workers will take turns"
+              " and Tier 2 is not pipelined. Use --backend subprocess for concurrent solves.")
+    if args.batch:
+        print(f"  Tier 1 Launches: 1 per generation (batch_cruise.vspscript)")
+        if args.workers > 1 or args.tier2_workers > 0:
+            print("  WARNING: --batch evaluates each generation in one sandbox - --workers/--tier2-workers are ignored")
+        if get_solver_backend().name == "api":
+            print("  WARNING: --batch has no launches to save with the openvsp API backend - designs run one by one")
+    else:
+        print(f"  Tier 1 Launches: {'1 (fused)' if USE_FUSED_SCRIPT else '2 (update_geom + cruise)'}"
+              f"{', no current.vsp3' if USE_FUSED_SCRIPT and not FUSED_WRITE_VSP3 else ''}")
+    print(f"  Max Generations: {DE_MAXITER}")
+    print(f"  Strategy: {DE_STRATEGY}")
+    print(f"  Convergence Tolerance: {DE_TOL:g}")
+    print(f"  Checkpoint: {CHECKPOINT_FILE}{' (resuming)' if args.resume else ''}")
+    if tracer is not None:
+        print(f"  Trace: {tracer.path} (per-stage spans, written every generation)")
+    if ADAPTIVE_ALPHA:
+        print(f"  Alpha Sweep: adaptive (start at {', '.join(f'{a:g}' for a in ADAPTIVE_ALPHA_INITIAL)} deg,"
+              f" refine around the L/D peak)")
+        if args.batch:
+            print("  WARNING: --batch always solves the full sweep - --adaptive-alpha is not used there")
+    if XNP_SOURCE != "pitch":
+        print(f"  Neutral Point: {XNP_SOURCE} (dCMy/dCL from the cruise sweep"
+              + (f", trusted after {XNP_CALIBRATION_SAMPLES} designs within {XNP_TOLERANCE_PCT_MAC:g}% MAC)"
+                 if XNP_SOURCE == "calibrate" else ", Tier 2 never runs)"))
+    if FIDELITY_ENABLED:
+        print(f"  Fidelity Ladder: {' -> '.join(level['name'] for level in FIDELITY_LEVELS)}"
+              f" (escalate within {FIDELITY_MARGIN:g} of best)")
+        if args.batch:
+            print("  WARNING: --batch runs every design at production fidelity - the ladder is not used")
+    if CG_MODEL_ENABLED:
+        print(f"  CG Model: skip MassProp where the CG is predicted within {CG_MODEL_MAX_ERROR_MM:g} mm"
+              f" (after {CG_MODEL_MIN_SAMPLES} MassProp runs)")
+    if PREFILTER_ENABLED:
+        print(f"  Pre-filter: skip designs whose best possible objective (<= {BEST_LD_TERM:.2f} minus"
+              f" span/TE penalties) is below the worst DE population member")
+    if MEMO_ENABLED:
+        print(f"  Near-duplicate Memo: reuse/interpolate designs within {MEMO_RADIUS:g} (normalized)"
+              f" of an evaluated design")
+    if SURROGATE_ENABLED:
+        print(f"  Surrogate Pre-screen: reject if mean + {SURROGATE_CONFIDENCE:g} std < best - {SURROGATE_MARGIN:g}"
+              f" (after {SURROGATE_MIN_SAMPLES} designs)")
     print(f"\nDesign Bounds:")
     print(f"  Span:      {bounds[0][0]:.1f} - {bounds[0][1]:.1f} mm")
     print(f"  Sweep:     {bounds[1][0]:.1f} - {bounds[1][1]:.1f} deg")
@@ -1117,13 +4030,35 @@ if __name__ == "__main__":
     print(f"  Over-stable: >15% (moderate penalty)")
     print("="*80)
     
-    # Write initial status to show optimizer is starting
-    write_status_file()
-    
-    print("\n[STEP 1/2] Evaluating baseline design...")
-    print("-"*80)
-    evaluate_design(baseline)
-    print("-"*80)
+    if not args.no_cache:
+        eval_cache = EvaluationCache()
+        print(f"[CACHE] {len(eval_cache)} stored evaluations in {eval_cache.path} (inputs {eval_cache.input_hash})")
+        loaded = _cg_cache.load(os.path.join(SCRIPT_DIR, CG_CACHE_FILE), eval_cache.input_hash)
+        print(f"[CG CACHE] {loaded} MassProp CGs from {CG_CACHE_FILE}")
+
+    if args.resume and os.path.exists(LOG_CSV):
+        # Keep appending to the history of the interrupted run
+        if not args.no_history_store:
+            open_column_store()
+        write_status_file()
+        print("\n[STEP 1/2] Resuming - baseline already evaluated")
+    else:
+        # Start a fresh history and write initial status to show optimizer is starting
+        init_history_log()
+        if not args.no_history_store:
+            open_column_store()
+        if FIDELITY_ENABLED:
+            init_fidelity_log()
+        if XNP_SOURCE == "calibrate":
+            init_xnp_calibration_log()
+        if PREFILTER_ENABLED:
+            init_prefilter_log()
+        write_status_file()
+        
+        print("\n[STEP 1/2] Evaluating baseline design...")
+        print("-"*80)
+        evaluate_design(baseline)
+        print("-"*80)
 
     print("\n[STEP 2/2] Starting differential evolution optimization...")
     print("="*80 + "\n")
@@ -1134,18 +4069,30 @@ if __name__ == "__main__":
     
     # Write initial status
     write_status_file()
+    if SURROGATE_ENABLED:
+        retrain_surrogate()  # Resumed runs can screen from the first generation
+    if CG_MODEL_ENABLED and args.resume:
+        print(f"[CG MODEL] {load_massprop_samples()} MassProp results from {LOG_CSV}", flush=True)
+    retrain_cg_model()
+    
+    # Parallel mode: DE hands the whole population to the sandbox pool at once
+    # (deferred updating); --tier2-workers always runs through the pool too, since
+    # its Tier 1 / Tier 2 pipeline overlaps candidates. Only a plain serial run
+    # keeps the original immediate updating.
+    sandbox_pool = None
+    batch_evaluator = None
+    if args.batch:
+        batch_evaluator = BatchEvaluator()
+        print(f"[BATCH] One VSP launch per generation in {batch_evaluator.workdir}", flush=True)
+    elif args.workers > 1 or args.tier2_workers > 0:
+        sandbox_pool = SandboxPool(args.workers, tier2_workers=args.tier2_workers)
+        print(f"[PARALLEL] {args.workers} sandboxes (+{args.tier2_workers} Tier 2) in "
+              f"{os.path.join(SCRIPT_DIR, SANDBOX_ROOT)}", flush=True)
+    elif SOLVER_BACKEND == "standin":
+        print(f"[STAND-IN] Serial run in {use_serial_sandbox()}", flush=True)
     
     try:
-        result = differential_evolution(
-            evaluate_design,
-            bounds,
-            maxiter=40,
-            popsize=20,
-            strategy='best1bin',
-            tol=5e-3,
-            polish=False,
-            callback=convergence_callback
-        )
+        result = run_differential_evolution(bounds, workers=sandbox_pool, resume=args.resume, batch=batch_evaluator)
     except KeyboardInterrupt as e:
         print("\n" + "="*80, flush=True)
         print("OPTIMIZATION INTERRUPTED", flush=True)
@@ -1167,6 +4114,8 @@ if __name__ == "__main__":
         }
         with open(STATUS_FILE, "w") as f:
             json.dump(status, f, indent=2)
+        log_event("run_end", status="stopped", reason=str(e), evaluations=eval_counter,
+                  generations=generation_counter)
         # Restore stdout before raising
         sys.stdout = tee.stdout
         sys.stderr = sys.__stderr__
@@ -1198,12 +4147,26 @@ if __name__ == "__main__":
                 json.dump(status, f, indent=2)
         except Exception as status_err:
             print(f"Warning: Could not write error status file: {status_err}", flush=True)
+        log_event("run_end", "error", status="error", error=str(e), evaluations=eval_counter,
+                  generations=generation_counter)
         # Restore stdout before raising
         sys.stdout = tee.stdout
         sys.stderr = sys.__stderr__
         tee.close()
         raise
 
+    finally:
+        if sandbox_pool is not None:
+            sandbox_pool.close()
+        if tracer is not None:
+            tracer.close()
+        if column_store is not None:
+            column_store.close()
+        if eval_cache is not None:
+            print(f"[CACHE] {eval_cache.hits} hits, {eval_cache.misses} misses this run", flush=True)
+            save_cg_cache()
+            eval_cache.close()
+
     total_s = time.time() - t_start
     total_min = total_s / 60.0
     
@@ -1214,6 +4177,19 @@ if __name__ == "__main__":
     print(f"  Total Evaluations: {eval_counter}")
     print(f"  Total Time:        {total_min:.1f} min ({total_s/3600:.2f} hours)")
     print(f"  Avg Time/Eval:     {total_s/eval_counter:.1f} s")
+    if SURROGATE_ENABLED:
+        print(f"  Surrogate Skips:   {surrogate_rejections} solver runs")
+    print(f"  MassProp Skips:    {cg_model_skips} runs (CG cache / CG model)")
+    if MEMO_ENABLED:
+        print(f"  Near-duplicates:   {design_memo.summary()}")
+    if PREFILTER_ENABLED:
+        print(f"  Pre-filter Skips:  {prefilter_skips} designs (log: {PREFILTER_LOG})")
+    print(f"  CG Cache:          {_cg_cache.summary()}")
+    if XNP_SOURCE != "pitch":
+        print(f"  Neutral Point:     {xnp_calibration.summary()}")
+    if FIDELITY_ENABLED:
+        print(f"\n[FIDELITY LADDER]")
+        print("\n".join(fidelity_report()))
     
     if best_x_so_far is not None:
         span, sweep, xloc, taper, tip, ctrl = best_x_so_far
@@ -1232,9 +4208,19 @@ if __name__ == "__main__":
     
     print(f"\n[OUTPUT FILES]")
     print(f"  Optimization History: {LOG_CSV}")
+    if column_store is not None:
+        print(f"  History Store:        {column_store.path}")
     print(f"  Latest Results:       {RESULTS_CSV}")
     print(f"  MassProp Results:     MassProp_Results.csv")
-    print(f"  Output Log:           {OUTPUT_LOG}")
+    print(f"  Output Log:           {OUTPUT_LOG} (rotated to {OUTPUT_LOG}.1.gz, ... past {LOG_MAX_BYTES / 2**20:g} MB)")
+    print(f"  Event Log:            {EVENT_LOG}")
+    if eval_cache is not None:
+        print(f"  Evaluation Cache:     {eval_cache.path}")
+        print(f"  CG Cache:             {os.path.join(SCRIPT_DIR, CG_CACHE_FILE)}")
+    if FIDELITY_ENABLED:
+        print(f"  Fidelity Log:         {FIDELITY_LOG}")
+    if tracer is not None:
+        print(f"  Trace:                {tracer.path}")
     print(f"  Status File:          {STATUS_FILE}")
     print("="*80)
     
@@ -1257,6 +4243,10 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Warning: Could not write final status file: {e}", flush=True)
     
+    log_event("run_end", status="completed", evaluations=eval_counter, generations=generation_counter,
+              best_objective=float(best_obj_so_far) if best_obj_so_far != -np.inf else None,
+              elapsed_s=round(total_s, 1))
+    
     # Restore stdout and close log file
     sys.stdout = tee.stdout
     sys.stderr = sys.__stderr__
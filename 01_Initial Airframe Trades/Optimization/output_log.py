@@ -0,0 +1,210 @@
+"""
+Output log of the optimizer: console output copied to a rotating log file and
+a JSON-lines event log by a background thread.
+
+Printed output goes to the console right away and through a queue to the
+LogWriter thread, which writes optimizer_output.log and the event log, so
+print(..., flush=True) costs a console write and a queue put rather than a
+log file flush. optimizer2 installs a TeeOutput as sys.stdout / sys.stderr
+and adds structured events through log_event().
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import time
+import queue
+import shutil
+import threading
+
+LOG_LEVELS = {"info": 20, "warning": 30, "error": 40}
+
+def line_level(line, stream="stdout"):
+    """Level of a printed line: stderr and errors are 'error', warnings and failed designs 'warning'."""
+    if stream == "stderr" or "ERROR" in line or "Error" in line or "Traceback" in line:
+        return "error"
+    if "WARNING" in line or "Warning" in line or "FAILED" in line:
+        return "warning"
+    return "info"
+
+class RotatingLogFile:
+    """
+    Text log that is gzipped to <path>.1.gz (older copies shifted to .2.gz, ...)
+    once it has grown past max_bytes. Written only by the LogWriter thread.
+    append=True continues an existing file (--resume keeps the interrupted run's log).
+    """
+    def __init__(self, path, max_bytes=0, backups=0, append=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotations = 0
+        self.file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, text):
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def rotate_if_full(self):
+        if not self.max_bytes or self.file.tell() < self.max_bytes:
+            return
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}.gz"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}.gz")
+        if self.backups > 0:
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.rotations += 1
+
+    def close(self):
+        self.file.close()
+
+class LogWriter:
+    """
+    Background thread writing the output log and the event log.
+    
+    Writers only put items on a queue: text printed to sys.stdout/sys.stderr
+    (TeeOutput) and structured events (log_event). The thread writes them in
+    order, flushes the files every flush_interval seconds while output keeps
+    coming (and on sync/close), and rotates them past max_bytes. Printed lines
+    at or above event_level also become "log" events with their [TAG].
+    
+    Parameters:
+    - log_path: Human-readable log (OUTPUT_LOG)
+    - event_path: JSON-lines event log (EVENT_LOG), or None for none
+    - max_bytes, backups: Rotation of both files (RotatingLogFile)
+    - append: Continue existing files instead of truncating them (--resume)
+    - flush_interval: Seconds between flushes
+    - event_level: Lowest level (LOG_LEVELS) of printed lines copied to the event log
+    """
+    def __init__(self, log_path, event_path=None, max_bytes=0, backups=0, flush_interval=1.0,
+                 event_level="warning", append=False):
+        self.log = RotatingLogFile(log_path, max_bytes, backups, append)
+        self.events = RotatingLogFile(event_path, max_bytes, backups, append) if event_path else None
+        self.flush_interval = flush_interval
+        self.event_level = LOG_LEVELS[event_level]
+        self.queue = queue.SimpleQueue()
+        self.lines = {}  # (thread, stream) -> its unfinished printed line
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def put_text(self, text, stream="stdout"):
+        if not self.closed:  # kept cheap: this is every print()
+            self.queue.put(("text", threading.current_thread().name, stream, text))
+
+    def event(self, name, level="info", **fields):
+        if not self.closed:
+            self.queue.put(("event", time.time(), threading.current_thread().name, name, level, fields))
+
+    def sync(self, timeout=None):
+        """Wait until everything queued so far is written and flushed."""
+        done = threading.Event()
+        self.queue.put(("sync", done))
+        return done.wait(timeout)
+
+    def close(self):
+        """Write what is queued, flush and close the files (idempotent)."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(("stop",))
+        self.thread.join()
+
+    def _run(self):
+        files = [self.log] + ([self.events] if self.events is not None else [])
+        last_flush, dirty = time.monotonic(), False
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                items = []
+            while True:  # the whole backlog in one pass
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            waiting, stop = [], False
+            try:
+                for item in items:
+                    if item[0] == "text":
+                        self._write_text(*item[1:])
+                        dirty = True
+                    elif item[0] == "event":
+                        self._write_event(*item[1:])
+                        dirty = True
+                    elif item[0] == "sync":
+                        waiting.append(item[1])
+                    else:
+                        stop = True
+                if dirty and (waiting or stop or time.monotonic() - last_flush >= self.flush_interval):
+                    for f in files:
+                        f.flush()
+                        f.rotate_if_full()
+                    last_flush, dirty = time.monotonic(), False
+            except OSError as e:
+                sys.__stderr__.write(f"[LOG] Could not write {self.log.path}: {e}\n")
+            for done in waiting:
+                done.set()
+            if stop:
+                for f in files:
+                    f.close()
+                return
+
+    def _write_text(self, thread, stream, text):
+        self.log.write(text)
+        if self.events is None:
+            return
+        *complete, rest = (self.lines.pop((thread, stream), "") + text).split("\n")
+        if rest:
+            self.lines[(thread, stream)] = rest
+        for line in complete:
+            level = line_level(line, stream)
+            if line.strip() and LOG_LEVELS[level] >= self.event_level:
+                tag = re.match(r"\s*\[([^\]]+)\]", line)
+                self._write_event(time.time(), thread, "log", level, {"tag": tag.group(1) if tag else None,
+                                                             "message": line.strip()})
+
+    def _write_event(self, t, thread, name, level, fields):
+        if self.events is None:
+            return
+        record = {"time": round(t, 3), "level": level, "event": name, "thread": thread}
+        record.update(fields)
+        self.events.write(json.dumps(record, default=lambda v: v.item() if hasattr(v, "item") else str(v)) + "\n")
+
+class TeeOutput:
+    """
+    Write to both stdout and the log file: the console right away, the log
+    through a LogWriter thread. flush() (print(..., flush=True)) flushes only
+    the console.
+    
+    Parameters:
+    - file_path: Output log; event_path and writer_options go to LogWriter
+    - stream: "stdout", or "stderr" for the tee from errors()
+    """
+    def __init__(self, file_path, event_path=None, stream="stdout", writer=None, **writer_options):
+        self.stdout = sys.stdout
+        self.stream = stream
+        self.writer = writer or LogWriter(file_path, event_path, **writer_options)
+        
+    def write(self, text):
+        self.stdout.write(text)
+        self.writer.put_text(text, self.stream)
+        
+    def flush(self):
+        self.stdout.flush()
+
+    def errors(self):
+        """Tee for sys.stderr: same console and log, its lines are 'error' events."""
+        tee = TeeOutput(None, stream="stderr", writer=self.writer)
+        tee.stdout = self.stdout
+        return tee
+        
+    def close(self):
+        self.writer.close()
@@ -3,11 +3,12 @@ Enhanced plotting script for optimization results
 Plots convergence, design space exploration, and stability metrics
 """
 
-import csv
 import numpy as np
 import sys
 import os
 
+import history_store
+
 try:
     import matplotlib.pyplot as plt
     HAS_MATPLOTLIB = True
@@ -27,40 +28,29 @@ def plot_optimization(history_file="opt_history.csv"):
         print(f"ERROR: {history_file} not found!")
         return None
     
-    # Read data
-    iterations = []
-    with open(history_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            iterations.append(row)
+    # Read data (typed columns - from the columnar store next to the CSV when there is one)
+    keys = ['iter', 'generation', 'final_obj', 'band_LD', 'static_margin', 
+            'span_mm', 'sweep_deg', 'xloc_mm', 'taper', 'tip_mm', 'cg_x',
+            'total_penalty']
+    columns = history_store.load_columns(history_file, keys + ['sm_category'])
     
-    if len(iterations) == 0:
+    if len(columns.get('iter', [])) == 0:
         print("ERROR: No iterations found!")
         return None
     
-    # Extract data
+    # Extract data (nan for N/A or a column the history doesn't have)
     data = {}
-    keys = ['iter', 'generation', 'final_obj', 'band_LD', 'static_margin', 
-            'span_mm', 'sweep_deg', 'xloc_mm', 'taper', 'tip_mm', 'cg_x',
-            'total_penalty', 'sm_category']
-    
     for key in keys:
-        data[key] = []
-        for it in iterations:
-            val = it.get(key, 'N/A')
-            if val != 'N/A' and val != '':
-                try:
-                    data[key].append(float(val))
-                except (ValueError, TypeError):
-                    data[key].append(None)
-            else:
-                data[key].append(None)
-    
-    # Convert to arrays (filtering None)
-    def to_array(lst):
-        return np.array([x for x in lst if x is not None])
-    
-    iter_nums = np.array([int(x) for x in data['iter'] if x is not None])
+        data[key] = np.asarray(columns.get(key, np.full(len(columns['iter']), np.nan)), dtype=float)
+        if key in history_store.INT_COLUMNS:
+            data[key][data[key] == history_store.INT_MISSING] = np.nan
+    data['sm_category'] = columns.get('sm_category', [])
+    
+    # Convert to arrays (filtering missing values)
+    def to_array(values):
+        return values[~np.isnan(values)]
+    
+    iter_nums = to_array(data['iter']).astype(int)
     objs = to_array(data['final_obj'])
     band_ld = to_array(data['band_LD'])
     sm = to_array(data['static_margin'])
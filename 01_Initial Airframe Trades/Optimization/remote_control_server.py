@@ -12,6 +12,8 @@ import urllib.parse
 import time
 from datetime import datetime
 
+import history_store
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 STATUS_FILE = os.path.join(SCRIPT_DIR, "optimizer_status.json")
 CONTROL_FILE = os.path.join(SCRIPT_DIR, "optimizer_control.txt")
@@ -286,15 +288,13 @@ class OptimizerHandler(http.server.SimpleHTTPRequestHandler):
         else:
             status['error'] = 'Status file not found - optimizer may not be running'
         
-        # Get latest iteration info from CSV if available
-        if os.path.exists(LOG_CSV):
+        # Get latest iteration info from the history if available (last row only)
+        if os.path.exists(LOG_CSV) or os.path.exists(history_store.store_path(LOG_CSV)):
             try:
-                with open(LOG_CSV, 'r') as f:
-                    lines = f.readlines()
-                    if len(lines) > 1:  # Has header + at least one data row
-                        last_line = lines[-1].strip().split(',')
-                        if len(last_line) > 0:
-                            status['latest_iteration'] = int(last_line[0]) if last_line[0].isdigit() else None
+                last = history_store.last_row(LOG_CSV)
+                if last is not None:
+                    iteration = last.get('iter', '')
+                    status['latest_iteration'] = int(iteration) if iteration.isdigit() else None
             except:
                 pass
         
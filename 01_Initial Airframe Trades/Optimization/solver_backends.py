@@ -0,0 +1,460 @@
+"""
+Solver backends: the three VSP stages (geometry update, Tier 1 cruise sweep,
+Tier 2 pitch stability) analyze_design runs for a design.
+
+- SubprocessBackend: vsp.exe on the vspscripts, data handed over through files
+  (the original path and the default)
+- OpenVSPAPIBackend: the openvsp Python module, in process
+- StandInBackend: deterministic analytic stand-in (vlm.py aerodynamics and a
+  component-mass CG), so the optimizer loop runs without OpenVSP
+
+The stages run under the optimizer's watchdog, core scheduler and fidelity
+ladder and read its settings when they run, so command-line options (and
+tests) that change them apply. optimizer2 binds itself as `optimizer` when it
+imports this module.
+"""
+
+import os
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+import vlm
+
+optimizer = None  # The optimizer2 module (bound by optimizer2 on import)
+
+class SolverBackend:
+    """
+    The three solver stages analyze_design runs for a design, in workdir.
+    
+    Stages raise RuntimeError when they fail (SolverTimeout when the watchdog
+    stopped them). `name` is shown in the configuration summary;
+    `files_in_workdir` is True when the cruise and pitch stages leave their
+    results as files in workdir (Results.csv, current.aerocenter.stab), so a
+    pipelined Tier 2 can carry the design over to another sandbox.
+    """
+    name = None
+    files_in_workdir = False
+
+    def update_geometry(self, x, workdir):
+        """Apply design vector x."""
+        raise NotImplementedError
+
+    def run_cruise(self, workdir):
+        """
+        Tier 1 cruise sweep, with MassProp unless _worker_state.run_massprop
+        is False.
+        
+        Returns: (results, vspaero_time_s) - results is a Results.csv path or
+        a ResultsTable
+        """
+        raise NotImplementedError
+
+    def run_pitch(self, workdir):
+        """Tier 2 pitch stability run. Returns: True if current.aerocenter.stab was written."""
+        raise NotImplementedError
+
+class SubprocessBackend(SolverBackend):
+    """Original path: run vsp.exe on the vspscripts and hand data over through files."""
+    name = "subprocess"
+    files_in_workdir = True
+
+    def update_geometry(self, x, workdir):
+        if optimizer.USE_FUSED_SCRIPT:
+            # The fused cruise launch applies the .des file itself
+            optimizer.write_des_from_x(x, os.path.join(workdir, "current.des"))
+            if not optimizer.FUSED_WRITE_VSP3 and os.path.exists(os.path.join(workdir, "current.vsp3")):
+                os.remove(os.path.join(workdir, "current.vsp3"))  # never let Tier 2 read a stale model
+        else:
+            optimizer.run_watched_stage("update_geom", lambda degraded, timeout: optimizer.update_geometry_from_x(x, workdir, timeout))
+
+    def run_cruise(self, workdir):
+        stage = optimizer.fidelity_stage("cruise")
+        with optimizer.solver_cores(stage) as cores:
+            # Adaptive refinements reuse the current.vsp3 the first fused sweep wrote
+            fused = optimizer.USE_FUSED_SCRIPT
+            # MassProp only if the CG isn't known yet, and only in the first sweep
+            massprop = getattr(optimizer._worker_state, "run_massprop", True)
+            if not massprop and os.path.exists(os.path.join(workdir, "MassProp_Results.csv")):
+                os.remove(os.path.join(workdir, "MassProp_Results.csv"))  # never read another design's CG
+
+            def sweep(**alpha_settings):
+                nonlocal fused, massprop
+
+                def attempt(degraded, timeout):
+                    settings = optimizer.fidelity_settings(degraded)
+                    settings.update(alpha_settings)
+                    if cores.ncpu != optimizer.VSPAERO_NCPU:
+                        settings["NCPU"] = cores.ncpu
+                    if not massprop:
+                        settings["RUN_MASSPROP"] = False
+                    if fused:
+                        script = optimizer.render_vspscript("fused_cruise.vspscript", workdir, WRITE_VSP3=optimizer.FUSED_WRITE_VSP3, **settings)
+                    else:
+                        script = optimizer.render_vspscript("cruise.vspscript", workdir, **settings)
+                    return optimizer.run_vspaero(workdir, script, cores.cpus, timeout)
+
+                elapsed = optimizer.run_watched_stage(stage, attempt)
+                fused = fused and not optimizer.FUSED_WRITE_VSP3
+                massprop = False
+                return elapsed
+
+            if not optimizer.ADAPTIVE_ALPHA:
+                return os.path.join(workdir, optimizer.RESULTS_CSV), sweep()
+
+            elapsed = 0.0
+
+            def run_sweep(alpha_start, alpha_end, npts):
+                nonlocal elapsed
+                elapsed += sweep(ALPHA_START=float(alpha_start), ALPHA_END=float(alpha_end), ALPHA_NPTS=npts)
+                return optimizer.ResultsTable.from_csv(os.path.join(workdir, optimizer.RESULTS_CSV))
+
+            results, _ = optimizer.adaptive_alpha_sweep(run_sweep)
+        return results, elapsed
+
+    def run_pitch(self, workdir):
+        stage = optimizer.fidelity_stage("pitch")
+        with optimizer.solver_cores(stage) as cores:
+            # No current.vsp3 (fused --skip-vsp3, or a batch run): re-apply current.des
+            apply_des = not os.path.exists(os.path.join(workdir, "current.vsp3"))
+
+            def attempt(degraded, timeout):
+                settings = optimizer.fidelity_settings(degraded)
+                return optimizer.run_pitch_stability(
+                    workdir, apply_des=apply_des, ncpu=cores.ncpu, cpus=cores.cpus,
+                    wake_iter=settings.get("WAKE_ITER", optimizer.VSPAERO_WAKE_ITER), timeout=timeout,
+                    tess_scale=settings.get("TESS_SCALE", 1.0)
+                )
+
+            return optimizer.run_watched_stage(stage, attempt)
+
+class OpenVSPAPIBackend(SolverBackend):
+    """
+    In-process backend using the OpenVSP Python API (`openvsp` module).
+    
+    baseline.vsp3 is loaded once and kept in memory; each design sets the DES
+    parms directly with SetParmVal instead of a ReadApplyDESFile round trip, and
+    results are read from the results manager instead of parsing Results.csv.
+    The openvsp module holds a single model, so stages are serialized with a
+    lock - use the subprocess backend for --workers > 1.
+    """
+    name = "api"
+
+    def __init__(self, vsp_module=None):
+        if vsp_module is None:
+            import openvsp as vsp_module
+        self.vsp = vsp_module
+        self.model_loaded = False
+        self.lock = threading.RLock()
+
+    def _ensure_model(self):
+        if not self.model_loaded:
+            self.vsp.ClearVSPModel()
+            self.vsp.ReadVSPFile(os.path.join(optimizer.SCRIPT_DIR, "baseline.vsp3"))
+            self.model_loaded = True
+
+    def _collect_results(self, results_id, rows):
+        """Flatten a results set (and the sub-results it lists) into label -> row."""
+        vsp = self.vsp
+        for data_name in vsp.GetAllDataNames(results_id):
+            data_type = vsp.GetResultsType(results_id, data_name)
+            if data_type == vsp.DOUBLE_DATA:
+                values = list(vsp.GetDoubleResults(results_id, data_name, 0))
+            elif data_type == vsp.INT_DATA:
+                values = list(vsp.GetIntResults(results_id, data_name, 0))
+            elif data_type == vsp.VEC3D_DATA:
+                vec = vsp.GetVec3dResults(results_id, data_name, 0)
+                values = [vec[0].x(), vec[0].y(), vec[0].z()] if len(vec) > 0 else []
+            elif data_type == vsp.STRING_DATA:
+                values = list(vsp.GetStringResults(results_id, data_name, 0))
+                if data_name == "ResultsVec":
+                    # VSPAEROSweep returns a wrapper listing the polar/load/history results
+                    for child_id in values:
+                        self._collect_results(child_id, rows)
+                    continue
+            else:
+                continue
+            rows.setdefault(data_name, [data_name] + values)
+        return rows
+
+    def _report_errors(self):
+        while self.vsp.GetNumTotalErrors() > 0:
+            print(f"OpenVSP: {self.vsp.PopLastError().GetErrorString()}", flush=True)
+
+    def _set_sweep_inputs(self, alpha_start, alpha_end, alpha_npts, unsteady_type, ncpu=None):
+        """Same VSPAEROSweep settings as cruise.vspscript / pitch_stability.vspscript."""
+        ncpu = ncpu or optimizer.VSPAERO_NCPU
+        vsp = self.vsp
+        analysis = "VSPAEROSweep"
+        vsp.SetAnalysisInputDefaults(analysis)
+        vsp.SetIntAnalysisInput(analysis, "RefFlag", [1])
+        vsp.SetDoubleAnalysisInput(analysis, "Xcg", [314.25])
+        vsp.SetDoubleAnalysisInput(analysis, "Ycg", [0.0])
+        vsp.SetDoubleAnalysisInput(analysis, "Zcg", [0.0])
+        vsp.SetDoubleAnalysisInput(analysis, "AlphaStart", [alpha_start])
+        vsp.SetDoubleAnalysisInput(analysis, "AlphaEnd", [alpha_end])
+        vsp.SetIntAnalysisInput(analysis, "AlphaNpts", [alpha_npts])
+        # Fidelity ladder wake iterations (tessellation scaling is vspscript-only)
+        vsp.SetIntAnalysisInput(analysis, "WakeNumIter", [optimizer.fidelity_settings().get("WAKE_ITER", optimizer.VSPAERO_WAKE_ITER)])
+        vsp.SetIntAnalysisInput(analysis, "NCPU", [ncpu])
+        vsp.SetIntAnalysisInput(analysis, "UnsteadyType", [unsteady_type])
+        return analysis
+
+    def update_geometry(self, x, workdir):
+        with self.lock:
+            self._ensure_model()
+            values = optimizer.des_values(x)
+            for parm_id, key in optimizer.DES_PARMS:
+                self.vsp.SetParmVal(parm_id, values[key])
+            self.vsp.Update()
+            # VSPAERO names its output files after the model file
+            self.vsp.SetVSP3FileName(os.path.join(workdir, "current.vsp3"))
+            self._report_errors()
+        # Keep current.des on disk for export/inspection tools
+        optimizer.write_des_from_x(x, os.path.join(workdir, "current.des"))
+
+    def run_cruise(self, workdir):
+        vsp = self.vsp
+        start = time.time()
+        with self.lock, optimizer.solver_cores(optimizer.fidelity_stage("cruise")) as cores:
+            try:
+                comp_geom = "VSPAEROComputeGeometry"
+                vsp.SetAnalysisInputDefaults(comp_geom)
+                vsp.SetIntAnalysisInput(comp_geom, "GeomSet", [0])
+                vsp.SetIntAnalysisInput(comp_geom, "ThinGeomSet", [-1])
+                vsp.ExecAnalysis(comp_geom)
+
+                if getattr(optimizer._worker_state, "run_massprop", True):
+                    with optimizer.trace_span("massprop", "solver"):
+                        vsp.SetAnalysisInputDefaults("MassProp")
+                        massprop_id = vsp.ExecAnalysis("MassProp")
+                    massprop = optimizer.ResultsTable(self._collect_results(massprop_id, {}), "MassProp_Results.csv", workdir)
+                else:
+                    massprop = optimizer.ResultsTable({}, "MassProp_Results.csv", workdir)  # CG cache / CG model knows it
+
+                def run_sweep(alpha_start, alpha_end, npts):
+                    sweep_id = vsp.ExecAnalysis(self._set_sweep_inputs(alpha_start, alpha_end, npts, 0, cores.ncpu))
+                    return optimizer.ResultsTable(self._collect_results(sweep_id, {}), optimizer.RESULTS_CSV, workdir, massprop=massprop)
+
+                if optimizer.ADAPTIVE_ALPHA:
+                    rows = optimizer.adaptive_alpha_sweep(run_sweep)[0].rows
+                else:
+                    rows = run_sweep(optimizer.SWEEP_ALPHAS[0], optimizer.SWEEP_ALPHAS[-1], len(optimizer.SWEEP_ALPHAS)).rows
+            except Exception as e:
+                raise RuntimeError(f"OpenVSP API cruise analysis failed: {e}")
+            finally:
+                self._report_errors()
+        elapsed = time.time() - start
+        print(f"VSPAERO run completed in {elapsed:.1f}s ({elapsed/60:.1f} min) [openvsp API]", flush=True)
+        if "L_D" not in rows:
+            raise RuntimeError("No L_D results returned by VSPAEROSweep")
+        return optimizer.ResultsTable(rows, optimizer.RESULTS_CSV, workdir, massprop=massprop), elapsed
+
+    def run_pitch(self, workdir):
+        stab_file = os.path.join(workdir, "current.aerocenter.stab")
+        if os.path.exists(stab_file):
+            os.remove(stab_file)
+        start = time.time()
+        print(f"[TIER 2] Running pitch stability analysis (single alpha = 8 deg) [openvsp API]...", flush=True)
+        with self.lock, optimizer.solver_cores(optimizer.fidelity_stage("pitch")) as cores:
+            try:
+                self.vsp.ExecAnalysis(self._set_sweep_inputs(8.0, 8.0, 1, 5, cores.ncpu))
+            except Exception as e:
+                raise RuntimeError(f"Pitch stability analysis failed: {e}")
+            finally:
+                self._report_errors()
+        elapsed = time.time() - start
+        print(f"Pitch stability completed in {elapsed:.1f}s ({elapsed/60:.1f} min)", flush=True)
+        if not os.path.exists(stab_file):
+            print(f"WARNING: current.aerocenter.stab not created - stability analysis may have failed", flush=True)
+            return False
+        return True
+
+class StandInBackend(SolverBackend):
+    """
+    Deterministic local stand-in for VSP: an analytic model writes the files
+    the vspscripts would, so the optimizer loop (workers, core scheduler,
+    watchdog, pipelined Tier 2) runs end to end without OpenVSP.
+    
+    update_geometry writes current.des; the cruise and pitch stages read it
+    back like VSP does. Aerodynamics come from the vortex lattice in vlm.py
+    with a skin-friction parasite drag, the MassProp CG from a fuselage /
+    systems mass plus wings and fins of constant density. Each stage sleeps
+    for its STANDIN_LATENCY, scaled by the cores it was given (Amdahl, with
+    STANDIN_PARALLEL_FRACTION), the fidelity level's wake iterations and
+    tessellation and the alphas solved. STANDIN_FAILURES makes a stage fail:
+    "error" (no output), "hang" (runs until the watchdog timeout; the
+    degraded retry succeeds) or "diverged" (cruise polar of NaN). Failures
+    and latency jitter are drawn from a hash of the design, stage and
+    STANDIN_SEED, so a design behaves the same every time it is evaluated.
+    """
+    name = "standin"
+    files_in_workdir = True
+
+    XCG = 314.25               # Moment reference: cruise.vspscript's manual CG
+    SKIN_FRICTION = 0.0055     # Turbulent flat plate, Re ~ 3e5
+    WETTED_RATIO = 2.04        # Wetted / planform area of a 12% thick section
+    FUSELAGE_WETTED = 35000.0  # mm^2
+    FUSELAGE_MASS = 400.0      # g - fuselage, EDF and systems
+    FUSELAGE_CG_X = 385.0      # mm - baseline static margin ~12%
+    SURFACE_DENSITY = 1.2e-4 * 0.12  # g/mm^3 x thickness ratio: mass per chord^2 per mm of span
+
+    def __init__(self, latency=None, failures=None, seed=None):
+        self.latency = dict(optimizer.STANDIN_LATENCY if latency is None else latency)
+        self.failures = dict(optimizer.STANDIN_FAILURES if failures is None else failures)
+        self.seed = optimizer.STANDIN_SEED if seed is None else seed
+
+    def _draw(self, x, key):
+        """Uniform [0, 1) number fixed by the design, key and seed."""
+        text = f"{self.seed}:{key}:" + ",".join(f"{float(v):.6f}" for v in x)
+        return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big") / 2.0 ** 64
+
+    def _failure(self, x, stage):
+        """Failure kind injected into this design's stage, or None."""
+        u = self._draw(x, stage)
+        total = 0.0
+        for key, rate in sorted(self.failures.items()):
+            key_stage, kind = key.split(":")
+            if key_stage == stage:
+                total += rate
+                if u < total:
+                    return kind
+        return None
+
+    def _run(self, x, stage, degraded, timeout, ncpu=None, work=1.0, hang=None):
+        """Sleep like the real stage would; raise SolverTimeout for an injected hang."""
+        ncpu = ncpu or optimizer.VSPAERO_NCPU
+        if hang is None:
+            hang = self._failure(x, stage) == "hang"
+        if hang and not degraded:
+            time.sleep(timeout)
+            raise optimizer.SolverTimeout(f"{stage} (stand-in) exceeded the {timeout:.0f}s watchdog timeout")
+        settings = optimizer.fidelity_settings(degraded)
+        work *= settings.get("WAKE_ITER", optimizer.VSPAERO_WAKE_ITER) / optimizer.VSPAERO_WAKE_ITER * settings.get("TESS_SCALE", 1.0) ** 2
+        p = optimizer.STANDIN_PARALLEL_FRACTION
+        scaling = ((1.0 - p) + p / ncpu) / ((1.0 - p) + p / optimizer.VSPAERO_NCPU)
+        jitter = 1.0 + optimizer.STANDIN_JITTER * (2.0 * self._draw(x, stage + ":latency") - 1.0)
+        seconds = self.latency.get(stage, 0.0) * work * scaling * jitter
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise optimizer.SolverTimeout(f"{stage} (stand-in) exceeded the {timeout:.0f}s watchdog timeout")
+        time.sleep(seconds)
+
+    def massprop_cg(self, x):
+        """CG x (mm) and total mass (g): fuselage, both wings and both fins."""
+        span, sweep, xloc, taper, tip = (float(v) for v in x[:5])
+        t, w = np.polynomial.legendre.leggauss(4)
+        t, w = 0.5 + 0.5 * t, 0.5 * w
+
+        def surface(length, root, tip_chord, le_root, tan_sweep):
+            chord = root + (tip_chord - root) * t
+            dm = 2.0 * self.SURFACE_DENSITY * length * w * chord ** 2
+            return dm.sum(), float(dm @ (le_root + length * t * tan_sweep + 0.42 * chord))
+
+        tan_sweep = np.tan(np.radians(sweep))
+        wing_mass, wing_moment = surface(span, tip / taper, tip, xloc, tan_sweep)
+        fin_mass, fin_moment = surface(vlm.FIN_SPAN, tip, vlm.FIN_TIP_CHORD, xloc + span * tan_sweep,
+                                       np.tan(np.radians(vlm.FIN_SWEEP_DEG)))
+        mass = self.FUSELAGE_MASS + wing_mass + fin_mass
+        return (self.FUSELAGE_MASS * self.FUSELAGE_CG_X + wing_moment + fin_moment) / mass, mass
+
+    def polar(self, x, alphas):
+        """VSPAero-style polar rows (label -> values) of design x at alphas."""
+        aero = vlm.solve(x, alphas=alphas, xref=self.XCG)
+        sref, cref = aero["sref"][0], aero["cref"][0]
+        fin_area = vlm.FIN_SPAN * (x[4] + vlm.FIN_TIP_CHORD) / 2.0
+        wetted = self.WETTED_RATIO * 2.0 * (sref + fin_area) + self.FUSELAGE_WETTED
+        cdo = np.full(len(alphas), self.SKIN_FRICTION * wetted / sref)
+        cl, cdi = aero["CL"][0], aero["CDi"][0]
+        cdtot = cdo + cdi
+        return {
+            "Alpha": alphas, "CLtot": cl, "CDi": cdi, "CDo": cdo, "CDtot": cdtot,
+            "L_D": -cl / cdtot,  # VSPAero reports L/D negative
+            "CMytot": aero["CMy"][0], "FC_Sref_": [sref], "FC_Cref_": [cref], "FC_Xcg_": [self.XCG],
+        }
+
+    def update_geometry(self, x, workdir):
+        def attempt(degraded, timeout):
+            if self._failure(x, "update_geom") == "error":
+                raise RuntimeError("update_geom.vspscript failed (stand-in)")
+            self._run(x, "update_geom", degraded, timeout)
+            optimizer.write_des_from_x(x, os.path.join(workdir, "current.des"))
+        optimizer.run_watched_stage("update_geom", attempt)
+
+    def run_cruise(self, workdir):
+        x = optimizer.read_des_file(os.path.join(workdir, "current.des"))
+        results_csv = os.path.join(workdir, optimizer.RESULTS_CSV)
+        massprop_csv = os.path.join(workdir, "MassProp_Results.csv")
+        for path in (results_csv, massprop_csv):
+            if os.path.exists(path):
+                os.remove(path)  # never read another design's results
+        failure = self._failure(x, "cruise")
+        stage = optimizer.fidelity_stage("cruise")
+        massprop = getattr(optimizer._worker_state, "run_massprop", True)
+        elapsed = 0.0
+        hang = failure == "hang"  # only the first sweep of the design hangs
+
+        def run_sweep(alpha_start, alpha_end, npts):
+            nonlocal elapsed, massprop, hang
+            alphas = np.linspace(alpha_start, alpha_end, npts)
+
+            def attempt(degraded, timeout):
+                self._run(x, "cruise", degraded, timeout, cores.ncpu, npts / len(optimizer.SWEEP_ALPHAS), hang)
+                if failure == "error":
+                    raise RuntimeError("No Results.csv produced (stand-in)")
+                rows = self.polar(x, alphas)
+                if failure == "diverged":
+                    rows.update({label: np.full(npts, np.nan) for label in ("CLtot", "CDtot", "L_D", "CMytot")})
+                with open(results_csv, "w") as f:
+                    f.write("Results_Name,VSPAERO_Polar\n")
+                    for label, values in rows.items():
+                        f.write(label + "," + ",".join(f"{v:.10f}" for v in values) + "\n")
+
+            start = time.time()
+            optimizer.run_watched_stage(stage, attempt)
+            elapsed += time.time() - start
+            hang = False
+            if massprop:
+                with optimizer.trace_span("massprop", "solver"):
+                    cg_x, mass = self.massprop_cg(x)
+                    with open(massprop_csv, "w") as f:
+                        f.write("Results_Name,Mass_Properties\n")
+                        f.write(f"Total_Mass,{mass:.10f}\n")
+                        f.write(f"Total_CG,{cg_x:.10f},0.0000000000,0.0000000000\n")
+                massprop = False
+            return optimizer.ResultsTable.from_csv(results_csv)
+
+        with optimizer.solver_cores(stage) as cores:
+            if optimizer.ADAPTIVE_ALPHA:
+                results = optimizer.adaptive_alpha_sweep(run_sweep)[0]
+            else:
+                run_sweep(optimizer.SWEEP_ALPHAS[0], optimizer.SWEEP_ALPHAS[-1], len(optimizer.SWEEP_ALPHAS))
+                results = results_csv
+        print(f"VSPAERO run completed in {elapsed:.1f}s ({elapsed/60:.1f} min) [stand-in]", flush=True)
+        return results, elapsed
+
+    def run_pitch(self, workdir):
+        x = optimizer.read_des_file(os.path.join(workdir, "current.des"))
+        stab_file = os.path.join(workdir, "current.aerocenter.stab")
+        if os.path.exists(stab_file):
+            os.remove(stab_file)
+        stage = optimizer.fidelity_stage("pitch")
+        print(f"[TIER 2] Running pitch stability analysis (single alpha = 8 deg) [stand-in]...", flush=True)
+
+        def attempt(degraded, timeout):
+            self._run(x, "pitch", degraded, timeout, cores.ncpu)
+            if self._failure(x, "pitch") == "error":
+                return
+            xnp = vlm.solve(x, xref=self.XCG)["xnp"][0]
+            with open(stab_file, "w") as f:
+                f.write("# Stand-in pitch stability (vlm.py)\n")
+                f.write(f"Aerodynamic Center is at: ( {xnp:.6f}, 0.000000, 0.000000)\n")
+
+        with optimizer.solver_cores(stage) as cores:
+            optimizer.run_watched_stage(stage, attempt)
+        if not os.path.exists(stab_file):
+            print(f"WARNING: current.aerocenter.stab not created - stability analysis may have failed", flush=True)
+            return False
+        return True
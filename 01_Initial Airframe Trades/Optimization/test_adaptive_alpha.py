@@ -0,0 +1,117 @@
+"""
+Test for the adaptive alpha sweep (optimizer2.adaptive_alpha_sweep).
+
+Uses the fake `vsp` executable from test_parallel_eval.py (which honors the
+ALPHA_START / ALPHA_END / ALPHA_NPTS script settings) and the mock openvsp
+module from test_solver_backends.py:
+- Band L/D, the objective and the energies match the full 7-point sweep
+- Fewer solver points per design, logged in the alpha_points column
+- Refinement follows the L/D peak wherever it lies on the grid
+- Works for the two-launch, fused (with and without current.vsp3) and API paths
+
+Run directly (python test_adaptive_alpha.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, gate_passing_population
+from test_solver_backends import MockOpenVSP
+
+def evaluate(population, tmp, adaptive, backend=None):
+    setup_optimizer(tmp)
+    if backend is not None:
+        optimizer2.set_solver_backend(backend)
+    optimizer2.ADAPTIVE_ALPHA = adaptive
+    pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+    try:
+        return pool(optimizer2.evaluate_design, population), read_history()
+    finally:
+        pool.close()
+        optimizer2.ADAPTIVE_ALPHA = False
+        optimizer2.set_solver_backend(None)
+
+def synthetic_sweep(peak_alpha, calls):
+    """run_sweep stand-in with a parabolic L/D polar peaking at peak_alpha."""
+    def run_sweep(alpha_start, alpha_end, npts):
+        alphas = np.linspace(alpha_start, alpha_end, npts)
+        calls.append(list(alphas))
+        ld = -(12.0 - 0.05 * (alphas - peak_alpha) ** 2)
+        rows = {
+            "L_D": ["L_D"] + [f"{v:.6f}" for v in ld],
+            "CMytot": ["CMytot"] + [f"{-0.01 * a:.6f}" for a in alphas],
+            "FC_Cref_": ["FC_Cref_", "137.88"],
+        }
+        return optimizer2.ResultsTable(rows, optimizer2.RESULTS_CSV)
+    return run_sweep
+
+def test_refinement_follows_the_peak():
+    grid = optimizer2.SWEEP_ALPHAS
+    for peak_alpha in grid:
+        calls = []
+        merged, points = optimizer2.adaptive_alpha_sweep(synthetic_sweep(peak_alpha, calls))
+        full = synthetic_sweep(peak_alpha, [])(grid[0], grid[-1], len(grid))
+
+        assert points == sum(len(c) for c in calls) < len(grid), (peak_alpha, calls)
+        band, center, curve = optimizer2.extract_band_ld(merged)
+        full_band, full_center, _ = optimizer2.extract_band_ld(full)
+        assert abs(band - full_band) < 1e-9 and center == full_center, peak_alpha
+        # Unsolved alphas are gaps, never zeros
+        assert np.isfinite(curve).sum() == points
+        # CMytot is merged on the same grid
+        cm = [float(v) for v in merged.row("CMytot")[1:]]
+        assert all(np.isnan(c) or abs(c + 0.01 * a) < 1e-9 for a, c in zip(grid, cm))
+        assert merged.row("FC_Cref_") == ["FC_Cref_", "137.88"]
+
+def test_adaptive_matches_full_sweep():
+    population = gate_passing_population(3, seed=40) + random_population(3, seed=40)
+    try:
+        for fused, write_vsp3 in [(False, True), (True, True), (True, False)]:
+            optimizer2.USE_FUSED_SCRIPT = fused
+            optimizer2.FUSED_WRITE_VSP3 = write_vsp3
+            with tempfile.TemporaryDirectory() as tmp:
+                full_energies, full_rows = evaluate(population, tmp, adaptive=False)
+            with tempfile.TemporaryDirectory() as tmp:
+                energies, rows = evaluate(population, tmp, adaptive=True)
+
+            np.testing.assert_allclose(energies, full_energies)
+            for row, full_row in zip(rows, full_rows):
+                assert row["band_LD"] == full_row["band_LD"]
+                assert row["xnp"] == full_row["xnp"]
+                assert int(full_row["alpha_points"]) == 7
+                assert int(row["alpha_points"]) == 5  # fake polar peaks at 8 deg: 4, 8, 12 + 6, 10
+                assert row["ld_at_2deg"] == "N/A" and row["ld_at_8deg"] == full_row["ld_at_8deg"]
+    finally:
+        optimizer2.USE_FUSED_SCRIPT = False
+        optimizer2.FUSED_WRITE_VSP3 = True
+
+def test_adaptive_api_backend():
+    population = random_population(4, seed=41)
+    with tempfile.TemporaryDirectory() as tmp:
+        full_energies, _ = evaluate(population, tmp, False, optimizer2.OpenVSPAPIBackend(MockOpenVSP()))
+    with tempfile.TemporaryDirectory() as tmp:
+        energies, rows = evaluate(population, tmp, True, optimizer2.OpenVSPAPIBackend(MockOpenVSP()))
+    np.testing.assert_allclose(energies, full_energies)
+    assert all(int(row["alpha_points"]) == 5 for row in rows)
+
+if __name__ == "__main__":
+    tests = [
+        test_refinement_follows_the_peak,
+        test_adaptive_matches_full_sweep,
+        test_adaptive_api_backend,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
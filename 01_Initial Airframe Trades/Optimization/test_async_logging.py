@@ -0,0 +1,262 @@
+"""
+Test for the buffered output log and the JSON-lines event log
+(optimizer2.LogWriter / TeeOutput, optimizer_events.jsonl).
+
+No VSP needed:
+- The log holds exactly what went to the console, written by the
+  background thread with a handful of flushes instead of one per print,
+  and printing through the tee is faster than flushing the file every write
+- The log and the event log are rotated past max_bytes into gzipped
+  backups, keeping at most `backups` of them; --resume appends to them
+- Printed lines at or above the event level become "log" events with their
+  [TAG] (partial lines joined, stderr lines are errors); log_event adds
+  structured events
+- Evaluations on the stand-in backend log an "evaluation" event per history
+  row, failures at warning level
+
+Run directly (python test_async_logging.py) or under pytest.
+"""
+
+import os
+import io
+import sys
+import gzip
+import json
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history, gate_passing_population
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+class SlowFlushFile:
+    """File wrapper counting flush() calls, each costing `delay` seconds like a disk write."""
+    def __init__(self, f, delay=0.0):
+        self.f = f
+        self.delay = delay
+        self.flushes = 0
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def flush(self):
+        self.flushes += 1
+        time.sleep(self.delay)
+        self.f.flush()
+
+class FlushEachTee:
+    """The previous TeeOutput: the log file written and flushed on every write."""
+    def __init__(self, file_path, console, delay):
+        self.file = SlowFlushFile(open(file_path, "w", encoding="utf-8"), delay)
+        self.stdout = console
+
+    def write(self, text):
+        self.stdout.write(text)
+        self.file.write(text)
+        self.file.flush()
+
+    def flush(self):
+        self.stdout.flush()
+        self.file.flush()
+
+def tee_to(console, log_path, event_path=None, **options):
+    saved = sys.stdout
+    sys.stdout = console
+    try:
+        return optimizer2.TeeOutput(log_path, event_path, **options)
+    finally:
+        sys.stdout = saved
+
+def test_log_matches_console_with_few_flushes():
+    lines = [f"[EVAL {i}] obj={i * 0.5:.3f} band_LD=12.{i % 10}" for i in range(2000)]
+    delay = 1e-4
+    with tempfile.TemporaryDirectory() as tmp:
+        console = io.StringIO()
+        tee = tee_to(console, os.path.join(tmp, "run.log"), flush_interval=10.0)
+        tee.writer.log.file = counter = SlowFlushFile(tee.writer.log.file, delay)
+        start = time.perf_counter()
+        for line in lines:
+            print(line, file=tee, flush=True)
+        buffered_s = time.perf_counter() - start
+        tee.close()
+        tee.close()  # idempotent
+        with open(tee.writer.log.path) as f:
+            logged = f.read()
+
+        old = FlushEachTee(os.path.join(tmp, "flush_each.log"), io.StringIO(), delay)
+        start = time.perf_counter()
+        for line in lines:
+            print(line, file=old, flush=True)
+        flush_each_s = time.perf_counter() - start
+        old.file.close()
+
+    assert logged == console.getvalue() == "".join(line + "\n" for line in lines)
+    assert counter.flushes <= 3, counter.flushes  # the close() flush, not one per print
+    assert old.file.flushes == 3 * len(lines)  # text, newline, flush=True
+    # The print loop no longer waits for the disk
+    assert buffered_s < 0.2 * flush_each_s, (buffered_s, flush_each_s)
+
+def test_sync_and_interval_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        tee = tee_to(io.StringIO(), os.path.join(tmp, "run.log"), flush_interval=0.05)
+        tee.write("first\n")
+        assert tee.writer.sync(5.0)
+        with open(tee.writer.log.path) as f:
+            assert f.read() == "first\n"
+        tee.write("second\n")
+        time.sleep(0.3)  # written by the interval flush, no sync
+        with open(tee.writer.log.path) as f:
+            assert f.read() == "first\nsecond\n"
+        tee.close()
+
+def test_rotation_keeps_gzipped_backups():
+    line = "x" * 99 + "\n"
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "run.log")
+        event_path = os.path.join(tmp, "events.jsonl")
+        tee = tee_to(io.StringIO(), log_path, event_path, max_bytes=1000, backups=2)
+        written = []
+        for i in range(5):
+            chunk = [f"{i}{line}"] * 12  # 1212 bytes: one rotation per sync
+            written.extend(chunk)
+            tee.write("".join(chunk))
+            tee.writer.event("chunk", index=i, padding="y" * 200)
+            tee.writer.sync()
+        tee.close()
+        files = sorted(os.listdir(tmp))
+        with gzip.open(log_path + ".1.gz", "rt") as f:
+            newest = f.read()
+        with gzip.open(log_path + ".2.gz", "rt") as f:
+            older = f.read()
+        with open(log_path) as f:
+            current = f.read()
+        with gzip.open(event_path + ".1.gz", "rt") as f:
+            events = [json.loads(line) for line in f]
+        remaining = read_events(event_path)
+
+    # Five log rotations, two backups kept; the events (~290 bytes each) rotated once
+    assert files == ["events.jsonl", "events.jsonl.1.gz", "run.log", "run.log.1.gz", "run.log.2.gz"]
+    assert tee.writer.log.rotations == 5 and tee.writer.events.rotations == 1 and current == ""
+    assert newest == "".join(written[-12:]) and older == "".join(written[-24:-12])
+    assert [e["index"] for e in events] == [0, 1, 2, 3] and [e["index"] for e in remaining] == [4]
+
+def test_resume_appends_to_logs():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "run.log")
+        event_path = os.path.join(tmp, "events.jsonl")
+        tee = tee_to(io.StringIO(), log_path, event_path)
+        tee.write("[EVAL 1] before the crash\n")
+        tee.writer.event("run_start", resume=False)
+        tee.close()
+
+        # --resume: the interrupted run's output stays in front of the new one
+        tee = tee_to(io.StringIO(), log_path, event_path, append=True, max_bytes=40, backups=1)
+        tee.write("[EVAL 2] after resume\n")
+        tee.writer.event("run_start", resume=True)
+        tee.writer.sync()
+        tee.close()
+        with gzip.open(log_path + ".1.gz", "rt") as f:
+            rotated = f.read()
+        events = [json.loads(line) for line in gzip.open(event_path + ".1.gz", "rt")]
+
+    assert rotated == "[EVAL 1] before the crash\n[EVAL 2] after resume\n"
+    assert [e["resume"] for e in events] == [False, True]
+    assert "debug" not in optimizer2.LOG_LEVELS
+
+def test_event_stream():
+    with tempfile.TemporaryDirectory() as tmp:
+        event_path = os.path.join(tmp, "events.jsonl")
+        console = io.StringIO()
+        tee = tee_to(console, os.path.join(tmp, "run.log"), event_path, event_level="warning")
+        errors = tee.errors()
+        tee.write("[EVAL 1] obj=1.0\n")
+        tee.write("  [SM] WARNING: static ")  # one line in three writes
+        tee.write("margin 3.1%")
+        worker = threading.Thread(target=lambda: tee.write("[POOL] worker line\n"), name="worker-1")
+        worker.start()
+        worker.join()
+        tee.write(" below target\n")
+        tee.write("[VSP] Cruise FAILED (returncode 1)\n")
+        errors.write("Traceback (most recent call last):\n")
+        tee.writer.event("generation", generation=3, best_objective=None)
+        tee.writer.event("evaluation", "warning", iter=7, final_obj=float("nan"))
+        tee.close()
+        events = read_events(event_path)
+        with open(os.path.join(tmp, "run.log")) as f:
+            logged = f.read()
+
+    assert logged == console.getvalue() and "Traceback" in logged
+    logs = [e for e in events if e["event"] == "log"]
+    assert [(e["level"], e["tag"]) for e in logs] == [("warning", "SM"), ("warning", "VSP"), ("error", None)]
+    assert logs[0]["message"] == "[SM] WARNING: static margin 3.1% below target"
+    assert all(e["thread"] == "MainThread" for e in logs)
+    generation = next(e for e in events if e["event"] == "generation")
+    assert generation["generation"] == 3 and generation["best_objective"] is None and generation["level"] == "info"
+    assert next(e for e in events if e["event"] == "evaluation")["level"] == "warning"
+    assert [e["event"] for e in events][-2:] == ["generation", "evaluation"]
+
+    # Info level: every printed line is an event
+    with tempfile.TemporaryDirectory() as tmp:
+        event_path = os.path.join(tmp, "events.jsonl")
+        tee = tee_to(io.StringIO(), os.path.join(tmp, "run.log"), event_path, event_level="info")
+        tee.write("[EVAL 1] obj=1.0\n\n")
+        tee.close()
+        assert [(e["level"], e["tag"]) for e in read_events(event_path)] == [("info", "EVAL 1")]
+
+def test_optimizer_evaluation_events():
+    population = gate_passing_population(6, seed=125)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        optimizer2.set_solver_backend(optimizer2.StandInBackend(failures={"cruise:error": 0.3}, seed=5))
+        event_path = os.path.join(tmp, "events.jsonl")
+        writer = optimizer2.LogWriter(os.path.join(tmp, "run.log"), event_path)
+        optimizer2.log_writer = writer
+        pool = optimizer2.SandboxPool(2, root=os.path.join(tmp, "sandboxes"))
+        try:
+            pool(optimizer2.evaluate_design, population)
+            optimizer2.log_event("generation", generation=1, evaluations=optimizer2.eval_counter)
+        finally:
+            pool.close()
+            optimizer2.log_writer = None
+            writer.close()
+        optimizer2.log_event("ignored")  # no log: no-op
+        events = read_events(event_path)
+        rows = read_history()
+
+    evaluations = [e for e in events if e["event"] == "evaluation"]
+    assert sorted(e["iter"] for e in evaluations) == sorted(int(row["iter"]) for row in rows) == list(range(1, 7))
+    by_iter = {e["iter"]: e for e in evaluations}
+    for row in rows:
+        event = by_iter[int(row["iter"])]
+        assert event["failure_class"] == row["failure_class"] and event["generation"] == int(row["generation"])
+        if row["failure_class"] == "cruise_error":
+            assert event["level"] == "warning" and event["band_LD"] is None
+        else:
+            assert event["level"] == "info" and event["band_LD"] == float(row["band_LD"])
+    assert any(e["level"] == "warning" for e in evaluations)
+    assert events[-1]["event"] == "generation" and events[-1]["evaluations"] == 6
+
+if __name__ == "__main__":
+    tests = [
+        test_log_matches_console_with_few_flushes,
+        test_sync_and_interval_flush,
+        test_rotation_keeps_gzipped_backups,
+        test_resume_appends_to_logs,
+        test_event_stream,
+        test_optimizer_evaluation_events,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
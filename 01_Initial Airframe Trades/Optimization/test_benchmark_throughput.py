@@ -0,0 +1,100 @@
+"""
+Test for the optimization loop throughput benchmark (benchmark_throughput.py).
+
+Runs short benchmarks on the stand-in backend:
+- The evaluation count is the baseline plus every DE trial, and evals/hour,
+  solver time and the overhead parts agree with the stand-in latency
+- The JSON result round-trips, and --compare flags a slower run
+- The optimizer's output paths and settings are restored afterwards, and
+  nothing is written outside the temporary directory
+
+Run directly (python test_benchmark_throughput.py) or under pytest.
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+import benchmark_throughput
+
+LATENCY = {"update_geom": 0.0, "cruise": 0.05, "pitch": 0.02}
+# popsize=1: one member per free design variable (ctrl is fixed), at least 5
+MEMBERS = max(5, sum(lower < upper for lower, upper in optimizer2.DESIGN_BOUNDS))
+
+def script_dir_files():
+    """Modification time of every file in the optimizer directory."""
+    directory = optimizer2.SCRIPT_DIR
+    return {name: os.stat(os.path.join(directory, name)).st_mtime
+            for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name))}
+
+def test_serial_run_metrics():
+    before = {name: getattr(optimizer2, name) for name in benchmark_throughput.CONFIG_NAMES}
+    files = script_dir_files()
+    results = benchmark_throughput.run_benchmark(LATENCY, popsize=1, generations=2)
+
+    # Baseline + initial population + 2 generations of trials
+    assert results["evaluations"] == 1 + MEMBERS * 3
+    assert abs(results["evals_per_hour"] - results["evaluations"] * 3600.0 / results["wall_s"]) < 1e-6
+    assert 0.0 < results["time_to_first_eval_s"] < results["wall_s"]
+    # Every design past the gate also runs the pitch stage, within the +-10% jitter
+    assert 0.9 * 0.05 <= results["solver_s_per_eval"] <= 1.1 * 0.07 + 0.05
+    overhead = results["overhead_ms_per_eval"]
+    assert set(overhead) == set(benchmark_throughput.OVERHEAD_PARTS) | {"total"}
+    assert all(ms >= 0.0 for ms in overhead.values())
+    assert abs(overhead["total"] - sum(ms for part, ms in overhead.items() if part != "total")) < 1e-9
+    assert results["overhead_calls"]["des_write"] == results["evaluations"]
+    assert results["overhead_calls"]["other"] == results["evaluations"]
+    # Serial evaluation: overhead + solver account for the wall time
+    accounted = results["evaluations"] * (results["solver_s_per_eval"] + overhead["total"] / 1000.0)
+    assert 0.9 * results["wall_s"] < accounted <= results["wall_s"]
+    assert results["peak_rss_mb"] is None or results["peak_rss_mb"] > 0
+
+    assert {name: getattr(optimizer2, name) for name in benchmark_throughput.CONFIG_NAMES} == before
+    assert script_dir_files() == files
+    assert optimizer2.write_des_from_x.__name__ == "write_des_from_x"
+    assert optimizer2.ResultsTable.from_csv.__func__.__name__ == "from_csv"
+
+def test_parallel_run():
+    files = script_dir_files()
+    results = benchmark_throughput.run_benchmark(LATENCY, workers=3, tier2_workers=1, popsize=1, generations=1)
+    assert script_dir_files() == files
+    assert results["evaluations"] == 1 + MEMBERS * 2
+    assert results["overhead_calls"]["tier2_handoff"] > 0
+    # Three solver jobs at a time: the wall time is well below the serial solver time
+    assert results["wall_s"] < 0.8 * results["evaluations"] * results["solver_s_per_eval"]
+
+def test_json_and_compare():
+    results = benchmark_throughput.run_benchmark(LATENCY, popsize=1, generations=1)
+    slower = json.loads(json.dumps(results))
+    slower["evals_per_hour"] *= 0.5
+    slower["overhead_ms_per_eval"]["parsing"] += 5.0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.json")
+        benchmark_throughput.write_results(results, path)
+        with open(path) as f:
+            assert json.load(f) == json.loads(json.dumps(results))
+
+    rows = {row[0]: row for row in benchmark_throughput.compare_results(slower, results)}
+    assert rows["evals_per_hour"][-1] and rows["overhead_ms_per_eval.parsing"][-1]
+    assert not rows["overhead_ms_per_eval.des_write"][-1]
+    assert not any(row[-1] for row in benchmark_throughput.compare_results(results, results))
+
+if __name__ == "__main__":
+    tests = [
+        test_serial_run_metrics,
+        test_parallel_run,
+        test_json_and_compare,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,155 @@
+"""
+Test for the nearest-neighbour CG cache (optimizer2.CGCache).
+
+Uses fake_cg (the component-mass CG of the fake `vsp` executable in
+test_parallel_eval.py) as the MassProp result:
+- Exact designs are hits, designs between cached neighbours are interpolated
+  within the estimated error, designs too far away or in a steep neighbourhood
+  are misses
+- Least recently used designs are evicted one at a time instead of clearing
+  the whole cache
+- The cache survives a save/load round trip, but not a change of inputs
+- New MassProp results are checked against the interpolation (statistics)
+- A design next to an evaluated one gets its CG from the cache without MassProp
+
+Run directly (python test_cg_cache.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history, fake_cg
+
+BASE = np.array([350.0, 20.0, 300.0, 0.8, 110.0, 0.22])
+TOL = np.array(optimizer2._cg_cache_tolerances)
+
+def true_cg(x):
+    return fake_cg(*x[:5])
+
+def neighbourhood():
+    """BASE and designs half a tolerance step away along each parameter."""
+    designs = [BASE.copy()]
+    for i in range(5):
+        for sign in (-1.0, 1.0):
+            x = BASE.copy()
+            x[i] += sign * 0.5 * TOL[i]
+            designs.append(x)
+    return designs
+
+def test_exact_interpolated_and_missed_lookups():
+    cache = optimizer2.CGCache()
+    for x in neighbourhood()[1:]:
+        cache.put(x, true_cg(x))
+
+    # Exact design
+    x = neighbourhood()[1]
+    assert cache.get(x) == true_cg(x)
+    # Between the neighbours: interpolated, close to MassProp
+    cg = cache.get(BASE)
+    assert cg is not None and abs(cg - true_cg(BASE)) < optimizer2.CG_CACHE_MAX_ERROR_MM
+    # Far from every cached design
+    assert cache.get(BASE + 5.0 * TOL) is None
+    assert (cache.hits, cache.interpolated, cache.misses) == (1, 1, 1)
+
+    # Neighbours that disagree more than the tolerance allows
+    steep = optimizer2.CGCache()
+    steep.put(BASE, 300.0)
+    steep.put(BASE + 0.8 * TOL * np.eye(6)[2], 303.0)
+    assert steep.get(BASE + 0.4 * TOL * np.eye(6)[2]) is None
+
+    # A single neighbour one full step away is the old tolerance box's limit
+    single = optimizer2.CGCache()
+    single.put(BASE, 300.0)
+    assert single.get(BASE + 0.9 * TOL * np.eye(6)[0]) == 300.0
+    assert single.get(BASE + 1.1 * TOL * np.eye(6)[0]) is None
+
+def test_lru_eviction():
+    cache = optimizer2.CGCache(max_size=3)
+    designs = [BASE + 10.0 * i * TOL for i in range(4)]
+    for x in designs[:3]:
+        cache.put(x, true_cg(x))
+    assert cache.get(designs[0]) is not None  # now the most recently used
+    cache.put(designs[3], true_cg(designs[3]))
+
+    assert len(cache) == 3
+    assert cache.get(designs[1]) is None  # evicted
+    assert all(cache.get(x) is not None for x in (designs[0], designs[2], designs[3]))
+
+def test_save_and_load():
+    designs = neighbourhood()
+    cache = optimizer2.CGCache()
+    for x in designs:
+        cache.put(x, true_cg(x))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cg_cache.json")
+        cache.save(path, "inputs-a")
+
+        loaded = optimizer2.CGCache()
+        assert loaded.load(path, "inputs-a") == len(designs)
+        assert list(loaded.entries) == list(cache.entries)  # LRU order kept
+        assert all(loaded.get(x) == true_cg(x) for x in designs)
+        assert loaded.errors == []
+
+        # baseline.vsp3 or a vspscript changed
+        assert optimizer2.CGCache().load(path, "inputs-b") == 0
+        assert optimizer2.CGCache().load(os.path.join(tmp, "missing.json"), "inputs-a") == 0
+
+def test_interpolation_error_statistics():
+    designs = neighbourhood()
+    cache = optimizer2.CGCache()
+    for x in designs[1:]:
+        cache.put(x, true_cg(x))
+    cache.put(BASE, true_cg(BASE))  # checked against the interpolation first
+
+    assert len(cache.errors) == len(designs) - 1  # the first design had no neighbours
+    real, estimated = np.array(cache.errors).T
+    assert np.all(real <= estimated)
+    summary = cache.summary()
+    assert f"{len(designs)} designs" in summary and "within the estimate 100%" in summary
+
+def test_nearby_design_skips_massprop():
+    nearby = BASE + 0.3 * TOL
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            log = os.path.join(tmp, "massprop_runs.log")
+            os.environ["FAKE_VSP_MASSPROP_LOG"] = log
+            pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+            try:
+                pool(optimizer2.evaluate_design, [BASE, nearby])
+            finally:
+                pool.close()
+            rows = read_history()
+            with open(log) as f:
+                massprop_runs = len(f.readlines())
+    finally:
+        os.environ["FAKE_VSP_MASSPROP_LOG"] = ""
+
+    assert massprop_runs == 1
+    assert [row["cg_source"] for row in rows] == ["massprop", "cache"]
+    assert abs(float(rows[1]["cg_x"]) - true_cg(nearby)) < optimizer2.CG_CACHE_MAX_ERROR_MM
+    assert optimizer2._cg_cache.interpolated == 1
+
+if __name__ == "__main__":
+    tests = [
+        test_exact_interpolated_and_missed_lookups,
+        test_lru_eviction,
+        test_save_and_load,
+        test_interpolation_error_statistics,
+        test_nearby_design_skips_massprop,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
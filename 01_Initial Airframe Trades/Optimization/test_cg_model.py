@@ -0,0 +1,157 @@
+"""
+Test for the analytic CG model (optimizer2.CGModel) that skips MassProp.
+
+Uses the fake `vsp` executable from test_parallel_eval.py, whose MassProp CG
+comes from a fuselage, two solid wings and a fin (fake_cg), and which only
+writes MassProp_Results.csv when the script asks for it:
+- The component-mass fit recovers that CG, and its predicted error grows
+  away from the sampled designs
+- Once fitted, designs it is sure of skip MassProp (RUN_MASSPROP = false),
+  are logged with cg_source = model and score like the MassProp path
+- The batch script runs MassProp only for the designs the model isn't sure of
+- The model waits for CG_MODEL_MIN_SAMPLES, --no-cg-model turns it off, and
+  a resumed run reloads its training data from opt_history.csv
+
+Run directly (python test_cg_model.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, fake_cg, evaluate
+
+def massprop_cgs(population):
+    return np.array([fake_cg(*x[:5]) for x in population])
+
+def count_massprop_runs(log):
+    if not os.path.exists(log):
+        return 0
+    with open(log) as f:
+        return len(f.readlines())
+
+def setup_with_log(tmp):
+    setup_optimizer(tmp)
+    log = os.path.join(tmp, "massprop_runs.log")
+    os.environ["FAKE_VSP_MASSPROP_LOG"] = log
+    return log
+
+def test_fit_recovers_component_masses():
+    train = random_population(20, seed=60)
+    model = optimizer2.CGModel().fit(train, massprop_cgs(train))
+    assert model.k == 2 and model.n_samples == 20
+    assert model.loo_rmse < 0.01, model.loo_rmse
+
+    test = random_population(10, seed=61)
+    cg, error = model.predict(test)
+    assert np.max(np.abs(cg - massprop_cgs(test))) < 0.01
+    assert np.all(error < optimizer2.CG_MODEL_MAX_ERROR_MM)
+
+    # Far outside the sampled box the expected error is larger
+    far = [np.array([900.0, 60.0, 150.0, 0.3, 220.0, 0.22])]
+    _, far_error = model.predict(far)
+    assert far_error[0] > 5.0 * np.max(error)
+
+def test_model_skips_massprop():
+    train = random_population(optimizer2.CG_MODEL_MIN_SAMPLES, seed=62)
+    population = random_population(5, seed=63)
+    saved = optimizer2.CG_MODEL_ENABLED
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_with_log(tmp)
+            optimizer2.CG_MODEL_ENABLED = False
+            expected = evaluate(population, tmp)
+        with tempfile.TemporaryDirectory() as tmp:
+            log = setup_with_log(tmp)
+            optimizer2.CG_MODEL_ENABLED = True
+            evaluate(train, tmp)
+            assert count_massprop_runs(log) == len(train)
+            assert optimizer2.retrain_cg_model() is optimizer2.cg_model is not None
+            energies = evaluate(population, tmp)
+            rows = read_history()[len(train):]
+            with open(os.path.join(tmp, "sandboxes", "worker_00", "cruise_gen.vspscript")) as f:
+                script = f.read()
+            massprop_runs = count_massprop_runs(log)
+    finally:
+        optimizer2.CG_MODEL_ENABLED = saved
+        os.environ["FAKE_VSP_MASSPROP_LOG"] = ""
+
+    assert massprop_runs == len(train)
+    assert "const bool RUN_MASSPROP = false;" in script
+    assert [row["cg_source"] for row in rows] == ["model"] * len(population)
+    np.testing.assert_allclose([float(row["cg_x"]) for row in rows], massprop_cgs(population), atol=0.05)
+    np.testing.assert_allclose(energies, expected, rtol=1e-4)
+    assert optimizer2.cg_model_skips == len(population)
+
+def test_batch_runs_massprop_where_needed():
+    train = random_population(optimizer2.CG_MODEL_MIN_SAMPLES, seed=64)
+    # Two designs far outside the training box still need MassProp
+    population = random_population(3, seed=65) + [
+        np.array([700.0, 55.0, 180.0, 0.35, 200.0, 0.22]),
+        np.array([650.0, 50.0, 200.0, 0.4, 190.0, 0.22]),
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log = setup_with_log(tmp)
+            evaluate(train, tmp)
+            # The fake's CG is exactly the model's form; give it a real solver's scatter
+            optimizer2.retrain_cg_model().loo_rmse = 0.1
+            batch = optimizer2.BatchEvaluator(root=os.path.join(tmp, "sandboxes"))
+            batch(np.array(population).T)
+            rows = read_history()[len(train):]
+            with open(os.path.join(batch.workdir, "batch_cruise_gen.vspscript")) as f:
+                script = f.read()
+            massprop_runs = count_massprop_runs(log)
+    finally:
+        os.environ["FAKE_VSP_MASSPROP_LOG"] = ""
+
+    assert 'const string MASSPROP_DESIGNS = "00011";' in script
+    assert massprop_runs == len(train) + 2
+    assert [row["cg_source"] for row in rows] == ["model"] * 3 + ["massprop"] * 2
+    np.testing.assert_allclose([float(row["cg_x"]) for row in rows], massprop_cgs(population), atol=0.05)
+
+def test_min_samples_disable_and_resume():
+    train = random_population(optimizer2.CG_MODEL_MIN_SAMPLES, seed=66)
+    saved = optimizer2.CG_MODEL_ENABLED
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            evaluate(train[:5], tmp)
+            assert optimizer2.retrain_cg_model() is None  # too few MassProp results
+            evaluate(train[5:], tmp)
+
+            optimizer2.CG_MODEL_ENABLED = False  # --no-cg-model
+            assert optimizer2.retrain_cg_model() is None
+            assert optimizer2.known_cgs(random_population(3, seed=67))[1] == [None] * 3
+
+            # --resume: the history holds every MassProp result
+            optimizer2.CG_MODEL_ENABLED = True
+            optimizer2._massprop_samples.clear()
+            assert optimizer2.load_massprop_samples() == len(train)
+            model = optimizer2.retrain_cg_model()
+    finally:
+        optimizer2.CG_MODEL_ENABLED = saved
+
+    assert model is not None and model.n_samples == len(train)
+
+if __name__ == "__main__":
+    tests = [
+        test_fit_recovers_component_masses,
+        test_model_skips_massprop,
+        test_batch_runs_massprop_where_needed,
+        test_min_samples_disable_and_resume,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,193 @@
+"""
+Test for checkpoint/resume of the differential evolution run.
+
+Uses the fake `vsp` executable from test_parallel_eval.py and a small
+population (DE_POPSIZE=1 -> 5 members):
+- A run stopped after generation 1 and resumed from optimizer_checkpoint.json
+  ends with exactly the same best design, energies and evaluation count as an
+  uninterrupted run (population, energies and RNG state are restored)
+- Without a checkpoint, --resume rebuilds the population from opt_history.csv
+  and keeps numbering evaluations after the last logged one
+- SciPy DE internals the checkpoint needs are checked up front; a checkpoint
+  whose sampler state this SciPy can't restore stops with a clear error
+
+Run directly (python test_checkpoint_resume.py) or under pytest.
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history
+
+BOUNDS = [(275.0, 480.0), (0.0, 40.0), (220.0, 340.0), (0.6, 0.9), (95.0, 125.0), (0.22, 0.22)]
+
+def setup_run(tmp):
+    setup_optimizer(tmp)
+    optimizer2.use_serial_sandbox(os.path.join(tmp, "sandboxes"))  # serial DE, not in the script directory
+    optimizer2.DE_POPSIZE = 1
+    optimizer2.DE_MAXITER = 3
+    optimizer2.DE_SEED = 42
+    optimizer2.DE_TOL = 0.0  # never stop early on convergence
+    optimizer2.CHECKPOINT_FILE = os.path.join(tmp, "optimizer_checkpoint.json")
+    optimizer2.generation_counter = 0
+    optimizer2.stagnation_counter = 0
+
+def restore_defaults():
+    optimizer2._worker_state.workdir = None
+    optimizer2.DE_POPSIZE = 20
+    optimizer2.DE_MAXITER = 40
+    optimizer2.DE_SEED = None
+    optimizer2.DE_TOL = 5e-3
+    optimizer2.CHECKPOINT_FILE = "optimizer_checkpoint.json"
+
+def simulate_restart():
+    """Forget the in-memory optimizer state, as a new process would."""
+    optimizer2.eval_counter = 0
+    optimizer2.generation_counter = 0
+    optimizer2.best_obj_so_far = -np.inf
+    optimizer2.best_x_so_far = None
+    optimizer2.prev_iter_obj = None
+
+def run_until_stopped(stop_after):
+    """Run DE and raise KeyboardInterrupt from the callback after `stop_after` generations."""
+    original = optimizer2.convergence_callback
+    calls = [0]
+
+    def stopping_callback(xk, convergence):
+        original(xk, convergence)
+        calls[0] += 1
+        if calls[0] >= stop_after:
+            raise KeyboardInterrupt("Stop requested via remote control")
+
+    optimizer2.convergence_callback = stopping_callback
+    try:
+        optimizer2.run_differential_evolution(BOUNDS)
+        raise AssertionError("run was not interrupted")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        optimizer2.convergence_callback = original
+
+def test_resume_matches_uninterrupted_run():
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            reference = optimizer2.run_differential_evolution(BOUNDS)
+            reference_rows = read_history()
+            reference_best = optimizer2.best_obj_so_far
+
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            run_until_stopped(1)
+            with open(optimizer2.CHECKPOINT_FILE) as f:
+                checkpoint = json.load(f)
+            assert checkpoint["generations_done"] == 1
+            assert checkpoint["eval_counter"] == 10  # initial population + 1 generation
+
+            simulate_restart()
+            resumed = optimizer2.run_differential_evolution(BOUNDS, resume=True)
+            rows = read_history()
+            best = optimizer2.best_obj_so_far
+    finally:
+        restore_defaults()
+
+    np.testing.assert_array_equal(resumed.x, reference.x)
+    assert resumed.fun == reference.fun
+    assert resumed.nfev == reference.nfev
+    assert best == reference_best
+    assert [r["iter"] for r in rows] == [r["iter"] for r in reference_rows]
+    assert [r["final_obj"] for r in rows] == [r["final_obj"] for r in reference_rows]
+
+def test_resume_rebuilds_from_history():
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            run_until_stopped(1)
+            best_before = optimizer2.best_obj_so_far
+            os.remove(optimizer2.CHECKPOINT_FILE)
+
+            simulate_restart()
+            n_logged = len(read_history())
+            result = optimizer2.run_differential_evolution(BOUNDS, resume=True)
+            rows = read_history()
+            best_after = optimizer2.best_obj_so_far
+    finally:
+        restore_defaults()
+
+    iters = [int(r["iter"]) for r in rows]
+    assert iters == list(range(1, len(rows) + 1))  # numbering continued, no duplicates
+    # 10 logged evaluations rebuild as "initial population done" (the history
+    # assumes a baseline row first), so all 3 generations of 5 members run again
+    assert len(rows) - n_logged == 3 * 5
+    assert best_after >= best_before
+    assert abs(-result.fun - max(float(r["final_obj"]) for r in rows)) < 1e-4
+
+def test_generation_column_counts_population_members():
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            optimizer2.DE_POPSIZE = 2  # x 5 free parameters (ctrl_frac is fixed) = 10 members
+            optimizer2.DE_MAXITER = 2
+            optimizer2.run_differential_evolution(BOUNDS)
+            members = optimizer2.population_size()
+            rows = read_history()
+            with open(optimizer2.STATUS_FILE) as f:
+                status = json.load(f)
+    finally:
+        optimizer2.de_population_members = None
+        restore_defaults()
+    assert members == 10 and status["population_members"] == 10 and status["max_generations"] == 2
+    # No baseline row in this run: iteration 1 counts as the baseline
+    generations = [int(row["generation"]) for row in sorted(rows, key=lambda r: int(r["iter"]))]
+    assert generations == [0] * 11 + [1] * 10 + [2] * 9
+
+def test_missing_scipy_internals_fail_clearly():
+    try:
+        optimizer2.check_de_solver(object())
+        raise AssertionError("no error for a solver without the DE internals")
+    except RuntimeError as e:
+        assert "_nfev" in str(e) and "SciPy" in str(e)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            run_until_stopped(1)
+            with open(optimizer2.CHECKPOINT_FILE) as f:
+                checkpoint = json.load(f)
+            assert checkpoint["scipy_version"] == optimizer2.scipy.__version__
+            # A checkpoint whose SciPy kept no sampler state: resuming can't be exact
+            checkpoint["sample_index"] = None
+            with open(optimizer2.CHECKPOINT_FILE, "w") as f:
+                json.dump(checkpoint, f)
+            simulate_restart()
+            try:
+                optimizer2.run_differential_evolution(BOUNDS, resume=True)
+                raise AssertionError("resumed without the sampler state")
+            except RuntimeError as e:
+                assert "sampler state" in str(e)
+    finally:
+        restore_defaults()
+
+if __name__ == "__main__":
+    tests = [
+        test_resume_matches_uninterrupted_run,
+        test_resume_rebuilds_from_history,
+        test_generation_column_counts_population_members,
+        test_missing_scipy_internals_fail_clearly,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
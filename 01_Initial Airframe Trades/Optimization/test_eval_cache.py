@@ -0,0 +1,106 @@
+"""
+Test for the persistent evaluation cache (optimizer2.EvaluationCache).
+
+Uses the fake `vsp` executable from test_parallel_eval.py:
+- A repeated (or nearly identical) design is answered from the cache without
+  launching VSP, and scores exactly like the original evaluation
+- Entries survive closing and reopening the database (optimizer restarts)
+- Changing baseline.vsp3 or a vspscript changes the key, so old results aren't reused
+- The size cap evicts the least recently used entry
+
+Run directly (python test_eval_cache.py) or under pytest.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, evaluate
+
+def test_cache_hit_skips_solver():
+    population = random_population(3, seed=9)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, delay=0.3)
+        optimizer2.eval_cache = optimizer2.EvaluationCache(os.path.join(tmp, "cache.sqlite"))
+        try:
+            first = evaluate(population, tmp)
+
+            # Same designs (plus sub-quantum noise) with no working VSP executable
+            optimizer2.VSP_EXE = os.path.join(tmp, "missing_vsp")
+            nudged = [x + 1e-6 for x in population]
+            start = time.time()
+            second = evaluate(nudged, tmp)
+            elapsed = time.time() - start
+            cache = optimizer2.eval_cache
+        finally:
+            optimizer2.eval_cache.close()
+            optimizer2.eval_cache = None
+        rows = read_history()
+
+    np.testing.assert_allclose(first, second)
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert elapsed < 0.5
+    assert [float(r["vspaero_time_s"]) for r in rows[3:]] == [0.0, 0.0, 0.0]
+
+def test_cache_persists_and_tracks_inputs():
+    x = random_population(1, seed=10)[0]
+    analysis = {"band_ld": 11.5, "ld_curve": np.array([9.0, 10.0, 11.0]), "xnp": 321.0, "mac": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        cache = optimizer2.EvaluationCache(path)
+        cache.put(x, analysis)
+        cache.close()
+
+        cache = optimizer2.EvaluationCache(path)
+        stored = cache.get(x)
+        cache.close()
+        assert stored == {"band_ld": 11.5, "ld_curve": [9.0, 10.0, 11.0], "xnp": 321.0, "mac": None}
+
+        # Edited vspscript -> different input hash -> miss
+        source = os.path.join(tmp, "inputs")
+        os.makedirs(source)
+        for name in optimizer2.SANDBOX_INPUT_FILES:
+            shutil.copy2(os.path.join(optimizer2.SCRIPT_DIR, name), os.path.join(source, name))
+        with open(os.path.join(source, "cruise.vspscript"), "a") as f:
+            f.write("\n// edited\n")
+        cache = optimizer2.EvaluationCache(path, source_dir=source)
+        assert cache.get(x) is None
+        cache.close()
+
+def test_cache_evicts_least_recently_used():
+    designs = random_population(4, seed=11)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = optimizer2.EvaluationCache(os.path.join(tmp, "cache.sqlite"), max_entries=3)
+        for i, x in enumerate(designs[:3]):
+            cache.put(x, {"band_ld": float(i)})
+            time.sleep(0.01)
+        assert cache.get(designs[0]) is not None  # designs[1] is now least recently used
+        time.sleep(0.01)
+        cache.put(designs[3], {"band_ld": 3.0})
+        assert len(cache) == 3
+        assert cache.get(designs[1]) is None
+        assert [cache.get(designs[i])["band_ld"] for i in (0, 2, 3)] == [0.0, 2.0, 3.0]
+        cache.close()
+
+if __name__ == "__main__":
+    tests = [
+        test_cache_hit_skips_solver,
+        test_cache_persists_and_tracks_inputs,
+        test_cache_evicts_least_recently_used,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
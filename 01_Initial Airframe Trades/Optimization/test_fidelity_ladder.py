@@ -0,0 +1,137 @@
+"""
+Test for the multi-fidelity evaluation ladder (optimizer2.analyze_with_ladder).
+
+Uses the fake `vsp` executable from test_parallel_eval.py, which runs faster
+with fewer wake iterations and over-predicts L/D on a coarser mesh:
+- Every design starts at the coarsest level; only designs within
+  FIDELITY_MARGIN of the best escalate, and every level is logged
+- The level's WAKE_ITER / TESS_SCALE reach the generated scripts
+- The history records the level each design was scored at, and only
+  production-level results go into the evaluation cache
+- fidelity_report summarizes time per level, savings and ranking agreement
+
+Run directly (python test_fidelity_ladder.py) or under pytest.
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, gate_passing_population, evaluate
+
+def read_fidelity_log():
+    with open(optimizer2.FIDELITY_LOG, "r") as f:
+        return list(csv.DictReader(f))
+
+def run_ladder(population, tmp, massprop_log=""):
+    setup_optimizer(tmp)
+    os.environ["FAKE_VSP_MASSPROP_LOG"] = massprop_log
+    optimizer2.FIDELITY_ENABLED = True
+    optimizer2.FIDELITY_LOG = os.path.join(tmp, "fidelity_log.csv")
+    optimizer2.init_fidelity_log()
+    optimizer2.eval_cache = optimizer2.EvaluationCache(os.path.join(tmp, "cache.sqlite"))
+    try:
+        energies = evaluate(population, tmp)
+        cached = [optimizer2.eval_cache.get(x) is not None for x in population]
+    finally:
+        optimizer2.FIDELITY_ENABLED = False
+        os.environ["FAKE_VSP_MASSPROP_LOG"] = ""
+        optimizer2.eval_cache.close()
+        optimizer2.eval_cache = None
+    return energies, cached
+
+def test_ladder_escalates_only_promising_designs():
+    population = gate_passing_population(4, seed=30) + random_population(6, seed=30)
+    saved_margin = optimizer2.FIDELITY_MARGIN
+    optimizer2.FIDELITY_MARGIN = 0.5
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            energies, cached = run_ladder(population, tmp)
+            rows = read_history()
+            levels = read_fidelity_log()
+            stages = set(optimizer2.watchdog.times)
+    finally:
+        optimizer2.FIDELITY_MARGIN = saved_margin
+
+    names = [level["name"] for level in optimizer2.FIDELITY_LEVELS]
+    by_iter = {}
+    for row in levels:
+        by_iter.setdefault(int(row["iter"]), []).append(row)
+    assert sorted(by_iter) == list(range(1, len(population) + 1))
+    for iteration, ladder in by_iter.items():
+        # Levels run in order from the coarsest; all but the last escalated
+        assert [int(r["level"]) for r in ladder] == list(range(len(ladder)))
+        assert [r["escalated"] for r in ladder] == ["True"] * (len(ladder) - 1) + ["False"]
+        history = rows[iteration - 1]
+        assert history["fidelity"] == names[len(ladder) - 1]
+        assert abs(float(history["final_obj"]) - float(ladder[-1]["final_obj"])) < 1e-4
+        assert cached[iteration - 1] == (len(ladder) == len(names))
+
+    depths = [len(ladder) for ladder in by_iter.values()]
+    assert min(depths) == 1 and max(depths) == len(names)
+    np.testing.assert_allclose(energies, [-float(r["final_obj"]) for r in rows], atol=1e-4)
+    # Cheaper levels learn their own watchdog timeouts
+    assert {"cruise", "cruise_coarse"} <= stages
+
+def test_level_settings_reach_scripts():
+    population = gate_passing_population(3, seed=31)
+    saved_margin = optimizer2.FIDELITY_MARGIN
+    optimizer2.FIDELITY_MARGIN = 1e9  # escalate everything
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            run_ladder(population, tmp)
+            levels = read_fidelity_log()
+            report = optimizer2.fidelity_report()
+    finally:
+        optimizer2.FIDELITY_MARGIN = saved_margin
+
+    assert len(levels) == len(population) * len(optimizer2.FIDELITY_LEVELS)
+    # Coarse mesh over-predicts L/D by 10% x (1 - TESS_SCALE) in the fake solver
+    for iteration in range(1, len(population) + 1):
+        band = {r["fidelity"]: float(r["band_LD"]) for r in levels if int(r["iter"]) == iteration}
+        assert abs(band["coarse"] / band["full"] - 1.05) < 1e-3
+        assert abs(band["medium"] / band["full"] - 1.025) < 1e-3
+    assert any("ranking coarse vs medium: Spearman 1.000" in line for line in report)
+    assert any(line.strip().startswith("saved:") for line in report)
+
+def test_full_level_reruns_massprop():
+    population = gate_passing_population(3, seed=32)
+    saved_margin = optimizer2.FIDELITY_MARGIN
+    optimizer2.FIDELITY_MARGIN = 1e9  # escalate everything
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            massprop_log = os.path.join(tmp, "massprop.log")
+            run_ladder(population, tmp, massprop_log)
+            with open(massprop_log) as f:
+                runs = len(f.readlines())
+            rows = read_history()
+            cached = len(optimizer2._cg_cache)
+    finally:
+        optimizer2.FIDELITY_MARGIN = saved_margin
+
+    # Coarse-mesh CGs are not cached, so the production level runs its own MassProp
+    assert runs == len(population) * len(optimizer2.FIDELITY_LEVELS)
+    assert all(row["fidelity"] == "full" and row["cg_source"] == "massprop" for row in rows)
+    assert cached == len(population)
+
+if __name__ == "__main__":
+    tests = [
+        test_ladder_escalates_only_promising_designs,
+        test_level_settings_reach_scripts,
+        test_full_level_reruns_massprop,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,234 @@
+"""
+Test for the columnar history store (history_store.py, opt_history.store/).
+
+No VSP needed:
+- Rows the optimizer appends (solved and unsolved) read back from the store
+  the same as from opt_history.csv, with the rows since the last segment
+  taken from the CSV
+- An interrupted run's store catches up when it is opened again, and a
+  rewritten CSV (new run) makes readers fall back to the CSV and the writer
+  rebuild
+- A 100k-row history loads in milliseconds, far faster than csv.DictReader,
+  and exports back to the same CSV values
+- The analysis, status and dashboard scripts read the store
+
+Run directly (python test_history_store.py) or under pytest.
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import time
+import tempfile
+from contextlib import redirect_stdout
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+import history_store
+import analyze_results
+import check_status
+import monitor_dashboard
+import remote_control_server
+from test_parallel_eval import setup_optimizer, read_history, gate_passing_population
+
+HEADER = optimizer2.HISTORY_HEADER.strip().split(",")
+
+def synthetic_rows(n, seed=0):
+    """History rows as CSV fields, formatted like record_evaluation / write_unsolved_row."""
+    values = [f"{v:.5f}" for v in np.random.default_rng(seed).normal(10.0, 3.0, size=4099)]
+    categories = ["sweet_spot", "acceptable", "unstable", "overly_stable", "unknown"]
+    rows = []
+    for i in range(n):
+        row = []
+        for j, name in enumerate(HEADER):
+            kind = history_store.column_kind(name)
+            if name == "iter":
+                row.append(str(i + 1))
+            elif kind == "int":
+                row.append(str(i // 20))
+            elif name == "sm_category":
+                row.append(categories[i % len(categories)])
+            elif kind == "text":
+                row.append("True" if name == "is_new_best" and i % 50 == 0 else "no")
+            elif i % 9 == 4 and name not in ("span_mm", "final_obj"):
+                row.append("N/A")  # unsolved design
+            else:
+                row.append(values[(i * len(HEADER) + j) % len(values)])
+        rows.append(row)
+    return rows
+
+def write_csv(path, rows, store=None):
+    """Append rows as the optimizer does (and to the store, if given)."""
+    with open(path, "a") as f:
+        for row in rows:
+            f.write(",".join(row) + "\n")
+            if store is not None:
+                store.append(row, f.tell())
+
+def new_history(tmp, name="opt_history.csv"):
+    path = os.path.join(tmp, name)
+    optimizer2.init_history_log(path)
+    return path
+
+def assert_same(columns, path):
+    """Typed columns equal the values in the CSV file at path."""
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert list(columns) == list(rows[0]) if rows else True
+    for name, array in columns.items():
+        assert len(array) == len(rows)
+        expected = [row[name] for row in rows]
+        if history_store.column_kind(name) == "text":
+            assert list(array) == expected
+        else:
+            got = array.astype(float)
+            got[array == history_store.INT_MISSING if array.dtype.kind == "i" else np.isnan(got)] = np.nan
+            np.testing.assert_array_equal(got, [np.nan if v == "N/A" else float(v) for v in expected], name)
+
+def test_optimizer_rows_round_trip():
+    population = gate_passing_population(8, seed=111)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            optimizer2.set_solver_backend(optimizer2.StandInBackend(failures={"cruise:error": 0.3}, seed=4))
+            optimizer2.column_store = history_store.HistoryStore(optimizer2.LOG_CSV, segment_rows=3)
+            pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+            try:
+                pool(optimizer2.evaluate_design, population)
+            finally:
+                pool.close()
+            store = optimizer2.column_store
+            index = history_store._read_index(store.path)
+            # Two full segments; the last two rows are only in the CSV so far
+            assert [s["rows"] for s in index["segments"]] == [3, 3] and len(store.pending) == 2
+            columns = history_store.load_columns(optimizer2.LOG_CSV)
+            assert_same(columns, optimizer2.LOG_CSV)
+            rows = read_history()
+
+            store.close()
+            assert [s["rows"] for s in history_store._read_index(store.path)["segments"]] == [3, 3, 2]
+            assert_same(history_store.load_columns(optimizer2.LOG_CSV), optimizer2.LOG_CSV)
+            assert history_store.load_columns(optimizer2.LOG_CSV, ["iter", "cruise_s"]).keys() == {"iter", "cruise_s"}
+    finally:
+        optimizer2.column_store = None
+    assert "cruise_error" in columns["failure_class"] and "N/A" in [row["band_LD"] for row in rows]
+    assert columns["iter"].dtype == np.int64 and list(columns["iter"]) == list(range(1, 9))
+    assert columns["cruise_s"].dtype == float and np.all(columns["cruise_s"] > 0.0)
+
+def test_interrupted_and_rewritten_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = new_history(tmp)
+        rows = synthetic_rows(30, seed=1)
+        store = history_store.HistoryStore(path, segment_rows=8)
+        write_csv(path, rows[:10], store)
+        # Killed before close(): rows 9-10 are pending, rows 11-20 written without the store
+        write_csv(path, rows[10:20])
+        assert_same(history_store.load_columns(path), path)
+
+        store = history_store.HistoryStore(path, segment_rows=8)
+        assert len(store) == 20 and store.index["rows"] == 16
+        write_csv(path, rows[20:], store)
+        store.close()
+        assert history_store._read_index(store.path)["rows"] == 30
+        assert_same(history_store.load_columns(path), path)
+        assert history_store.last_row(path) == dict(zip(HEADER, rows[-1]))
+
+        # New run: a fresh CSV with other rows - readers must not use the old segments
+        path = new_history(tmp)
+        write_csv(path, synthetic_rows(5, seed=2))
+        assert_same(history_store.load_columns(path), path)
+        store = history_store.HistoryStore(path, segment_rows=8)
+        store.close()
+        assert history_store._read_index(store.path)["rows"] == 5
+        assert sorted(os.listdir(store.path)) == ["index.json", "seg_000000.bin"]
+        assert_same(history_store.load_columns(path), path)
+
+        # Header only: no rows either way
+        path = new_history(tmp, "empty.csv")
+        assert len(history_store.read_rows(path)) == 0 and history_store.last_row(path) is None
+
+def test_100k_rows_load_in_milliseconds():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = new_history(tmp)
+        store = history_store.HistoryStore(path)
+        rows = synthetic_rows(100000, seed=3)
+        write_csv(path, rows, store)
+
+        def best_time(read, repeats=3):
+            best = np.inf
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = read()
+                best = min(best, time.perf_counter() - start)
+            return best, result
+
+        store_s, columns = best_time(lambda: history_store.load_columns(path))
+        csv_s, _ = best_time(lambda: list(csv.DictReader(open(path))), repeats=1)
+        assert len(columns["iter"]) == 100000 and len(store.pending) == 100000 % history_store.SEGMENT_ROWS
+        assert store_s < 0.25 and store_s < 0.2 * csv_s, (store_s, csv_s)
+        assert_same(columns, path)
+
+        exported = os.path.join(tmp, "export.csv")
+        assert history_store.export_csv(path, exported) == 100000
+        for name, array in history_store.load_columns(exported).items():
+            assert array.dtype == columns[name].dtype
+            np.testing.assert_array_equal(array, columns[name])
+        rows = history_store.read_rows(path)
+        last = history_store.last_row(path)
+        assert rows[-1]["iter"] == last["iter"] == "100000" and float(rows[-1]["final_obj"]) == float(last["final_obj"])
+        assert rows[5]["sm_category"] == "sweet_spot" and rows[13]["band_LD"] == "N/A"
+
+def test_readers_use_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = new_history(tmp)
+        rows = synthetic_rows(60, seed=4)
+        write_csv(path, rows)
+        with redirect_stdout(io.StringIO()) as csv_report:
+            analyze_results.analyze_results(path)
+
+        store = history_store.HistoryStore(path, segment_rows=16)
+        store.close()
+        with redirect_stdout(io.StringIO()) as store_report:
+            analyze_results.analyze_results(path)
+        assert "[TOP 5 DESIGNS]" in store_report.getvalue()
+        assert store_report.getvalue() == csv_report.getvalue()
+
+        saved = (check_status.HISTORY_FILE, check_status.STATUS_FILE, monitor_dashboard.HISTORY_FILE,
+                 monitor_dashboard.STATUS_FILE, monitor_dashboard.DASHBOARD_FILE, remote_control_server.LOG_CSV)
+        try:
+            check_status.HISTORY_FILE = monitor_dashboard.HISTORY_FILE = remote_control_server.LOG_CSV = path
+            check_status.STATUS_FILE = monitor_dashboard.STATUS_FILE = os.path.join(tmp, "optimizer_status.json")
+            monitor_dashboard.DASHBOARD_FILE = os.path.join(tmp, "dashboard.html")
+            with open(check_status.STATUS_FILE, "w") as f:
+                json.dump({"status": "running", "iteration": 60, "generation": 2}, f)
+            with redirect_stdout(io.StringIO()) as status_report:
+                check_status.check_status()
+            assert "Eval   60" in status_report.getvalue()
+            assert monitor_dashboard.generate_dashboard()
+            status = remote_control_server.OptimizerHandler.get_status(None)
+            assert status["latest_iteration"] == 60
+        finally:
+            (check_status.HISTORY_FILE, check_status.STATUS_FILE, monitor_dashboard.HISTORY_FILE,
+             monitor_dashboard.STATUS_FILE, monitor_dashboard.DASHBOARD_FILE, remote_control_server.LOG_CSV) = saved
+
+if __name__ == "__main__":
+    tests = [
+        test_optimizer_rows_round_trip,
+        test_interrupted_and_rewritten_history,
+        test_100k_rows_load_in_milliseconds,
+        test_readers_use_store,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
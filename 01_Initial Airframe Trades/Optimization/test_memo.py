@@ -0,0 +1,111 @@
+"""
+Test for near-duplicate memoization (optimizer2.DesignMemo).
+
+Uses the fake `vsp` executable from test_parallel_eval.py, whose L/D is
+span/30, so an interpolated band L/D can be checked exactly:
+- A design within MEMO_RADIUS of one evaluated design reuses its result
+  without a solver run; between several it is interpolated
+- The history's reused column says which (no / nearest / interpolated)
+- Designs further away, or any design with --no-memo, are evaluated
+- A near-duplicate of a design another worker is running waits for it
+- Near-duplicates within a batch generation are solved once
+
+Run directly (python test_memo.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history, evaluate
+
+BASE = np.array([340.0, 20.0, 300.0, 0.8, 110.0, 0.22])
+SPAN_RANGE = optimizer2.DESIGN_BOUNDS[0][1] - optimizer2.DESIGN_BOUNDS[0][0]
+
+def along_span(fraction_of_radius):
+    """BASE moved along the span by this fraction of MEMO_RADIUS."""
+    x = BASE.copy()
+    x[0] += fraction_of_radius * optimizer2.MEMO_RADIUS * SPAN_RANGE
+    return x
+
+def cruise_runs():
+    return len(optimizer2.watchdog.times.get("cruise", []))
+
+def test_nearest_and_interpolated_reuse():
+    population = [along_span(-0.6), along_span(0.6), along_span(0.0), along_span(0.9), along_span(3.0)]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        energies = evaluate(population, tmp)
+        rows = read_history()
+        runs = cruise_runs()
+
+    # 0.9 is only within the radius of +0.6; 3.0 is outside every radius
+    assert [row["reused"] for row in rows] == ["no", "no", "interpolated", "nearest", "no"]
+    assert runs == 3
+    assert float(rows[2]["vspaero_time_s"]) == 0.0 and float(rows[3]["vspaero_time_s"]) == 0.0
+    # Equal distances: the interpolated L/D is the mean of the two neighbours'
+    assert abs(float(rows[2]["band_LD"]) - (float(rows[0]["band_LD"]) + float(rows[1]["band_LD"])) / 2) < 1e-4
+    assert abs(energies[2] - (energies[0] + energies[1]) / 2) < 1e-3
+    assert energies[3] == energies[1]
+    assert optimizer2.design_memo.reused == {"nearest": 1, "interpolated": 1}
+
+def test_no_memo_evaluates_everything():
+    population = [along_span(0.0), along_span(0.5)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            optimizer2.MEMO_ENABLED = False
+            evaluate(population, tmp)
+            rows = read_history()
+            runs = cruise_runs()
+    finally:
+        optimizer2.MEMO_ENABLED = True
+    assert runs == 2
+    assert [row["reused"] for row in rows] == ["no", "no"]
+
+def test_concurrent_duplicate_waits():
+    population = [along_span(0.0), along_span(0.5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, delay=0.5)
+        energies = evaluate(population, tmp, workers=2)
+        rows = read_history()
+        runs = cruise_runs()
+    assert runs == 1
+    assert sorted(row["reused"] for row in rows) == ["nearest", "no"]
+    assert energies[0] == energies[1]
+
+def test_batch_solves_duplicates_once():
+    other = BASE + np.array([30.0, 5.0, 10.0, 0.0, 0.0, 0.0])
+    population = [along_span(0.0), other, along_span(0.5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        batch = optimizer2.BatchEvaluator(root=os.path.join(tmp, "sandboxes"))
+        energies = batch(np.array(population).T)
+        rows = read_history()
+        with open(os.path.join(batch.workdir, "batch_cruise_gen.vspscript")) as f:
+            script = f.read()
+    assert "const int NDESIGNS = 2;" in script
+    assert [row["reused"] for row in rows] == ["no", "no", "nearest"]
+    assert energies[2] == energies[0]
+
+if __name__ == "__main__":
+    tests = [
+        test_nearest_and_interpolated_reuse,
+        test_no_memo_evaluates_everything,
+        test_concurrent_duplicate_waits,
+        test_batch_solves_duplicates_once,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,654 @@
+"""
+Test for parallel population evaluation with per-worker sandboxes.
+
+Runs optimizer2.evaluate_design against a fake `vsp` executable that writes
+canned Results.csv / MassProp_Results.csv / current.aerocenter.stab files, so
+it needs neither OpenVSP nor Windows:
+- Each worker gets its own sandbox with copies of the vspscripts
+- Generated scripts inline the shared tessellation.vspscript functions
+- Concurrent evaluations don't read each other's result files
+- N workers finish a population faster than one
+- differential_evolution runs through the workers=/updating='deferred' path
+- The core scheduler keeps concurrent jobs inside the core budget, writes
+  each job's share into the generated script and learns the best split
+- Pipelined Tier 2 runs in its own sandboxes, overlaps the next candidates'
+  Tier 1 and scores designs exactly like the unpipelined path
+- The watchdog kills hung runs (with their child processes), retries with
+  fewer wake iterations and logs the outcome in failure_class
+- The batch script scores a whole population in one launch exactly like the
+  single-design path, and designs it produced no results for are re-run
+
+Run directly (python test_parallel_eval.py) or under pytest.
+"""
+
+import os
+import sys
+import csv
+import json
+import stat
+import shutil
+import time
+import threading
+import tempfile
+import textwrap
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+
+# ---------------------------------------------------------------------
+# Fake VSP executable
+# ---------------------------------------------------------------------
+# MassProp CG of a 400 g fuselage at x = 250 mm, two solid wings and a fin
+# whose chord is the wing tip chord (80 mm span, 45 deg sweep, root at 430 mm)
+FAKE_CG_SOURCE = textwrap.dedent('''
+    def fake_cg(span, sweep, xloc, taper, tip):
+        import math
+        density = 1.2e-4 * 0.12                      # g/mm^3 x thickness ratio
+        stations = [(0.5 + 0.5 * t, 0.5 * w) for t, w in
+                    [(-0.861136, 0.347855), (-0.339981, 0.652145), (0.339981, 0.652145), (0.861136, 0.347855)]]
+        root = tip / taper
+        mass = moment = 0.0
+        for t, w in stations:
+            chord = root + (tip - root) * t
+            x_le = xloc + span * t * math.tan(math.radians(sweep))
+            mass += 2.0 * density * span * w * chord ** 2
+            moment += 2.0 * density * span * w * chord ** 2 * (x_le + 0.42 * chord)
+        fin = density * 80.0 * tip ** 2
+        return (400.0 * 250.0 + moment + fin * (430.0 + 40.0 + 0.42 * tip)) / (400.0 + mass + fin)
+''')
+exec(FAKE_CG_SOURCE)
+
+# Mimics the file side effects of the vspscripts. L/D peaks at 8 deg
+# with a value of span/30, so every history row can be checked against the
+# design that produced it.
+FAKE_VSP_SOURCE = FAKE_CG_SOURCE + textwrap.dedent('''
+    import os
+    import sys
+    import time
+    import subprocess
+
+    script = sys.argv[sys.argv.index("-script") + 1]
+    delay = float(os.environ.get("FAKE_VSP_DELAY", "0.0"))
+    time.sleep(float(os.environ.get("FAKE_VSP_STARTUP", "0.0")))  # launch + model load
+
+    with open(script) as f:
+        script_text = f.read()
+
+    # FAKE_VSP_HANG=cruise,pitch: hang like a stuck solver (with a solver child
+    # process) unless the script asks for the watchdog's degraded WAKE_ITER;
+    # FAKE_VSP_HANG_RETRY=1 hangs the degraded retry too
+    script = os.path.basename(script)  # generated scripts of serial runs come with a temp path
+    stage = "pitch" if script.startswith("pitch") else "cruise" if "cruise" in script else "update_geom"
+    degraded = "WAKE_ITER = 5;" in script_text
+    if stage in os.environ.get("FAKE_VSP_HANG", "").split(",") and (not degraded or os.environ.get("FAKE_VSP_HANG_RETRY") == "1"):
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+        with open("hung_child.pid", "w") as f:
+            f.write(str(child.pid))
+        time.sleep(3600)
+
+    def read_des(path):
+        params = {}
+        with open(path) as f:
+            for line in f.readlines()[1:]:
+                parts = line.strip().split(":")
+                if len(parts) >= 5:
+                    params[parts[1] + ":" + parts[3]] = float(parts[4])
+        return params
+
+    # Fidelity settings: fewer wake iterations run proportionally faster and a
+    # coarser mesh over-predicts L/D by 10% x (1 - TESS_SCALE)
+    def setting(name, default):
+        marker = " " + name + " = "
+        return float(script_text.split(marker)[1].split(";")[0]) if marker in script_text else default
+    wake_fraction = setting("WAKE_ITER", 10) / 10.0
+    ld_bias = 1.0 + 0.1 * (1.0 - setting("TESS_SCALE", 1.0))
+    delay *= wake_fraction
+
+    # ALPHA_START / ALPHA_END / ALPHA_NPTS select the sweep (2-14 deg, 7 points by default)
+    alpha_start, alpha_end = setting("ALPHA_START", 2.0), setting("ALPHA_END", 14.0)
+    alpha_npts = int(setting("ALPHA_NPTS", 7))
+    alphas = [alpha_start + i * (alpha_end - alpha_start) / max(alpha_npts - 1, 1) for i in range(alpha_npts)]
+    delay *= alpha_npts / 7.0
+
+    def write_cruise_results(p, results_csv, massprop_csv):
+        span = p["Lwing:Span"]
+        xloc = p["Lwing:X_Rel_Location"]
+        ld = [-(span / 30.0) * ld_bias * (1.0 - ((a - 8) / 10.0) ** 2) for a in alphas]
+        # Pitching moment about Xcg = 314.25 of a wing whose neutral point is
+        # xloc + 12 (where the pitch stability run puts it), Cref = 137.88
+        cl = [0.08 * a for a in alphas]
+        cm = [0.01 + (314.25 - (xloc + 12.0)) / 137.88 * c for c in cl]
+        with open(results_csv, "w") as f:
+            f.write("Results_Name,VSPAERO_Polar\\n")
+            f.write("L_D," + ",".join(f"{v:.10f}" for v in ld) + "\\n")
+            f.write("CLtot," + ",".join(f"{v:.10f}" for v in cl) + "\\n")
+            f.write("CMytot," + ",".join(f"{v:.10f}" for v in cm) + "\\n")
+            f.write("FC_Cref_,137.88\\n")
+            f.write("FC_Xcg_,314.25\\n")
+            f.write("# padding to look like a complete sweep\\n" * 40)
+        if massprop_csv is None:
+            return  # RUN_MASSPROP = false / MASSPROP_DESIGNS
+        cg = fake_cg(span, p["Lwing:Sweep"], xloc, p["Lwing:Taper"], p["Lwing:Tip_Chord"])
+        with open(massprop_csv, "w") as f:
+            f.write("Results_Name,Mass_Properties\\n")
+            f.write(f"Total_CG,{cg:.10f},0.0,0.0\\n")
+        # FAKE_VSP_MASSPROP_LOG: count the MassProp runs
+        if os.environ.get("FAKE_VSP_MASSPROP_LOG"):
+            with open(os.environ["FAKE_VSP_MASSPROP_LOG"], "a") as f:
+                f.write(f"{span:.6f}\\n")
+
+    if script.startswith("update_geom"):
+        with open("current.des") as src, open("current.vsp3", "w") as dst:
+            dst.write(src.read())
+    elif script.startswith("cruise") or script.startswith("fused_cruise"):
+        time.sleep(delay)
+        if script.startswith("fused_cruise"):
+            p = read_des("current.des")
+            if "WRITE_VSP3 = true" in script_text:
+                with open("current.des") as src, open("current.vsp3", "w") as dst:
+                    dst.write(src.read())
+        else:
+            p = read_des("current.vsp3")
+        write_cruise_results(p, "Results.csv",
+                             None if "const bool RUN_MASSPROP = false;" in script_text else "MassProp_Results.csv")
+    elif script.startswith("batch_cruise"):
+        # FAKE_VSP_BATCH_SKIP=1,3: those designs crash without writing results
+        skip = os.environ.get("FAKE_VSP_BATCH_SKIP", "").split(",")
+        n = int(script_text.split("const int NDESIGNS = ")[1].split(";")[0])
+        mask = script_text.split('const string MASSPROP_DESIGNS = "')[1].split('"')[0] if "const string MASSPROP_DESIGNS" in script_text else ""
+        for i in range(n):
+            time.sleep(delay)
+            if str(i) not in skip:
+                massprop = not mask or mask[i] == "1"
+                write_cruise_results(read_des(f"batch_{i}.des"), f"batch_{i}_Results.csv",
+                                     f"batch_{i}_MassProp_Results.csv" if massprop else None)
+    elif script.startswith("pitch_stability"):
+        time.sleep(delay)
+        p = read_des("current.des" if "APPLY_DES = true" in script_text else "current.vsp3")
+        # FAKE_VSP_STAB_OFFSET moves the aerodynamic center away from the cruise sweep's
+        xnp = p["Lwing:X_Rel_Location"] + 12.0 + float(os.environ.get("FAKE_VSP_STAB_OFFSET", "0"))
+        with open("current.aerocenter.stab", "w") as f:
+            f.write(f"Aerodynamic Center is at: ( {xnp:.4f}, 0.0000, 0.0000)\\n")
+    sys.exit(0)
+''')
+
+def make_fake_vsp(directory):
+    """Write the fake vsp executable into directory and return its path."""
+    script_path = os.path.join(directory, "fake_vsp.py")
+    with open(script_path, "w") as f:
+        f.write(FAKE_VSP_SOURCE)
+
+    if os.name == "nt":
+        exe_path = os.path.join(directory, "fake_vsp.cmd")
+        with open(exe_path, "w") as f:
+            f.write(f'@"{sys.executable}" "{script_path}" %*\n')
+    else:
+        exe_path = os.path.join(directory, "fake_vsp")
+        with open(exe_path, "w") as f:
+            f.write(f"#!{sys.executable}\n")
+            f.write(FAKE_VSP_SOURCE)
+        os.chmod(exe_path, os.stat(exe_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return exe_path
+
+def setup_optimizer(tmp_dir, delay=0.0, startup=0.0, hang=""):
+    """Point optimizer2 at the fake VSP and at history/status files in tmp_dir."""
+    os.environ["FAKE_VSP_DELAY"] = str(delay)
+    os.environ["FAKE_VSP_STARTUP"] = str(startup)
+    os.environ["FAKE_VSP_HANG"] = hang
+    os.environ["FAKE_VSP_HANG_RETRY"] = "0"
+    os.environ["FAKE_VSP_BATCH_SKIP"] = ""
+    os.environ["FAKE_VSP_STAB_OFFSET"] = "0"
+    os.environ["FAKE_VSP_MASSPROP_LOG"] = ""
+    optimizer2.watchdog = optimizer2.StageWatchdog()
+    optimizer2.VSP_EXE = make_fake_vsp(tmp_dir)
+    optimizer2.set_solver_backend(optimizer2.SubprocessBackend())
+    optimizer2.LOG_CSV = os.path.join(tmp_dir, "opt_history.csv")
+    optimizer2.STATUS_FILE = os.path.join(tmp_dir, "optimizer_status.json")
+    optimizer2.CONTROL_FILE = os.path.join(tmp_dir, "optimizer_control.txt")
+    optimizer2.eval_counter = 0
+    optimizer2.best_obj_so_far = -np.inf
+    optimizer2.best_x_so_far = None
+    optimizer2.prev_iter_obj = None
+    optimizer2._cg_cache.clear()
+    optimizer2._massprop_samples.clear()
+    optimizer2.cg_model = None
+    optimizer2.cg_model_skips = 0
+    optimizer2.design_memo.clear()
+    optimizer2.prefilter_threshold = None
+    optimizer2.prefilter_skips = 0
+    optimizer2.PREFILTER_LOG = os.path.join(tmp_dir, "prefilter_log.csv")
+    optimizer2.init_history_log()
+
+def process_alive(pid):
+    """True if pid is running (zombies waiting to be reaped count as dead)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+def random_population(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lower = np.array([275.0, 0.0, 220.0, 0.6, 95.0, 0.22])
+    upper = np.array([480.0, 40.0, 340.0, 0.9, 125.0, 0.22])
+    return [lower + rng.random(6) * (upper - lower) for _ in range(n)]
+
+def read_history():
+    with open(optimizer2.LOG_CSV, "r") as f:
+        return list(csv.DictReader(f))
+
+def evaluate(population, tmp, workers=1):
+    pool = optimizer2.SandboxPool(workers, root=os.path.join(tmp, "sandboxes"))
+    try:
+        return pool(optimizer2.evaluate_design, population)
+    finally:
+        pool.close()
+
+# ---------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------
+def test_sandboxes_are_isolated():
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, delay=0.2)
+        pool = optimizer2.SandboxPool(4, root=os.path.join(tmp, "sandboxes"))
+        try:
+            sandboxes = sorted(os.listdir(os.path.join(tmp, "sandboxes")))
+            assert sandboxes == ["worker_00", "worker_01", "worker_02", "worker_03"]
+            for name in sandboxes:
+                for input_file in optimizer2.SANDBOX_INPUT_FILES:
+                    assert os.path.exists(os.path.join(tmp, "sandboxes", name, input_file))
+
+            population = random_population(8)
+            energies = pool(optimizer2.evaluate_design, population)
+        finally:
+            pool.close()
+
+        assert len(energies) == 8
+        assert all(np.isfinite(energies))
+        rows = read_history()
+        assert len(rows) == 8
+        assert sorted(int(r["iter"]) for r in rows) == list(range(1, 9))
+        for row in rows:
+            # L/D at 8 deg must come from this row's own design, not a neighbour's
+            assert abs(float(row["ld_at_8deg"]) - float(row["span_mm"]) / 30.0) < 0.01
+            # CG from this sandbox's MassProp file
+            cg = fake_cg(*(float(row[c]) for c in ("span_mm", "sweep_deg", "xloc_mm", "taper", "tip_mm")))
+            assert abs(float(row["cg_x"]) - cg) < 0.05
+
+def test_parallel_is_faster_than_serial():
+    population = random_population(8, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, delay=0.5)
+        pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+        try:
+            start = time.time()
+            serial = pool(optimizer2.evaluate_design, population)
+            serial_time = time.time() - start
+        finally:
+            pool.close()
+
+        setup_optimizer(tmp, delay=0.5)
+        pool = optimizer2.SandboxPool(4, root=os.path.join(tmp, "sandboxes"))
+        try:
+            start = time.time()
+            parallel = pool(optimizer2.evaluate_design, population)
+            parallel_time = time.time() - start
+        finally:
+            pool.close()
+
+    print(f"  serial: {serial_time:.1f}s, 4 workers: {parallel_time:.1f}s")
+    np.testing.assert_allclose(serial, parallel)
+    assert parallel_time < 0.6 * serial_time
+
+def test_differential_evolution_with_workers():
+    bounds = [(275.0, 480.0), (0.0, 40.0), (220.0, 340.0), (0.6, 0.9), (95.0, 125.0), (0.22, 0.22)]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        pool = optimizer2.SandboxPool(3, root=os.path.join(tmp, "sandboxes"))
+        try:
+            result = differential_evolution(
+                optimizer2.evaluate_design, bounds,
+                maxiter=1, popsize=2, seed=3, polish=False,
+                workers=pool, updating='deferred'
+            )
+        finally:
+            pool.close()
+        rows = read_history()
+
+    assert result.nfev == len(rows)
+    assert np.isfinite(result.fun)
+
+def test_fused_script_matches_two_launch_path():
+    population = random_population(4, seed=2)
+    results = {}
+    for fused, write_vsp3 in [(False, True), (True, True), (True, False)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            optimizer2.USE_FUSED_SCRIPT = fused
+            optimizer2.FUSED_WRITE_VSP3 = write_vsp3
+            pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+            try:
+                results[(fused, write_vsp3)] = pool(optimizer2.evaluate_design, population)
+                wrote_vsp3 = os.path.exists(os.path.join(tmp, "sandboxes", "worker_00", "current.vsp3"))
+            finally:
+                pool.close()
+                optimizer2.USE_FUSED_SCRIPT = False
+                optimizer2.FUSED_WRITE_VSP3 = True
+            assert wrote_vsp3 == write_vsp3
+            rows = read_history()
+            # Tier 2 still ran for gate-passing designs and saw the right geometry
+            for row in rows:
+                if row["xnp"] != "N/A":
+                    assert abs(float(row["xnp"]) - (float(row["xloc_mm"]) + 12.0)) < 0.05
+
+    np.testing.assert_allclose(results[(False, True)], results[(True, True)])
+    np.testing.assert_allclose(results[(False, True)], results[(True, False)])
+
+def test_generated_scripts_stay_out_of_source_dir():
+    serial = optimizer2.render_vspscript("cruise.vspscript", optimizer2.SCRIPT_DIR, WAKE_ITER=5)
+    assert os.path.isabs(serial) and os.path.dirname(serial) != optimizer2.SCRIPT_DIR
+    assert not os.path.exists(os.path.join(optimizer2.SCRIPT_DIR, "cruise_gen.vspscript"))
+    with open(serial) as f:
+        assert "const int WAKE_ITER = 5;" in f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Sandboxes keep their generated scripts next to their copies of the inputs
+        assert optimizer2.render_vspscript("cruise.vspscript", tmp, WAKE_ITER=5) == "cruise_gen.vspscript"
+        assert os.path.exists(os.path.join(tmp, "cruise_gen.vspscript"))
+
+def test_shared_script_functions_are_inlined():
+    with open(os.path.join(optimizer2.SCRIPT_DIR, "tessellation.vspscript")) as f:
+        shared = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("cruise.vspscript", "fused_cruise.vspscript", "pitch_stability.vspscript",
+                     "batch_cruise.vspscript"):
+            with open(os.path.join(optimizer2.SCRIPT_DIR, name)) as f:
+                source = f.read()
+            assert "void ScaleTessellation" not in source and '#include "tessellation.vspscript"' in source
+            # Rendered even without overrides, so the copy VSP runs defines the function itself
+            generated = optimizer2.render_vspscript(name, tmp)
+            with open(os.path.join(tmp, generated)) as f:
+                text = f.read()
+            assert generated == name.replace(".vspscript", "_gen.vspscript")
+            assert shared in text and text.count("void ScaleTessellation") == 1
+        assert optimizer2.render_vspscript("update_geom.vspscript", tmp) == "update_geom.vspscript"
+
+def test_pipelined_tier2_overlaps_tier1():
+    # Spans that pass the Tier 2 gate (L/D > 8, span penalty < 1)
+    rng = np.random.default_rng(12)
+    population = [np.array([300.0 + 70.0 * rng.random(), 20.0, 220.0 + 100.0 * rng.random(), 0.8, 110.0, 0.22])
+                  for _ in range(6)]
+    timings, energies = {}, {}
+    for tier2_workers in (0, 1):
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp, delay=0.4)
+            pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"), tier2_workers=tier2_workers)
+            try:
+                start = time.time()
+                energies[tier2_workers] = pool(optimizer2.evaluate_design, population)
+                timings[tier2_workers] = time.time() - start
+            finally:
+                pool.close()
+            rows = read_history()
+            assert len(rows) == 6
+            for row in rows:
+                # Tier 2 ran (in the tier2 sandbox when pipelined) on this row's own geometry
+                assert abs(float(row["xnp"]) - (float(row["xloc_mm"]) + 12.0)) < 0.05
+            if tier2_workers:
+                assert os.path.exists(os.path.join(tmp, "sandboxes", "tier2_00", "current.aerocenter.stab"))
+                assert not os.path.exists(os.path.join(tmp, "sandboxes", "worker_00", "current.aerocenter.stab"))
+
+    print(f"  sequential tiers: {timings[0]:.1f}s, pipelined: {timings[1]:.1f}s")
+    np.testing.assert_allclose(energies[0], energies[1])
+    assert timings[1] < 0.8 * timings[0]
+
+def test_core_scheduler_stays_within_budget():
+    scheduler = optimizer2.CoreScheduler(total_cores=8, max_jobs=6, min_samples=1)
+    peak = [0]
+    lock = threading.Lock()
+
+    def job():
+        with scheduler.allocate("cruise") as cores:
+            with lock:
+                peak[0] = max(peak[0], scheduler.in_use)
+            assert 1 <= cores.ncpu <= 8
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=job) for _ in range(24)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] <= 8
+    assert scheduler.in_use == 0
+    assert sum(len(v) for v in scheduler.samples.values()) == 24
+
+def test_core_scheduler_learns_best_split():
+    # Amdahl-style job time: 10 s serial + 160 core-seconds of parallel work.
+    # Splits: 16x1 -> 180/h, 8x2 -> 240/h, 5x3 -> 257/h, 4x4 -> 288/h
+    scheduler = optimizer2.CoreScheduler(total_cores=16, max_jobs=4)
+    assert scheduler.candidates == [16, 8, 5, 4]
+    for _ in range(20):
+        cores = scheduler.choose_cores("cruise")
+        scheduler.record("cruise", cores, 10.0 + 160.0 / cores)
+    assert scheduler.choose_cores("cruise") == 4
+    assert "<- using" in scheduler.summary()
+
+    # Memory-bound solver: concurrent jobs slow each other down, one wide job wins
+    scheduler = optimizer2.CoreScheduler(total_cores=16, max_jobs=4)
+    for _ in range(20):
+        cores = scheduler.choose_cores("cruise")
+        scheduler.record("cruise", cores, 10.0 * scheduler.concurrency(cores) ** 2)
+    assert scheduler.choose_cores("cruise") == 16
+
+def test_scheduler_writes_ncpu_into_scripts():
+    population = random_population(4, seed=6)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        optimizer2.core_scheduler = optimizer2.CoreScheduler(total_cores=4, max_jobs=2, pin=True)
+        pool = optimizer2.SandboxPool(2, root=os.path.join(tmp, "sandboxes"))
+        try:
+            energies = pool(optimizer2.evaluate_design, population)
+            scheduler = optimizer2.core_scheduler
+        finally:
+            pool.close()
+            optimizer2.core_scheduler = None
+
+        assert all(np.isfinite(energies))
+        assert scheduler.in_use == 0
+        assert any(stage == "cruise" for stage, _ in scheduler.samples)
+        scripts = [os.path.join(tmp, "sandboxes", w, "cruise_gen.vspscript") for w in ("worker_00", "worker_01")]
+        for path in scripts:
+            if os.path.exists(path):
+                with open(path) as f:
+                    text = f.read()
+                assert "const int NCPU = 16;" not in text
+                assert "NumCPU(1, NCPU)" in text
+
+def test_vsp_is_pinned_at_launch():
+    if not hasattr(os, "sched_setaffinity"):
+        return  # Windows/macOS: pinned after launch through psutil
+    cpu = min(os.sched_getaffinity(0))
+    saved = optimizer2.VSP_EXE, os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as tmp:
+        # An executable that reports its affinity (after the post-launch pinning had time to land)
+        optimizer2.VSP_EXE = os.path.join(tmp, "report_affinity")
+        with open(optimizer2.VSP_EXE, "w") as f:
+            f.write(f"#!{sys.executable}\nimport os, time\ntime.sleep(0.3)\nprint(sorted(os.sched_getaffinity(0)))\n")
+        os.chmod(optimizer2.VSP_EXE, os.stat(optimizer2.VSP_EXE).st_mode | stat.S_IEXEC)
+        try:
+            command, after = optimizer2.pinned_command(["vsp"], [cpu])
+            pinned = optimizer2.run_vsp_script("cruise.vspscript", tmp, cpus=[cpu]).stdout
+            # CPUs this process may not use: launched unpinned instead of failing
+            unpinned = optimizer2.run_vsp_script("cruise.vspscript", tmp, cpus=[4096]).stdout
+            # No taskset: pinned right after launch
+            os.environ["PATH"] = tmp
+            assert optimizer2.pinned_command(["vsp"], [cpu]) == (["vsp"], [cpu])
+            pinned_after = optimizer2.run_vsp_script("cruise.vspscript", tmp, cpus=[cpu]).stdout
+        finally:
+            optimizer2.VSP_EXE, os.environ["PATH"] = saved
+    if shutil.which("taskset"):
+        assert command == [shutil.which("taskset"), "-c", str(cpu), "vsp"] and after is None
+    assert pinned.strip() == pinned_after.strip() == str([cpu])
+    assert unpinned.strip() == str(sorted(os.sched_getaffinity(0)))
+    assert optimizer2.pinned_command(["vsp"], None) == (["vsp"], None)
+
+def test_watchdog_timeout_learns_from_stage_times():
+    watchdog = optimizer2.StageWatchdog(defaults={"cruise": 1800.0}, min_timeout=60.0)
+    assert watchdog.timeout("cruise") == 1800.0
+    for elapsed in [100.0, 110.0, 120.0, 130.0, 140.0]:
+        watchdog.record("cruise", elapsed)
+    # 95th percentile (138 s) x 3
+    assert abs(watchdog.timeout("cruise") - 414.0) < 1e-6
+    for _ in range(10):
+        watchdog.record("pitch", 1.0)
+    assert watchdog.timeout("pitch") == 60.0  # floor
+
+def test_watchdog_kills_and_retries_hung_cruise():
+    population = random_population(2, seed=7)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, hang="cruise")
+        optimizer2.watchdog = optimizer2.StageWatchdog(defaults={"update_geom": 60.0, "cruise": 1.5, "pitch": 60.0})
+        pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+        try:
+            start = time.time()
+            energies = pool(optimizer2.evaluate_design, population)
+            elapsed = time.time() - start
+        finally:
+            pool.close()
+        rows = read_history()
+        with open(os.path.join(tmp, "sandboxes", "worker_00", "hung_child.pid")) as f:
+            child_pid = int(f.read())
+
+    assert elapsed < 30.0
+    # Scored, not failed (crash penalties can exceed FAILURE_ENERGY)
+    assert all(np.isfinite(energies)) and all(e != optimizer2.FAILURE_ENERGY for e in energies)
+    assert [row["failure_class"] for row in rows] == ["cruise_retried", "cruise_retried"]
+    if os.path.isdir("/proc"):
+        time.sleep(0.2)
+        assert not process_alive(child_pid), "solver child survived the watchdog"
+
+def test_watchdog_gives_up_after_failed_retry():
+    population = random_population(2, seed=8)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, hang="cruise")
+        os.environ["FAKE_VSP_HANG_RETRY"] = "1"
+        optimizer2.watchdog = optimizer2.StageWatchdog(defaults={"update_geom": 60.0, "cruise": 1.0, "pitch": 60.0})
+        pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+        try:
+            energies = pool(optimizer2.evaluate_design, population)
+        finally:
+            pool.close()
+            os.environ["FAKE_VSP_HANG_RETRY"] = "0"
+        rows = read_history()
+
+    # Failures must look worse than any real design to the minimizer
+    assert energies == [optimizer2.FAILURE_ENERGY] * 2
+    assert [row["failure_class"] for row in rows] == ["cruise_timeout", "cruise_timeout"]
+    assert all(float(row["final_obj"]) == -optimizer2.FAILURE_ENERGY for row in rows)
+    assert all(abs(float(row["span_mm"]) - x[0]) < 0.01 for row, x in zip(rows, population))
+
+def gate_passing_population(n, seed):
+    """Designs that pass the Tier 2 gate (L/D > 8, span penalty < 1)."""
+    rng = np.random.default_rng(seed)
+    return [np.array([300.0 + 70.0 * rng.random(), 20.0, 220.0 + 100.0 * rng.random(), 0.8, 110.0, 0.22])
+            for _ in range(n)]
+
+def test_batch_matches_single_design_path():
+    population = gate_passing_population(3, seed=13) + random_population(3, seed=13)
+    timings, energies = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, startup=0.3)
+        pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+        try:
+            start = time.time()
+            energies["single"] = pool(optimizer2.evaluate_design, population)
+            timings["single"] = time.time() - start
+        finally:
+            pool.close()
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp, startup=0.3)
+        batch = optimizer2.BatchEvaluator(root=os.path.join(tmp, "sandboxes"))
+        start = time.time()
+        # DE's vectorized layout: one column per design
+        energies["batch"] = batch(np.array(population).T)
+        timings["batch"] = time.time() - start
+        rows = read_history()
+        with open(os.path.join(batch.workdir, optimizer2.BATCH_MANIFEST)) as f:
+            manifest = json.load(f)
+
+    np.testing.assert_allclose(energies["single"], energies["batch"])
+    assert energies["batch"].shape == (len(population),)
+    assert [int(row["iter"]) for row in rows] == list(range(1, len(population) + 1))
+    assert len(manifest["designs"]) == len(population)
+    np.testing.assert_allclose(manifest["designs"][4]["x"], population[4])
+    # Tier 2 re-applied each design's own geometry
+    tier2_rows = [row for row in rows if row["xnp"] != "N/A"]
+    assert len(tier2_rows) >= 3
+    for row in tier2_rows:
+        assert abs(float(row["xnp"]) - (float(row["xloc_mm"]) + 12.0)) < 0.05
+    # One Tier 1 launch instead of two per design
+    assert timings["batch"] < 0.6 * timings["single"], timings
+
+def test_batch_reruns_designs_without_results():
+    bounds = [(275.0, 480.0), (0.0, 40.0), (220.0, 340.0), (0.6, 0.9), (95.0, 125.0), (0.22, 0.22)]
+    population = random_population(4, seed=14)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+        try:
+            expected = pool(optimizer2.evaluate_design, population)
+        finally:
+            pool.close()
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        os.environ["FAKE_VSP_BATCH_SKIP"] = "1,3"
+        batch = optimizer2.BatchEvaluator(root=os.path.join(tmp, "sandboxes"))
+        energies = batch(np.array(population).T)
+        rows = read_history()
+        assert [row["failure_class"] for row in rows] == ["ok"] * 4
+        np.testing.assert_allclose(energies, expected)
+
+        # Whole generations through DE's vectorized path
+        optimizer2.init_history_log()
+        result = differential_evolution(
+            batch, bounds, maxiter=1, popsize=2, seed=3, polish=False,
+            vectorized=True, updating='deferred'
+        )
+        rows = read_history()
+    # Vectorized nfev counts calls: initial population + 1 generation of 10 designs each
+    assert result.nfev == 2
+    assert len(rows) == 20
+    assert np.isfinite(result.fun)
+
+if __name__ == "__main__":
+    tests = [
+        test_sandboxes_are_isolated,
+        test_parallel_is_faster_than_serial,
+        test_differential_evolution_with_workers,
+        test_fused_script_matches_two_launch_path,
+        test_generated_scripts_stay_out_of_source_dir,
+        test_shared_script_functions_are_inlined,
+        test_pipelined_tier2_overlaps_tier1,
+        test_core_scheduler_stays_within_budget,
+        test_core_scheduler_learns_best_split,
+        test_scheduler_writes_ncpu_into_scripts,
+        test_vsp_is_pinned_at_launch,
+        test_watchdog_timeout_learns_from_stage_times,
+        test_watchdog_kills_and_retries_hung_cruise,
+        test_watchdog_gives_up_after_failed_retry,
+        test_batch_matches_single_design_path,
+        test_batch_reruns_designs_without_results,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,157 @@
+"""
+Test for the analytic feasibility pre-filter (optimizer2.prefilter).
+
+Uses the fake `vsp` executable from test_parallel_eval.py:
+- analytic_penalties gives the span / trailing edge penalties analyze_design
+  logs, and its best_obj bounds every real objective
+- Designs that can't beat the worst population member skip the solver, with
+  the reason in prefilter_log.csv and failure_class = prefiltered
+- The batch path filters the whole population in one pass
+- A DE run filters generation 1's trials, but never the initial population
+- DE selects exactly the same designs with and without the pre-filter, with
+  fewer solver runs
+
+Run directly (python test_prefilter.py) or under pytest.
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, gate_passing_population, evaluate
+from test_checkpoint_resume import setup_run, restore_defaults
+
+# Span penalty 16.9 (fails the gate) and trailing edge at 718 mm: best possible objective -7.88
+HOPELESS = np.array([480.0, 40.0, 300.0, 0.8, 110.0, 0.22])
+# Wide enough that DE proposes designs with no chance of surviving selection
+WIDE_BOUNDS = [(275.0, 650.0), (0.0, 60.0), (220.0, 340.0), (0.6, 0.9), (95.0, 125.0), (0.22, 0.22)]
+
+def read_prefilter_log():
+    with open(optimizer2.PREFILTER_LOG, "r") as f:
+        return list(csv.DictReader(f))
+
+def cruise_runs():
+    return len(optimizer2.watchdog.times.get("cruise", []))
+
+def test_penalties_match_and_bound_the_objective():
+    population = random_population(8, seed=70) + [HOPELESS]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        evaluate(population, tmp)
+        rows = read_history()
+
+    penalties = optimizer2.analytic_penalties(population)
+    np.testing.assert_allclose([float(r["span_penalty"]) for r in rows], penalties["span_penalty"], atol=1e-4)
+    np.testing.assert_allclose([float(r["te_penalty"]) for r in rows], penalties["te_penalty"], atol=1e-4)
+    np.testing.assert_allclose([float(r["te_x_mm"]) for r in rows], penalties["te_x"], atol=0.01)
+    assert np.all([float(r["final_obj"]) for r in rows] <= penalties["best_obj"] + 1e-6)
+    assert penalties["gate_failure"][-1] and abs(penalties["best_obj"][-1] + 7.88) < 0.01
+
+def test_hopeless_design_skips_solver():
+    population = gate_passing_population(2, seed=71) + [HOPELESS]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        optimizer2.prefilter_threshold = 5.0
+        energies = evaluate(population, tmp)
+        rows = read_history()
+        log = read_prefilter_log()
+        runs = cruise_runs()
+
+    assert runs == 2
+    assert [row["failure_class"] for row in rows] == ["ok", "ok", "prefiltered"]
+    best_obj = optimizer2.analytic_penalties([HOPELESS])["best_obj"][0]
+    assert abs(float(rows[2]["final_obj"]) - best_obj) < 1e-4
+    assert energies[2] == -best_obj and energies[2] > -optimizer2.prefilter_threshold
+    assert len(log) == 1 and int(log[0]["iter"]) == 3
+    assert "fails the Tier 2 gate" in log[0]["reason"] and "trailing edge" in log[0]["reason"]
+    assert float(log[0]["worst_survivor_obj"]) == 5.0
+    assert optimizer2.prefilter_skips == 1
+
+def test_batch_filters_the_population():
+    population = [HOPELESS] + gate_passing_population(2, seed=72) + [HOPELESS + np.array([-10.0, 0, 0, 0, 0, 0])]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        optimizer2.prefilter_threshold = 5.0
+        batch = optimizer2.BatchEvaluator(root=os.path.join(tmp, "sandboxes"))
+        batch(np.array(population).T)
+        rows = read_history()
+        with open(os.path.join(batch.workdir, "batch_cruise_gen.vspscript")) as f:
+            script = f.read()
+    assert "const int NDESIGNS = 2;" in script
+    assert [row["failure_class"] for row in rows] == ["prefiltered", "ok", "ok", "prefiltered"]
+
+def test_threshold_is_the_worst_survivor():
+    optimizer2.update_prefilter_threshold([-3.0, 2.0, -1.0])
+    assert optimizer2.prefilter_threshold == -2.0
+    optimizer2.prefilter_threshold = None
+    assert optimizer2.prefilter([HOPELESS]) == {}  # generation 0: nothing to compare with
+
+def test_first_generation_is_filtered():
+    # Stand-in backend (stable near the baseline) with a wide span range: some
+    # generation 1 trials can't beat the worst initial member
+    span, sweep, xloc, taper, tip, ctrl = optimizer2.BASELINE_X
+    bounds = [(275.0, 900.0), (0.0, 40.0), (xloc, xloc), (taper, taper), (tip, tip), (ctrl, ctrl)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            optimizer2.set_solver_backend(optimizer2.StandInBackend(latency={}))
+            optimizer2.DE_POPSIZE = 2
+            optimizer2.DE_MAXITER = 1
+            optimizer2.DE_SEED = 5
+            optimizer2.prefilter_threshold = 1e9  # left over from an earlier run: must not filter generation 0
+            optimizer2.run_differential_evolution(bounds)
+            members = optimizer2.population_size()
+            rows = sorted(read_history(), key=lambda row: int(row["iter"]))
+    finally:
+        optimizer2.set_solver_backend(None)
+        optimizer2.de_population_members = None
+        restore_defaults()
+    assert len(rows) == 2 * members
+    assert all(row["failure_class"] != "prefiltered" for row in rows[:members])
+    assert any(row["failure_class"] == "prefiltered" for row in rows[members:])
+
+def test_de_selects_the_same_designs():
+    results, runs = {}, {}
+    try:
+        for enabled in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                setup_run(tmp)
+                optimizer2.DE_POPSIZE = 2
+                optimizer2.DE_MAXITER = 10
+                optimizer2.PREFILTER_ENABLED = enabled
+                results[enabled] = optimizer2.run_differential_evolution(WIDE_BOUNDS)
+                runs[enabled] = cruise_runs()
+                rows = read_history()
+    finally:
+        optimizer2.PREFILTER_ENABLED = True
+        restore_defaults()
+
+    np.testing.assert_array_equal(results[True].x, results[False].x)
+    assert results[True].fun == results[False].fun
+    skipped = sum(row["failure_class"] == "prefiltered" for row in rows)
+    assert skipped > 0 and runs[True] == runs[False] - skipped
+
+if __name__ == "__main__":
+    tests = [
+        test_penalties_match_and_bound_the_objective,
+        test_hopeless_design_skips_solver,
+        test_batch_filters_the_population,
+        test_threshold_is_the_worst_survivor,
+        test_first_generation_is_filtered,
+        test_de_selects_the_same_designs,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
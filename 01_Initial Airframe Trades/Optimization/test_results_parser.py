@@ -0,0 +1,116 @@
+"""
+Test for the single-pass indexed Results.csv parser (optimizer2.ResultsTable).
+
+No VSP needed:
+- Every line is indexed by label and result block; row() / values() read a
+  label from any block, and the default stays the first row in the file
+- Typed accessors return float arrays / scalars, nan for text, None if missing
+- Tables built from rows (OpenVSP API backend, merged adaptive sweeps) work
+  the same way
+- The extract_* functions read a large multi-block Results.csv to the same
+  values as scanning the file once per quantity, several times faster
+
+Run directly (python test_results_parser.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+import benchmark_results_parser
+
+MULTI_BLOCK = """\
+Results_Name,VSPAERO_History
+CLtot,0.1,0.2
+L_D,-1.0,-2.0
+Results_Name,VSPAERO_Polar
+Alpha,2.0,4.0,6.0,8.0,10.0,12.0,14.0
+CLtot,0.16,0.32,0.48,0.64,0.80,0.96,1.12
+CMytot,0.01,0.00,-0.01,-0.02,-0.03,-0.04,-0.05
+L_D,-8.0,-12.0,-15.0,-16.0,-15.5,-14.0,-12.0
+Results_Date,Mon,Jan,1
+Results_Name,VSPAERO_Flow_Conditions
+FC_Cref_,137.88
+FC_Xcg_,314.25
+"""
+
+def write(tmp, text, name="Results.csv"):
+    path = os.path.join(tmp, name)
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+def test_blocks_are_indexed():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = optimizer2.ResultsTable.from_csv(write(tmp, MULTI_BLOCK))
+    assert table.blocks == ["VSPAERO_History", "VSPAERO_Polar", "VSPAERO_Flow_Conditions"]
+    # Default: the first row in the file, as the CSV scans always picked
+    assert table.row("CLtot") == ["CLtot", "0.1", "0.2"]
+    np.testing.assert_allclose(table.values("CLtot", block="VSPAERO_Polar"), 0.16 * np.arange(1, 8))
+    np.testing.assert_allclose(table.values("L_D", block=1)[3], -16.0)
+    assert [row[1] for row in table.all_rows("L_D")] == ["-1.0", "-8.0"]
+    assert table.row("CLtot", block="VSPAERO_Flow_Conditions") is None
+    assert table.row("CDtot") is None and table.all_rows("CDtot") == []
+
+def test_typed_accessors():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = optimizer2.ResultsTable.from_csv(write(tmp, MULTI_BLOCK.replace("VSPAERO_History", "Other")
+                                                        .replace("CLtot,0.1,0.2\nL_D,-1.0,-2.0\n", "")))
+    assert isinstance(table.L_D, np.ndarray) and table.L_D.dtype == float and len(table.L_D) == 7
+    np.testing.assert_allclose(table.CMytot[:2], [0.01, 0.0])
+    assert table.CDtot is None
+    assert table.FC_Cref_ == 137.88 and table.FC_Xcg_ == 314.25
+    np.testing.assert_array_equal(table.values("Results_Date"), [np.nan, np.nan, 1.0])
+    assert table.scalar("Results_Date", default=-1.0) == -1.0
+    assert table.values("L_D") is table.values("L_D")  # converted once
+
+def test_tables_from_rows():
+    rows = {"L_D": ["L_D", -10.0, "-12.5", "nan"], "FC_Cref_": ["FC_Cref_", 140.0]}
+    table = optimizer2.ResultsTable(rows, optimizer2.RESULTS_CSV)
+    np.testing.assert_array_equal(table.L_D[:2], [-10.0, -12.5])
+    assert np.isnan(table.L_D[2]) and table.FC_Cref_ == 140.0
+    assert table.row("L_D", block=0) == rows["L_D"] and table.row("L_D", block="VSPAERO_Polar") is None
+    assert table.all_rows("L_D") == [rows["L_D"]]
+
+def test_extract_functions_match_scans():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "Results.csv")
+        polar = benchmark_results_parser.write_results_csv(path, n_alphas=7, span_stations=300)
+        write(tmp, "Results_Name,Mass_Properties\nTotal_CG,405.5,0,0\n", "MassProp_Results.csv")
+        write(tmp, "Aerodynamic Center is at: ( 420.0, 0.0, 0.0)\n", "current.aerocenter.stab")
+
+        table = optimizer2.load_results_table(path)
+        ld, cl, cm, cref, xcg = benchmark_results_parser.read_per_quantity(path)
+        band_ld, _, curve = optimizer2.extract_band_ld(table)
+        assert optimizer2.extract_cg_from_results(table) == 405.5
+        margin, _, _, xnp, mac, _ = optimizer2.extract_stability_margin(None, table)
+        xnp_estimate, _ = optimizer2.estimate_neutral_point(table)
+        times = benchmark_results_parser.time_readers(path, repeats=5)
+
+    np.testing.assert_array_equal(curve, np.clip(-ld, 0.0, 50.0))
+    np.testing.assert_allclose(polar["L_D"], ld, atol=1e-10)  # written with 10 decimals
+    assert mac == cref == 137.88 and xnp == 420.0 and abs(margin - 14.5 / 137.88 * 100.0) < 1e-9
+    assert abs(xnp_estimate - (xcg - cref * np.polyfit(cl, cm, 1)[0])) < 1e-9
+    assert times["indexed table"] < 0.5 * times["per-quantity scans"]
+
+if __name__ == "__main__":
+    tests = [
+        test_blocks_are_indexed,
+        test_typed_accessors,
+        test_tables_from_rows,
+        test_extract_functions_match_scans,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
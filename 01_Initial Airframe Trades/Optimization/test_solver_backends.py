@@ -0,0 +1,231 @@
+"""
+Test for the pluggable solver backends (subprocess vs openvsp Python API).
+
+A mock `openvsp` module stands in for the real API and a fake `vsp`
+executable stands in for vsp.exe; both produce the same synthetic
+aerodynamics, so the two backends must score designs identically:
+- API backend loads baseline.vsp3 once and sets DES parms with SetParmVal
+- API results come from the results manager (no Results.csv is written)
+- The subprocess backend is the default even when openvsp imports; the API
+  backend is selected only with "api"
+
+Run directly (python test_solver_backends.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, fake_cg
+
+# ---------------------------------------------------------------------
+# Mock openvsp module
+# ---------------------------------------------------------------------
+SPAN_PARM = "ZVZTXUKAZWE"   # Lwing:XSec_1:Span
+XLOC_PARM = "VEBCTUVXEVB"   # Lwing:XForm:X_Rel_Location
+SWEEP_PARM = "QTIUMVPVMNM"  # Lwing:XSec_1:Sweep
+TAPER_PARM = "QDYUWWIMJJA"  # Lwing:XSec_1:Taper
+TIP_PARM = "IQQQXPRMWKO"    # Lwing:XSec_1:Tip_Chord
+
+class MockVec3d:
+    def __init__(self, x, y, z):
+        self._xyz = (x, y, z)
+
+    def x(self):
+        return self._xyz[0]
+
+    def y(self):
+        return self._xyz[1]
+
+    def z(self):
+        return self._xyz[2]
+
+class MockOpenVSP:
+    """Just enough of the openvsp module for OpenVSPAPIBackend."""
+    INT_DATA = 0
+    DOUBLE_DATA = 1
+    STRING_DATA = 2
+    VEC3D_DATA = 3
+
+    def __init__(self):
+        self.parms = {}
+        self.read_count = 0
+        self.set_count = 0
+        self.massprop_count = 0
+        self.vsp3_file = None
+        self.inputs = {}
+        self.results = {}
+
+    # Model
+    def ClearVSPModel(self):
+        self.parms = {}
+
+    def ReadVSPFile(self, path):
+        assert os.path.exists(path)
+        self.read_count += 1
+        # Parm IDs/values of the baseline model, as listed in baseline.des
+        with open(os.path.join(optimizer2.SCRIPT_DIR, "baseline.des")) as f:
+            for line in f.readlines()[1:]:
+                parts = line.strip().split(":")
+                self.parms[parts[0]] = float(parts[4])
+
+    def SetParmVal(self, parm_id, value):
+        if parm_id not in self.parms and not parm_id.startswith(("ARLMRMBRQTY", "OJGNBNXLMTG")):
+            raise KeyError(f"Unknown parm {parm_id}")
+        self.parms[parm_id] = float(value)
+        self.set_count += 1
+
+    def Update(self):
+        pass
+
+    def SetVSP3FileName(self, path):
+        self.vsp3_file = path
+
+    # Analyses
+    def SetAnalysisInputDefaults(self, analysis):
+        self.inputs[analysis] = {}
+
+    def SetIntAnalysisInput(self, analysis, name, values):
+        self.inputs.setdefault(analysis, {})[name] = list(values)
+
+    def SetDoubleAnalysisInput(self, analysis, name, values):
+        self.inputs.setdefault(analysis, {})[name] = list(values)
+
+    def ExecAnalysis(self, analysis):
+        span = self.parms[SPAN_PARM]
+        xloc = self.parms[XLOC_PARM]
+        rid = f"{analysis}_{len(self.results)}"
+        if analysis == "MassProp":
+            self.massprop_count += 1
+            cg = fake_cg(span, self.parms[SWEEP_PARM], xloc, self.parms[TAPER_PARM], self.parms[TIP_PARM])
+            self.results[rid] = {"Total_CG": (self.VEC3D_DATA, [MockVec3d(cg, 0.0, 0.0)])}
+        elif analysis == "VSPAEROSweep":
+            settings = self.inputs[analysis]
+            if settings["UnsteadyType"] == [5]:
+                stab = os.path.splitext(self.vsp3_file)[0] + ".aerocenter.stab"
+                with open(stab, "w") as f:
+                    f.write(f"Aerodynamic Center is at: ( {xloc + 12.0:.4f}, 0.0000, 0.0000)\n")
+                self.results[rid] = {}
+            else:
+                start, end, npts = settings["AlphaStart"][0], settings["AlphaEnd"][0], settings["AlphaNpts"][0]
+                alphas = [start + i * (end - start) / max(npts - 1, 1) for i in range(npts)]
+                polar_id = rid + "_polar"
+                self.results[polar_id] = {
+                    "L_D": (self.DOUBLE_DATA, [-(span / 30.0) * (1.0 - ((a - 8) / 10.0) ** 2) for a in alphas]),
+                    "CLtot": (self.DOUBLE_DATA, [0.08 * a for a in alphas]),
+                    "CMytot": (self.DOUBLE_DATA, [0.01 + (314.25 - (xloc + 12.0)) / 137.88 * 0.08 * a for a in alphas]),
+                    "FC_Cref_": (self.DOUBLE_DATA, [137.88]),
+                    "FC_Xcg_": (self.DOUBLE_DATA, [314.25]),
+                }
+                self.results[rid] = {"ResultsVec": (self.STRING_DATA, [polar_id])}
+        else:
+            self.results[rid] = {}
+        return rid
+
+    # Results manager
+    def GetAllDataNames(self, rid):
+        return list(self.results[rid])
+
+    def GetResultsType(self, rid, name):
+        return self.results[rid][name][0]
+
+    def GetDoubleResults(self, rid, name, index=0):
+        return self.results[rid][name][1]
+
+    def GetIntResults(self, rid, name, index=0):
+        return self.results[rid][name][1]
+
+    def GetStringResults(self, rid, name, index=0):
+        return self.results[rid][name][1]
+
+    def GetVec3dResults(self, rid, name, index=0):
+        return self.results[rid][name][1]
+
+    # Errors
+    def GetNumTotalErrors(self):
+        return 0
+
+# ---------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------
+def evaluate_with(backend, population, tmp):
+    setup_optimizer(tmp)
+    optimizer2.set_solver_backend(backend)
+    pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+    try:
+        return pool(optimizer2.evaluate_design, population)
+    finally:
+        pool.close()
+        optimizer2.set_solver_backend(None)
+
+def test_api_backend_matches_subprocess_backend():
+    population = random_population(5, seed=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        subprocess_energies = evaluate_with(optimizer2.SubprocessBackend(), population, tmp)
+    with tempfile.TemporaryDirectory() as tmp:
+        api_energies = evaluate_with(optimizer2.OpenVSPAPIBackend(MockOpenVSP()), population, tmp)
+        rows = read_history()
+        # Results came from the results manager, not from a Results.csv file
+        assert not os.path.exists(os.path.join(tmp, "sandboxes", "worker_00", "Results.csv"))
+
+    np.testing.assert_allclose(subprocess_energies, api_energies)
+    assert any(row["xnp"] != "N/A" for row in rows)
+
+def test_api_backend_keeps_model_loaded():
+    vsp = MockOpenVSP()
+    population = random_population(4, seed=5)
+    with tempfile.TemporaryDirectory() as tmp:
+        evaluate_with(optimizer2.OpenVSPAPIBackend(vsp), population, tmp)
+    assert vsp.read_count == 1
+    assert vsp.set_count == len(population) * len(optimizer2.DES_PARMS)
+    # Model holds the last design's parms
+    assert vsp.parms[SPAN_PARM] == population[-1][0]
+
+def test_backend_selection():
+    saved = sys.modules.get("openvsp")
+    try:
+        # Subprocess by default even when openvsp imports; the API backend is opt-in
+        sys.modules["openvsp"] = MockOpenVSP()
+        optimizer2.set_solver_backend(None)
+        assert optimizer2.SOLVER_BACKEND == "subprocess"
+        assert optimizer2.get_solver_backend().name == "subprocess"
+
+        optimizer2.set_solver_backend(None)
+        optimizer2.SOLVER_BACKEND = "api"
+        assert optimizer2.get_solver_backend().name == "api"
+
+        sys.modules["openvsp"] = None  # import openvsp -> ImportError
+        optimizer2.set_solver_backend(None)
+        try:
+            optimizer2.get_solver_backend()
+            assert False, "api backend without openvsp"
+        except ImportError:
+            pass
+    finally:
+        optimizer2.SOLVER_BACKEND = "subprocess"
+        optimizer2.set_solver_backend(None)
+        if saved is None:
+            sys.modules.pop("openvsp", None)
+        else:
+            sys.modules["openvsp"] = saved
+
+if __name__ == "__main__":
+    tests = [
+        test_api_backend_matches_subprocess_backend,
+        test_api_backend_keeps_model_loaded,
+        test_backend_selection,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,159 @@
+"""
+Test for the per-stage wall-clock columns of opt_history.csv and the
+dashboard's stage-time panel.
+
+Runs evaluations on the stand-in backend:
+- geom_s / cruise_s / pitch_s follow the stand-in latencies, and a row's
+  columns plus the next rows' add up to the wall time of the run
+- Nested spans are exclusive (parsing inside a cruise span is parse_s only)
+- Failed and skipped designs get timing columns too
+- monitor_dashboard.generate_dashboard draws the stacked-area chart and the
+  rolling p50/p95 table, and still works on a history without the columns
+
+Run directly (python test_stage_times.py) or under pytest.
+"""
+
+import os
+import sys
+import csv
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+import monitor_dashboard
+from test_parallel_eval import setup_optimizer, read_history, gate_passing_population
+
+LATENCY = {"update_geom": 0.03, "cruise": 0.06, "pitch": 0.04}
+
+def run_standin(tmp, population, workers=1, **kwargs):
+    setup_optimizer(tmp)
+    optimizer2.set_solver_backend(optimizer2.StandInBackend(latency=LATENCY, **kwargs))
+    pool = optimizer2.SandboxPool(workers, root=os.path.join(tmp, "sandboxes"))
+    start = time.perf_counter()
+    try:
+        pool(optimizer2.evaluate_design, population)
+    finally:
+        pool.close()
+    return time.perf_counter() - start
+
+def seconds(row):
+    return {column: float(row[column]) for column in optimizer2.STAGE_TIME_HEADER}
+
+def test_columns_follow_stages():
+    population = gate_passing_population(4, seed=92)
+    with tempfile.TemporaryDirectory() as tmp:
+        wall = run_standin(tmp, population)
+        rows = read_history()
+
+    assert optimizer2.HISTORY_HEADER.strip().split(",")[-7:] == optimizer2.STAGE_TIME_HEADER
+    for row in rows:
+        times = seconds(row)
+        assert row["xnp_source"] == "pitch"
+        # Stand-in latencies within the +-10% jitter
+        assert 0.9 * LATENCY["update_geom"] <= times["geom_s"] < 1.1 * LATENCY["update_geom"] + 0.02
+        assert 0.9 * LATENCY["cruise"] <= times["cruise_s"] < 1.1 * LATENCY["cruise"] + 0.02
+        assert 0.9 * LATENCY["pitch"] <= times["pitch_s"] < 1.1 * LATENCY["pitch"] + 0.02
+        assert times["parse_s"] > 0.0 and times["logging_s"] > 0.0
+        assert all(value >= 0.0 for value in times.values())
+    # First row has no previous row on its thread; together the rows cover the run
+    assert seconds(rows[0])["overhead_s"] == 0.0
+    accounted = sum(sum(seconds(row).values()) for row in rows)
+    assert 0.9 * wall < accounted <= wall
+
+def test_nested_spans_are_exclusive():
+    times = optimizer2.begin_stage_times()
+    parse = optimizer2.traced("parse", name="parse_results")(lambda: time.sleep(0.05))
+    try:
+        with optimizer2.trace_span("cruise", "solver"):
+            time.sleep(0.03)
+            parse()
+        with optimizer2.trace_span("pitch attempt", "solver"):  # not a column
+            time.sleep(0.02)
+        fields = optimizer2.stage_time_fields()
+    finally:
+        optimizer2._worker_state.stage_times = None
+    assert optimizer2._worker_state.stage_times is None
+    assert 0.03 <= float(fields["cruise_s"]) < 0.045
+    assert 0.05 <= float(fields["parse_s"]) < 0.065
+    assert 0.02 <= float(fields["other_s"]) < 0.035
+    assert float(fields["pitch_s"]) == 0.0 and times.stack == []
+    # Outside an evaluation the row gets N/A
+    assert set(optimizer2.stage_time_fields().values()) == {"N/A"}
+
+def test_failed_designs_are_timed():
+    population = gate_passing_population(4, seed=103)
+    with tempfile.TemporaryDirectory() as tmp:
+        run_standin(tmp, population, failures={"cruise:error": 0.25})
+        rows = read_history()
+    failed = [row for row in rows if row["failure_class"] == "cruise_error"]
+    assert failed and len(rows) == 4
+    for row in failed:
+        times = seconds(row)
+        assert times["cruise_s"] >= 0.9 * LATENCY["cruise"] and times["pitch_s"] == 0.0
+
+def write_history(path, rows, columns):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_dashboard_panel():
+    stage_columns = [column for column, _, _ in monitor_dashboard.STAGE_TIME_COLUMNS]
+    base = {"generation": "0", "final_obj": "1.0", "static_margin": "10.0", "sm_category": "sweet_spot",
+            "ld_at_8deg": "15.0", "vspaero_time_s": "60.0", "span_mm": "330.0", "sweep_deg": "25.0",
+            "xloc_mm": "320.0", "taper": "0.83", "tip_mm": "120.0"}
+    rows = []
+    for i in range(1, 61):
+        row = dict(base, iter=str(i))
+        row.update({column: "1.0" for column in stage_columns})
+        row["cruise_s"] = str(float(i))  # last 50: 11..60
+        rows.append(row)
+    rows.append(dict(base, iter="61", **{column: "N/A" for column in stage_columns}))  # unsolved row
+
+    stats = {stat["column"]: stat for stat in monitor_dashboard.analyze_stage_times(rows)["stats"]}
+    assert stats["cruise_s"]["p50"] == 35.5 and abs(stats["cruise_s"]["p95"] - 57.55) < 1e-9
+    assert stats["geom_s"]["p95"] == 1.0
+    assert abs(sum(stat["share"] for stat in stats.values()) - 100.0) < 1e-9
+    assert abs(stats["cruise_s"]["hours_per_generation"] - 35.5 * 100 / 3600) < 1e-9  # 20 x 5 members
+
+    saved = (monitor_dashboard.HISTORY_FILE, monitor_dashboard.STATUS_FILE, monitor_dashboard.DASHBOARD_FILE)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            monitor_dashboard.STATUS_FILE = os.path.join(tmp, "optimizer_status.json")
+            monitor_dashboard.DASHBOARD_FILE = os.path.join(tmp, "dashboard.html")
+            monitor_dashboard.HISTORY_FILE = os.path.join(tmp, "opt_history.csv")
+            write_history(monitor_dashboard.HISTORY_FILE, rows, list(rows[0]))
+            assert monitor_dashboard.generate_dashboard()
+            with open(monitor_dashboard.DASHBOARD_FILE, encoding="utf-8") as f:
+                html = f.read()
+            assert "stageChart" in html and "Stage Times (Last 50)" in html and "57.5" in html
+
+            # History from before the stage-time columns
+            old_columns = [column for column in rows[0] if column not in stage_columns]
+            write_history(monitor_dashboard.HISTORY_FILE, [{c: row[c] for c in old_columns} for row in rows],
+                          old_columns)
+            assert monitor_dashboard.generate_dashboard()
+            with open(monitor_dashboard.DASHBOARD_FILE, encoding="utf-8") as f:
+                html = f.read()
+            assert "stageChart" not in html and "No per-stage timing" in html
+    finally:
+        monitor_dashboard.HISTORY_FILE, monitor_dashboard.STATUS_FILE, monitor_dashboard.DASHBOARD_FILE = saved
+
+if __name__ == "__main__":
+    tests = [
+        test_columns_follow_stages,
+        test_nested_spans_are_exclusive,
+        test_failed_designs_are_timed,
+        test_dashboard_panel,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
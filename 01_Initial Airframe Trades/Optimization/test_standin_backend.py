@@ -0,0 +1,164 @@
+"""
+Test for the solver backend interface and the stand-in backend
+(optimizer2.StandInBackend).
+
+No OpenVSP needed:
+- The stand-in writes Results.csv, MassProp_Results.csv and
+  current.aerocenter.stab that the optimizer reads like VSP's: a single-peaked
+  polar, a MassProp CG and the vortex lattice neutral point
+- Results, latency jitter and failures are the same every time a design is
+  evaluated
+- Latency scales with the cores the core scheduler gives a job
+- Injected failures end the way real ones do: an error is a cruise_error, a
+  hang is stopped by the watchdog and retried, a missing .stab is a crash
+  penalty
+- A DE run on parallel workers with a pipelined Tier 2 completes end to end
+- A serial run works in its own sandbox, not the script directory
+
+Run directly (python test_standin_backend.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import vlm
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history, gate_passing_population, evaluate
+from test_checkpoint_resume import setup_run, restore_defaults
+
+BASELINE = np.array(optimizer2.BASELINE_X)
+
+def use_standin(tmp, **kwargs):
+    setup_optimizer(tmp)
+    backend = optimizer2.StandInBackend(**kwargs)
+    optimizer2.set_solver_backend(backend)
+    return backend
+
+def test_files_read_like_vsp_output():
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_standin(tmp)
+        backend.update_geometry(BASELINE, tmp)
+        results, _ = backend.run_cruise(tmp)
+        assert backend.run_pitch(tmp)
+
+        np.testing.assert_allclose(optimizer2.read_des_file(os.path.join(tmp, "current.des")), BASELINE)
+        table = optimizer2.load_results_table(results)
+        ld = -np.array([float(v) for v in table.row("L_D")[1:]])
+        assert 6 <= optimizer2.SWEEP_ALPHAS[int(np.argmax(ld))] <= 10 and 12 < ld.max() < 25
+        cg_x = optimizer2.extract_cg_from_results(results, os.path.join(tmp, "current.aerocenter.stab"))
+        assert abs(cg_x - backend.massprop_cg(BASELINE)[0]) < 1e-6
+        margin, crash, slug, xnp, mac, _ = optimizer2.extract_stability_margin(None, results, design_x=BASELINE)
+
+    aero = vlm.solve(BASELINE, xref=optimizer2.StandInBackend.XCG)
+    assert abs(xnp - aero["xnp"][0]) < 1e-3 and abs(mac - aero["cref"][0]) < 1e-6
+    assert 5.0 < margin < 15.0 and crash == 0.0 and slug == 0.0
+
+def test_deterministic():
+    population = gate_passing_population(3, seed=90)
+    runs = []
+    for _ in range(2):
+        with tempfile.TemporaryDirectory() as tmp:
+            use_standin(tmp, failures={"pitch:error": 0.5})
+            energies = evaluate(population, tmp)
+            runs.append((energies, [row["crash_penalty"] for row in read_history()]))
+    assert runs[0] == runs[1]
+
+def test_latency_scales_with_cores():
+    backend = optimizer2.StandInBackend(latency={"cruise": 0.4})
+    times = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        adaptive, optimizer2.ADAPTIVE_ALPHA = optimizer2.ADAPTIVE_ALPHA, False
+        try:
+            backend.update_geometry(BASELINE, tmp)
+            for cores in (1, 16):
+                optimizer2.core_scheduler = optimizer2.CoreScheduler(cores)
+                times[cores] = backend.run_cruise(tmp)[1]
+        finally:
+            optimizer2.core_scheduler = None
+            optimizer2.ADAPTIVE_ALPHA = adaptive
+    # Amdahl with a 90% parallel fraction: 1 core is 6.4x slower than 16
+    assert abs(times[16] - 0.4 * (1 + backend._draw(BASELINE, "cruise:latency") * 0.2 - 0.1)) < 0.05
+    assert 5.5 < times[1] / times[16] < 7.0
+
+def test_injected_failures():
+    population = gate_passing_population(4, seed=103)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_standin(tmp, failures={"cruise:error": 0.25, "cruise:hang": 0.25, "pitch:error": 0.5})
+        optimizer2.watchdog = optimizer2.StageWatchdog(defaults={"update_geom": 1.0, "cruise": 0.3, "pitch": 1.0})
+        backend = optimizer2.get_solver_backend()
+        kinds = [backend._failure(x, "cruise") for x in population]
+        pitch = [backend._failure(x, "pitch") for x in population]
+        energies = evaluate(population, tmp)
+        rows = read_history()
+
+    outcomes = {"error": "cruise_error", "hang": "cruise_retried", None: "ok"}
+    assert set(kinds) == {"error", "hang", None} and "error" in pitch
+    for kind, missing_stab, row, energy in zip(kinds, pitch, rows, energies):
+        if kind == "error":
+            assert row["failure_class"] == "cruise_error" and energy == optimizer2.FAILURE_ENERGY
+            continue
+        assert row["failure_class"] == outcomes[kind]
+        if missing_stab:
+            assert float(row["crash_penalty"]) >= 5.0
+
+def test_de_end_to_end():
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            optimizer2.set_solver_backend(optimizer2.StandInBackend(latency={"cruise": 0.05, "pitch": 0.05}))
+            optimizer2.DE_POPSIZE = 2
+            pool = optimizer2.SandboxPool(3, root=os.path.join(tmp, "sandboxes"), tier2_workers=1)
+            try:
+                result = optimizer2.run_differential_evolution(optimizer2.DESIGN_BOUNDS, workers=pool)
+            finally:
+                pool.close()
+            rows = read_history()
+            tier2_used = os.listdir(os.path.join(tmp, "sandboxes"))
+    finally:
+        restore_defaults()
+    assert np.isfinite(result.fun) and result.fun < 0
+    assert all(row["failure_class"] in ("ok", "prefiltered") for row in rows)
+    assert "pitch" in {row["xnp_source"] for row in rows if row["failure_class"] == "ok"}
+    assert "tier2_00" in tier2_used
+
+def test_serial_run_stays_out_of_source_dir():
+    source_files = {name: os.path.getmtime(os.path.join(optimizer2.SCRIPT_DIR, name))
+                    for name in os.listdir(optimizer2.SCRIPT_DIR)}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            use_standin(tmp)
+            workdir = optimizer2.use_serial_sandbox(os.path.join(tmp, "sandboxes"))
+            energy = optimizer2.evaluate_design(BASELINE)
+            written = set(os.listdir(workdir))
+    finally:
+        optimizer2._worker_state.workdir = None
+    assert np.isfinite(energy) and os.path.basename(workdir) == "serial_00"
+    assert {"current.des", "Results.csv", "MassProp_Results.csv", "current.aerocenter.stab"} <= written
+    # Nothing in the script directory was created or rewritten
+    assert {name: os.path.getmtime(os.path.join(optimizer2.SCRIPT_DIR, name))
+            for name in os.listdir(optimizer2.SCRIPT_DIR)} == source_files
+
+if __name__ == "__main__":
+    tests = [
+        test_files_read_like_vsp_output,
+        test_deterministic,
+        test_latency_scales_with_cores,
+        test_injected_failures,
+        test_de_end_to_end,
+        test_serial_run_stays_out_of_source_dir,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,102 @@
+"""
+Test for the surrogate pre-screen (optimizer2.SurrogateModel).
+
+Uses the fake `vsp` executable from test_parallel_eval.py:
+- The Gaussian process recovers a smooth function and is more certain near
+  its training data than far from it
+- Nothing is rejected until the history has SURROGATE_MIN_SAMPLES designs
+- A design predicted to be far below the best is logged as
+  surrogate_rejected without launching VSP; promising designs still run
+- Rejected rows are not used to retrain the surrogate
+
+Run directly (python test_surrogate.py) or under pytest.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, evaluate
+
+def smooth_objective(X):
+    X = np.atleast_2d(X)
+    return np.sin(X[:, 0] / 60.0) + 0.002 * (X[:, 2] - 280.0) ** 2 / 10.0 - 0.05 * X[:, 1]
+
+def test_gp_recovers_smooth_function():
+    train = np.array(random_population(80, seed=20))
+    test = np.array(random_population(20, seed=21))
+    model = optimizer2.SurrogateModel().fit(train, smooth_objective(train))
+
+    mean, std = model.predict(test)
+    y = smooth_objective(test)
+    assert model.n_samples == 80
+    assert np.max(np.abs(mean - y)) < 0.1 * np.ptp(smooth_objective(train))
+    # More certain at a training point than outside the sampled box
+    _, std_near = model.predict(train[:1])
+    far = train[:1].copy()
+    far[0, 0] += 500.0
+    _, std_far = model.predict(far)
+    assert std_near[0] < 0.5 * std_far[0]
+
+def test_prescreen_skips_hopeless_designs():
+    population = random_population(16, seed=22)
+    saved_min, saved_margin = optimizer2.SURROGATE_MIN_SAMPLES, optimizer2.SURROGATE_MARGIN
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        optimizer2.surrogate = None
+        optimizer2.SURROGATE_MIN_SAMPLES = 12
+        optimizer2.SURROGATE_MARGIN = 1.0
+        try:
+            evaluate(population[:8], tmp)
+            assert optimizer2.retrain_surrogate() is None  # too few designs yet
+            evaluate(population[8:], tmp)
+            model = optimizer2.retrain_surrogate()
+            assert model is not None and model.n_samples == 16
+
+            rows = read_history()
+            objectives = [float(r["final_obj"]) for r in rows]
+            worst = population[int(np.argmin(objectives))]
+            best = population[int(np.argmax(objectives))]
+            assert max(objectives) - min(objectives) > 2 * optimizer2.SURROGATE_MARGIN
+
+            # A rejected design must not reach the solver
+            fake_vsp = optimizer2.VSP_EXE
+            optimizer2.VSP_EXE = os.path.join(tmp, "missing_vsp")
+            energy = evaluate([worst + 1e-3], tmp)[0]
+            rejected = read_history()[-1]
+            assert rejected["failure_class"] == "surrogate_rejected"
+            # The prediction is logged, but DE gets an energy no member can lose to
+            assert float(rejected["final_obj"]) < optimizer2.best_obj_so_far
+            assert energy == optimizer2.REJECTED_ENERGY > optimizer2.FAILURE_ENERGY
+            assert optimizer2.surrogate_rejections >= 1
+
+            # Promising designs still run
+            optimizer2.VSP_EXE = fake_vsp
+            evaluate([best + 1e-3], tmp)
+            assert read_history()[-1]["failure_class"] == "ok"
+
+            # Only solver results train the next model
+            assert optimizer2.retrain_surrogate().n_samples == 17
+        finally:
+            optimizer2.SURROGATE_MIN_SAMPLES, optimizer2.SURROGATE_MARGIN = saved_min, saved_margin
+            optimizer2.surrogate = None
+
+if __name__ == "__main__":
+    tests = [
+        test_gp_recovers_smooth_function,
+        test_prescreen_skips_hopeless_designs,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
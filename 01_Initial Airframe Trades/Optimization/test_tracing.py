@@ -0,0 +1,150 @@
+"""
+Test for per-stage tracing (optimizer2.Tracer, --trace).
+
+Runs evaluations on the stand-in backend:
+- With tracing off, trace_span/traced cost about a function call and write
+  nothing
+- Every evaluation's span holds its stages - DES write, geometry update,
+  cruise, MassProp, pitch, the parsers, the history append and the status
+  write - and the trace file is Chrome/Perfetto JSON
+- Parallel workers get their own tracks; a flushed but unclosed trace (an
+  interrupted run) still reads as a JSON array
+- A DE run marks every generation and writes the trace as it goes
+
+Run directly (python test_tracing.py) or under pytest.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, read_history, gate_passing_population
+from test_checkpoint_resume import setup_run, restore_defaults
+
+STAGES = {"write_des_from_x", "update_geom", "cruise", "massprop", "pitch", "ResultsTable.from_csv",
+          "extract_band_ld", "extract_cg_from_results", "extract_stability_margin", "read_aerocenter_x",
+          "history_append", "write_status_file"}
+
+def load_trace(path):
+    with open(path) as f:
+        return json.load(f)
+
+def spans(events, name=None):
+    return [e for e in events if e["ph"] == "X" and (name is None or e["name"] == name)]
+
+def traced_run(tmp, population, workers=1):
+    setup_optimizer(tmp)
+    optimizer2.set_solver_backend(optimizer2.StandInBackend(latency={"cruise": 0.02, "pitch": 0.01}))
+    optimizer2.tracer = optimizer2.Tracer(os.path.join(tmp, "trace.json"))
+    pool = optimizer2.SandboxPool(workers, root=os.path.join(tmp, "sandboxes"))
+    try:
+        pool(optimizer2.evaluate_design, population)
+    finally:
+        pool.close()
+        tracer, optimizer2.tracer = optimizer2.tracer, None
+    return tracer
+
+def test_disabled_is_noop():
+    assert optimizer2.tracer is None
+    assert optimizer2.trace_span("cruise") is optimizer2.trace_span("pitch")
+    with optimizer2.trace_span("cruise") as span:
+        span.set(iter=1)
+
+    plain = lambda a, b=0: a + b
+    wrapped = optimizer2.traced("parse")(plain)
+    assert wrapped(1, b=2) == 3 and wrapped.__name__ == plain.__name__
+    n = 200000
+    start = time.perf_counter()
+    for _ in range(n):
+        plain(1)
+    base = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n):
+        wrapped(1)
+    assert (time.perf_counter() - start - base) / n < 2e-6
+
+def test_spans_cover_evaluation():
+    population = gate_passing_population(2, seed=90)
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer = traced_run(tmp, population)
+        tracer.close()
+        tracer.close()  # idempotent
+        events = load_trace(tracer.path)
+        rows = read_history()
+
+    evaluations = spans(events, "evaluate_design")
+    assert [e["args"]["iter"] for e in evaluations] == [int(row["iter"]) for row in rows] == [1, 2]
+    assert all(row["xnp_source"] == "pitch" for row in rows)
+    for evaluation in evaluations:
+        begin, end = evaluation["ts"], evaluation["ts"] + evaluation["dur"]
+        inside = [e for e in spans(events) if e["tid"] == evaluation["tid"] and begin <= e["ts"] <= end]
+        assert STAGES <= {e["name"] for e in inside}
+        cruise = next(e for e in inside if e["name"] == "cruise")
+        assert cruise["args"]["massprop"] is True and cruise["dur"] >= 0.9 * 0.02e6
+        # Stage spans end inside the evaluation span
+        assert all(e["ts"] + e["dur"] <= end + 1.0 for e in inside)
+    attempts = {e["name"] for e in spans(events) if e["cat"] == "solver"}
+    assert {"cruise attempt", "pitch attempt", "update_geom attempt"} <= attempts
+    assert {e["name"] for e in events if e["ph"] == "M"} == {"process_name", "thread_name"}
+
+def test_parallel_tracks_and_unclosed_file():
+    population = gate_passing_population(4, seed=91)
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer = traced_run(tmp, population, workers=2)
+        tracer.flush()
+        with open(tracer.path) as f:
+            text = f.read()
+        tracer.close()
+        events = load_trace(tracer.path)
+
+    # An interrupted run's file is the array without its closing bracket
+    assert json.loads(text + "]") == events
+    tracks = {e["tid"] for e in spans(events, "evaluate_design")}
+    names = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert len(tracks) == 2 and tracks <= set(names)
+    assert len(spans(events, "evaluate_design")) == 4
+
+def test_de_run_marks_generations():
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_run(tmp)
+            optimizer2.set_solver_backend(optimizer2.StandInBackend())
+            optimizer2.DE_POPSIZE = 1
+            optimizer2.DE_MAXITER = 2
+            optimizer2.tracer = optimizer2.Tracer(os.path.join(tmp, "trace.json"))
+            optimizer2.run_differential_evolution(optimizer2.DESIGN_BOUNDS)
+            # Written at every generation, before close()
+            with open(optimizer2.tracer.path) as f:
+                partial = json.loads(f.read() + "]")
+            optimizer2.tracer.close()
+            events = load_trace(optimizer2.tracer.path)
+            evaluations = len(read_history())
+    finally:
+        optimizer2.tracer = None
+        restore_defaults()
+    generations = [e for e in events if e["ph"] == "i"]
+    assert [e["name"] for e in generations] == ["generation 1", "generation 2"]
+    assert partial == events
+    assert len(spans(events, "evaluate_design")) == evaluations
+
+if __name__ == "__main__":
+    tests = [
+        test_disabled_is_noop,
+        test_spans_cover_evaluation,
+        test_parallel_tracks_and_unclosed_file,
+        test_de_run_marks_generations,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
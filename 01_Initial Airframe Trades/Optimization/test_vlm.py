@@ -0,0 +1,114 @@
+"""
+Test for the NumPy vortex lattice solver (vlm.py).
+
+No OpenVSP needed:
+- A bare wing matches the classical results: Helmbold lift slope, Oswald
+  efficiency close to 1, induced drag growing as CL^2
+- The wing tip fins act as end plates (less induced drag at the same CL)
+- Moving the wing moves the neutral point by the same distance, there is
+  almost no pitching moment about the neutral point, and it is the one
+  estimate_neutral_point finds in the polar
+- A batch of designs gives the same numbers as one design at a time, in
+  milliseconds per design
+
+Run directly (python test_vlm.py) or under pytest.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import vlm
+import optimizer2
+
+BASELINE = np.array(optimizer2.BASELINE_X)
+
+def whole_wing(x, result):
+    """Aspect ratio, CL and CDi of both wings together (VSPAero's Sref is one wing)."""
+    span_total = 2.0 * x[0]
+    area = 2.0 * result["sref"][0]
+    return span_total ** 2 / area, result["CL"][0] / 2.0, result["CDi"][0] / 2.0
+
+def test_bare_wing_matches_classical_results():
+    for x in ([330.0, 0.0, 320.0, 0.45, 120.0, 0.22], [400.0, 30.0, 300.0, 0.7, 110.0, 0.22]):
+        result = vlm.solve(x, fin=False)
+        aspect, cl, cdi = whole_wing(x, result)
+
+        root = x[4] / x[3]
+        tan_half_chord = np.tan(np.radians(x[1])) - (root - x[4]) / (2.0 * x[0])
+        helmbold = 2 * np.pi * aspect / (2 + np.sqrt(aspect ** 2 * (1 + tan_half_chord ** 2) + 4))
+        cl_alpha = np.polyfit(np.radians(vlm.ALPHAS), cl, 1)[0]
+        assert abs(cl_alpha / helmbold - 1.0) < 0.05, (cl_alpha, helmbold)
+
+        oswald = cl ** 2 / (np.pi * aspect * cdi)
+        assert np.all((oswald > 0.95) & (oswald < 1.05)), oswald
+        np.testing.assert_allclose(cdi / cl ** 2, cdi[0] / cl[0] ** 2, rtol=1e-9)
+
+def test_fins_are_end_plates():
+    bare = vlm.solve(BASELINE, fin=False)
+    finned = vlm.solve(BASELINE)
+    # Same CL: CDi / CL^2 is constant, so compare that
+    assert finned["CDi"][0, 3] / finned["CL"][0, 3] ** 2 < 0.9 * bare["CDi"][0, 3] / bare["CL"][0, 3] ** 2
+    assert finned["CL"][0, 3] > bare["CL"][0, 3]
+
+def test_neutral_point():
+    moved = BASELINE + np.array([0.0, 0.0, 20.0, 0.0, 0.0, 0.0])
+    base, shifted = vlm.solve(BASELINE), vlm.solve(moved)
+    assert abs(shifted["xnp"][0] - base["xnp"][0] - 20.0) < 1e-6
+    np.testing.assert_allclose(shifted["CL"], base["CL"], rtol=1e-9)
+
+    # Stable: nose-down moment grows with CL about a CG ahead of the neutral point,
+    # about the neutral point itself only the cos(alpha) of body axes is left
+    ahead = vlm.solve(BASELINE, xref=base["xnp"] - 10.0)
+    assert np.all(np.diff(ahead["CMy"][0]) < 0)
+    about_np = vlm.solve(BASELINE, xref=base["xnp"])
+    assert np.abs(about_np["CMy"]).max() < 0.01 * np.abs(ahead["CMy"]).max()
+
+    # Written as a VSPAero polar, the optimizer finds the same neutral point
+    rows = {
+        "CLtot": ["CLtot"] + [f"{v:.10f}" for v in base["CL"][0]],
+        "CMytot": ["CMytot"] + [f"{v:.10f}" for v in base["CMy"][0]],
+        "FC_Cref_": ["FC_Cref_", f"{base['cref'][0]:.10f}"],
+        "FC_Xcg_": ["FC_Xcg_", f"{base['xref'][0]:.10f}"],
+    }
+    xnp, mac = optimizer2.estimate_neutral_point(optimizer2.ResultsTable(rows))
+    assert abs(xnp - base["xnp"][0]) < 1e-6 and abs(mac - base["cref"][0]) < 1e-6
+
+def test_batch_matches_single_designs():
+    rng = np.random.default_rng(80)
+    lower = np.array([b[0] for b in optimizer2.DESIGN_BOUNDS])
+    upper = np.array([b[1] for b in optimizer2.DESIGN_BOUNDS])
+    X = lower + rng.random((50, 6)) * (upper - lower)
+    cgs = rng.uniform(380.0, 440.0, len(X))
+
+    start = time.perf_counter()
+    batch = vlm.solve(X, xref=cgs)
+    elapsed = time.perf_counter() - start
+    for i in (0, 17, 49):
+        single = vlm.solve(X[i], xref=cgs[i])
+        for name in ("CL", "CDi", "CMy", "xnp"):
+            np.testing.assert_allclose(batch[name][i], single[name][0], rtol=1e-9, atol=1e-12)
+    assert batch["CL"].shape == (50, len(vlm.ALPHAS))
+    assert np.all(batch["CDi"] > 0)
+    assert elapsed / len(X) < 0.05, elapsed
+
+if __name__ == "__main__":
+    tests = [
+        test_bare_wing_matches_classical_results,
+        test_fins_are_end_plates,
+        test_neutral_point,
+        test_batch_matches_single_designs,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
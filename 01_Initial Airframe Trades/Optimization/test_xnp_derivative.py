@@ -0,0 +1,167 @@
+"""
+Test for the neutral point estimate from the cruise sweep
+(optimizer2.estimate_neutral_point) and its calibration against Tier 2.
+
+Uses the fake `vsp` executable from test_parallel_eval.py, whose cruise sweep
+has CLtot/CMytot consistent with the aerodynamic center its pitch stability
+run writes (FAKE_VSP_STAB_OFFSET moves the latter):
+- Xnp = Xref - Cref * dCMy/dCL is recovered, also from an adaptive sweep with gaps
+- Designs that fail the Tier 2 gate get a real neutral point and static margin
+- --xnp calibrate runs Tier 2 until the estimate has agreed
+  XNP_CALIBRATION_SAMPLES times in a row, then skips it except for re-checks;
+  the objective is unchanged when the two agree
+- A disagreeing estimate never replaces Tier 2
+- --xnp derivative never runs Tier 2
+
+Run directly (python test_xnp_derivative.py) or under pytest.
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import optimizer2
+from test_parallel_eval import setup_optimizer, random_population, read_history, gate_passing_population
+
+def evaluate(population, tmp, source="pitch"):
+    optimizer2.XNP_SOURCE = source
+    optimizer2.XNP_CALIBRATION_LOG = os.path.join(tmp, "xnp_calibration.csv")
+    optimizer2.xnp_calibration = optimizer2.XnpCalibration()
+    pool = optimizer2.SandboxPool(1, root=os.path.join(tmp, "sandboxes"))
+    try:
+        return pool(optimizer2.evaluate_design, population)
+    finally:
+        pool.close()
+        optimizer2.XNP_SOURCE = "pitch"
+
+def read_calibration_log():
+    if not os.path.exists(optimizer2.XNP_CALIBRATION_LOG):
+        return []
+    with open(optimizer2.XNP_CALIBRATION_LOG, "r") as f:
+        return list(csv.DictReader(f))
+
+def polar_table(xnp, xref=314.25, cref=137.88, alphas=optimizer2.SWEEP_ALPHAS, gaps=()):
+    cl = [0.08 * a for a in alphas]
+    cm = [0.02 + (xref - xnp) / cref * c for c in cl]
+    fmt = lambda values: ["nan" if i in gaps else f"{v:.6f}" for i, v in enumerate(values)]
+    rows = {
+        "CLtot": ["CLtot"] + fmt(cl),
+        "CMytot": ["CMytot"] + fmt(cm),
+        "FC_Cref_": ["FC_Cref_", f"{cref}"],
+        "FC_Xcg_": ["FC_Xcg_", f"{xref}"],
+    }
+    return optimizer2.ResultsTable(rows, optimizer2.RESULTS_CSV)
+
+def test_estimate_recovers_neutral_point():
+    for xnp, gaps in [(300.0, ()), (330.0, ()), (290.0, (0, 5))]:
+        est_xnp, mac = optimizer2.estimate_neutral_point(polar_table(xnp, gaps=gaps))
+        assert abs(est_xnp - xnp) < 0.01 and mac == 137.88
+
+    # A different moment reference moves the derivative, not the answer
+    est_xnp, _ = optimizer2.estimate_neutral_point(polar_table(305.0, xref=250.0))
+    assert abs(est_xnp - 305.0) < 0.01
+
+    sm, crash, slug, xnp, mac, cg = optimizer2.extract_stability_fallback(polar_table(300.0), cg_x=290.0)
+    assert abs(sm - 10.0 / 137.88 * 100.0) < 0.01 and crash == 0.0 and slug == 0.0 and cg == 290.0
+    sm, crash, _, _, _, _ = optimizer2.extract_stability_fallback(polar_table(300.0), cg_x=299.0)
+    assert crash > 0.0  # < 5% MAC
+
+    # Not enough data: no estimate
+    table = polar_table(300.0)
+    del table.rows["CLtot"]
+    assert optimizer2.estimate_neutral_point(table) is None
+    assert optimizer2.estimate_neutral_point(polar_table(300.0, gaps=(0, 1, 2, 3, 4))) is None
+    assert optimizer2.extract_stability_fallback(table, cg_x=290.0)[0] is None
+
+def test_gate_failed_designs_get_neutral_point():
+    population = random_population(8, seed=50)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        evaluate(population, tmp)
+        rows = read_history()
+
+    sources = {row["xnp_source"] for row in rows}
+    assert sources == {"pitch", "derivative"}, sources
+    for x, row in zip(population, rows):
+        # Fake solver: Xnp = xloc + 12 from either source
+        assert abs(float(row["xnp"]) - (x[2] + 12.0)) < 0.05, row["xnp_source"]
+        sm = (x[2] + 12.0 - float(row["cg_x"])) / 137.88 * 100.0
+        assert abs(float(row["static_margin"]) - sm) < 0.05
+
+def test_calibration_skips_tier2_after_agreement():
+    population = gate_passing_population(10, seed=51)
+    saved = optimizer2.XNP_CALIBRATION_SAMPLES, optimizer2.XNP_RECHECK_EVERY
+    optimizer2.XNP_CALIBRATION_SAMPLES, optimizer2.XNP_RECHECK_EVERY = 3, 3
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            pitch_energies = evaluate(population, tmp)
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            energies = evaluate(population, tmp, source="calibrate")
+            rows = read_history()
+            log = read_calibration_log()
+            summary = optimizer2.xnp_calibration.summary()
+    finally:
+        optimizer2.XNP_CALIBRATION_SAMPLES, optimizer2.XNP_RECHECK_EVERY = saved
+
+    # 3 to calibrate, then every 3rd design is a re-check
+    expected = ["pitch"] * 3 + ["derivative", "derivative", "pitch"] * 2 + ["derivative"]
+    assert [row["xnp_source"] for row in rows] == expected
+    assert len(log) == expected.count("pitch")
+    assert all(row["agree"] == "True" and abs(float(row["error_pct_mac"])) < 0.01 for row in log)
+    assert "trusted" in summary and "5 Tier 2 runs skipped" in summary
+    np.testing.assert_allclose(energies, pitch_energies, atol=1e-3)
+
+def test_disagreement_keeps_running_tier2():
+    population = gate_passing_population(6, seed=52)
+    saved = optimizer2.XNP_CALIBRATION_SAMPLES
+    optimizer2.XNP_CALIBRATION_SAMPLES = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            setup_optimizer(tmp)
+            os.environ["FAKE_VSP_STAB_OFFSET"] = "5.0"  # 3.6% MAC
+            evaluate(population, tmp, source="calibrate")
+            rows = read_history()
+            log = read_calibration_log()
+    finally:
+        optimizer2.XNP_CALIBRATION_SAMPLES = saved
+        os.environ["FAKE_VSP_STAB_OFFSET"] = "0"
+
+    assert all(row["xnp_source"] == "pitch" for row in rows)
+    assert len(log) == len(population)
+    assert all(row["agree"] == "False" and row["streak"] == "0" for row in log)
+    assert all(abs(float(row["error_pct_mac"]) + 5.0 / 137.88 * 100.0) < 0.01 for row in log)
+
+def test_derivative_mode_never_runs_tier2():
+    population = gate_passing_population(4, seed=53)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_optimizer(tmp)
+        evaluate(population, tmp, source="derivative")
+        rows = read_history()
+        stages = set(optimizer2.watchdog.times)
+    assert all(row["xnp_source"] == "derivative" for row in rows)
+    assert "pitch" not in stages and "cruise" in stages
+
+if __name__ == "__main__":
+    tests = [
+        test_estimate_recovers_neutral_point,
+        test_gate_failed_designs_get_neutral_point,
+        test_calibration_skips_tier2_after_agreement,
+        test_disagreement_keeps_running_tier2,
+        test_derivative_mode_never_runs_tier2,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"[OK] {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,175 @@
+"""
+Per-stage timing of evaluations.
+
+- Tracer collects spans from every worker thread and writes them as a Chrome
+  trace (--trace), one track per thread
+- StageTimes adds up the exclusive wall time of one evaluation per history
+  timing column (geom_s, cruise_s, ...)
+- TraceSpan is one timed stage feeding both
+
+optimizer2.trace_span / traced create the spans of the evaluation running on
+the calling thread.
+"""
+
+import os
+import json
+import time
+import threading
+
+class StageTimes:
+    """
+    Wall-clock seconds of one evaluation per history timing column (columns:
+    the timed ones; other_s and overhead_s are added by fields()).
+    
+    Spans are exclusive: time inside a nested span counts only for the inner
+    column, so Results.csv parsing during an adaptive cruise sweep is parse_s,
+    not cruise_s, and the columns of a row add up to its wall time.
+    """
+    def __init__(self, columns, overhead_s=0.0):
+        self.start = time.perf_counter()
+        self.seconds = dict.fromkeys(columns, 0.0)
+        self.overhead_s = overhead_s
+        self.stack = []  # [column, start of its current exclusive stretch]
+
+    def enter(self, column, now):
+        if self.stack:
+            outer = self.stack[-1]
+            self.seconds[outer[0]] += now - outer[1]
+        self.stack.append([column, now])
+
+    def exit(self, now):
+        column, start = self.stack.pop()
+        self.seconds[column] += now - start
+        if self.stack:
+            self.stack[-1][1] = now
+
+    def fields(self, now):
+        """History column values, other_s being the rest of the wall time up to now."""
+        seconds = dict(self.seconds)
+        if self.stack:  # e.g. record_evaluation, which writes the row
+            seconds[self.stack[-1][0]] += now - self.stack[-1][1]
+        fields = {column: f"{value:.4f}" for column, value in seconds.items()}
+        fields["other_s"] = f"{max(now - self.start - sum(seconds.values()), 0.0):.4f}"
+        fields["overhead_s"] = f"{self.overhead_s:.4f}"
+        return fields
+
+class _NullSpan:
+    """What trace_span hands out while tracing is off: does nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class TraceSpan:
+    """
+    One timed stage: recorded as a complete ("X") event when it ends if
+    tracing is on, and added to its history timing column (StageTimes).
+    """
+    def __init__(self, tracer, name, cat, args, times=None, column=None):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.times = times
+        self.column = column
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        if self.times is not None:
+            self.times.enter(self.column, self.start)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if self.times is not None:
+            self.times.exit(end)
+        if self.tracer is not None:
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            self.tracer.complete(self.name, self.cat, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach values known only once the span is running (e.g. the iteration)."""
+        self.args.update(args)
+
+class Tracer:
+    """
+    Collects spans from every worker thread and writes them as a Chrome trace
+    (JSON array format) - open the file in ui.perfetto.dev or chrome://tracing
+    to see each worker thread as a track of evaluations and their stages.
+    
+    Events are kept in memory and appended to the file by flush(), which the
+    optimizer calls once per generation, so an evaluation does no trace I/O.
+    The file is valid JSON after close(); the file of an interrupted run has
+    no closing bracket, which both viewers accept.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        self.events = []
+        self.threads = {}  # thread ident -> small track id
+        self.written = 0
+        self.closed = False
+        with open(path, "w") as f:
+            f.write("[")
+        self.events.append({"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                            "args": {"name": "optimizer2"}})
+
+    def _tid(self):
+        """Track id of the calling thread (call with the lock held)."""
+        ident = threading.get_ident()
+        tid = self.threads.get(ident)
+        if tid is None:
+            tid = self.threads[ident] = len(self.threads) + 1
+            self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                                "args": {"name": threading.current_thread().name}})
+        return tid
+
+    def complete(self, name, cat, start, end, args=None):
+        """Span from perf_counter() start to end on the calling thread's track."""
+        event = {"name": name, "cat": cat, "ph": "X", "ts": round((start - self.t0) * 1e6, 3),
+                 "dur": round((end - start) * 1e6, 3), "pid": self.pid}
+        if args:
+            event["args"] = args
+        with self.lock:
+            event["tid"] = self._tid()
+            self.events.append(event)
+
+    def instant(self, name, cat="optimizer", **args):
+        """Marker across the whole process (e.g. the end of a generation)."""
+        event = {"name": name, "cat": cat, "ph": "i", "s": "p",
+                 "ts": round((time.perf_counter() - self.t0) * 1e6, 3), "pid": self.pid}
+        if args:
+            event["args"] = args
+        with self.lock:
+            event["tid"] = self._tid()
+            self.events.append(event)
+
+    def flush(self):
+        """Append the buffered events to the trace file."""
+        with self.lock:
+            events, self.events = self.events, []
+            if not events or self.closed:
+                return
+            with open(self.path, "a") as f:
+                for event in events:
+                    f.write(("\n" if self.written == 0 else ",\n") + json.dumps(event))
+                    self.written += 1
+
+    def close(self):
+        """Flush and close the JSON array."""
+        self.flush()
+        with self.lock:
+            if not self.closed:
+                with open(self.path, "a") as f:
+                    f.write("\n]\n")
+                self.closed = True
@@ -12,11 +12,12 @@ Can validate either:
 - opt_history.csv (from main optimizer2.py)
 """
 
-import csv
 import numpy as np
 import sys
 import os
 
+import history_store
+
 def validate_milestone3(history_file="test_opt_history.csv"):
     """
     Validate Milestone 3 criteria from optimization history file.
@@ -33,11 +34,7 @@ def validate_milestone3(history_file="test_opt_history.csv"):
         return False, {}
     
     # Read history file
-    iterations = []
-    with open(history_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            iterations.append(row)
+    iterations = history_store.read_rows(history_file)
     
     if len(iterations) == 0:
         print("ERROR: No iterations found in history file!")
@@ -0,0 +1,313 @@
+"""
+Vortex lattice method (VLM) for the optimizer's planform - Tier 0 low-fidelity
+aerodynamics in pure NumPy, no OpenVSP needed.
+
+Geometry follows the DES_TEMPLATE parameters on baseline.vsp3:
+- Lwing / Rwing: each a panel from the centreline, root leading edge at
+  X_Rel_Location = xloc, `span` mm per side, leading-edge sweep, root chord
+  tip / taper
+- TailGeom: vertical fins on the wing tips, root leading edge at the wing tip
+  leading edge, root chord = tip chord, 45 deg leading-edge sweep (des_values);
+  its span and tip chord are fixed in baseline.vsp3 (FIN_SPAN, FIN_TIP_CHORD)
+
+Surfaces are flat and thin (no camber, thickness or fuselage), the wake is
+flat along +x, and the flow is symmetric, so only the right half is
+paneled and the left half enters as a mirror image. The influence matrix does
+not depend on alpha: each design is solved once for every alpha, and designs
+are solved as one batched np.linalg.solve.
+
+Coefficients use VSPAero's component reference (one wing geom: Sref = its
+area, Cref = its MAC), so CL / CMy compare with the cruise sweep's CLtot /
+CMytot. CDi is the Trefftz plane induced drag; there is no parasite drag.
+
+Usage:
+    python vlm.py [--designs 100]   (baseline polar and solver timing)
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+
+# ---------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------
+ALPHAS = np.arange(2.0, 15.0, 2.0)  # deg, same as the cruise sweep (ALPHA_START..ALPHA_END)
+
+# Fins (TailGeom) - fixed in baseline.vsp3 (10 mm + 105 mm sections)
+FIN_SWEEP_DEG = 45.0   # optimizer2.des_values fin_sweep
+FIN_SPAN = 115.0       # mm
+FIN_TIP_CHORD = 54.67  # mm
+
+# Lattice size: spanwise x chordwise panels per surface (right half)
+WING_SPAN_PANELS = 16
+FIN_SPAN_PANELS = 4
+CHORD_PANELS = 4
+
+CORE_RADIUS = 1e-6  # mm - induced velocity is zero this close to a vortex line
+
+# ---------------------------------------------------------------------
+# Geometry
+# ---------------------------------------------------------------------
+def wing_reference(X):
+    """
+    VSPAero component reference values of one wing geom, per design.
+
+    Parameters:
+    - X: Design vectors (n, 6) - span, sweep, xloc, taper, tip, ctrl
+
+    Returns: (sref mm^2, cref mm = MAC, x of the MAC leading edge mm), arrays (n,)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    span, sweep, xloc, taper, tip = X[:, 0], X[:, 1], X[:, 2], X[:, 3], X[:, 4]
+    root = tip / taper
+    sref = span * (root + tip) / 2.0
+    cref = 2.0 / 3.0 * root * (1.0 + taper + taper ** 2) / (1.0 + taper)
+    y_mac = span * (1.0 + 2.0 * taper) / (3.0 * (1.0 + taper))
+    x_mac = xloc + y_mac * np.tan(np.radians(sweep))
+    return sref, cref, x_mac
+
+def _surface(le_root, le_dir, span_dir, length, root_chord, tip_chord, eta, n_chord):
+    """
+    Horseshoe vortices of one trapezoidal surface, per design.
+
+    le_root (n, 3) is the root leading edge, le_dir (n, 3) the leading edge
+    direction per unit of span along span_dir (3,) and eta the strip edges as
+    fractions of the span. Returns (a, b, cp, strip ends) with a/b
+    (n, strips * n_chord, 3) the bound vortex ends on the quarter-chord line of
+    each panel, cp the three-quarter-chord control points and strip ends
+    (n, strips + 1, 3) the trailing edge points between strips.
+    """
+    # Leading edge and chord at each strip edge (n, strips + 1)
+    le = le_root[:, None, :] + (eta[None, :, None] * length[:, None, None]) * (
+        le_dir[:, None, :] + np.asarray(span_dir)[None, None, :])
+    chord = root_chord[:, None] + (tip_chord - root_chord)[:, None] * eta[None, :]
+    xi = np.arange(n_chord) / n_chord
+
+    def chordwise(points, chords, fraction):
+        # (n, strips, 3) -> (n, strips * n_chord, 3) at xi + fraction of each panel
+        offset = (xi[None, None, :] + fraction / n_chord) * chords[:, :, None]
+        p = np.repeat(points[:, :, None, :], n_chord, axis=2)
+        p[..., 0] += offset
+        return p.reshape(len(points), -1, 3)
+
+    a = chordwise(le[:, :-1], chord[:, :-1], 0.25)
+    b = chordwise(le[:, 1:], chord[:, 1:], 0.25)
+    cp = chordwise((le[:, :-1] + le[:, 1:]) / 2.0, (chord[:, :-1] + chord[:, 1:]) / 2.0, 0.75)
+    te = le.copy()
+    te[..., 0] += chord
+    return a, b, cp, te
+
+def build_lattice(X, fin=True):
+    """
+    Vortex lattice of the right half of each design.
+
+    Parameters:
+    - X: Design vectors (n, 6) - span, sweep, xloc, taper, tip, ctrl
+    - fin: Include the wing tip fins (False = bare wing, for validation)
+
+    Returns: dict of arrays - a, b (bound vortex ends), cp (control points),
+    normal (n, N, 3); strip_a, strip_b (n, S, 3) Trefftz plane ends of each
+    spanwise strip; strip (N,) strip of each panel; sref, cref, x_mac (n,)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    n = len(X)
+    span, sweep, xloc, taper, tip = X[:, 0], X[:, 1], X[:, 2], X[:, 3], X[:, 4]
+    tan_sweep = np.tan(np.radians(sweep))
+    zeros = np.zeros(n)
+
+    # Strips bunch up towards the tips and the fin junction, where the loading changes fastest
+    wing_eta = np.sin(np.linspace(0.0, np.pi / 2.0, WING_SPAN_PANELS + 1))
+    fin_eta = (1.0 - np.cos(np.linspace(0.0, np.pi, FIN_SPAN_PANELS + 1))) / 2.0
+
+    surfaces = [_surface(
+        np.stack([xloc, zeros, zeros], axis=1), np.stack([tan_sweep, zeros, zeros], axis=1),
+        (0.0, 1.0, 0.0), span, tip / taper, tip, wing_eta, CHORD_PANELS)]
+    if fin:
+        fin_root = np.stack([xloc + span * tan_sweep, span, zeros], axis=1)
+        fin_dir = np.tile([np.tan(np.radians(FIN_SWEEP_DEG)), 0.0, 0.0], (n, 1))
+        surfaces.append(_surface(
+            fin_root, fin_dir, (0.0, 0.0, 1.0), np.full(n, FIN_SPAN), tip,
+            np.full(n, FIN_TIP_CHORD), fin_eta, CHORD_PANELS))
+
+    a = np.concatenate([s[0] for s in surfaces], axis=1)
+    b = np.concatenate([s[1] for s in surfaces], axis=1)
+    cp = np.concatenate([s[2] for s in surfaces], axis=1)
+    # Flat surfaces: normal = chordwise x bound vortex (wing +z, fin -y)
+    normal = np.cross([1.0, 0.0, 0.0], b - a)
+    normal /= np.linalg.norm(normal, axis=-1, keepdims=True)
+    strip_a = np.concatenate([s[3][:, :-1] for s in surfaces], axis=1)
+    strip_b = np.concatenate([s[3][:, 1:] for s in surfaces], axis=1)
+    strip = np.arange(a.shape[1]) // CHORD_PANELS
+
+    sref, cref, x_mac = wing_reference(X)
+    return dict(a=a, b=b, cp=cp, normal=normal, strip_a=strip_a, strip_b=strip_b,
+                strip=strip, sref=sref, cref=cref, x_mac=x_mac)
+
+def mirror(points):
+    """Points reflected in the symmetry plane (y -> -y)."""
+    mirrored = np.array(points, dtype=float, copy=True)
+    mirrored[..., 1] *= -1.0
+    return mirrored
+
+# ---------------------------------------------------------------------
+# Induced velocities (Biot-Savart, unit circulation)
+# ---------------------------------------------------------------------
+def segment_velocity(p, a, b):
+    """Velocity at p induced by the vortex segment a -> b (broadcast over leading axes)."""
+    r1 = p - a
+    r2 = p - b
+    r0 = b - a
+    cross = np.cross(r1, r2)
+    cross2 = np.sum(cross * cross, axis=-1)
+    n1 = np.linalg.norm(r1, axis=-1)
+    n2 = np.linalg.norm(r2, axis=-1)
+    valid = (cross2 > CORE_RADIUS ** 2 * np.sum(r0 * r0, axis=-1)) & (n1 > CORE_RADIUS) & (n2 > CORE_RADIUS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.sum(r0 * (r1 / n1[..., None] - r2 / n2[..., None]), axis=-1) / (4.0 * np.pi * cross2)
+    return np.where(valid, k, 0.0)[..., None] * cross
+
+def trailing_velocity(p, a):
+    """Velocity at p induced by the semi-infinite vortex from a to x = +infinity."""
+    r = p - a
+    d2 = r[..., 1] ** 2 + r[..., 2] ** 2  # |x_hat cross r|^2
+    valid = d2 > CORE_RADIUS ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (1.0 + r[..., 0] / np.linalg.norm(r, axis=-1)) / (4.0 * np.pi * d2)
+    k = np.where(valid, k, 0.0)
+    return np.stack([np.zeros_like(k), -k * r[..., 2], k * r[..., 1]], axis=-1)
+
+def horseshoe_velocity(p, a, b):
+    """Velocity at p induced by the horseshoe vortex +inf -> a -> b -> +inf."""
+    return segment_velocity(p, a, b) + trailing_velocity(p, b) - trailing_velocity(p, a)
+
+def influence_matrix(lattice):
+    """Normal velocity at each control point per unit circulation of each panel and its mirror image, (n, N, N)."""
+    p = lattice["cp"][:, :, None, :]
+    a = lattice["a"][:, None, :, :]
+    b = lattice["b"][:, None, :, :]
+    # The image of a -> b runs mirror(b) -> mirror(a), so both halves lift the same way
+    v = horseshoe_velocity(p, a, b) + horseshoe_velocity(p, mirror(b), mirror(a))
+    return np.einsum("nijk,nik->nij", v, lattice["normal"])
+
+# ---------------------------------------------------------------------
+# Solver
+# ---------------------------------------------------------------------
+def freestream(alphas):
+    """Unit freestream (na, 3) and lift direction (na, 3) in body axes."""
+    alpha = np.radians(np.asarray(alphas, dtype=float))
+    zeros = np.zeros_like(alpha)
+    return (np.stack([np.cos(alpha), zeros, np.sin(alpha)], axis=-1),
+            np.stack([-np.sin(alpha), zeros, np.cos(alpha)], axis=-1))
+
+def trefftz_drag(lattice, gamma):
+    """
+    Induced drag of the whole aircraft (rho = V = 1) from the wake far downstream.
+
+    Each spanwise strip sheds its total circulation from its trailing edge
+    ends; the downwash at strip centres comes from those 2D point vortices
+    and their mirror images. Returns (n, na).
+    """
+    n_strips = lattice["strip_a"].shape[1]
+    strip_gamma = np.zeros((gamma.shape[0], n_strips, gamma.shape[2]))
+    np.add.at(strip_gamma, (slice(None), lattice["strip"]), gamma)
+
+    ya, yb = lattice["strip_a"][..., 1:], lattice["strip_b"][..., 1:]  # (y, z)
+    centre = (ya + yb) / 2.0
+    ds = yb - ya
+    length = np.linalg.norm(ds, axis=-1)
+    normal = np.stack([-ds[..., 1], ds[..., 0]], axis=-1) / length[..., None]  # wing +z, fin -y
+
+    def point_vortex(p, p0):
+        # 2D velocity at p per unit circulation about +x at p0, (n, S, S, 2)
+        r = p[:, :, None, :] - p0[:, None, :, :]
+        r2 = np.sum(r * r, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = np.where(r2 > CORE_RADIUS ** 2, 1.0 / (2.0 * np.pi * r2), 0.0)
+        return np.stack([-k * r[..., 1], k * r[..., 0]], axis=-1)
+
+    def image(p):
+        return p * np.array([-1.0, 1.0])
+
+    # +gamma at b, -gamma at a; the mirror images have the opposite sign
+    v = (point_vortex(centre, yb) - point_vortex(centre, ya)
+         - point_vortex(centre, image(yb)) + point_vortex(centre, image(ya)))
+    w = np.einsum("nijk,nik->nij", v, normal)           # downwash per unit strip circulation
+    wash = np.einsum("nij,nja->nia", w, strip_gamma)    # (n, S, na)
+    half_drag = -0.5 * np.sum(strip_gamma * wash * length[..., None], axis=1)
+    return 2.0 * half_drag
+
+def solve(X, alphas=ALPHAS, xref=None, fin=True):
+    """
+    CL, CDi and CMy per alpha and the neutral point, for a batch of designs.
+
+    Parameters:
+    - X: Design vectors (n, 6) or one design (6,)
+    - alphas: Angles of attack (deg)
+    - xref: Moment reference x (mm) - scalar or per design (e.g. the CG);
+      None = quarter chord of the MAC
+    - fin: Include the wing tip fins
+
+    Returns: dict - CL, CDi, CMy (n, na); xnp (n,) in mm from the
+    least-squares dCMy/dCL, as estimate_neutral_point does with VSPAero's
+    polar; sref, cref, xref (n,)
+    """
+    lattice = build_lattice(X, fin=fin)
+    n = len(lattice["sref"])
+    if xref is None:
+        xref = lattice["x_mac"] + 0.25 * lattice["cref"]
+    xref = np.broadcast_to(np.asarray(xref, dtype=float), (n,))
+
+    v_inf, lift_dir = freestream(alphas)
+    rhs = -np.einsum("ak,nik->nia", v_inf, lattice["normal"])
+    gamma = np.linalg.solve(influence_matrix(lattice), rhs)  # (n, N, na)
+
+    # Kutta-Joukowski on the bound vortices with the freestream: F = gamma * V x l
+    bound = lattice["b"] - lattice["a"]
+    force = gamma[..., None] * np.cross(v_inf[None, None, :, :], bound[:, :, None, :])  # (n, N, na, 3)
+    arm = (lattice["a"] + lattice["b"]) / 2.0
+    arm = arm - np.stack([xref, np.zeros(n), np.zeros(n)], axis=1)[:, None, :]
+    pitch = arm[:, :, None, 2] * force[..., 0] - arm[:, :, None, 0] * force[..., 2]
+
+    q_sref = 0.5 * lattice["sref"][:, None]
+    cl = 2.0 * np.einsum("nial,al->na", force, lift_dir) / q_sref
+    cmy = 2.0 * pitch.sum(axis=1) / (q_sref * lattice["cref"][:, None])
+    cdi = trefftz_drag(lattice, gamma) / q_sref
+
+    cl_dev = cl - cl.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):  # one alpha has no slope: xnp is nan
+        dcm_dcl = np.sum(cl_dev * (cmy - cmy.mean(axis=1, keepdims=True)), axis=1) / np.sum(cl_dev ** 2, axis=1)
+    xnp = xref - lattice["cref"] * dcm_dcl
+    return dict(CL=cl, CDi=cdi, CMy=cmy, xnp=xnp, sref=lattice["sref"], cref=lattice["cref"], xref=xref)
+
+# ---------------------------------------------------------------------
+# Baseline polar and timing
+# ---------------------------------------------------------------------
+BASELINE_X = [330.0, 25.0, 320.0, 0.833333, 120.0, 0.22]  # optimizer2.BASELINE_X
+
+def main():
+    parser = argparse.ArgumentParser(description="VLM polar of the baseline design and batch solve timing")
+    parser.add_argument("--designs", type=int, default=100, help="Designs in the timed batch")
+    args = parser.parse_args()
+
+    result = solve(BASELINE_X)
+    print(f"Baseline: Sref {result['sref'][0]:.0f} mm^2, Cref {result['cref'][0]:.2f} mm, "
+          f"Xnp {result['xnp'][0]:.1f} mm")
+    print(f"{'alpha':>6} {'CL':>8} {'CDi':>9} {'CMy':>8} {'L/Di':>7}")
+    for i, alpha in enumerate(ALPHAS):
+        cl, cdi, cmy = result["CL"][0, i], result["CDi"][0, i], result["CMy"][0, i]
+        print(f"{alpha:6.1f} {cl:8.4f} {cdi:9.5f} {cmy:8.4f} {cl / cdi:7.1f}")
+
+    rng = np.random.default_rng(0)
+    lower = np.array([275.0, 0.0, 220.0, 0.6, 95.0, 0.22])
+    upper = np.array([480.0, 40.0, 340.0, 0.9, 125.0, 0.22])
+    X = lower + rng.random((args.designs, 6)) * (upper - lower)
+    start = time.perf_counter()
+    solve(X)
+    elapsed = time.perf_counter() - start
+    print(f"\n{args.designs} designs x {len(ALPHAS)} alphas in {elapsed * 1000:.1f} ms "
+          f"({elapsed * 1000 / args.designs:.2f} ms per design)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())